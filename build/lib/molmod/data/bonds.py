@@ -0,0 +1,210 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from molmod.data.periodic import periodic
+import molmod.units as units
+from molmod import context
+
+import numpy, os
+
+
+__all__ = [
+    "BondData", "BOND_SINGLE", "BOND_DOUBLE", "BOND_TRIPLE", "BOND_HYBRID",
+    "BOND_HYDROGEN", "bond_types"
+]
+
+
+class BondType(object):
+    def __init__(self, num, special):
+        self.num = num
+        self.special = special
+
+
+BOND_SINGLE = 1
+BOND_DOUBLE = 2
+BOND_TRIPLE = 3
+BOND_HYBRID = 4
+BOND_HYDROGEN = 5
+
+bond_types = [
+    BOND_SINGLE, BOND_DOUBLE, BOND_TRIPLE, BOND_HYBRID, BOND_HYDROGEN
+]
+
+
+class BondData(object):
+    """
+    This object loads information about average bond lengths from a csv file
+    when it is initialized. Missing data points in the csv file are estimated
+    by adding Van der Waals radii of the two atoms of the given bond.
+    """
+    bond_tolerance = 1.2
+
+    def __init__(self, filename, periodic_data):
+        self.lengths = dict([bond_type, {}] for bond_type in bond_types)
+        self.periodic_data = periodic_data
+        self._load_bond_data(filename)
+        self._approximate_unkown_bond_lengths()
+        self._build_length_table()
+        self.max_length = max(
+            max(lengths.itervalues())
+            for lengths
+            in self.lengths.itervalues()
+            if len(lengths) > 0
+        )
+
+    def _load_bond_data(self, filename):
+        """Load the bond data from the given file.
+
+        It's assumed that the uncommented lines in the data file have the
+        following format:
+        symbol1 symbol2 number1 number2 bond_length_single_a bond_length_double_a bond_length_triple_a bond_length_single_b bond_length_double_b bond_length_triple_b ..."
+        where a, b, ... stand for different sources.
+        """
+
+        def read_units(unit_names):
+            tmp = {
+                "A": units.angstrom,
+                "pm": units.pm,
+                "nm": units.nanometer,
+            }
+            return [tmp[unit_name] for unit_name in unit_names]
+
+        def read_length(BOND_TYPE, words, col):
+            nlow = int(words[2])
+            nhigh = int(words[3])
+            for i, conversion in zip(xrange((len(words) - 4) / 3), conversions):
+                word = words[col + 3 + i*3]
+                if word != 'NA':
+                    self.lengths[BOND_TYPE][frozenset([nlow, nhigh])] = float(word)*conversion
+                    return
+
+        f = file(filename)
+        for line in f:
+            words = line.split()
+            if (len(words) > 0) and (words[0][0] != "#"):
+                if words[0] == "unit":
+                    conversions = read_units(words[1:])
+                else:
+                    read_length(BOND_SINGLE, words, 1)
+                    read_length(BOND_DOUBLE, words, 2)
+                    read_length(BOND_TRIPLE, words, 3)
+        f.close()
+
+    def _approximate_unkown_bond_lengths(self):
+        """Completes the bond length database with approximations based on VDW radii"""
+        dataset = self.lengths[BOND_SINGLE]
+        for n1 in self.periodic_data.yield_numbers():
+            for n2 in self.periodic_data.yield_numbers():
+                if n1 <= n2:
+                    pair = frozenset([n1, n2])
+                    atom1 = self.periodic_data[n1]
+                    atom2 = self.periodic_data[n2]
+                    #if (pair not in dataset) and hasattr(atom1, "covalent_radius") and hasattr(atom2, "covalent_radius"):
+                    if (pair not in dataset) and (atom1.covalent_radius is not None) and (atom2.covalent_radius is not None):
+                        dataset[pair] = (atom1.covalent_radius + atom2.covalent_radius)
+                    #print "%3i  %3i  %s %30s %30s" % (n1, n2, dataset.get(pair), atom1, atom2)
+
+    def _build_length_table(self):
+        """Store the bond lengths in an array for the vectorized bonded_array
+
+        The element length_table[i, n1, n2] is the bond length for
+        bond_types[i] between atom numbers n1 and n2. Missing bond lengths are
+        set to zero.
+        """
+        size = max(self.periodic_data.yield_numbers()) + 1
+        self.length_table = numpy.zeros((len(bond_types), size, size), float)
+        for index, bond_type in enumerate(bond_types):
+            for pair, bond_length in self.lengths[bond_type].iteritems():
+                numbers = list(pair)
+                n1, n2 = numbers[0], numbers[-1]
+                self.length_table[index, n1, n2] = bond_length
+                self.length_table[index, n2, n1] = bond_length
+
+    def bonded(self, n1, n2, distance):
+        """
+        Return the estimated bond type.
+
+        This method checks wether for the given pair of atom numbers, the
+        given distance corresponds to a certain bond_length. The best
+        matching bond type will be returned. If the distance is a factor
+        self.bond_tolerance larger than a tabulated distance, the algorithm
+        will not relate them.
+        """
+        if distance > self.max_length * self.bond_tolerance:
+            return None
+
+        deviation = 0.0
+        pair = frozenset([n1,n2])
+        result = None
+        for bond_type in bond_types:
+            bond_length = self.lengths[bond_type].get(pair)
+            if (bond_length is not None) and \
+               (distance < bond_length * self.bond_tolerance):
+                if result is None:
+                    result = bond_type
+                    deviation = abs(bond_length - distance)
+                else:
+                    new_deviation = abs(bond_length - distance)
+                    if deviation > new_deviation:
+                        result = bond_type
+                        deviation = new_deviation
+        return result
+
+    def bonded_array(self, numbers1, numbers2, distances):
+        """
+        Return the estimated bond types for arrays of atom pairs.
+
+        This is the vectorized version of the method bonded. The arguments are
+        arrays with the atom numbers of the first and the second atom in each
+        pair and the distances between them. The result is an integer array
+        with the bond types. Where no bond is found, the result is zero.
+        """
+        numbers1 = numpy.asarray(numbers1, int)
+        numbers2 = numpy.asarray(numbers2, int)
+        distances = numpy.asarray(distances, float)
+        size = self.length_table.shape[1]
+        known = (numbers1 >= 0) & (numbers1 < size) & (numbers2 >= 0) & (numbers2 < size)
+        bond_lengths = self.length_table[:, numbers1*known, numbers2*known]
+        deviations = abs(bond_lengths - distances)
+        deviations[(bond_lengths == 0.0) | (distances >= bond_lengths*self.bond_tolerance)] = numpy.inf
+        # argmin picks the first bond type in case of ties, just like bonded
+        result = numpy.array(bond_types)[deviations.argmin(axis=0)]
+        result[~known | numpy.isinf(deviations.min(axis=0))] = 0
+        return result
+
+    def get_length(self, n1, n2, bond_type=BOND_SINGLE):
+        """
+        Return the length of a bond between n1 and n2 of type bond_type.
+
+        This is a safe method for querying a bond_length. If no answer can be
+        found, this get_length returns None.
+        """
+        dataset = self.lengths.get(bond_type)
+        if dataset == None:
+            return None
+        return dataset.get(frozenset([n1, n2]))
+
+
+bonds = BondData(context.get_share_filename("bonds.csv"), periodic)
+
+
+
+
@@ -0,0 +1,89 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from binning import IntraAnalyseNeighboringObjects
+
+import numpy
+
+
+__all__ = ["Environment", "calculate_environments"]
+
+
+class Error(Exception):
+    pass
+
+
+class Environment(object):
+    def __init__(self, positioned):
+        self.__dict__.update(positioned.__dict__)
+        deltas = []
+        distances = []
+
+
+def calculate_environments(sparse_binned_objects, radius, unit_cell=None):
+    if radius >= sparse_binned_objects.gridsize:
+        raise Error("The grid size of the bins is too small.")
+
+    # compute all relative vectors between neighboring objects at once
+    indices1, indices2, deltas = IntraAnalyseNeighboringObjects(sparse_binned_objects, None).get_pairs(unit_cell)
+    if unit_cell is not None:
+        deltas = unit_cell.shortest_vector(deltas)
+    distances = numpy.sqrt((deltas**2).sum(axis=1))
+    # a pair can be found in more than one periodic image
+    foo, first = numpy.unique(indices1*len(sparse_binned_objects.positioned_objects) + indices2, return_index=True)
+    mask = numpy.zeros(len(distances), bool)
+    mask[first] = True
+    mask &= distances <= radius
+    indices1 = indices1[mask]
+    indices2 = indices2[mask]
+    deltas = deltas[mask]
+    distances = distances[mask]
+
+    # each pair contributes to the environments of both objects
+    centers = numpy.concatenate([indices1, indices2])
+    others = numpy.concatenate([indices2, indices1])
+    deltas = numpy.concatenate([deltas, -deltas])
+    distances = numpy.concatenate([distances, distances])
+    order = centers.argsort(kind="mergesort")
+    centers = centers[order]
+    others = others[order]
+    deltas = deltas[order]
+    distances = distances[order]
+    bounds = numpy.concatenate([[0], (centers[1:] != centers[:-1]).nonzero()[0] + 1, [len(centers)]])
+
+    # At this time we have for each object a set of vectors that
+    # point to other objects within the range of radius. Now we will
+    # calculate some aditional information
+    positioned_objects = sparse_binned_objects.positioned_objects
+    environments = {}
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        if begin == end:
+            continue
+        environment = Environment(positioned_objects[centers[begin]])
+        environment.n = end - begin
+        environment.deltas = deltas[begin:end]
+        environment.distances = distances[begin:end]
+        environment.neighbors = numpy.array([positioned_objects[other].id for other in others[begin:end]])
+        environment.reverse_neighbors = dict((id, index) for index, id in enumerate(environment.neighbors))
+        environment.directions = (environment.deltas.transpose() / (environment.distances + (environment.distances == 0.0))).transpose()
+        environments[environment.id] = environment
+
+    return environments
@@ -0,0 +1,687 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+import numpy
+
+
+__all__ = [
+    "Scalar", "Vector3", "dot", "cross",
+    "bond_length", "pair_distance",
+    "bend_cos", "bend_angle",
+    "dihed_cos", "dihed_angle",
+    "oop_sin", "oop_angle",
+    "bond_lengths", "pair_distances",
+    "bend_cosines", "bend_angles",
+    "dihed_cosines", "dihed_angles",
+    "oop_sines", "oop_angles",
+    "sparse_jacobian", "sparse_hessian", "ICArray",
+]
+
+
+# All internal coordinates below also accept arrays of vectors with shape
+# (...,3) instead of single vectors. The leading axes are then carried through
+# all values and derivatives. These helpers make the values and derivatives
+# of lower rank broadcast against those of higher rank.
+
+def _ex(v, n=1):
+    """Append n axes of length one to v."""
+    return numpy.reshape(v, numpy.shape(v) + (1,)*n)
+
+def _outer(a, b):
+    """The outer product of the last axes of a and b."""
+    return a[...,:,None]*b[...,None,:]
+
+
+class Scalar(object):
+    def __init__(self, size, deriv=0, value=0, index=None):
+        """Initialize a scalar internal coordinate.
+
+        size -- the number of inputs on which this ic depends. e.g. a distance
+                depends on 6 cartesian coordinates.
+        deriv -- consider up to deriv order derivatives.
+        value -- the initial value
+        index -- if self is one of the inputs, this is its index
+        """
+        self.deriv = deriv
+        self.size = size
+        if numpy.ndim(value) == 0:
+            self.v = numpy.float64(value)
+        else:
+            self.v = numpy.array(value, float)
+        shape = numpy.shape(value)
+        if deriv > 0:
+            self.d = numpy.zeros(shape + (size,), float)
+            if index is not None:
+                self.d[...,index] = 1
+        if deriv > 1:
+            self.dd = numpy.zeros(shape + (size,size), float)
+        if deriv > 2:
+            raise ValueError("This implementation (only) supports up to second order derivatives.")
+
+    def copy(self):
+        result = Scalar(self.size, self.deriv, self.v)
+        if self.deriv > 0: result.d[:] = self.d[:]
+        if self.deriv > 1: result.dd[:] = self.dd[:]
+        return result
+
+    def results(self):
+        if self.deriv == 0:
+            return self.v,
+        if self.deriv == 1:
+            return self.v, self.d
+        if self.deriv == 2:
+            return self.v, self.d, self.dd
+
+    def __iadd__(self, other):
+        if self.deriv > 1: self.dd += other.dd
+        if self.deriv > 0: self.d += other.d
+        self.v += other.v
+        return self
+
+    def __isub__(self, other):
+        if self.deriv > 1: self.dd -= other.dd
+        if self.deriv > 0: self.d -= other.d
+        self.v -= other.v
+        return self
+
+    def __imul__(self, other):
+        if isinstance(other, int) or isinstance(other, float):
+            self.v *= other
+            if self.deriv > 0:
+                self.d *= other
+            if self.deriv > 1:
+                self.dd *= other
+        elif isinstance(other, Scalar):
+            # trying to avoid temporaries as much as possible
+            if self.deriv > 1:
+                self.dd *= _ex(other.v, 2)
+                self.dd += _ex(self.v, 2)*other.dd
+                tmp = _outer(self.d, other.d)
+                self.dd += tmp
+                self.dd += tmp.swapaxes(-1,-2)
+            if self.deriv > 0:
+                self.d *= _ex(other.v)
+                self.d += _ex(self.v)*other.d
+            self.v *= other.v
+        else:
+            raise TypeError("Second argument must be float, int or Scalar")
+        return self
+
+    def __idiv__(self, other):
+        if isinstance(other, int) or isinstance(other, float):
+            self.v /= other
+            if self.deriv > 0:
+                self.d /= other
+            if self.deriv > 1:
+                self.dd /= other
+        elif isinstance(other, Scalar):
+            # trying to avoid temporaries as much as possible
+            self.v /= other.v
+            if self.deriv > 0:
+                self.d -= _ex(self.v)*other.d
+                self.d /= _ex(other.v)
+            if self.deriv > 1:
+                self.dd -= _ex(self.v, 2)*other.dd
+                tmp = _outer(self.d, other.d)
+                self.dd -= tmp
+                self.dd -= tmp.swapaxes(-1,-2)
+                self.dd /= _ex(other.v, 2)
+        else:
+            raise TypeError("Second argument must be float, int or Scalar")
+        return self
+
+    def inv(self):
+        """In place invert"""
+        self.v = 1/self.v
+        tmp = self.v**2
+        if self.deriv > 1:
+            self.dd[:] = _ex(tmp, 2)*(2*_ex(self.v, 2)*_outer(self.d, self.d) - self.dd)
+        if self.deriv > 0:
+            self.d[:] = -_ex(tmp)*self.d[:]
+
+
+class Vector3(object):
+    def __init__(self, size, deriv=0, values=(0,0,0), indexes=(None,None,None)):
+        self.deriv = deriv
+        self.size = size
+        self.x = Scalar(size, deriv, values[0], indexes[0])
+        self.y = Scalar(size, deriv, values[1], indexes[1])
+        self.z = Scalar(size, deriv, values[2], indexes[2])
+
+    def copy(self):
+        result = Vector3(self.size, self.deriv)
+        result.x = self.x.copy()
+        result.y = self.y.copy()
+        result.z = self.z.copy()
+        return result
+
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        self.z += other.z
+        return self
+
+    def __isub__(self, other):
+        self.x -= other.x
+        self.y -= other.y
+        self.z -= other.z
+        return self
+
+    def __imul__(self, other):
+        self.x *= other
+        self.y *= other
+        self.z *= other
+        return self
+
+    def __idiv__(self, other):
+        self.x /= other
+        self.y /= other
+        self.z /= other
+        return self
+
+    def norm(self):
+        result = Scalar(self.size, self.deriv, numpy.sqrt(self.x.v**2 + self.y.v**2 + self.z.v**2))
+        if self.deriv > 0:
+            result.d += _ex(self.x.v)*self.x.d
+            result.d += _ex(self.y.v)*self.y.d
+            result.d += _ex(self.z.v)*self.z.d
+            result.d /= _ex(result.v)
+        if self.deriv > 1:
+            result.dd += _ex(self.x.v, 2)*self.x.dd
+            result.dd += _ex(self.y.v, 2)*self.y.dd
+            result.dd += _ex(self.z.v, 2)*self.z.dd
+            denom = result.v**2
+            result.dd += _ex(1 - self.x.v**2/denom, 2)*_outer(self.x.d, self.x.d)
+            result.dd += _ex(1 - self.y.v**2/denom, 2)*_outer(self.y.d, self.y.d)
+            result.dd += _ex(1 - self.z.v**2/denom, 2)*_outer(self.z.d, self.z.d)
+            tmp = _ex(-self.x.v*self.y.v/denom, 2)*_outer(self.x.d, self.y.d)
+            result.dd += tmp+tmp.swapaxes(-1,-2)
+            tmp = _ex(-self.y.v*self.z.v/denom, 2)*_outer(self.y.d, self.z.d)
+            result.dd += tmp+tmp.swapaxes(-1,-2)
+            tmp = _ex(-self.z.v*self.x.v/denom, 2)*_outer(self.z.d, self.x.d)
+            result.dd += tmp+tmp.swapaxes(-1,-2)
+            result.dd /= _ex(result.v, 2)
+        return result
+
+    #def norm2(self):
+    #    result = Scalar(self.size, self.deriv)
+    #    result.v = self.x.v**2 + self.y.v**2 + self.z.v**2
+    #    if self.deriv > 0:
+    #        result.d += self.x.v*self.x.d
+    #        result.d += self.y.v*self.y.d
+    #        result.d += self.z.v*self.z.d
+    #        result.d *= 2
+    #    if self.deriv > 1:
+    #        result.dd += self.x.v*self.x.dd
+    #        result.dd += self.y.v*self.y.dd
+    #        result.dd += self.z.v*self.z.dd
+    #        result.dd += numpy.outer(self.x.d, self.x.d)
+    #        result.dd += numpy.outer(self.y.d, self.y.d)
+    #        result.dd += numpy.outer(self.z.d, self.z.d)
+    #        tmp = denom*numpy.outer(self.x.d, self.y.d)
+    #        result.dd += tmp+tmp.transpose()
+    #        tmp = denom*numpy.outer(self.y.d, self.z.d)
+    #        result.dd += tmp+tmp.transpose()
+    #        tmp = denom*numpy.outer(self.z.d, self.x.d)
+    #        result.dd += tmp+tmp.transpose()
+    #        result.dd *= 2
+    #    return result
+
+
+def dot(r1, r2):
+    if r1.size != r2.size:
+        raise ValueError("Both arguments must have the same input size.")
+    if r1.deriv != r2.deriv:
+        raise ValueError("Both arguments must have the same deriv.")
+    result = Scalar(r1.size, r1.deriv, r1.x.v*r2.x.v + r1.y.v*r2.y.v + r1.z.v*r2.z.v)
+    if result.deriv > 0:
+        result.d[:] += _ex(r1.x.v)*r2.x.d
+        result.d[:] += _ex(r2.x.v)*r1.x.d
+        result.d[:] += _ex(r1.y.v)*r2.y.d
+        result.d[:] += _ex(r2.y.v)*r1.y.d
+        result.d[:] += _ex(r1.z.v)*r2.z.d
+        result.d[:] += _ex(r2.z.v)*r1.z.d
+    if result.deriv > 1:
+        result.dd[:] += _outer(r1.x.d, r2.x.d)
+        result.dd[:] += _outer(r2.x.d, r1.x.d)
+        result.dd[:] += _outer(r1.y.d, r2.y.d)
+        result.dd[:] += _outer(r2.y.d, r1.y.d)
+        result.dd[:] += _outer(r1.z.d, r2.z.d)
+        result.dd[:] += _outer(r2.z.d, r1.z.d)
+        result.dd[:] += _ex(r1.x.v, 2)*r2.x.dd
+        result.dd[:] += _ex(r2.x.v, 2)*r1.x.dd
+        result.dd[:] += _ex(r1.y.v, 2)*r2.y.dd
+        result.dd[:] += _ex(r2.y.v, 2)*r1.y.dd
+        result.dd[:] += _ex(r1.z.v, 2)*r2.z.dd
+        result.dd[:] += _ex(r2.z.v, 2)*r1.z.dd
+    return result
+
+
+def cross(r1, r2):
+    if r1.size != r2.size:
+        raise ValueError("Both arguments must have the same input size.")
+    if r1.deriv != r2.deriv:
+        raise ValueError("Both arguments must have the same deriv.")
+    def component(a1, b2, a2, b1):
+        result = a1.copy()
+        result *= b2
+        tmp = a2.copy()
+        tmp *= b1
+        result -= tmp
+        return result
+    result = Vector3(r1.size, r1.deriv)
+    result.x = component(r1.y, r2.z, r1.z, r2.y)
+    result.y = component(r1.z, r2.x, r1.x, r2.z)
+    result.z = component(r1.x, r2.y, r1.y, r2.x)
+    return result
+
+
+def bond_length(r0, r1, deriv=0):
+    r = r0 - r1
+    result = _bond_length_low(r, deriv)
+    v = result[0]
+    if deriv == 0:
+        return v,
+    d = numpy.zeros(numpy.shape(v) + (2,3), float)
+    d[...,0,:] = result[1]
+    d[...,1,:] = -result[1]
+    if deriv == 1:
+        return v, d
+    dd = numpy.zeros(numpy.shape(v) + (2,3,2,3), float)
+    dd[...,0,:,0,:] = result[2]
+    dd[...,1,:,1,:] = result[2]
+    dd[...,0,:,1,:] = -result[2]
+    dd[...,1,:,0,:] = -result[2]
+    if deriv == 2:
+        return v, d, dd
+    raise ValueError("deriv must be 0, 1 or 2.")
+
+pair_distance = bond_length
+
+def _bond_length_low(r, deriv):
+    r = Vector3(3, deriv, (r[...,0], r[...,1], r[...,2]), (0,1,2))
+    d = r.norm()
+    return d.results()
+
+
+def bend_cos(r0, r1, r2, deriv=0):
+    a = r0 - r1
+    b = r2 - r1
+    result = _bend_cos_low(a, b, deriv)
+    v = result[0]
+    if deriv == 0:
+        return v,
+    d = numpy.zeros(numpy.shape(v) + (3,3), float)
+    d[...,0,:] = result[1][...,:3]
+    d[...,1,:] = -result[1][...,:3]-result[1][...,3:]
+    d[...,2,:] = result[1][...,3:]
+    if deriv == 1:
+        return v, d
+    dd = numpy.zeros(numpy.shape(v) + (3,3,3,3), float)
+    aa = result[2][...,:3,:3]
+    ab = result[2][...,:3,3:]
+    ba = result[2][...,3:,:3]
+    bb = result[2][...,3:,3:]
+    dd[...,0,:,0,:] =   aa
+    dd[...,0,:,1,:] = - aa - ab
+    dd[...,0,:,2,:] =   ab
+    dd[...,1,:,0,:] = - aa - ba
+    dd[...,1,:,1,:] =   aa + ba + ab + bb
+    dd[...,1,:,2,:] = - ab - bb
+    dd[...,2,:,0,:] =   ba
+    dd[...,2,:,1,:] = - ba - bb
+    dd[...,2,:,2,:] =   bb
+    if deriv == 2:
+        return v, d, dd
+    raise ValueError("deriv must be 0, 1 or 2.")
+
+def _bend_cos_low(a, b, deriv):
+    a = Vector3(6, deriv, (a[...,0], a[...,1], a[...,2]), (0,1,2))
+    b = Vector3(6, deriv, (b[...,0], b[...,1], b[...,2]), (3,4,5))
+    a /= a.norm()
+    b /= b.norm()
+    return dot(a,b).results()
+
+def _cos_to_angle(result, deriv, sign=1):
+    v = numpy.arccos(numpy.clip(result[0],-1,1))
+    if deriv == 0:
+        return v*sign,
+    # the derivatives are set to zero where abs(cos) >= 1
+    sin2 = 1-numpy.clip(result[0],-1,1)**2
+    factor1 = numpy.where(sin2 > 0, -1.0/numpy.sqrt(numpy.where(sin2 > 0, sin2, 1)), 0.0)
+    d = _ex(factor1, 2)*result[1]
+    if deriv == 1:
+        return v*sign, d*_ex(sign, 2)
+    factor2 = result[0]*factor1**3
+    dd = (
+        _ex(factor2, 4)*result[1][...,:,:,None,None]*result[1][...,None,None,:,:] +
+        _ex(factor1, 4)*result[2]
+    )
+    if deriv == 2:
+        return v*sign, d*_ex(sign, 2), dd*_ex(sign, 4)
+    raise ValueError("deriv must be 0, 1 or 2.")
+
+def bend_angle(r0, r1, r2, deriv=0):
+    result = bend_cos(r0, r1, r2, deriv)
+    return _cos_to_angle(result, deriv)
+
+
+def dihed_cos(r0, r1, r2, r3, deriv=0):
+    a = r0 - r1
+    b = r2 - r1
+    c = r3 - r2
+    result = _dihed_cos_low(a, b, c, deriv)
+    return _dihed_to_atoms(result, deriv)
+
+def _dihed_to_atoms(result, deriv):
+    """Transform derivatives towards a, b and c into derivatives towards atoms."""
+    v = result[0]
+    if deriv == 0:
+        return v,
+    d = numpy.zeros(numpy.shape(v) + (4,3), float)
+    d[...,0,:] = result[1][...,:3]
+    d[...,1,:] = -result[1][...,:3]-result[1][...,3:6]
+    d[...,2,:] = result[1][...,3:6]-result[1][...,6:]
+    d[...,3,:] = result[1][...,6:]
+    if deriv == 1:
+        return v, d
+    dd = numpy.zeros(numpy.shape(v) + (4,3,4,3), float)
+    aa = result[2][...,:3,:3]
+    ab = result[2][...,:3,3:6]
+    ac = result[2][...,:3,6:]
+    ba = result[2][...,3:6,:3]
+    bb = result[2][...,3:6,3:6]
+    bc = result[2][...,3:6,6:]
+    ca = result[2][...,6:,:3]
+    cb = result[2][...,6:,3:6]
+    cc = result[2][...,6:,6:]
+
+    dd[...,0,:,0,:] =   aa
+    dd[...,0,:,1,:] = - aa - ab
+    dd[...,0,:,2,:] =   ab - ac
+    dd[...,0,:,3,:] =   ac
+
+    dd[...,1,:,0,:] = - aa - ba
+    dd[...,1,:,1,:] =   aa + ba + ab + bb
+    dd[...,1,:,2,:] = - ab - bb + ac + bc
+    dd[...,1,:,3,:] = - ac - bc
+
+    dd[...,2,:,0,:] =   ba - ca
+    dd[...,2,:,1,:] = - ba + ca - bb + cb
+    dd[...,2,:,2,:] =   bb - cb - bc + cc
+    dd[...,2,:,3,:] =   bc - cc
+
+    dd[...,3,:,0,:] =   ca
+    dd[...,3,:,1,:] = - ca - cb
+    dd[...,3,:,2,:] =   cb - cc
+    dd[...,3,:,3,:] =   cc
+    if deriv == 2:
+        return v, d, dd
+    raise ValueError("deriv must be 0, 1 or 2.")
+
+def _dihed_cos_low(a, b, c, deriv):
+    a = Vector3(9, deriv, (a[...,0], a[...,1], a[...,2]), (0,1,2))
+    b = Vector3(9, deriv, (b[...,0], b[...,1], b[...,2]), (3,4,5))
+    c = Vector3(9, deriv, (c[...,0], c[...,1], c[...,2]), (6,7,8))
+    b /= b.norm()
+    tmp = b.copy()
+    tmp *= dot(a,b)
+    a -= tmp
+    tmp = b.copy()
+    tmp *= dot(c,b)
+    c -= tmp
+    a /= a.norm()
+    c /= c.norm()
+    return dot(a,c).results()
+
+def _atan2(y, x):
+    """Return the Scalar arctan2(y, x), including derivatives."""
+    result = Scalar(y.size, y.deriv, numpy.arctan2(y.v, x.v))
+    if result.deriv > 0:
+        r2 = x.v**2 + y.v**2
+        fx = -y.v/r2
+        fy = x.v/r2
+        result.d[:] = _ex(fx)*x.d + _ex(fy)*y.d
+    if result.deriv > 1:
+        fxx = 2*x.v*y.v/r2**2
+        fxy = (y.v**2 - x.v**2)/r2**2
+        result.dd[:] = _ex(fx, 2)*x.dd + _ex(fy, 2)*y.dd
+        result.dd += _ex(fxx, 2)*(_outer(x.d, x.d) - _outer(y.d, y.d))
+        result.dd += _ex(fxy, 2)*(_outer(x.d, y.d) + _outer(y.d, x.d))
+    return result
+
+def dihed_angle(r0, r1, r2, r3, deriv=0):
+    a = r0 - r1
+    b = r2 - r1
+    c = r3 - r2
+    result = _dihed_angle_low(a, b, c, deriv)
+    return _dihed_to_atoms(result, deriv)
+
+def _dihed_angle_low(a, b, c, deriv):
+    # The angle is computed with arctan2 instead of arccos. This keeps the
+    # derivatives accurate for (nearly) planar dihedral angles.
+    a = Vector3(9, deriv, (a[...,0], a[...,1], a[...,2]), (0,1,2))
+    b = Vector3(9, deriv, (b[...,0], b[...,1], b[...,2]), (3,4,5))
+    c = Vector3(9, deriv, (c[...,0], c[...,1], c[...,2]), (6,7,8))
+    b /= b.norm()
+    tmp = b.copy()
+    tmp *= dot(a,b)
+    a -= tmp
+    tmp = b.copy()
+    tmp *= dot(c,b)
+    c -= tmp
+    y = dot(cross(c, a), b)
+    result = _atan2(y, dot(a, c))
+    # Angles with a zero sine are negative, like in the arccos version.
+    result.v = numpy.where(y.v > 0, 1, -1)*abs(result.v)
+    if numpy.ndim(result.v) == 0:
+        result.v = numpy.float64(result.v)
+    return result.results()
+
+
+
+
+def oop_sin(r0, r1, r2, r3, deriv=0):
+    """The sine of the out-of-plane angle of the bond r0-r1.
+
+    The plane is spanned by the bonds r1-r2 and r1-r3 around the central
+    atom r1.
+    """
+    a = r0 - r1
+    b = r2 - r1
+    c = r3 - r1
+    result = _oop_sin_low(a, b, c, deriv)
+    v = result[0]
+    if deriv == 0:
+        return v,
+    # the derivatives towards the atoms follow from a linear transformation
+    # of the derivatives towards a, b and c.
+    transform = numpy.array([[1,0,0],[-1,-1,-1],[0,1,0],[0,0,1]], float)
+    g = result[1].reshape(numpy.shape(v) + (3,3))
+    d = numpy.einsum("ip,...px->...ix", transform, g)
+    if deriv == 1:
+        return v, d
+    h = result[2].reshape(numpy.shape(v) + (3,3,3,3))
+    dd = numpy.einsum("ip,jq,...pxqy->...ixjy", transform, transform, h)
+    if deriv == 2:
+        return v, d, dd
+    raise ValueError("deriv must be 0, 1 or 2.")
+
+def _oop_sin_low(a, b, c, deriv):
+    a = Vector3(9, deriv, (a[...,0], a[...,1], a[...,2]), (0,1,2))
+    b = Vector3(9, deriv, (b[...,0], b[...,1], b[...,2]), (3,4,5))
+    c = Vector3(9, deriv, (c[...,0], c[...,1], c[...,2]), (6,7,8))
+    n = cross(b, c)
+    n /= n.norm()
+    a /= a.norm()
+    return dot(a, n).results()
+
+def oop_angle(r0, r1, r2, r3, deriv=0):
+    """The out-of-plane angle of the bond r0-r1, see oop_sin."""
+    result = oop_sin(r0, r1, r2, r3, deriv)
+    v = numpy.arcsin(numpy.clip(result[0],-1,1))
+    if deriv == 0:
+        return v,
+    # the derivatives are set to zero where abs(sin) >= 1
+    cos2 = 1-numpy.clip(result[0],-1,1)**2
+    factor1 = numpy.where(cos2 > 0, 1.0/numpy.sqrt(numpy.where(cos2 > 0, cos2, 1)), 0.0)
+    d = _ex(factor1, 2)*result[1]
+    if deriv == 1:
+        return v, d
+    factor2 = result[0]*factor1**3
+    dd = (
+        _ex(factor2, 4)*result[1][...,:,:,None,None]*result[1][...,None,None,:,:] +
+        _ex(factor1, 4)*result[2]
+    )
+    if deriv == 2:
+        return v, d, dd
+    raise ValueError("deriv must be 0, 1 or 2.")
+
+
+def _ic_array(function, coordinates, indices, deriv):
+    indices = numpy.asarray(indices, int)
+    return function(*([coordinates[indices[:,i]] for i in xrange(indices.shape[1])] + [deriv]))
+
+def bond_lengths(coordinates, indices, deriv=0):
+    """Compute M bond lengths at once.
+
+    Arguments:
+      coordinates  --  an (N,3) array with atomic coordinates
+      indices  --  an (M,2) array with the atom indexes of each bond
+
+    Optional argument:
+      deriv  --  the order of the derivatives to compute (0, 1 or 2)
+
+    Returns a tuple with the values (M,), and depending on deriv, the
+    gradients (M,2,3) and the Hessians (M,2,3,2,3). The derivatives are
+    towards the coordinates of the atoms in the corresponding row of indices.
+    Use sparse_jacobian and sparse_hessian to assemble them into matrices.
+    """
+    return _ic_array(bond_length, coordinates, indices, deriv)
+
+pair_distances = bond_lengths
+
+def bend_cosines(coordinates, indices, deriv=0):
+    """Compute M bending cosines at once. See bond_lengths. indices is (M,3)."""
+    return _ic_array(bend_cos, coordinates, indices, deriv)
+
+def bend_angles(coordinates, indices, deriv=0):
+    """Compute M bending angles at once. See bond_lengths. indices is (M,3)."""
+    return _ic_array(bend_angle, coordinates, indices, deriv)
+
+def dihed_cosines(coordinates, indices, deriv=0):
+    """Compute M dihedral cosines at once. See bond_lengths. indices is (M,4)."""
+    return _ic_array(dihed_cos, coordinates, indices, deriv)
+
+def dihed_angles(coordinates, indices, deriv=0):
+    """Compute M dihedral angles at once. See bond_lengths. indices is (M,4)."""
+    return _ic_array(dihed_angle, coordinates, indices, deriv)
+
+def oop_sines(coordinates, indices, deriv=0):
+    """Compute M out-of-plane sines at once. See bond_lengths. indices is (M,4)."""
+    return _ic_array(oop_sin, coordinates, indices, deriv)
+
+def oop_angles(coordinates, indices, deriv=0):
+    """Compute M out-of-plane angles at once. See bond_lengths. indices is (M,4)."""
+    return _ic_array(oop_angle, coordinates, indices, deriv)
+
+
+def sparse_jacobian(indices, gradients, num_atoms):
+    """Assemble the gradients of M internal coordinates in a sparse matrix.
+
+    Arguments:
+      indices  --  the (M,k) atom indexes of the internal coordinates
+      gradients  --  the (M,k,3) gradients, e.g. from bond_lengths
+      num_atoms  --  the total number of atoms N
+
+    Returns an (M,3*N) scipy.sparse CSR matrix. The columns follow the order
+    of the raveled (N,3) coordinates.
+    """
+    import scipy.sparse
+    indices = numpy.asarray(indices, int)
+    M, k = indices.shape
+    rows = numpy.repeat(numpy.arange(M), 3*k)
+    cols = (3*indices[:,:,None] + numpy.arange(3)).ravel()
+    return scipy.sparse.csr_matrix(
+        (gradients.ravel(), (rows, cols)), shape=(M, 3*num_atoms)
+    )
+
+
+def sparse_hessian(indices, hessians, num_atoms, weights=None):
+    """Assemble the (weighted) sum of M internal coordinate Hessians.
+
+    Arguments:
+      indices  --  the (M,k) atom indexes of the internal coordinates
+      hessians  --  the (M,k,3,k,3) Hessians, e.g. from bond_lengths
+      num_atoms  --  the total number of atoms N
+
+    Optional argument:
+      weights  --  an array with M weights. The default is one for each
+          internal coordinate.
+
+    Returns a (3*N,3*N) scipy.sparse CSR matrix.
+    """
+    import scipy.sparse
+    indices = numpy.asarray(indices, int)
+    M, k = indices.shape
+    if weights is not None:
+        hessians = hessians*weights.reshape((-1,1,1,1,1))
+    cols = (3*indices[:,:,None] + numpy.arange(3)).reshape((M, 1, 3*k))
+    rows = cols.reshape((M, 3*k, 1))
+    rows, cols = numpy.broadcast_arrays(rows, cols)
+    return scipy.sparse.csr_matrix(
+        (hessians.ravel(), (rows.ravel(), cols.ravel())),
+        shape=(3*num_atoms, 3*num_atoms)
+    )
+
+
+class ICArray(object):
+    """A set of M internal coordinates of the same kind.
+
+    This is a small wrapper around the array functions above that remembers
+    the atom indexes. It can be passed to jacobian.jacobian_analysis.
+    """
+    def __init__(self, function, indices):
+        """Initialize an ICArray.
+
+        Arguments:
+          function  --  one of the array functions, e.g. bond_lengths
+          indices  --  the (M,k) atom indexes
+        """
+        self.function = function
+        self.indices = numpy.asarray(indices, int)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __call__(self, coordinates, deriv=0):
+        """Compute the values and derivatives, see bond_lengths."""
+        return self.function(coordinates, self.indices, deriv)
+
+    def values_tangents(self, cartesian_values):
+        """Return the M values and an (M,3*N) dense Jacobian.
+
+        cartesian_values can be an (N,3) array or its raveled version.
+        """
+        coordinates = numpy.reshape(cartesian_values, (-1,3))
+        values, gradients = self(coordinates, 1)
+        jacobian = sparse_jacobian(self.indices, gradients, len(coordinates))
+        return values, jacobian.toarray()
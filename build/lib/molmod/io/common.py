@@ -0,0 +1,323 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from molmod.ext import io_read_columns, io_read_fixed, io_find_lines, io_find_field
+
+import numpy, os
+
+
+__all__ = [
+    "slice_match", "scan_frame_offsets", "get_frame_offsets", "read_lines",
+    "parse_columns", "parse_fixed_columns", "parse_words",
+]
+
+
+def slice_match(sub, counter):
+    """Efficiently test if counter is in xrange(*sub)
+
+    The function raises a StopIteration if counter is beyond sub.stop.
+    """
+
+    if sub.start is not None and counter < sub.start:
+        return False
+    if sub.stop is not None and counter >= sub.stop:
+        raise StopIteration
+    if sub.step is not None:
+        if sub.start is None:
+            if counter % sub.step != 0:
+                return False
+        else:
+            if (counter - sub.start) % sub.step != 0:
+                return False
+    return True
+
+
+def scan_frame_offsets(f, num_header, get_num_lines, skip=0, chunk_size=2**24, start=None):
+    """Locate the frames in a line-based trajectory file with a fast byte scan
+
+    Arguments:
+      f  --  a file object opened for reading
+      num_header  --  the number of lines at the beginning of a frame that
+          determine the total number of lines in that frame
+      get_num_lines  --  a function that takes the list of the header lines
+          of a frame and returns the total number of lines in the frame. A
+          ValueError marks the end of the trajectory.
+
+    Optional arguments:
+      skip  --  the number of lines before the first frame
+      chunk_size  --  the number of bytes that is scanned at once
+      start  --  the byte offset where the scan starts. The default is the
+          current position of f.
+
+    The file is read in large chunks and the line endings are located with
+    numpy, so only the header lines of each frame are converted to Python
+    strings. An incomplete frame at the end of the file is ignored.
+
+    Returns an integer array with the byte offsets of the frames, followed
+    by the offset of the end of the last frame. The file position is
+    restored afterwards.
+    """
+    old_position = f.tell()
+    if start is None:
+        start = old_position
+    f.seek(start)
+    offsets = []
+    end = start
+    base = start # the position of the buffer in the file
+    size = start # the position of the end of the data read so far
+    buffer = ""
+    todo = skip # the number of lines to pass before the next header
+    in_frame = False
+    done = False
+    while not done:
+        chunk = f.read(chunk_size)
+        size += len(chunk)
+        if len(chunk) == 0:
+            if len(buffer) == 0:
+                break
+            # the last line has no line ending
+            chunk = "\n"
+            done = True
+        buffer += chunk
+        newlines = numpy.flatnonzero(numpy.frombuffer(buffer, numpy.uint8) == 10)
+        starts = numpy.zeros(len(newlines)+1, int)
+        starts[1:] = newlines + 1
+        line = 0
+        while True:
+            if todo > 0:
+                step = min(todo, len(newlines) - line)
+                line += step
+                todo -= step
+                if todo > 0:
+                    break
+                if in_frame:
+                    end = min(base + starts[line], size)
+                    in_frame = False
+            if line + num_header > len(newlines):
+                break
+            header = [buffer[starts[i]:newlines[i]] for i in xrange(line, line + num_header)]
+            try:
+                todo = get_num_lines(header)
+            except ValueError:
+                done = True
+                break
+            offsets.append(base + starts[line])
+            in_frame = True
+        # only keep the lines that are not processed yet
+        base += starts[line]
+        buffer = buffer[starts[line]:]
+    if in_frame:
+        del offsets[-1]
+    offsets.append(end)
+    f.seek(old_position)
+    return numpy.array(offsets, int)
+
+
+def get_frame_offsets(f, scan, sidecar=False):
+    """Return the byte offsets of the frames in a trajectory file
+
+    Arguments:
+      f  --  a filename or a file object
+      scan  --  a function that takes a file object and returns the offsets,
+          e.g. based on scan_frame_offsets
+
+    Optional arguments:
+      sidecar  --  when True, the offsets are loaded from and stored in the
+          file f + ".frames". A filename can also be given. The sidecar file
+          is only used when the size and the modification time of the
+          trajectory did not change. This is only supported when f is a
+          filename.
+    """
+    if isinstance(f, file):
+        if sidecar:
+            raise ValueError("A sidecar file can only be used when the trajectory is given by its filename.")
+        return scan(f)
+    if not sidecar:
+        g = file(f)
+        try:
+            return scan(g)
+        finally:
+            g.close()
+    if sidecar is True:
+        sidecar = f + ".frames"
+    stat = os.stat(f)
+    signature = [stat.st_size, int(round(stat.st_mtime*1e6))]
+    try:
+        g = file(sidecar, "rb")
+        try:
+            data = numpy.load(g)
+        finally:
+            g.close()
+        if list(data[:2]) == signature:
+            return data[2:]
+    except (IOError, ValueError):
+        pass
+    g = file(f)
+    try:
+        offsets = scan(g)
+    finally:
+        g.close()
+    try:
+        g = file(sidecar, "wb")
+        try:
+            numpy.save(g, numpy.concatenate([signature, offsets]).astype(numpy.int64))
+        finally:
+            g.close()
+    except IOError:
+        # the index is still usable without the sidecar
+        pass
+    return offsets
+
+
+def read_lines(f, num_lines, chunk_size=None):
+    """Read a block of lines from a file at once
+
+    Arguments:
+      f  --  a seekable file object
+      num_lines  --  the number of lines to read
+
+    Optional argument:
+      chunk_size  --  the number of bytes that is read at once. The default
+          is 64 bytes per line.
+
+    The file is read in chunks and positioned right after the last line. The
+    size of the next chunk is estimated from the length of the lines in the
+    previous one. Returns a string with the lines. It contains fewer lines
+    when the end of the file is reached.
+    """
+    if chunk_size is None:
+        chunk_size = max(64*num_lines, 4096)
+    parts = []
+    while num_lines > 0:
+        chunk = f.read(chunk_size)
+        if len(chunk) == 0:
+            break
+        end = io_find_lines(_get_text_array(chunk), num_lines)
+        if end >= 0:
+            f.seek(end - len(chunk), 1)
+            if end < len(chunk):
+                chunk = chunk[:end]
+            parts.append(chunk)
+            break
+        parts.append(chunk)
+        found = -1 - end
+        num_lines -= found
+        if found == 0:
+            chunk_size *= 2
+        else:
+            chunk_size = num_lines*(len(chunk)/found + 1) + 4096
+    if len(parts) == 1:
+        return parts[0]
+    return "".join(parts)
+
+
+def _get_text_array(text):
+    return numpy.frombuffer(text, numpy.int8)
+
+
+def parse_columns(text, num_rows, columns, out=None):
+    """Convert whitespace separated fields in a block of lines to floats
+
+    Arguments:
+      text  --  a string with (at least) num_rows lines
+      num_rows  --  the number of lines to convert
+      columns  --  the indexes of the fields in each line that are
+          converted, in increasing order
+
+    Optional argument:
+      out  --  an array with shape (num_rows, len(columns)) for the result
+
+    The conversion is done in C in a single pass over the text. Returns the
+    array with the numbers and the number of characters consumed. A
+    ValueError is raised when a line has not enough fields or when a field is
+    not a number.
+    """
+    if out is None:
+        out = numpy.zeros((num_rows, len(columns)), float)
+    elif out.shape != (num_rows, len(columns)) or out.dtype != float or not out.flags.c_contiguous:
+        raise TypeError("The output array must be contiguous and have shape (num_rows, len(columns)).")
+    columns = numpy.array(columns, numpy.int32)
+    if (columns[1:] <= columns[:-1]).any():
+        raise ValueError("The columns must be given in increasing order.")
+    if num_rows == 0:
+        return out, 0
+    result = io_read_columns(_get_text_array(text), columns, out)
+    if result < 0:
+        raise ValueError("Could not convert line %i of the text block." % (-1 - result))
+    return out, result
+
+
+def parse_fixed_columns(text, num_rows, num_cols, offset, width, out=None):
+    """Convert fixed width fields in a block of lines to floats
+
+    Arguments:
+      text  --  a string with (at least) num_rows lines
+      num_rows  --  the number of lines to convert
+      num_cols  --  the number of fields in each line
+      offset  --  the position of the first field in each line
+      width  --  the width of each field
+
+    Optional argument:
+      out  --  an array with shape (num_rows, num_cols) for the result
+
+    Returns the array with the numbers and the number of characters
+    consumed. A ValueError is raised when a line is too short or when a
+    field is not a number.
+    """
+    if out is None:
+        out = numpy.zeros((num_rows, num_cols), float)
+    elif out.shape != (num_rows, num_cols) or out.dtype != float or not out.flags.c_contiguous:
+        raise TypeError("The output array must be contiguous and have shape (num_rows, num_cols).")
+    if num_rows == 0:
+        return out, 0
+    result = io_read_fixed(_get_text_array(text), offset, width, out)
+    if result < 0:
+        raise ValueError("Could not convert line %i of the text block." % (-1 - result))
+    return out, result
+
+
+def parse_words(text, num_rows, field):
+    """Return one whitespace separated field of each line in a block of lines
+
+    Arguments:
+      text  --  a string with (at least) num_rows lines
+      num_rows  --  the number of lines
+      field  --  the index of the field in each line
+
+    The fields are located in C and copied at once into a numpy array of
+    strings, instead of splitting each line in Python. Returns a list of
+    strings. A ValueError is raised when a line has not enough fields.
+    """
+    begins = numpy.zeros(num_rows, numpy.int32)
+    ends = numpy.zeros(num_rows, numpy.int32)
+    if num_rows == 0:
+        return []
+    result = io_find_field(_get_text_array(text), field, begins, ends)
+    if result < 0:
+        raise ValueError("Could not find field %i in line %i of the text block." % (field, -1 - result))
+    width = (ends - begins).max()
+    positions = begins.reshape(-1, 1) + numpy.arange(width)
+    mask = positions >= ends.reshape(-1, 1)
+    positions[mask] = 0
+    characters = numpy.frombuffer(text, numpy.uint8)[positions]
+    # the trailing zeros are dropped when the strings are extracted
+    characters[mask] = 0
+    return characters.view("S%i" % width).ravel().tolist()
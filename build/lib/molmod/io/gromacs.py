@@ -0,0 +1,149 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from molmod.units import ps, nm
+from molmod.io.common import slice_match, read_lines, parse_fixed_columns, \
+    scan_frame_offsets, get_frame_offsets
+
+import numpy
+
+
+__all__ = ["GroReader"]
+
+
+class Error(Exception):
+    pass
+
+
+class GroReader(object):
+    def __init__(self, filename, sub=slice(None)):
+        self.filename = filename
+        self._f = file(filename)
+        self._sub = sub
+        self.num_atoms = None
+        self._width = None
+        (time, pos, vel, cell) = self.read_frame()
+        self.num_atoms = len(pos)
+        self._counter = 0
+        self._f.seek(0)
+
+    def get_line(self):
+        line = self._f.readline()
+        if len(line) == 0:
+            raise StopIteration
+        return line
+
+    def _init_columns(self, line):
+        # The atom lines have a fixed format. The width of the numerical
+        # fields follows from the distance between the decimal points.
+        first = line.find(".", 20)
+        second = line.find(".", first+1)
+        if first < 0 or second < 0:
+            raise ValueError("Could not determine the width of the fields in the atom lines.")
+        self._width = second - first
+        self._num_cols = min((len(line.rstrip()) - 20)/self._width, 6)
+        if self._num_cols < 3:
+            raise ValueError("The atom lines must contain at least the positions.")
+
+    def read_frame(self):
+        # Read the first line, ignore the title and try to get the time. The
+        # time field is optional.
+        line = self.get_line()
+        pos = line.rfind("t=")
+        if pos >= 0:
+            time = float(line[pos+2:])*ps
+        else:
+            time = 0.0
+        # Read the second line, the number of atoms must match with the first
+        # frame.
+        num_atoms = int(self.get_line())
+        if self.num_atoms is not None and self.num_atoms != num_atoms:
+            raise ValueError("The number of atoms must be the same over the entire file.")
+        # Read the atom lines at once and convert the fixed columns
+        block = read_lines(self._f, num_atoms)
+        if block.count("\n") < num_atoms:
+            raise StopIteration
+        if self._width is None:
+            self._init_columns(block[:block.find("\n")])
+        fields = parse_fixed_columns(block, num_atoms, self._num_cols, 20, self._width)[0]
+        pos = fields[:,:3].astype(numpy.float32)
+        vel = numpy.zeros((num_atoms,3),numpy.float32)
+        vel[:,:self._num_cols-3] = fields[:,3:]
+        pos *= nm
+        vel *= nm/ps
+        # Read the cell line
+        cell = numpy.zeros((3,3), numpy.float32)
+        words = self.get_line().split()
+        if len(words) >= 3:
+            cell[0,0] = float(words[0])
+            cell[1,1] = float(words[1])
+            cell[2,2] = float(words[2])
+        if len(words) == 9:
+            cell[1,0] = float(words[3])
+            cell[2,0] = float(words[4])
+            cell[0,1] = float(words[5])
+            cell[2,1] = float(words[6])
+            cell[0,2] = float(words[7])
+            cell[1,2] = float(words[8])
+        cell *= nm
+        return time, pos, vel, cell
+
+    def skip_frame(self):
+        line = self.get_line()
+        num_atoms = int(self.get_line())
+        if self.num_atoms is not None and self.num_atoms != num_atoms:
+            raise ValueError("The number of atoms must be the same over the entire file.")
+        if read_lines(self._f, num_atoms+1).count("\n") < num_atoms+1:
+            raise StopIteration
+
+    def get_offsets(self):
+        """Return the byte offsets of all frames, followed by the end of the last frame."""
+        def get_num_lines(lines):
+            return int(lines[1]) + 3
+        return get_frame_offsets(self.filename, lambda f: scan_frame_offsets(f, 2, get_num_lines))
+
+    def seek_frame(self, offset, counter):
+        """Continue the iteration at a given frame
+
+        Arguments:
+          offset  --  the byte offset of the frame, see get_offsets
+          counter  --  the index of the frame in the file
+        """
+        self._f.seek(offset)
+        self._counter = counter
+
+    def __del__(self):
+        self._f.close()
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        # skip frames as requested
+        while not slice_match(self._sub, self._counter):
+            self._counter += 1
+            self.skip_frame()
+
+        self._counter += 1
+        return self.read_frame()
+
+
+
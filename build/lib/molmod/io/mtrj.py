@@ -0,0 +1,334 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""A compact binary trajectory format that can be memory-mapped
+
+An MTRJ file starts with a text header of 512 bytes, followed by the atomic
+numbers (int32) and a sequence of frames with a fixed size. Each frame is a
+record with the fields that are listed in the header, in the order of
+field_shapes below. All values are stored in atomic units. Since the size of
+a frame is fixed, the frames can be accessed with numpy.memmap without
+reading or converting the file, and new frames can be appended at any time.
+"""
+
+
+from molmod.data.periodic import periodic
+from molmod.units import angstrom
+
+import numpy, os
+
+
+__all__ = [
+    "Error", "MTRJWriter", "MTRJFile", "convert_xyz", "convert_gro",
+    "convert_lammps", "convert_dlpoly", "convert_atrj",
+]
+
+
+class Error(Exception):
+    pass
+
+
+_magic = "MTRJ 1"
+_header_size = 512
+field_shapes = [
+    ("pos", ("num_atoms", 3)),
+    ("vel", ("num_atoms", 3)),
+    ("frc", ("num_atoms", 3)),
+    ("cell", (3, 3)),
+    ("time", ()),
+    ("energy", ()),
+]
+field_names = [name for name, shape in field_shapes]
+
+
+def _get_record_dtype(num_atoms, fields, dtype):
+    result = []
+    for name, shape in field_shapes:
+        if name in fields:
+            shape = tuple(num_atoms if size == "num_atoms" else size for size in shape)
+            result.append((name, dtype, shape))
+    return numpy.dtype(result)
+
+
+def _get_data_offset(num_atoms):
+    # the frames are aligned at multiples of eight bytes
+    return _header_size + ((4*num_atoms + 7)/8)*8
+
+
+class MTRJWriter(object):
+    def __init__(self, filename, numbers, fields=["pos"], dtype=numpy.float64, append=False):
+        """Initialize an MTRJWriter
+
+        Arguments:
+          filename  --  the MTRJ file
+          numbers  --  the atomic numbers
+
+        Optional arguments:
+          fields  --  the fields that are stored in each frame, a subset of
+              pos, vel, frc, cell, time and energy
+          dtype  --  numpy.float64 or numpy.float32
+          append  --  when True and the file exists, new frames are appended.
+              The atomic numbers, the fields and the dtype must match the
+              existing file.
+
+        The file is flushed after each frame, so it can be read with MTRJFile
+        while frames are still being added, e.g. by dumping each step of an
+        MD run in the log function of molmod.dynamics.VerletIntegrator.
+        """
+        numbers = numpy.array(numbers, numpy.int32)
+        for field in fields:
+            if field not in field_names:
+                raise Error("Unknown field: %s" % field)
+        self.numbers = numbers
+        self.fields = [name for name in field_names if name in fields]
+        self.dtype = numpy.dtype(dtype)
+        if self.dtype not in [numpy.dtype(numpy.float32), numpy.dtype(numpy.float64)]:
+            raise Error("Only float32 and float64 are supported.")
+        self.record_dtype = _get_record_dtype(len(numbers), self.fields, self.dtype)
+
+        if append and os.path.isfile(filename):
+            existing = MTRJFile(filename)
+            if (existing.numbers != numbers).any() or \
+               existing.fields != self.fields or existing.dtype != self.dtype:
+                raise Error("The numbers, fields and dtype must match with the existing file.")
+            # drop an incomplete frame at the end, e.g. after a crash
+            end = existing.data_offset + len(existing)*self.record_dtype.itemsize
+            del existing
+            self._file = file(filename, "r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = file(filename, "wb")
+            header = "%s\nnum_atoms %i\ndtype %s\nfields %s\n" % (
+                _magic, len(numbers), self.dtype.str, " ".join(self.fields)
+            )
+            self._file.write(header.ljust(_header_size, "\0"))
+            padding = _get_data_offset(len(numbers)) - _header_size - 4*len(numbers)
+            self._file.write(numbers.astype("<i4").tostring() + "\0"*padding)
+            self._file.flush()
+        self._record = numpy.zeros(1, self.record_dtype)
+
+    def __del__(self):
+        if hasattr(self, "_file"):
+            self._file.close()
+
+    def dump(self, **values):
+        """Append a frame to the file
+
+        The values of all the fields of the file must be given as keyword
+        arguments, e.g. writer.dump(pos=coordinates, time=time).
+        """
+        if sorted(values) != sorted(self.fields):
+            raise Error("Expecting values for the fields %s. Got %s." % (
+                ", ".join(self.fields), ", ".join(values)
+            ))
+        for name, value in values.iteritems():
+            self._record[name] = value
+        self._file.write(self._record.tostring())
+        self._file.flush()
+
+
+class MTRJFile(object):
+    def __init__(self, filename, mode="r"):
+        """Open an MTRJ file with numpy.memmap
+
+        Arguments:
+          filename  --  the MTRJ file
+
+        Optional argument:
+          mode  --  "r" for read-only access, or "r+" to modify the frames
+              in place
+
+        Each field in the file becomes an attribute of this object: an array
+        whose first index is the frame number, e.g. traj.pos[1000:2000,
+        atoms]. These arrays are views on the memory map, so no data is read
+        or copied until it is used. Frames that are appended afterwards are
+        only visible after reload.
+        """
+        self.filename = filename
+        self.mode = mode
+        f = file(filename, "rb")
+        try:
+            header = f.read(_header_size)
+            lines = header.rstrip("\0").split("\n")
+            if len(header) != _header_size or lines[0] != _magic:
+                raise Error("%s is not an MTRJ file." % filename)
+            settings = {}
+            for line in lines[1:]:
+                words = line.split()
+                if len(words) > 0:
+                    settings[words[0]] = words[1:]
+            try:
+                self.num_atoms = int(settings["num_atoms"][0])
+                self.dtype = numpy.dtype(settings["dtype"][0])
+                self.fields = settings["fields"]
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise Error("Could not read the header of %s." % filename)
+            self.numbers = numpy.fromstring(f.read(4*self.num_atoms), "<i4").astype(int)
+        finally:
+            f.close()
+        self.data_offset = _get_data_offset(self.num_atoms)
+        self.record_dtype = _get_record_dtype(self.num_atoms, self.fields, self.dtype)
+        self.reload()
+
+    def reload(self):
+        """Map the file again, e.g. to include frames that are appended."""
+        size = os.path.getsize(self.filename)
+        num_frames = max(size - self.data_offset, 0)/self.record_dtype.itemsize
+        if num_frames == 0:
+            self.records = numpy.zeros(0, self.record_dtype)
+        else:
+            self.records = numpy.memmap(
+                self.filename, self.record_dtype, self.mode, self.data_offset,
+                (num_frames,)
+            )
+        for name in self.fields:
+            setattr(self, name, self.records[name])
+
+    def __len__(self):
+        return len(self.records)
+
+
+def _convert(filename, numbers, fields, frames, dtype):
+    writer = None
+    for frame in frames:
+        if writer is None:
+            writer = MTRJWriter(filename, numbers, fields, dtype)
+        writer.dump(**frame)
+    if writer is None:
+        raise Error("No frames could be read.")
+
+
+def _get_numbers(symbols):
+    result = numpy.zeros(len(symbols), int)
+    for index, symbol in enumerate(symbols):
+        atom_info = periodic[symbol]
+        if atom_info is not None:
+            result[index] = atom_info.number
+    return result
+
+
+def convert_xyz(filename_in, filename_out, sub=slice(None), file_unit=angstrom, dtype=numpy.float64):
+    """Convert an XYZ trajectory to an MTRJ file with the field pos."""
+    from molmod.io.xyz import XYZReader
+    xyz_reader = XYZReader(filename_in, sub, file_unit=file_unit)
+    frames = (
+        {"pos": coordinates} for title, coordinates in xyz_reader
+    )
+    _convert(filename_out, xyz_reader.numbers, ["pos"], frames, dtype)
+
+
+def convert_gro(filename_in, filename_out, numbers=None, sub=slice(None), dtype=numpy.float64):
+    """Convert a Gromacs .gro trajectory to an MTRJ file
+
+    The fields pos, vel, cell and time are stored. The atomic numbers are
+    not in the .gro file and can be given with the optional argument numbers.
+    Otherwise they are zero.
+    """
+    from molmod.io.gromacs import GroReader
+    gro_reader = GroReader(filename_in, sub)
+    if numbers is None:
+        numbers = numpy.zeros(gro_reader.num_atoms, int)
+    frames = (
+        {"pos": pos, "vel": vel, "cell": cell, "time": time}
+        for time, pos, vel, cell in gro_reader
+    )
+    _convert(filename_out, numbers, ["pos", "vel", "cell", "time"], frames, dtype)
+
+
+def convert_lammps(filename_in, filename_out, units, fields=["pos"], numbers=None, time_step=None, sub=slice(None), dtype=numpy.float64, columns=None):
+    """Convert a LAMMPS dump file to an MTRJ file
+
+    Arguments:
+      filename_in  --  the LAMMPS dump file
+      filename_out  --  the MTRJ file
+      units  --  the units of the columns that are read, see DumpReader
+
+    Optional arguments:
+      fields  --  the fields that correspond to the columns in groups of
+          three, e.g. ["pos", "vel"] when the dump file contains the columns
+          x y z vx vy vz. The field cell can be added to store the box.
+      numbers  --  the atomic numbers, zero by default
+      time_step  --  when given, the field time is the step number times the
+          time step
+      sub  --  a slice object to select a subset of the frames
+      dtype  --  numpy.float64 or numpy.float32
+      columns  --  the names of the columns that are read, see DumpReader
+    """
+    from molmod.io.lammps import DumpReader
+    column_fields = [field for field in fields if field != "cell"]
+    if 3*len(column_fields) != len(units):
+        raise Error("Each field must correspond to three columns.")
+    dump_reader = DumpReader(filename_in, units, sub, columns)
+    if numbers is None:
+        numbers = numpy.zeros(dump_reader.num_atoms, int)
+    def iter_frames():
+        for values in dump_reader:
+            frame = {}
+            for index, field in enumerate(column_fields):
+                frame[field] = numpy.array(values[1+3*index:4+3*index]).transpose()
+            if "cell" in fields:
+                frame["cell"] = values.unit_cell.cell
+            if time_step is not None:
+                frame["time"] = values.step*time_step
+            yield frame
+    all_fields = list(fields)
+    if time_step is not None:
+        all_fields.append("time")
+    _convert(filename_out, numbers, all_fields, iter_frames(), dtype)
+
+
+def convert_dlpoly(filename_in, filename_out, sub=slice(None), dtype=numpy.float64, **kwargs):
+    """Convert a DL_POLY HISTORY file to an MTRJ file
+
+    The fields pos, cell and time are stored, together with vel and frc when
+    they are present in the HISTORY file. The keyword arguments are passed to
+    the HistoryReader.
+    """
+    from molmod.io.dlpoly import HistoryReader
+    history_reader = HistoryReader(filename_in, sub, **kwargs)
+    fields = ["pos", "vel", "frc"][:history_reader.keytrj+1] + ["cell", "time"]
+    # the atomic numbers are derived from the symbols in the first frame
+    try:
+        first = history_reader.next()
+    except StopIteration:
+        raise Error("No frames could be read.")
+    numbers = _get_numbers(first["symbols"])
+    def iter_frames():
+        yield first
+        for frame in history_reader:
+            yield frame
+    frames = (
+        dict((field, frame[field]) for field in fields)
+        for frame in iter_frames()
+    )
+    _convert(filename_out, numbers, fields, frames, dtype)
+
+
+def convert_atrj(filename_in, filename_out, numbers=None, sub=slice(None), dtype=numpy.float64):
+    """Convert an ATRJ file to an MTRJ file with the fields pos, time and energy."""
+    from molmod.io.atrj import ATRJReader
+    atrj_reader = ATRJReader(filename_in, sub)
+    if numbers is None:
+        numbers = numpy.zeros(atrj_reader.num_atoms, int)
+    frames = (
+        {"pos": frame.coordinates, "time": frame.time, "energy": frame.total_energy}
+        for frame in atrj_reader
+    )
+    _convert(filename_out, numbers, ["pos", "time", "energy"], frames, dtype)
@@ -0,0 +1,709 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from random import shuffle, sample
+import random
+
+from molmod.molecules import Molecule
+from molmod.binning import CellList
+from molmod.graphs import GraphError
+from molmod.data.bonds import bonds
+from molmod.data.periodic import periodic
+from molmod.transformations import rotation_around_center, Translation, Rotation, Complete
+from molmod.vectors import random_orthonormal, random_unit
+
+import numpy, copy, multiprocessing
+
+
+__all__ = [
+    "MolecularTransformation",
+    "RandomManipulation", "RandomStretch", "RandomTorsion", "RandomBend", "RandomDoubleStretch",
+    "yield_halfs_bond", "yield_halfs_bend", "yield_halfs_double",
+    "generate_manipulations", "get_threshold_matrix", "NonbondChecker",
+    "check_nonbond", "randomize_coordinates",
+    "randomize_molecule", "randomize_molecule_low",
+    "single_random_manipulation", "single_random_manipulation_low",
+    "random_dimer", "conformer_rmsds", "generate_conformers",
+]
+
+
+def _transform_rows(transformation, coordinates, indices):
+    """Apply a transformation in place to the given rows of coordinates."""
+    rows = coordinates[indices]
+    if isinstance(transformation, Rotation):
+        rows = numpy.dot(rows, transformation.r.transpose())
+    if isinstance(transformation, Translation):
+        rows += transformation.t
+    coordinates[indices] = rows
+
+
+class MolecularTransformation(object):
+    @classmethod
+    def read_from_file(cls, filename):
+        f = file(filename)
+        lines = list(line for line in f if line[0] != '#')
+        f.close()
+        r = []
+        t = []
+        for line in lines[:3]:
+            values = list(float(word) for word in line.split())
+            r.append(values[:3])
+            t.append(values[3])
+        transformation = Complete()
+        transformation.r[:] = r
+        transformation.t[:] = t
+        affected_atoms = set(int(word) for word in lines[3].split())
+        return cls(affected_atoms, transformation)
+
+    def __init__(self, affected_atoms, transformation, molecule=None):
+        self.affected_atoms = affected_atoms
+        self.transformation = Complete()
+        if isinstance(transformation, Rotation):
+            self.transformation.r[:] = transformation.r
+        if isinstance(transformation, Translation):
+            self.transformation.t[:] = transformation.t
+
+        if molecule is not None:
+            indices = numpy.array(list(affected_atoms), int)
+            _transform_rows(transformation, molecule.coordinates, indices)
+
+    def write_to_file(self, filename):
+        r = self.transformation.r
+        t = self.transformation.t
+        f = file(filename, "w")
+        print >> f, "# A (random) transformation of a part of a molecule:"
+        print >> f, "# The translation vector is in atomic units."
+        print >> f, "#     Rx             Ry             Rz              T"
+        print >> f, "% 15.9e % 15.9e % 15.9e % 15.9e" % (r[0,0], r[0,1], r[0,2], t[0])
+        print >> f, "% 15.9e % 15.9e % 15.9e % 15.9e" % (r[1,0], r[1,1], r[1,2], t[1])
+        print >> f, "% 15.9e % 15.9e % 15.9e % 15.9e" % (r[2,0], r[2,1], r[2,2], t[2])
+        print >> f, "# The indexes of the affected atoms:"
+        print >> f, " ".join(str(i) for i in self.affected_atoms)
+        f.close()
+
+
+
+class RandomManipulation(object):
+    num_hinge_atoms = None
+
+    def __init__(self, affected_atoms, max_amplitude, hinge_atoms):
+        if len(hinge_atoms) != self.num_hinge_atoms:
+            raise ValueError("The number of hinge atoms must be %i, got %i." % (
+                self.num_hinge_atoms,
+                len(hinge_atoms)
+            ))
+        self.affected_atoms = affected_atoms
+        self.affected_indices = numpy.array(sorted(affected_atoms), int)
+        self.max_amplitude = max_amplitude
+        self.hinge_atoms = hinge_atoms
+
+    def apply(self, molecule):
+        return MolecularTransformation(
+            self.affected_atoms, self.get_transformation(molecule.coordinates), molecule
+        )
+
+    def apply_coordinates(self, coordinates):
+        """Apply a random transformation in place to an (N,3) coordinates array.
+
+        This is the light-weight version of apply, for use in loops over
+        many trials: no molecule is copied and no MolecularTransformation
+        object is created.
+        """
+        _transform_rows(self.get_transformation(coordinates), coordinates, self.affected_indices)
+
+    def get_transformation(self, coordinates):
+        raise NotImplementedError
+
+
+class RandomStretch(RandomManipulation):
+    num_hinge_atoms = 2
+
+    def get_transformation(self, coordinates):
+        atom1, atom2 = self.hinge_atoms
+        direction = coordinates[atom1] - coordinates[atom2]
+        direction /= numpy.linalg.norm(direction)
+        direction *= numpy.random.uniform(-self.max_amplitude, self.max_amplitude)
+        result = Translation()
+        result.t[:] = direction
+        return result
+
+
+class RandomTorsion(RandomManipulation):
+    num_hinge_atoms = 2
+
+    def get_transformation(self, coordinates):
+        atom1, atom2 = self.hinge_atoms
+        center = coordinates[atom1]
+        axis = coordinates[atom1] - coordinates[atom2]
+        axis /= numpy.linalg.norm(axis)
+        angle = numpy.random.uniform(-self.max_amplitude, self.max_amplitude)
+        return rotation_around_center(center, angle, axis)
+
+
+class RandomBend(RandomManipulation):
+    num_hinge_atoms = 3
+
+    def get_transformation(self, coordinates):
+        atom1, atom2, atom3 = self.hinge_atoms
+        center = coordinates[atom2]
+        a = coordinates[atom1] - coordinates[atom2]
+        b = coordinates[atom3] - coordinates[atom2]
+        axis = numpy.cross(a, b)
+        norm = numpy.linalg.norm(axis)
+        if norm < 1e-5:
+            # We suppose that atom3 is part of the affected atoms
+            axis = random_orthonormal(a)
+        else:
+            axis /= numpy.linalg.norm(axis)
+        angle = numpy.random.uniform(-self.max_amplitude, self.max_amplitude)
+        return rotation_around_center(center, angle, axis)
+
+
+class RandomDoubleStretch(RandomManipulation):
+    num_hinge_atoms = 4
+
+    def get_transformation(self, coordinates):
+        atom1, atom2, atom3, atom4 = self.hinge_atoms
+        a = coordinates[atom1] - coordinates[atom2]
+        a /= numpy.linalg.norm(a)
+        b = coordinates[atom3] - coordinates[atom4]
+        b /= numpy.linalg.norm(b)
+        direction = 0.5*(a+b)
+        direction *= numpy.random.uniform(-self.max_amplitude, self.max_amplitude)
+        result = Translation()
+        result.t[:] = direction
+        return result
+
+
+def yield_halfs_bond(graph):
+    for atom1, atom2 in graph.pairs:
+        try:
+            affected_atoms1, affected_atoms2 = graph.get_halfs(atom1, atom2)
+            yield affected_atoms1, affected_atoms2, (atom1, atom2)
+        except GraphError:
+            pass
+
+
+def yield_halfs_bend(graph):
+    for atom2 in xrange(graph.num_nodes):
+        neighbors = list(graph.neighbors[atom2])
+        for index1, atom1 in enumerate(neighbors):
+            for atom3 in neighbors[index1+1:]:
+                try:
+                    affected_atoms, foo = graph.get_halfs(atom2, atom1)
+                    # the affected atoms never contain atom1!
+                    yield affected_atoms, (atom1, atom2, atom3)
+                    continue
+                except GraphError:
+                    pass
+                try:
+                    affected_atoms, foo = graph.get_halfs(atom2, atom3)
+                    # the affected atoms never contain atom3!
+                    yield affected_atoms, (atom3, atom2, atom1)
+                except GraphError:
+                    pass
+
+
+def yield_halfs_double(graph):
+    pairs = graph.pairs
+    for index1, (atom_a1, atom_b1) in enumerate(pairs):
+        for atom_a2, atom_b2 in pairs[:index1]:
+            try:
+                affected_atoms1, affected_atoms2, hinge_atoms = graph.get_halfs_double(atom_a1, atom_b1, atom_a2, atom_b2)
+                yield affected_atoms1, affected_atoms2, hinge_atoms
+            except GraphError, e:
+                pass
+
+
+
+def generate_manipulations(
+    graph, molecule, bond_stretch_factor=0.15, torsion_amplitude=numpy.pi,
+    bending_amplitude=0.30
+):
+    do_stretch = (bond_stretch_factor > 0)
+    do_double_stretch = (bond_stretch_factor > 0)
+    do_bend = (bending_amplitude > 0)
+    do_double_bend = (bending_amplitude > 0)
+    do_torsion = (torsion_amplitude > 0)
+
+    results = []
+    # A) all manipulations that require one bond that cuts the molecule in half
+    if do_stretch or do_torsion:
+        for affected_atoms1, affected_atoms2, hinge_atoms in yield_halfs_bond(graph):
+            if do_stretch:
+                length = numpy.linalg.norm(
+                    molecule.coordinates[hinge_atoms[0]] -
+                    molecule.coordinates[hinge_atoms[1]]
+                )
+                results.append(RandomStretch(
+                    affected_atoms1, length*bond_stretch_factor, hinge_atoms
+                ))
+            if do_torsion and len(affected_atoms1) > 1 and len(affected_atoms2) > 1:
+                results.append(RandomTorsion(
+                    affected_atoms1, torsion_amplitude, hinge_atoms
+                ))
+    # B) all manipulations that require a bending angle that cuts the molecule
+    #    in two parts
+    if do_bend:
+        for affected_atoms, hinge_atoms in yield_halfs_bend(graph):
+            results.append(RandomBend(
+                affected_atoms, bending_amplitude, hinge_atoms
+            ))
+    # C) all manipulations that require two bonds that separate two halfs
+    if do_double_stretch or do_double_bend:
+        for affected_atoms1, affected_atoms2, hinge_atoms in yield_halfs_double(graph):
+            if do_double_stretch:
+                length1 = numpy.linalg.norm(
+                    molecule.coordinates[hinge_atoms[0]] -
+                    molecule.coordinates[hinge_atoms[1]]
+                )
+                length2 = numpy.linalg.norm(
+                    molecule.coordinates[hinge_atoms[2]] -
+                    molecule.coordinates[hinge_atoms[3]]
+                )
+                results.append(RandomDoubleStretch(
+                    affected_atoms1, 0.5*(length1+length2)*bond_stretch_factor, hinge_atoms
+                ))
+            if do_double_bend and len(affected_atoms1) > 2 and len(affected_atoms2) > 2:
+                if hinge_atoms[0] != hinge_atoms[2]:
+                    results.append(RandomTorsion(
+                        affected_atoms1, bending_amplitude, (hinge_atoms[0], hinge_atoms[2])
+                    ))
+                if hinge_atoms[1] != hinge_atoms[3]:
+                    results.append(RandomTorsion(
+                        affected_atoms2, bending_amplitude, (hinge_atoms[1], hinge_atoms[3])
+                    ))
+    # Neglect situations where three or more cuts are required.
+    return results
+
+
+def get_threshold_matrix(thresholds):
+    """Convert a dictionary with nonbond thresholds into a matrix.
+
+    The thresholds dictionary has the following format:
+    {frozenset([atom_number1, atom_number2]): distance}
+
+    The result is a symmetric square matrix, indexed by atom numbers. Entries
+    without a threshold are set to nan.
+    """
+    size = max(max(key) for key in thresholds) + 1
+    result = numpy.zeros((size, size), float)
+    result[:] = numpy.nan
+    for key, distance in thresholds.iteritems():
+        key = list(key)
+        number1 = key[0]
+        number2 = key[-1]
+        result[number1, number2] = distance
+        result[number2, number1] = distance
+    return result
+
+
+class NonbondChecker(object):
+    """A fast nonbond clash test for many geometries of one molecular graph.
+
+    All work that only depends on the graph is done once in the constructor:
+    the atom pairs that are separated by one or two bonds are excluded and
+    the thresholds are looked up per pair. For small molecules, the
+    distances of all remaining pairs are compared with their thresholds in
+    one vectorized operation. For molecules with more than max_dense_size
+    atoms, a cell list is used to find the candidate pairs.
+    """
+
+    max_dense_size = 500
+
+    def __init__(self, graph, numbers, thresholds):
+        """Initialize a NonbondChecker.
+
+        Arguments:
+          graph  --  the molecular graph
+          numbers  --  the atom numbers of the molecule
+          thresholds  --  see check_nonbond
+        """
+        self.size = graph.num_nodes
+        self.numbers = numpy.array(numbers, int)
+        # atoms that are separated by one or two bonds are not checked. These
+        # pairs are stored as sorted integer keys index1*size+index2, with
+        # index1 < index2.
+        close = graph.get_sparse_distances(2).tocoo()
+        mask = close.row < close.col
+        self.close_keys = numpy.sort(close.row[mask].astype(int)*self.size + close.col[mask])
+        threshold_matrix = get_threshold_matrix(thresholds)
+        if self.numbers.max() >= len(threshold_matrix):
+            padded = numpy.zeros((self.numbers.max()+1,)*2, float)
+            padded[:] = numpy.nan
+            padded[:len(threshold_matrix),:len(threshold_matrix)] = threshold_matrix
+            threshold_matrix = padded
+        if self.size > self.max_dense_size:
+            self.indices1 = None
+            self.indices2 = None
+            # all combinations of atom numbers in the molecule must be covered
+            unique = numpy.unique(self.numbers)
+            missing = numpy.isnan(threshold_matrix[unique][:,unique])
+            self.max_threshold = threshold_matrix[unique][:,unique].max()
+        else:
+            indices1, indices2 = numpy.triu_indices(self.size, 1)
+            mask = ~self.is_close(indices1, indices2)
+            self.indices1 = indices1[mask]
+            self.indices2 = indices2[mask]
+            pair_thresholds = threshold_matrix[self.numbers[self.indices1], self.numbers[self.indices2]]
+            missing = numpy.isnan(pair_thresholds)
+            self.pair_thresholds_sq = pair_thresholds**2
+        if missing.any():
+            raise KeyError("Some nonbond thresholds are missing.")
+        self.threshold_matrix_sq = threshold_matrix**2
+
+    def is_close(self, indices1, indices2):
+        """Test which pairs are separated by one or two bonds.
+
+        Both index arrays must satisfy indices1 < indices2. A boolean array
+        is returned.
+        """
+        if len(self.close_keys) == 0:
+            return numpy.zeros(len(indices1), bool)
+        keys = indices1*self.size + indices2
+        positions = self.close_keys.searchsorted(keys)
+        positions = numpy.minimum(positions, len(self.close_keys) - 1)
+        return self.close_keys[positions] == keys
+
+    def __call__(self, coordinates):
+        """Return True when all nonbonded atoms are well separated."""
+        if self.indices1 is not None:
+            deltas = coordinates[self.indices1] - coordinates[self.indices2]
+            distances_sq = (deltas*deltas).sum(axis=1)
+            return not (distances_sq < self.pair_thresholds_sq).any()
+        else:
+            cell_list = CellList(coordinates, self.max_threshold)
+            indices1, indices2, deltas = cell_list.get_pairs(radius=self.max_threshold)
+            distances_sq = (deltas*deltas).sum(axis=1)
+            clash = distances_sq < self.threshold_matrix_sq[self.numbers[indices1], self.numbers[indices2]]
+            if not clash.any():
+                return True
+            return self.is_close(indices1[clash], indices2[clash]).all()
+
+
+def check_nonbond(molecule, graph, thresholds):
+    """Check whether all nonbonded atoms are well separated.
+
+    If a nonbond atom pair is found that has an interatomic distance below
+    the given thresholds. The thresholds dictionary has the following format:
+    {frozenset([atom_number1, atom_number2]): distance}
+
+    When random geometries are generated for sampling the conformational space
+    of a molecule without strong repulsive nonbonding interactions, try to
+    underestimate the thresholds at first instance and exclude bond stretches
+    and bending motions for the random manipuulations. Then compute the forces
+    projected on the nonbonding distance gradients. The distance for which the
+    absolute value of these gradients drops below 100 kJ/mol is a rough guess
+    of a proper threshold value.
+
+    When many geometries of the same graph are checked, construct a
+    NonbondChecker once and call it with the coordinates instead.
+    """
+    return NonbondChecker(graph, molecule.numbers, thresholds)(molecule.coordinates)
+
+
+def randomize_coordinates(coordinates, manipulations, checker, max_tries=1000, out=None):
+    """Randomize an (N,3) array of coordinates.
+
+    Arguments:
+      coordinates  --  the initial coordinates, which are not altered
+      manipulations  --  a list of RandomManipulation objects
+      checker  --  a NonbondChecker instance, or any function that returns
+          True when the given coordinates are acceptable
+
+    Optional arguments:
+      max_tries  --  the maximum number of trials
+      out  --  a preallocated (N,3) buffer for the result
+
+    Each trial copies the coordinates into the buffer and applies all
+    manipulations in random order in place. The buffer is returned as soon
+    as it passes the check. If all trials fail, None is returned.
+    """
+    if out is None:
+        out = numpy.zeros(coordinates.shape, float)
+    for m in xrange(max_tries):
+        out[:] = coordinates
+        order = copy.copy(manipulations)
+        shuffle(order)
+        for manipulation in order:
+            manipulation.apply_coordinates(out)
+        if checker(out):
+            return out
+    return None
+
+
+def randomize_molecule(molecule, graph, manipulations, nonbond_thresholds, max_tries=1000):
+    """Return a randomized copy of the molecule.
+
+    If no randomized molecule can be generated that survives the nonbond check
+    after max_tries repetitions, None is returned. In case of success, the
+    randomized molecule is returned. The original molecule is not altered.
+    """
+    checker = NonbondChecker(graph, molecule.numbers, nonbond_thresholds)
+    coordinates = randomize_coordinates(molecule.coordinates, manipulations, checker, max_tries)
+    if coordinates is None:
+        return None
+    random_molecule = copy.deepcopy(molecule)
+    random_molecule.coordinates[:] = coordinates
+    return random_molecule
+
+
+def randomize_molecule_low(molecule, manipulations):
+    """Return a randomized copy of the molecule, without the nonbond check."""
+
+    manipulations = copy.copy(manipulations)
+    shuffle(manipulations)
+    randomized_molecule = copy.deepcopy(molecule)
+    for manipulation in manipulations:
+        manipulation.apply(randomized_molecule)
+    return randomized_molecule
+
+
+def single_random_manipulation(molecule, graph, manipulations, nonbond_thresholds, max_tries=1000):
+    """Apply a single random manipulation.
+
+    If no randomized molecule can be generated that survives the nonbond check
+    after max_tries repetitions, None is returned. In case of success, the
+    randomized molecule and the corresponding transformation is returned.
+    The original molecule is not altered.
+    """
+    checker = NonbondChecker(graph, molecule.numbers, nonbond_thresholds)
+    for m in xrange(max_tries):
+        random_molecule, transformation = single_random_manipulation_low(molecule, manipulations)
+        if checker(random_molecule.coordinates):
+            return random_molecule, transformation
+    return None
+
+
+def single_random_manipulation_low(molecule, manipulations):
+    """Return a randomized copy of the molecule, without the nonbond check."""
+
+    manipulation = sample(manipulations, 1)[0]
+    randomized_molecule = copy.deepcopy(molecule)
+    transformation = manipulation.apply(randomized_molecule)
+    return randomized_molecule, transformation
+
+
+def random_dimer(molecule0, molecule1, thresholds, shoot_max, max_tries=1000):
+    """Create a random dimer.
+
+    molecule0 and molecule1 are placed in one reference frame at random relative
+    positions. Interatomic distances are above the thresholds. Initially a dimer
+    is created where one interatomic distance approximates the threshold value.
+    Then the molecules are given an additional separation in the range
+    [0,shoot_max].
+
+    thresholds has the following format:
+    {frozenset([atom_number1, atom_number2]): distance}
+    """
+
+    # apply a random rotation to molecule1
+    center = numpy.zeros(3, float)
+    angle = numpy.random.uniform(0, 2*numpy.pi)
+    axis = random_unit(3)
+    rotation = rotation_around_center(center, angle, axis)
+    cor1 = numpy.dot(molecule1.coordinates, rotation.r)
+
+    # select a random atom in each molecule
+    atom0 = numpy.random.randint(len(molecule0.numbers))
+    atom1 = numpy.random.randint(len(molecule1.numbers))
+
+    # define a translation of molecule1 that brings both atoms in overlap
+    delta = molecule0.coordinates[atom0] - cor1[atom1]
+    cor1 += delta
+
+    # define a random direction
+    direction = random_unit(3)
+    cor1 += 1*direction
+
+    # move molecule1 along this direction until all intermolecular atomic
+    # distances are above the threshold values
+    threshold_mat = numpy.zeros((len(molecule0.numbers), len(molecule1.numbers)), float)
+    distance_mat = numpy.zeros((len(molecule0.numbers), len(molecule1.numbers)), float)
+    for i1, n1 in enumerate(molecule0.numbers):
+        for i2, n2 in enumerate(molecule1.numbers):
+            threshold = thresholds.get(frozenset([n1,n2]))
+            threshold_mat[i1,i2] = threshold**2
+    while True:
+        cor1 += 0.1*direction
+        distance_mat[:] = 0
+        for i in 0,1,2:
+            distance_mat += numpy.subtract.outer(molecule0.coordinates[:,i], cor1[:,i])**2
+        if (distance_mat > threshold_mat).all():
+            break
+
+    # translate over a random distance [0,shoot] along the same direction
+    # (if necessary repeat until no overlap is found)
+    while True:
+        cor1 += direction*numpy.random.uniform(0,shoot_max)
+        distance_mat[:] = 0
+        for i in 0,1,2:
+            distance_mat += numpy.subtract.outer(molecule0.coordinates[:,i], cor1[:,i])**2
+        if (distance_mat > threshold_mat).all():
+            break
+
+    # done
+    dimer = Molecule(
+        numpy.concatenate([molecule0.numbers, molecule1.numbers]),
+        numpy.concatenate([molecule0.coordinates, cor1])
+    )
+    dimer.direction = direction
+    dimer.atom0 = atom0
+    dimer.atom1 = atom1
+    return dimer
+
+
+def conformer_rmsds(references, coordinates):
+    """Compute the RMSD between one geometry and a stack of reference geometries.
+
+    Arguments:
+      references  --  a numpy array with shape (K,N,3)
+      coordinates  --  a numpy array with shape (N,3)
+
+    Each reference is optimally superposed on the given coordinates with the
+    Kabsch algorithm (see transformations.superpose) before the RMSD is
+    computed. All K superpositions are handled in one batch of 3x3 singular
+    value decompositions. An array with K RMSD values is returned.
+    """
+    references = references - references.mean(axis=1).reshape((-1,1,3))
+    coordinates = coordinates - coordinates.mean(axis=0)
+    covariances = numpy.tensordot(references, coordinates, axes=([1],[0]))
+    u, s, vt = numpy.linalg.svd(covariances)
+    # the sign of the smallest singular value takes care of reflections
+    s[:,2] *= numpy.sign(numpy.linalg.det(u)*numpy.linalg.det(vt))
+    msds = (
+        (references**2).sum(axis=2).sum(axis=1) + (coordinates**2).sum()
+        - 2*s.sum(axis=1)
+    )/len(coordinates)
+    return numpy.sqrt(numpy.clip(msds, 0, numpy.inf))
+
+
+# The read-only state of the worker processes in generate_conformers. It is
+# installed once per worker by _init_conformer_worker.
+_conformer_worker_state = None
+
+
+def _init_conformer_worker(molecule, graph, manipulations, nonbond_thresholds, max_tries, seed):
+    global _conformer_worker_state
+    checker = NonbondChecker(graph, molecule.numbers, nonbond_thresholds)
+    _conformer_worker_state = (molecule.coordinates, manipulations, checker, max_tries, seed)
+
+
+def _random_conformer_task(index):
+    """Generate the random conformer with the given index.
+
+    Both random number generators are seeded with the pair (seed, index),
+    which makes the outcome of a task independent of the process that
+    executes it.
+    """
+    coordinates, manipulations, checker, max_tries, seed = _conformer_worker_state
+    numpy.random.seed([seed, index])
+    random.seed(numpy.random.randint(2**31))
+    return index, randomize_coordinates(coordinates, manipulations, checker, max_tries)
+
+
+def generate_conformers(
+    molecule, graph, manipulations, nonbond_thresholds, num_conformers,
+    max_tasks=None, max_tries=1000, num_processes=None, seed=0, ordered=False,
+    rmsd_threshold=None, similarity_threshold=None, margin=1.0, cutoff=10.0,
+):
+    """Generate random conformers in parallel and yield the distinct ones.
+
+    Arguments:
+      molecule, graph, manipulations, nonbond_thresholds, max_tries  --  see
+          randomize_molecule
+      num_conformers  --  the generator stops after this number of accepted
+          conformers
+
+    Optional arguments:
+      max_tasks  --  the maximum number of calls to randomize_coordinates,
+          defaults to 10*num_conformers
+      num_processes  --  the size of the multiprocessing pool. The default is
+          the number of cpus. When num_processes is 1, no pool is created.
+      seed  --  task i seeds its random number generators with (seed, i)
+      ordered  --  when True, results are screened in the order of the task
+          index and the sequence of conformers is fully reproducible. When
+          False, results are screened as soon as they arrive.
+      rmsd_threshold  --  a conformer is dropped when its RMSD after
+          superposition with a previously accepted conformer is below this
+          threshold
+      similarity_threshold  --  a conformer is dropped when its normalized
+          DistanceDescriptor similarity with a previously accepted conformer
+          exceeds this threshold (a value between 0 and 1)
+      margin, cutoff  --  parameters for DistanceDescriptor.similarity
+
+    The accepted conformers are yielded as Molecule objects as soon as they
+    are screened. Tasks that fail the nonbond check max_tries times are
+    silently skipped. Closing the generator terminates the pool.
+    """
+    from molmod.similarity import DistanceDescriptor
+
+    if max_tasks is None:
+        max_tasks = 10*num_conformers
+    if num_processes is None:
+        num_processes = multiprocessing.cpu_count()
+
+    initargs = (molecule, graph, manipulations, nonbond_thresholds, max_tries, seed)
+    if num_processes == 1:
+        pool = None
+        _init_conformer_worker(*initargs)
+        results = (_random_conformer_task(index) for index in xrange(max_tasks))
+    else:
+        pool = multiprocessing.Pool(num_processes, _init_conformer_worker, initargs)
+        chunksize = max(1, min(16, max_tasks/(4*num_processes)))
+        if ordered:
+            results = pool.imap(_random_conformer_task, xrange(max_tasks), chunksize)
+        else:
+            results = pool.imap_unordered(_random_conformer_task, xrange(max_tasks), chunksize)
+
+    accepted = numpy.zeros((num_conformers, molecule.size, 3), float)
+    descriptors = []
+    norms = []
+    counter = 0
+    try:
+        for index, coordinates in results:
+            if coordinates is None:
+                continue
+            if rmsd_threshold is not None and counter > 0:
+                if conformer_rmsds(accepted[:counter], coordinates).min() < rmsd_threshold:
+                    continue
+            conformer = Molecule(molecule.numbers, coordinates, "conformer %i" % index)
+            if similarity_threshold is not None:
+                descriptor = DistanceDescriptor(conformer)
+                norm = descriptor.norm(margin, cutoff)
+                duplicate = False
+                for other, other_norm in zip(descriptors, norms):
+                    if descriptor.similarity(other, margin, cutoff)/(norm*other_norm) > similarity_threshold:
+                        duplicate = True
+                        break
+                if duplicate:
+                    continue
+                descriptors.append(descriptor)
+                norms.append(norm)
+            accepted[counter] = coordinates
+            counter += 1
+            yield conformer
+            if counter == num_conformers:
+                break
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
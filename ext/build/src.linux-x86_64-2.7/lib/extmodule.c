@@ -0,0 +1,3308 @@
+/* File: extmodule.c
+ * This file is auto-generated with f2py (version:2).
+ * f2py is a Fortran to Python Interface Generator (FPIG), Second Edition,
+ * written by Pearu Peterson <pearu@cens.ioc.ee>.
+ * Generation date: Sun Oct 18 09:29:55 2026
+ * Do not edit this file directly unless you know what you are doing!!!
+ */
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+/*********************** See f2py2e/cfuncs.py: includes ***********************/
+#include "Python.h"
+#include <stdarg.h>
+#include "fortranobject.h"
+#include <math.h>
+
+/**************** See f2py2e/rules.py: mod_rules['modulebody'] ****************/
+static PyObject *ext_error;
+static PyObject *ext_module;
+
+/*********************** See f2py2e/cfuncs.py: typedefs ***********************/
+#ifdef _WIN32
+typedef __int64 long_long;
+#else
+typedef long long long_long;
+typedef unsigned long long unsigned_long_long;
+#endif
+
+typedef signed char signed_char;
+
+/****************** See f2py2e/cfuncs.py: typedefs_generated ******************/
+/*need_typedefs_generated*/
+
+/********************** See f2py2e/cfuncs.py: cppmacros **********************/
+#if defined(PREPEND_FORTRAN)
+#if defined(NO_APPEND_FORTRAN)
+#if defined(UPPERCASE_FORTRAN)
+#define F_FUNC(f,F) _##F
+#else
+#define F_FUNC(f,F) _##f
+#endif
+#else
+#if defined(UPPERCASE_FORTRAN)
+#define F_FUNC(f,F) _##F##_
+#else
+#define F_FUNC(f,F) _##f##_
+#endif
+#endif
+#else
+#if defined(NO_APPEND_FORTRAN)
+#if defined(UPPERCASE_FORTRAN)
+#define F_FUNC(f,F) F
+#else
+#define F_FUNC(f,F) f
+#endif
+#else
+#if defined(UPPERCASE_FORTRAN)
+#define F_FUNC(f,F) F##_
+#else
+#define F_FUNC(f,F) f##_
+#endif
+#endif
+#endif
+#if defined(UNDERSCORE_G77)
+#define F_FUNC_US(f,F) F_FUNC(f##_,F##_)
+#else
+#define F_FUNC_US(f,F) F_FUNC(f,F)
+#endif
+
+#define rank(var) var ## _Rank
+#define shape(var,dim) var ## _Dims[dim]
+#define old_rank(var) (PyArray_NDIM((PyArrayObject *)(capi_ ## var ## _tmp)))
+#define old_shape(var,dim) PyArray_DIM(((PyArrayObject *)(capi_ ## var ## _tmp)),dim)
+#define fshape(var,dim) shape(var,rank(var)-dim-1)
+#define len(var) shape(var,0)
+#define flen(var) fshape(var,0)
+#define old_size(var) PyArray_SIZE((PyArrayObject *)(capi_ ## var ## _tmp))
+/* #define index(i) capi_i ## i */
+#define slen(var) capi_ ## var ## _len
+#define size(var, ...) f2py_size((PyArrayObject *)(capi_ ## var ## _tmp), ## __VA_ARGS__, -1)
+
+#ifdef DEBUGCFUNCS
+#define CFUNCSMESS(mess) fprintf(stderr,"debug-capi:"mess);
+#define CFUNCSMESSPY(mess,obj) CFUNCSMESS(mess) \
+    PyObject_Print((PyObject *)obj,stderr,Py_PRINT_RAW);\
+    fprintf(stderr,"\n");
+#else
+#define CFUNCSMESS(mess)
+#define CFUNCSMESSPY(mess,obj)
+#endif
+
+#ifndef max
+#define max(a,b) ((a > b) ? (a) : (b))
+#endif
+#ifndef min
+#define min(a,b) ((a < b) ? (a) : (b))
+#endif
+#ifndef MAX
+#define MAX(a,b) ((a > b) ? (a) : (b))
+#endif
+#ifndef MIN
+#define MIN(a,b) ((a < b) ? (a) : (b))
+#endif
+
+
+/************************ See f2py2e/cfuncs.py: cfuncs ************************/
+static int f2py_size(PyArrayObject* var, ...)
+{
+  npy_int sz = 0;
+  npy_int dim;
+  npy_int rank;
+  va_list argp;
+  va_start(argp, var);
+  dim = va_arg(argp, npy_int);
+  if (dim==-1)
+    {
+      sz = PyArray_SIZE(var);
+    }
+  else
+    {
+      rank = PyArray_NDIM(var);
+      if (dim>=1 && dim<=rank)
+        sz = PyArray_DIM(var, dim-1);
+      else
+        fprintf(stderr, "f2py_size: 2nd argument value=%d fails to satisfy 1<=value<=%d. Result will be 0.\n", dim, rank);
+    }
+  va_end(argp);
+  return sz;
+}
+
+static int double_from_pyobj(double* v,PyObject *obj,const char *errmess) {
+    PyObject* tmp = NULL;
+    if (PyFloat_Check(obj)) {
+#ifdef __sgi
+        *v = PyFloat_AsDouble(obj);
+#else
+        *v = PyFloat_AS_DOUBLE(obj);
+#endif
+        return 1;
+    }
+    tmp = PyNumber_Float(obj);
+    if (tmp) {
+#ifdef __sgi
+        *v = PyFloat_AsDouble(tmp);
+#else
+        *v = PyFloat_AS_DOUBLE(tmp);
+#endif
+        Py_DECREF(tmp);
+        return 1;
+    }
+    if (PyComplex_Check(obj))
+        tmp = PyObject_GetAttrString(obj,"real");
+    else if (PyString_Check(obj) || PyUnicode_Check(obj))
+        /*pass*/;
+    else if (PySequence_Check(obj))
+        tmp = PySequence_GetItem(obj,0);
+    if (tmp) {
+        PyErr_Clear();
+        if (double_from_pyobj(v,tmp,errmess)) {Py_DECREF(tmp); return 1;}
+        Py_DECREF(tmp);
+    }
+    {
+        PyObject* err = PyErr_Occurred();
+        if (err==NULL) err = ext_error;
+        PyErr_SetString(err,errmess);
+    }
+    return 0;
+}
+
+static int int_from_pyobj(int* v,PyObject *obj,const char *errmess) {
+    PyObject* tmp = NULL;
+    if (PyInt_Check(obj)) {
+        *v = (int)PyInt_AS_LONG(obj);
+        return 1;
+    }
+    tmp = PyNumber_Int(obj);
+    if (tmp) {
+        *v = PyInt_AS_LONG(tmp);
+        Py_DECREF(tmp);
+        return 1;
+    }
+    if (PyComplex_Check(obj))
+        tmp = PyObject_GetAttrString(obj,"real");
+    else if (PyString_Check(obj) || PyUnicode_Check(obj))
+        /*pass*/;
+    else if (PySequence_Check(obj))
+        tmp = PySequence_GetItem(obj,0);
+    if (tmp) {
+        PyErr_Clear();
+        if (int_from_pyobj(v,tmp,errmess)) {Py_DECREF(tmp); return 1;}
+        Py_DECREF(tmp);
+    }
+    {
+        PyObject* err = PyErr_Occurred();
+        if (err==NULL) err = ext_error;
+        PyErr_SetString(err,errmess);
+    }
+    return 0;
+}
+
+
+/********************* See f2py2e/cfuncs.py: userincludes *********************/
+/*need_userincludes*/
+
+/********************* See f2py2e/capi_rules.py: usercode *********************/
+
+
+/* See f2py2e/rules.py */
+extern double ff_dm_quad(int,double*,double*,double*,double,double*,double*,int*,double*);
+extern double ff_dm_reci(int,double*,double*,int*,double,double*,double*,int*,double*);
+extern double ff_bond_quad(int,int,double*,int*,double*,double,double*,double*,int*,double*);
+extern double ff_bond_hyper(int,int,double*,int*,double*,double,double,double*,double*,int*,double*);
+extern void graphs_floyd_warshall(int,int*);
+extern void molecules_distance_matrix(int,double*,double*);
+extern void similarity_table_labels(int,int*,int*);
+extern void similarity_table_distances(int,double*,double*);
+extern double similarity_measure(int,int*,double*,int,int*,double*,double,double);
+extern int in_spheres(int,double*,double,double*,double*);
+extern int in_spheres_all(int,double*,double,double*,double*,int*);
+extern void center_ses1(double*,double*,double,double*);
+extern int center_ses2(double*,double*,double,double*,double,double*);
+extern int center_ses3(double*,double*,double,double*,double,double*,double,double*);
+extern double monte_carlo_volumes(int,double,double*,double*,int,int,int,long_long*);
+extern int io_read_columns(int,signed_char*,int,int,int*,double*);
+extern int io_read_fixed(int,signed_char*,int,int,int,int,double*);
+extern int io_find_lines(int,signed_char*,int);
+extern int io_find_field(int,signed_char*,int,int,int*,int*);
+/*eof externroutines*/
+
+/******************** See f2py2e/capi_rules.py: usercode1 ********************/
+
+
+/******************* See f2py2e/cb_rules.py: buildcallback *******************/
+/*need_callbacks*/
+
+/*********************** See f2py2e/rules.py: buildapi ***********************/
+
+/********************************* ff_dm_quad *********************************/
+static char doc_f2py_rout_ext_ff_dm_quad[] = "\
+ff_dm_quad = ff_dm_quad(cor,dm0,dmk,amp,unitcell,unitcell_reciproke,unitcell_active,gradient)\n\nWrapper for ``ff_dm_quad``.\
+\n\nParameters\n----------\n"
+"cor : input rank-2 array('d') with bounds (n,3)\n"
+"dm0 : input rank-2 array('d') with bounds (n,n)\n"
+"dmk : input rank-2 array('d') with bounds (n,n)\n"
+"amp : input float\n"
+"unitcell : input rank-2 array('d') with bounds (3,3)\n"
+"unitcell_reciproke : input rank-2 array('d') with bounds (3,3)\n"
+"unitcell_active : input rank-1 array('i') with bounds (3)\n"
+"gradient : in/output rank-2 array('d') with bounds (n,3)\n"
+"\nReturns\n-------\n"
+"ff_dm_quad : float";
+/* extern double ff_dm_quad(int,double*,double*,double*,double,double*,double*,int*,double*); */
+static PyObject *f2py_rout_ext_ff_dm_quad(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           double (*f2py_func)(int,double*,double*,double*,double,double*,double*,int*,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  double ff_dm_quad_return_value=0;
+  int n = 0;
+  double *cor = NULL;
+  npy_intp cor_Dims[2] = {-1, -1};
+  const int cor_Rank = 2;
+  PyArrayObject *capi_cor_tmp = NULL;
+  int capi_cor_intent = 0;
+  PyObject *cor_capi = Py_None;
+  double *dm0 = NULL;
+  npy_intp dm0_Dims[2] = {-1, -1};
+  const int dm0_Rank = 2;
+  PyArrayObject *capi_dm0_tmp = NULL;
+  int capi_dm0_intent = 0;
+  PyObject *dm0_capi = Py_None;
+  double *dmk = NULL;
+  npy_intp dmk_Dims[2] = {-1, -1};
+  const int dmk_Rank = 2;
+  PyArrayObject *capi_dmk_tmp = NULL;
+  int capi_dmk_intent = 0;
+  PyObject *dmk_capi = Py_None;
+  double amp = 0;
+  PyObject *amp_capi = Py_None;
+  double *unitcell = NULL;
+  npy_intp unitcell_Dims[2] = {-1, -1};
+  const int unitcell_Rank = 2;
+  PyArrayObject *capi_unitcell_tmp = NULL;
+  int capi_unitcell_intent = 0;
+  PyObject *unitcell_capi = Py_None;
+  double *unitcell_reciproke = NULL;
+  npy_intp unitcell_reciproke_Dims[2] = {-1, -1};
+  const int unitcell_reciproke_Rank = 2;
+  PyArrayObject *capi_unitcell_reciproke_tmp = NULL;
+  int capi_unitcell_reciproke_intent = 0;
+  PyObject *unitcell_reciproke_capi = Py_None;
+  int *unitcell_active = NULL;
+  npy_intp unitcell_active_Dims[1] = {-1};
+  const int unitcell_active_Rank = 1;
+  PyArrayObject *capi_unitcell_active_tmp = NULL;
+  int capi_unitcell_active_intent = 0;
+  PyObject *unitcell_active_capi = Py_None;
+  double *gradient = NULL;
+  npy_intp gradient_Dims[2] = {-1, -1};
+  const int gradient_Rank = 2;
+  PyArrayObject *capi_gradient_tmp = NULL;
+  int capi_gradient_intent = 0;
+  PyObject *gradient_capi = Py_None;
+  static char *capi_kwlist[] = {"cor","dm0","dmk","amp","unitcell","unitcell_reciproke","unitcell_active","gradient",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOOOOO:ext.ff_dm_quad",\
+    capi_kwlist,&cor_capi,&dm0_capi,&dmk_capi,&amp_capi,&unitcell_capi,&unitcell_reciproke_capi,&unitcell_active_capi,&gradient_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable cor */
+  cor_Dims[1]=3;
+  capi_cor_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_cor_tmp = array_from_pyobj(NPY_DOUBLE,cor_Dims,cor_Rank,capi_cor_intent,cor_capi);
+  if (capi_cor_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `cor' of ext.ff_dm_quad to C/Fortran array" );
+  } else {
+    cor = (double *)(PyArray_DATA(capi_cor_tmp));
+
+  /* Processing variable unitcell_reciproke */
+  unitcell_reciproke_Dims[0]=3,unitcell_reciproke_Dims[1]=3;
+  capi_unitcell_reciproke_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_reciproke_tmp = array_from_pyobj(NPY_DOUBLE,unitcell_reciproke_Dims,unitcell_reciproke_Rank,capi_unitcell_reciproke_intent,unitcell_reciproke_capi);
+  if (capi_unitcell_reciproke_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 6th argument `unitcell_reciproke' of ext.ff_dm_quad to C/Fortran array" );
+  } else {
+    unitcell_reciproke = (double *)(PyArray_DATA(capi_unitcell_reciproke_tmp));
+
+  /* Processing variable unitcell_active */
+  unitcell_active_Dims[0]=3;
+  capi_unitcell_active_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_active_tmp = array_from_pyobj(NPY_INT,unitcell_active_Dims,unitcell_active_Rank,capi_unitcell_active_intent,unitcell_active_capi);
+  if (capi_unitcell_active_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 7th argument `unitcell_active' of ext.ff_dm_quad to C/Fortran array" );
+  } else {
+    unitcell_active = (int *)(PyArray_DATA(capi_unitcell_active_tmp));
+
+  /* Processing variable amp */
+    f2py_success = double_from_pyobj(&amp,amp_capi,"ext.ff_dm_quad() 4th argument (amp) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable unitcell */
+  unitcell_Dims[0]=3,unitcell_Dims[1]=3;
+  capi_unitcell_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_tmp = array_from_pyobj(NPY_DOUBLE,unitcell_Dims,unitcell_Rank,capi_unitcell_intent,unitcell_capi);
+  if (capi_unitcell_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 5th argument `unitcell' of ext.ff_dm_quad to C/Fortran array" );
+  } else {
+    unitcell = (double *)(PyArray_DATA(capi_unitcell_tmp));
+
+  /* Processing variable n */
+  n = len(cor);
+  /* Processing variable dm0 */
+  dm0_Dims[0]=n,dm0_Dims[1]=n;
+  capi_dm0_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_dm0_tmp = array_from_pyobj(NPY_DOUBLE,dm0_Dims,dm0_Rank,capi_dm0_intent,dm0_capi);
+  if (capi_dm0_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `dm0' of ext.ff_dm_quad to C/Fortran array" );
+  } else {
+    dm0 = (double *)(PyArray_DATA(capi_dm0_tmp));
+
+  /* Processing variable gradient */
+  gradient_Dims[0]=n,gradient_Dims[1]=3;
+  capi_gradient_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_gradient_tmp = array_from_pyobj(NPY_DOUBLE,gradient_Dims,gradient_Rank,capi_gradient_intent,gradient_capi);
+  if (capi_gradient_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 8th argument `gradient' of ext.ff_dm_quad to C/Fortran array" );
+  } else {
+    gradient = (double *)(PyArray_DATA(capi_gradient_tmp));
+
+  /* Processing variable dmk */
+  dmk_Dims[0]=n,dmk_Dims[1]=n;
+  capi_dmk_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_dmk_tmp = array_from_pyobj(NPY_DOUBLE,dmk_Dims,dmk_Rank,capi_dmk_intent,dmk_capi);
+  if (capi_dmk_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `dmk' of ext.ff_dm_quad to C/Fortran array" );
+  } else {
+    dmk = (double *)(PyArray_DATA(capi_dmk_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  ff_dm_quad_return_value = (*f2py_func)(n,cor,dm0,dmk,amp,unitcell,unitcell_reciproke,unitcell_active,gradient);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("d",ff_dm_quad_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_dmk_tmp!=dmk_capi) {
+    Py_XDECREF(capi_dmk_tmp); }
+  }  /*if (capi_dmk_tmp == NULL) ... else of dmk*/
+  /* End of cleaning variable dmk */
+  if((PyObject *)capi_gradient_tmp!=gradient_capi) {
+    Py_XDECREF(capi_gradient_tmp); }
+  }  /*if (capi_gradient_tmp == NULL) ... else of gradient*/
+  /* End of cleaning variable gradient */
+  if((PyObject *)capi_dm0_tmp!=dm0_capi) {
+    Py_XDECREF(capi_dm0_tmp); }
+  }  /*if (capi_dm0_tmp == NULL) ... else of dm0*/
+  /* End of cleaning variable dm0 */
+  /* End of cleaning variable n */
+  if((PyObject *)capi_unitcell_tmp!=unitcell_capi) {
+    Py_XDECREF(capi_unitcell_tmp); }
+  }  /*if (capi_unitcell_tmp == NULL) ... else of unitcell*/
+  /* End of cleaning variable unitcell */
+  } /*if (f2py_success) of amp*/
+  /* End of cleaning variable amp */
+  if((PyObject *)capi_unitcell_active_tmp!=unitcell_active_capi) {
+    Py_XDECREF(capi_unitcell_active_tmp); }
+  }  /*if (capi_unitcell_active_tmp == NULL) ... else of unitcell_active*/
+  /* End of cleaning variable unitcell_active */
+  if((PyObject *)capi_unitcell_reciproke_tmp!=unitcell_reciproke_capi) {
+    Py_XDECREF(capi_unitcell_reciproke_tmp); }
+  }  /*if (capi_unitcell_reciproke_tmp == NULL) ... else of unitcell_reciproke*/
+  /* End of cleaning variable unitcell_reciproke */
+  if((PyObject *)capi_cor_tmp!=cor_capi) {
+    Py_XDECREF(capi_cor_tmp); }
+  }  /*if (capi_cor_tmp == NULL) ... else of cor*/
+  /* End of cleaning variable cor */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/***************************** end of ff_dm_quad *****************************/
+
+/********************************* ff_dm_reci *********************************/
+static char doc_f2py_rout_ext_ff_dm_reci[] = "\
+ff_dm_reci = ff_dm_reci(radii,cor,dm0,amp,unitcell,unitcell_reciproke,unitcell_active,gradient)\n\nWrapper for ``ff_dm_reci``.\
+\n\nParameters\n----------\n"
+"radii : input rank-1 array('d') with bounds (n)\n"
+"cor : input rank-2 array('d') with bounds (n,3)\n"
+"dm0 : input rank-2 array('i') with bounds (n,n)\n"
+"amp : input float\n"
+"unitcell : input rank-2 array('d') with bounds (3,3)\n"
+"unitcell_reciproke : input rank-2 array('d') with bounds (3,3)\n"
+"unitcell_active : input rank-1 array('i') with bounds (3)\n"
+"gradient : in/output rank-2 array('d') with bounds (n,3)\n"
+"\nReturns\n-------\n"
+"ff_dm_reci : float";
+/* extern double ff_dm_reci(int,double*,double*,int*,double,double*,double*,int*,double*); */
+static PyObject *f2py_rout_ext_ff_dm_reci(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           double (*f2py_func)(int,double*,double*,int*,double,double*,double*,int*,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  double ff_dm_reci_return_value=0;
+  int n = 0;
+  double *radii = NULL;
+  npy_intp radii_Dims[1] = {-1};
+  const int radii_Rank = 1;
+  PyArrayObject *capi_radii_tmp = NULL;
+  int capi_radii_intent = 0;
+  PyObject *radii_capi = Py_None;
+  double *cor = NULL;
+  npy_intp cor_Dims[2] = {-1, -1};
+  const int cor_Rank = 2;
+  PyArrayObject *capi_cor_tmp = NULL;
+  int capi_cor_intent = 0;
+  PyObject *cor_capi = Py_None;
+  int *dm0 = NULL;
+  npy_intp dm0_Dims[2] = {-1, -1};
+  const int dm0_Rank = 2;
+  PyArrayObject *capi_dm0_tmp = NULL;
+  int capi_dm0_intent = 0;
+  PyObject *dm0_capi = Py_None;
+  double amp = 0;
+  PyObject *amp_capi = Py_None;
+  double *unitcell = NULL;
+  npy_intp unitcell_Dims[2] = {-1, -1};
+  const int unitcell_Rank = 2;
+  PyArrayObject *capi_unitcell_tmp = NULL;
+  int capi_unitcell_intent = 0;
+  PyObject *unitcell_capi = Py_None;
+  double *unitcell_reciproke = NULL;
+  npy_intp unitcell_reciproke_Dims[2] = {-1, -1};
+  const int unitcell_reciproke_Rank = 2;
+  PyArrayObject *capi_unitcell_reciproke_tmp = NULL;
+  int capi_unitcell_reciproke_intent = 0;
+  PyObject *unitcell_reciproke_capi = Py_None;
+  int *unitcell_active = NULL;
+  npy_intp unitcell_active_Dims[1] = {-1};
+  const int unitcell_active_Rank = 1;
+  PyArrayObject *capi_unitcell_active_tmp = NULL;
+  int capi_unitcell_active_intent = 0;
+  PyObject *unitcell_active_capi = Py_None;
+  double *gradient = NULL;
+  npy_intp gradient_Dims[2] = {-1, -1};
+  const int gradient_Rank = 2;
+  PyArrayObject *capi_gradient_tmp = NULL;
+  int capi_gradient_intent = 0;
+  PyObject *gradient_capi = Py_None;
+  static char *capi_kwlist[] = {"radii","cor","dm0","amp","unitcell","unitcell_reciproke","unitcell_active","gradient",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOOOOO:ext.ff_dm_reci",\
+    capi_kwlist,&radii_capi,&cor_capi,&dm0_capi,&amp_capi,&unitcell_capi,&unitcell_reciproke_capi,&unitcell_active_capi,&gradient_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable cor */
+  cor_Dims[1]=3;
+  capi_cor_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_cor_tmp = array_from_pyobj(NPY_DOUBLE,cor_Dims,cor_Rank,capi_cor_intent,cor_capi);
+  if (capi_cor_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `cor' of ext.ff_dm_reci to C/Fortran array" );
+  } else {
+    cor = (double *)(PyArray_DATA(capi_cor_tmp));
+
+  /* Processing variable unitcell_reciproke */
+  unitcell_reciproke_Dims[0]=3,unitcell_reciproke_Dims[1]=3;
+  capi_unitcell_reciproke_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_reciproke_tmp = array_from_pyobj(NPY_DOUBLE,unitcell_reciproke_Dims,unitcell_reciproke_Rank,capi_unitcell_reciproke_intent,unitcell_reciproke_capi);
+  if (capi_unitcell_reciproke_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 6th argument `unitcell_reciproke' of ext.ff_dm_reci to C/Fortran array" );
+  } else {
+    unitcell_reciproke = (double *)(PyArray_DATA(capi_unitcell_reciproke_tmp));
+
+  /* Processing variable unitcell_active */
+  unitcell_active_Dims[0]=3;
+  capi_unitcell_active_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_active_tmp = array_from_pyobj(NPY_INT,unitcell_active_Dims,unitcell_active_Rank,capi_unitcell_active_intent,unitcell_active_capi);
+  if (capi_unitcell_active_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 7th argument `unitcell_active' of ext.ff_dm_reci to C/Fortran array" );
+  } else {
+    unitcell_active = (int *)(PyArray_DATA(capi_unitcell_active_tmp));
+
+  /* Processing variable amp */
+    f2py_success = double_from_pyobj(&amp,amp_capi,"ext.ff_dm_reci() 4th argument (amp) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable unitcell */
+  unitcell_Dims[0]=3,unitcell_Dims[1]=3;
+  capi_unitcell_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_tmp = array_from_pyobj(NPY_DOUBLE,unitcell_Dims,unitcell_Rank,capi_unitcell_intent,unitcell_capi);
+  if (capi_unitcell_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 5th argument `unitcell' of ext.ff_dm_reci to C/Fortran array" );
+  } else {
+    unitcell = (double *)(PyArray_DATA(capi_unitcell_tmp));
+
+  /* Processing variable n */
+  n = len(cor);
+  /* Processing variable dm0 */
+  dm0_Dims[0]=n,dm0_Dims[1]=n;
+  capi_dm0_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_dm0_tmp = array_from_pyobj(NPY_INT,dm0_Dims,dm0_Rank,capi_dm0_intent,dm0_capi);
+  if (capi_dm0_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `dm0' of ext.ff_dm_reci to C/Fortran array" );
+  } else {
+    dm0 = (int *)(PyArray_DATA(capi_dm0_tmp));
+
+  /* Processing variable radii */
+  radii_Dims[0]=n;
+  capi_radii_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_radii_tmp = array_from_pyobj(NPY_DOUBLE,radii_Dims,radii_Rank,capi_radii_intent,radii_capi);
+  if (capi_radii_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `radii' of ext.ff_dm_reci to C/Fortran array" );
+  } else {
+    radii = (double *)(PyArray_DATA(capi_radii_tmp));
+
+  /* Processing variable gradient */
+  gradient_Dims[0]=n,gradient_Dims[1]=3;
+  capi_gradient_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_gradient_tmp = array_from_pyobj(NPY_DOUBLE,gradient_Dims,gradient_Rank,capi_gradient_intent,gradient_capi);
+  if (capi_gradient_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 8th argument `gradient' of ext.ff_dm_reci to C/Fortran array" );
+  } else {
+    gradient = (double *)(PyArray_DATA(capi_gradient_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  ff_dm_reci_return_value = (*f2py_func)(n,radii,cor,dm0,amp,unitcell,unitcell_reciproke,unitcell_active,gradient);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("d",ff_dm_reci_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_gradient_tmp!=gradient_capi) {
+    Py_XDECREF(capi_gradient_tmp); }
+  }  /*if (capi_gradient_tmp == NULL) ... else of gradient*/
+  /* End of cleaning variable gradient */
+  if((PyObject *)capi_radii_tmp!=radii_capi) {
+    Py_XDECREF(capi_radii_tmp); }
+  }  /*if (capi_radii_tmp == NULL) ... else of radii*/
+  /* End of cleaning variable radii */
+  if((PyObject *)capi_dm0_tmp!=dm0_capi) {
+    Py_XDECREF(capi_dm0_tmp); }
+  }  /*if (capi_dm0_tmp == NULL) ... else of dm0*/
+  /* End of cleaning variable dm0 */
+  /* End of cleaning variable n */
+  if((PyObject *)capi_unitcell_tmp!=unitcell_capi) {
+    Py_XDECREF(capi_unitcell_tmp); }
+  }  /*if (capi_unitcell_tmp == NULL) ... else of unitcell*/
+  /* End of cleaning variable unitcell */
+  } /*if (f2py_success) of amp*/
+  /* End of cleaning variable amp */
+  if((PyObject *)capi_unitcell_active_tmp!=unitcell_active_capi) {
+    Py_XDECREF(capi_unitcell_active_tmp); }
+  }  /*if (capi_unitcell_active_tmp == NULL) ... else of unitcell_active*/
+  /* End of cleaning variable unitcell_active */
+  if((PyObject *)capi_unitcell_reciproke_tmp!=unitcell_reciproke_capi) {
+    Py_XDECREF(capi_unitcell_reciproke_tmp); }
+  }  /*if (capi_unitcell_reciproke_tmp == NULL) ... else of unitcell_reciproke*/
+  /* End of cleaning variable unitcell_reciproke */
+  if((PyObject *)capi_cor_tmp!=cor_capi) {
+    Py_XDECREF(capi_cor_tmp); }
+  }  /*if (capi_cor_tmp == NULL) ... else of cor*/
+  /* End of cleaning variable cor */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/***************************** end of ff_dm_reci *****************************/
+
+/******************************** ff_bond_quad ********************************/
+static char doc_f2py_rout_ext_ff_bond_quad[] = "\
+ff_bond_quad = ff_bond_quad(cor,pairs,lengths,amp,unitcell,unitcell_reciproke,unitcell_active,gradient)\n\nWrapper for ``ff_bond_quad``.\
+\n\nParameters\n----------\n"
+"cor : input rank-2 array('d') with bounds (n,3)\n"
+"pairs : input rank-2 array('i') with bounds (m,2)\n"
+"lengths : input rank-1 array('d') with bounds (m)\n"
+"amp : input float\n"
+"unitcell : input rank-2 array('d') with bounds (3,3)\n"
+"unitcell_reciproke : input rank-2 array('d') with bounds (3,3)\n"
+"unitcell_active : input rank-1 array('i') with bounds (3)\n"
+"gradient : in/output rank-2 array('d') with bounds (n,3)\n"
+"\nReturns\n-------\n"
+"ff_bond_quad : float";
+/* extern double ff_bond_quad(int,int,double*,int*,double*,double,double*,double*,int*,double*); */
+static PyObject *f2py_rout_ext_ff_bond_quad(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           double (*f2py_func)(int,int,double*,int*,double*,double,double*,double*,int*,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  double ff_bond_quad_return_value=0;
+  int m = 0;
+  int n = 0;
+  double *cor = NULL;
+  npy_intp cor_Dims[2] = {-1, -1};
+  const int cor_Rank = 2;
+  PyArrayObject *capi_cor_tmp = NULL;
+  int capi_cor_intent = 0;
+  PyObject *cor_capi = Py_None;
+  int *pairs = NULL;
+  npy_intp pairs_Dims[2] = {-1, -1};
+  const int pairs_Rank = 2;
+  PyArrayObject *capi_pairs_tmp = NULL;
+  int capi_pairs_intent = 0;
+  PyObject *pairs_capi = Py_None;
+  double *lengths = NULL;
+  npy_intp lengths_Dims[1] = {-1};
+  const int lengths_Rank = 1;
+  PyArrayObject *capi_lengths_tmp = NULL;
+  int capi_lengths_intent = 0;
+  PyObject *lengths_capi = Py_None;
+  double amp = 0;
+  PyObject *amp_capi = Py_None;
+  double *unitcell = NULL;
+  npy_intp unitcell_Dims[2] = {-1, -1};
+  const int unitcell_Rank = 2;
+  PyArrayObject *capi_unitcell_tmp = NULL;
+  int capi_unitcell_intent = 0;
+  PyObject *unitcell_capi = Py_None;
+  double *unitcell_reciproke = NULL;
+  npy_intp unitcell_reciproke_Dims[2] = {-1, -1};
+  const int unitcell_reciproke_Rank = 2;
+  PyArrayObject *capi_unitcell_reciproke_tmp = NULL;
+  int capi_unitcell_reciproke_intent = 0;
+  PyObject *unitcell_reciproke_capi = Py_None;
+  int *unitcell_active = NULL;
+  npy_intp unitcell_active_Dims[1] = {-1};
+  const int unitcell_active_Rank = 1;
+  PyArrayObject *capi_unitcell_active_tmp = NULL;
+  int capi_unitcell_active_intent = 0;
+  PyObject *unitcell_active_capi = Py_None;
+  double *gradient = NULL;
+  npy_intp gradient_Dims[2] = {-1, -1};
+  const int gradient_Rank = 2;
+  PyArrayObject *capi_gradient_tmp = NULL;
+  int capi_gradient_intent = 0;
+  PyObject *gradient_capi = Py_None;
+  static char *capi_kwlist[] = {"cor","pairs","lengths","amp","unitcell","unitcell_reciproke","unitcell_active","gradient",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOOOOO:ext.ff_bond_quad",\
+    capi_kwlist,&cor_capi,&pairs_capi,&lengths_capi,&amp_capi,&unitcell_capi,&unitcell_reciproke_capi,&unitcell_active_capi,&gradient_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable pairs */
+  pairs_Dims[1]=2;
+  capi_pairs_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_pairs_tmp = array_from_pyobj(NPY_INT,pairs_Dims,pairs_Rank,capi_pairs_intent,pairs_capi);
+  if (capi_pairs_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `pairs' of ext.ff_bond_quad to C/Fortran array" );
+  } else {
+    pairs = (int *)(PyArray_DATA(capi_pairs_tmp));
+
+  /* Processing variable cor */
+  cor_Dims[1]=3;
+  capi_cor_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_cor_tmp = array_from_pyobj(NPY_DOUBLE,cor_Dims,cor_Rank,capi_cor_intent,cor_capi);
+  if (capi_cor_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `cor' of ext.ff_bond_quad to C/Fortran array" );
+  } else {
+    cor = (double *)(PyArray_DATA(capi_cor_tmp));
+
+  /* Processing variable unitcell_reciproke */
+  unitcell_reciproke_Dims[0]=3,unitcell_reciproke_Dims[1]=3;
+  capi_unitcell_reciproke_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_reciproke_tmp = array_from_pyobj(NPY_DOUBLE,unitcell_reciproke_Dims,unitcell_reciproke_Rank,capi_unitcell_reciproke_intent,unitcell_reciproke_capi);
+  if (capi_unitcell_reciproke_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 6th argument `unitcell_reciproke' of ext.ff_bond_quad to C/Fortran array" );
+  } else {
+    unitcell_reciproke = (double *)(PyArray_DATA(capi_unitcell_reciproke_tmp));
+
+  /* Processing variable unitcell_active */
+  unitcell_active_Dims[0]=3;
+  capi_unitcell_active_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_active_tmp = array_from_pyobj(NPY_INT,unitcell_active_Dims,unitcell_active_Rank,capi_unitcell_active_intent,unitcell_active_capi);
+  if (capi_unitcell_active_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 7th argument `unitcell_active' of ext.ff_bond_quad to C/Fortran array" );
+  } else {
+    unitcell_active = (int *)(PyArray_DATA(capi_unitcell_active_tmp));
+
+  /* Processing variable amp */
+    f2py_success = double_from_pyobj(&amp,amp_capi,"ext.ff_bond_quad() 4th argument (amp) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable unitcell */
+  unitcell_Dims[0]=3,unitcell_Dims[1]=3;
+  capi_unitcell_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_tmp = array_from_pyobj(NPY_DOUBLE,unitcell_Dims,unitcell_Rank,capi_unitcell_intent,unitcell_capi);
+  if (capi_unitcell_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 5th argument `unitcell' of ext.ff_bond_quad to C/Fortran array" );
+  } else {
+    unitcell = (double *)(PyArray_DATA(capi_unitcell_tmp));
+
+  /* Processing variable m */
+  m = len(pairs);
+  /* Processing variable n */
+  n = len(cor);
+  /* Processing variable gradient */
+  gradient_Dims[0]=n,gradient_Dims[1]=3;
+  capi_gradient_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_gradient_tmp = array_from_pyobj(NPY_DOUBLE,gradient_Dims,gradient_Rank,capi_gradient_intent,gradient_capi);
+  if (capi_gradient_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 8th argument `gradient' of ext.ff_bond_quad to C/Fortran array" );
+  } else {
+    gradient = (double *)(PyArray_DATA(capi_gradient_tmp));
+
+  /* Processing variable lengths */
+  lengths_Dims[0]=m;
+  capi_lengths_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_lengths_tmp = array_from_pyobj(NPY_DOUBLE,lengths_Dims,lengths_Rank,capi_lengths_intent,lengths_capi);
+  if (capi_lengths_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `lengths' of ext.ff_bond_quad to C/Fortran array" );
+  } else {
+    lengths = (double *)(PyArray_DATA(capi_lengths_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  ff_bond_quad_return_value = (*f2py_func)(m,n,cor,pairs,lengths,amp,unitcell,unitcell_reciproke,unitcell_active,gradient);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("d",ff_bond_quad_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_lengths_tmp!=lengths_capi) {
+    Py_XDECREF(capi_lengths_tmp); }
+  }  /*if (capi_lengths_tmp == NULL) ... else of lengths*/
+  /* End of cleaning variable lengths */
+  if((PyObject *)capi_gradient_tmp!=gradient_capi) {
+    Py_XDECREF(capi_gradient_tmp); }
+  }  /*if (capi_gradient_tmp == NULL) ... else of gradient*/
+  /* End of cleaning variable gradient */
+  /* End of cleaning variable n */
+  /* End of cleaning variable m */
+  if((PyObject *)capi_unitcell_tmp!=unitcell_capi) {
+    Py_XDECREF(capi_unitcell_tmp); }
+  }  /*if (capi_unitcell_tmp == NULL) ... else of unitcell*/
+  /* End of cleaning variable unitcell */
+  } /*if (f2py_success) of amp*/
+  /* End of cleaning variable amp */
+  if((PyObject *)capi_unitcell_active_tmp!=unitcell_active_capi) {
+    Py_XDECREF(capi_unitcell_active_tmp); }
+  }  /*if (capi_unitcell_active_tmp == NULL) ... else of unitcell_active*/
+  /* End of cleaning variable unitcell_active */
+  if((PyObject *)capi_unitcell_reciproke_tmp!=unitcell_reciproke_capi) {
+    Py_XDECREF(capi_unitcell_reciproke_tmp); }
+  }  /*if (capi_unitcell_reciproke_tmp == NULL) ... else of unitcell_reciproke*/
+  /* End of cleaning variable unitcell_reciproke */
+  if((PyObject *)capi_cor_tmp!=cor_capi) {
+    Py_XDECREF(capi_cor_tmp); }
+  }  /*if (capi_cor_tmp == NULL) ... else of cor*/
+  /* End of cleaning variable cor */
+  if((PyObject *)capi_pairs_tmp!=pairs_capi) {
+    Py_XDECREF(capi_pairs_tmp); }
+  }  /*if (capi_pairs_tmp == NULL) ... else of pairs*/
+  /* End of cleaning variable pairs */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/**************************** end of ff_bond_quad ****************************/
+
+/******************************* ff_bond_hyper *******************************/
+static char doc_f2py_rout_ext_ff_bond_hyper[] = "\
+ff_bond_hyper = ff_bond_hyper(cor,pairs,lengths,scale,amp,unitcell,unitcell_reciproke,unitcell_active,gradient)\n\nWrapper for ``ff_bond_hyper``.\
+\n\nParameters\n----------\n"
+"cor : input rank-2 array('d') with bounds (n,3)\n"
+"pairs : input rank-2 array('i') with bounds (m,2)\n"
+"lengths : input rank-1 array('d') with bounds (m)\n"
+"scale : input float\n"
+"amp : input float\n"
+"unitcell : input rank-2 array('d') with bounds (3,3)\n"
+"unitcell_reciproke : input rank-2 array('d') with bounds (3,3)\n"
+"unitcell_active : input rank-1 array('i') with bounds (3)\n"
+"gradient : in/output rank-2 array('d') with bounds (n,3)\n"
+"\nReturns\n-------\n"
+"ff_bond_hyper : float";
+/* extern double ff_bond_hyper(int,int,double*,int*,double*,double,double,double*,double*,int*,double*); */
+static PyObject *f2py_rout_ext_ff_bond_hyper(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           double (*f2py_func)(int,int,double*,int*,double*,double,double,double*,double*,int*,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  double ff_bond_hyper_return_value=0;
+  int m = 0;
+  int n = 0;
+  double *cor = NULL;
+  npy_intp cor_Dims[2] = {-1, -1};
+  const int cor_Rank = 2;
+  PyArrayObject *capi_cor_tmp = NULL;
+  int capi_cor_intent = 0;
+  PyObject *cor_capi = Py_None;
+  int *pairs = NULL;
+  npy_intp pairs_Dims[2] = {-1, -1};
+  const int pairs_Rank = 2;
+  PyArrayObject *capi_pairs_tmp = NULL;
+  int capi_pairs_intent = 0;
+  PyObject *pairs_capi = Py_None;
+  double *lengths = NULL;
+  npy_intp lengths_Dims[1] = {-1};
+  const int lengths_Rank = 1;
+  PyArrayObject *capi_lengths_tmp = NULL;
+  int capi_lengths_intent = 0;
+  PyObject *lengths_capi = Py_None;
+  double scale = 0;
+  PyObject *scale_capi = Py_None;
+  double amp = 0;
+  PyObject *amp_capi = Py_None;
+  double *unitcell = NULL;
+  npy_intp unitcell_Dims[2] = {-1, -1};
+  const int unitcell_Rank = 2;
+  PyArrayObject *capi_unitcell_tmp = NULL;
+  int capi_unitcell_intent = 0;
+  PyObject *unitcell_capi = Py_None;
+  double *unitcell_reciproke = NULL;
+  npy_intp unitcell_reciproke_Dims[2] = {-1, -1};
+  const int unitcell_reciproke_Rank = 2;
+  PyArrayObject *capi_unitcell_reciproke_tmp = NULL;
+  int capi_unitcell_reciproke_intent = 0;
+  PyObject *unitcell_reciproke_capi = Py_None;
+  int *unitcell_active = NULL;
+  npy_intp unitcell_active_Dims[1] = {-1};
+  const int unitcell_active_Rank = 1;
+  PyArrayObject *capi_unitcell_active_tmp = NULL;
+  int capi_unitcell_active_intent = 0;
+  PyObject *unitcell_active_capi = Py_None;
+  double *gradient = NULL;
+  npy_intp gradient_Dims[2] = {-1, -1};
+  const int gradient_Rank = 2;
+  PyArrayObject *capi_gradient_tmp = NULL;
+  int capi_gradient_intent = 0;
+  PyObject *gradient_capi = Py_None;
+  static char *capi_kwlist[] = {"cor","pairs","lengths","scale","amp","unitcell","unitcell_reciproke","unitcell_active","gradient",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOOOOOO:ext.ff_bond_hyper",\
+    capi_kwlist,&cor_capi,&pairs_capi,&lengths_capi,&scale_capi,&amp_capi,&unitcell_capi,&unitcell_reciproke_capi,&unitcell_active_capi,&gradient_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable pairs */
+  pairs_Dims[1]=2;
+  capi_pairs_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_pairs_tmp = array_from_pyobj(NPY_INT,pairs_Dims,pairs_Rank,capi_pairs_intent,pairs_capi);
+  if (capi_pairs_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `pairs' of ext.ff_bond_hyper to C/Fortran array" );
+  } else {
+    pairs = (int *)(PyArray_DATA(capi_pairs_tmp));
+
+  /* Processing variable cor */
+  cor_Dims[1]=3;
+  capi_cor_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_cor_tmp = array_from_pyobj(NPY_DOUBLE,cor_Dims,cor_Rank,capi_cor_intent,cor_capi);
+  if (capi_cor_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `cor' of ext.ff_bond_hyper to C/Fortran array" );
+  } else {
+    cor = (double *)(PyArray_DATA(capi_cor_tmp));
+
+  /* Processing variable scale */
+    f2py_success = double_from_pyobj(&scale,scale_capi,"ext.ff_bond_hyper() 4th argument (scale) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable unitcell_reciproke */
+  unitcell_reciproke_Dims[0]=3,unitcell_reciproke_Dims[1]=3;
+  capi_unitcell_reciproke_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_reciproke_tmp = array_from_pyobj(NPY_DOUBLE,unitcell_reciproke_Dims,unitcell_reciproke_Rank,capi_unitcell_reciproke_intent,unitcell_reciproke_capi);
+  if (capi_unitcell_reciproke_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 7th argument `unitcell_reciproke' of ext.ff_bond_hyper to C/Fortran array" );
+  } else {
+    unitcell_reciproke = (double *)(PyArray_DATA(capi_unitcell_reciproke_tmp));
+
+  /* Processing variable unitcell_active */
+  unitcell_active_Dims[0]=3;
+  capi_unitcell_active_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_active_tmp = array_from_pyobj(NPY_INT,unitcell_active_Dims,unitcell_active_Rank,capi_unitcell_active_intent,unitcell_active_capi);
+  if (capi_unitcell_active_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 8th argument `unitcell_active' of ext.ff_bond_hyper to C/Fortran array" );
+  } else {
+    unitcell_active = (int *)(PyArray_DATA(capi_unitcell_active_tmp));
+
+  /* Processing variable amp */
+    f2py_success = double_from_pyobj(&amp,amp_capi,"ext.ff_bond_hyper() 5th argument (amp) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable unitcell */
+  unitcell_Dims[0]=3,unitcell_Dims[1]=3;
+  capi_unitcell_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_unitcell_tmp = array_from_pyobj(NPY_DOUBLE,unitcell_Dims,unitcell_Rank,capi_unitcell_intent,unitcell_capi);
+  if (capi_unitcell_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 6th argument `unitcell' of ext.ff_bond_hyper to C/Fortran array" );
+  } else {
+    unitcell = (double *)(PyArray_DATA(capi_unitcell_tmp));
+
+  /* Processing variable m */
+  m = len(pairs);
+  /* Processing variable n */
+  n = len(cor);
+  /* Processing variable gradient */
+  gradient_Dims[0]=n,gradient_Dims[1]=3;
+  capi_gradient_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_gradient_tmp = array_from_pyobj(NPY_DOUBLE,gradient_Dims,gradient_Rank,capi_gradient_intent,gradient_capi);
+  if (capi_gradient_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 9th argument `gradient' of ext.ff_bond_hyper to C/Fortran array" );
+  } else {
+    gradient = (double *)(PyArray_DATA(capi_gradient_tmp));
+
+  /* Processing variable lengths */
+  lengths_Dims[0]=m;
+  capi_lengths_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_lengths_tmp = array_from_pyobj(NPY_DOUBLE,lengths_Dims,lengths_Rank,capi_lengths_intent,lengths_capi);
+  if (capi_lengths_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `lengths' of ext.ff_bond_hyper to C/Fortran array" );
+  } else {
+    lengths = (double *)(PyArray_DATA(capi_lengths_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  ff_bond_hyper_return_value = (*f2py_func)(m,n,cor,pairs,lengths,scale,amp,unitcell,unitcell_reciproke,unitcell_active,gradient);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("d",ff_bond_hyper_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_lengths_tmp!=lengths_capi) {
+    Py_XDECREF(capi_lengths_tmp); }
+  }  /*if (capi_lengths_tmp == NULL) ... else of lengths*/
+  /* End of cleaning variable lengths */
+  if((PyObject *)capi_gradient_tmp!=gradient_capi) {
+    Py_XDECREF(capi_gradient_tmp); }
+  }  /*if (capi_gradient_tmp == NULL) ... else of gradient*/
+  /* End of cleaning variable gradient */
+  /* End of cleaning variable n */
+  /* End of cleaning variable m */
+  if((PyObject *)capi_unitcell_tmp!=unitcell_capi) {
+    Py_XDECREF(capi_unitcell_tmp); }
+  }  /*if (capi_unitcell_tmp == NULL) ... else of unitcell*/
+  /* End of cleaning variable unitcell */
+  } /*if (f2py_success) of amp*/
+  /* End of cleaning variable amp */
+  if((PyObject *)capi_unitcell_active_tmp!=unitcell_active_capi) {
+    Py_XDECREF(capi_unitcell_active_tmp); }
+  }  /*if (capi_unitcell_active_tmp == NULL) ... else of unitcell_active*/
+  /* End of cleaning variable unitcell_active */
+  if((PyObject *)capi_unitcell_reciproke_tmp!=unitcell_reciproke_capi) {
+    Py_XDECREF(capi_unitcell_reciproke_tmp); }
+  }  /*if (capi_unitcell_reciproke_tmp == NULL) ... else of unitcell_reciproke*/
+  /* End of cleaning variable unitcell_reciproke */
+  } /*if (f2py_success) of scale*/
+  /* End of cleaning variable scale */
+  if((PyObject *)capi_cor_tmp!=cor_capi) {
+    Py_XDECREF(capi_cor_tmp); }
+  }  /*if (capi_cor_tmp == NULL) ... else of cor*/
+  /* End of cleaning variable cor */
+  if((PyObject *)capi_pairs_tmp!=pairs_capi) {
+    Py_XDECREF(capi_pairs_tmp); }
+  }  /*if (capi_pairs_tmp == NULL) ... else of pairs*/
+  /* End of cleaning variable pairs */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/**************************** end of ff_bond_hyper ****************************/
+
+/*************************** graphs_floyd_warshall ***************************/
+static char doc_f2py_rout_ext_graphs_floyd_warshall[] = "\
+graphs_floyd_warshall(dm)\n\nWrapper for ``graphs_floyd_warshall``.\
+\n\nParameters\n----------\n"
+"dm : in/output rank-2 array('i') with bounds (n,n)";
+/* extern void graphs_floyd_warshall(int,int*); */
+static PyObject *f2py_rout_ext_graphs_floyd_warshall(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           void (*f2py_func)(int,int*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int n = 0;
+  int *dm = NULL;
+  npy_intp dm_Dims[2] = {-1, -1};
+  const int dm_Rank = 2;
+  PyArrayObject *capi_dm_tmp = NULL;
+  int capi_dm_intent = 0;
+  PyObject *dm_capi = Py_None;
+  static char *capi_kwlist[] = {"dm",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "O:ext.graphs_floyd_warshall",\
+    capi_kwlist,&dm_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable dm */
+  ;
+  capi_dm_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_dm_tmp = array_from_pyobj(NPY_INT,dm_Dims,dm_Rank,capi_dm_intent,dm_capi);
+  if (capi_dm_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `dm' of ext.graphs_floyd_warshall to C/Fortran array" );
+  } else {
+    dm = (int *)(PyArray_DATA(capi_dm_tmp));
+
+  /* Processing variable n */
+  n = len(dm);
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+        (*f2py_func)(n,dm);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("");
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  /* End of cleaning variable n */
+  if((PyObject *)capi_dm_tmp!=dm_capi) {
+    Py_XDECREF(capi_dm_tmp); }
+  }  /*if (capi_dm_tmp == NULL) ... else of dm*/
+  /* End of cleaning variable dm */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/************************ end of graphs_floyd_warshall ************************/
+
+/************************* molecules_distance_matrix *************************/
+static char doc_f2py_rout_ext_molecules_distance_matrix[] = "\
+dm = molecules_distance_matrix(cor)\n\nWrapper for ``molecules_distance_matrix``.\
+\n\nParameters\n----------\n"
+"cor : input rank-2 array('d') with bounds (n,3)\n"
+"\nReturns\n-------\n"
+"dm : rank-2 array('d') with bounds (n,n)";
+/* extern void molecules_distance_matrix(int,double*,double*); */
+static PyObject *f2py_rout_ext_molecules_distance_matrix(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           void (*f2py_func)(int,double*,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int n = 0;
+  double *cor = NULL;
+  npy_intp cor_Dims[2] = {-1, -1};
+  const int cor_Rank = 2;
+  PyArrayObject *capi_cor_tmp = NULL;
+  int capi_cor_intent = 0;
+  PyObject *cor_capi = Py_None;
+  double *dm = NULL;
+  npy_intp dm_Dims[2] = {-1, -1};
+  const int dm_Rank = 2;
+  PyArrayObject *capi_dm_tmp = NULL;
+  int capi_dm_intent = 0;
+  static char *capi_kwlist[] = {"cor",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "O:ext.molecules_distance_matrix",\
+    capi_kwlist,&cor_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable cor */
+  cor_Dims[1]=3;
+  capi_cor_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_cor_tmp = array_from_pyobj(NPY_DOUBLE,cor_Dims,cor_Rank,capi_cor_intent,cor_capi);
+  if (capi_cor_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `cor' of ext.molecules_distance_matrix to C/Fortran array" );
+  } else {
+    cor = (double *)(PyArray_DATA(capi_cor_tmp));
+
+  /* Processing variable n */
+  n = len(cor);
+  /* Processing variable dm */
+  dm_Dims[0]=n,dm_Dims[1]=n;
+  capi_dm_intent |= F2PY_INTENT_HIDE|F2PY_INTENT_OUT|F2PY_INTENT_C;
+  capi_dm_tmp = array_from_pyobj(NPY_DOUBLE,dm_Dims,dm_Rank,capi_dm_intent,Py_None);
+  if (capi_dm_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting hidden `dm' of ext.molecules_distance_matrix to C/Fortran array" );
+  } else {
+    dm = (double *)(PyArray_DATA(capi_dm_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+        (*f2py_func)(n,cor,dm);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("N",capi_dm_tmp);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  }  /*if (capi_dm_tmp == NULL) ... else of dm*/
+  /* End of cleaning variable dm */
+  /* End of cleaning variable n */
+  if((PyObject *)capi_cor_tmp!=cor_capi) {
+    Py_XDECREF(capi_cor_tmp); }
+  }  /*if (capi_cor_tmp == NULL) ... else of cor*/
+  /* End of cleaning variable cor */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/********************** end of molecules_distance_matrix **********************/
+
+/************************** similarity_table_labels **************************/
+static char doc_f2py_rout_ext_similarity_table_labels[] = "\
+labels_table = similarity_table_labels(labels)\n\nWrapper for ``similarity_table_labels``.\
+\n\nParameters\n----------\n"
+"labels : input rank-1 array('i') with bounds (n)\n"
+"\nReturns\n-------\n"
+"labels_table : rank-2 array('i') with bounds ((n*(n-1))/2,2)";
+/* extern void similarity_table_labels(int,int*,int*); */
+static PyObject *f2py_rout_ext_similarity_table_labels(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           void (*f2py_func)(int,int*,int*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int n = 0;
+  int *labels = NULL;
+  npy_intp labels_Dims[1] = {-1};
+  const int labels_Rank = 1;
+  PyArrayObject *capi_labels_tmp = NULL;
+  int capi_labels_intent = 0;
+  PyObject *labels_capi = Py_None;
+  int *labels_table = NULL;
+  npy_intp labels_table_Dims[2] = {-1, -1};
+  const int labels_table_Rank = 2;
+  PyArrayObject *capi_labels_table_tmp = NULL;
+  int capi_labels_table_intent = 0;
+  static char *capi_kwlist[] = {"labels",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "O:ext.similarity_table_labels",\
+    capi_kwlist,&labels_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable labels */
+  ;
+  capi_labels_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_labels_tmp = array_from_pyobj(NPY_INT,labels_Dims,labels_Rank,capi_labels_intent,labels_capi);
+  if (capi_labels_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `labels' of ext.similarity_table_labels to C/Fortran array" );
+  } else {
+    labels = (int *)(PyArray_DATA(capi_labels_tmp));
+
+  /* Processing variable n */
+  n = len(labels);
+  /* Processing variable labels_table */
+  labels_table_Dims[0]=(n*(n-1))/2,labels_table_Dims[1]=2;
+  capi_labels_table_intent |= F2PY_INTENT_HIDE|F2PY_INTENT_OUT|F2PY_INTENT_C;
+  capi_labels_table_tmp = array_from_pyobj(NPY_INT,labels_table_Dims,labels_table_Rank,capi_labels_table_intent,Py_None);
+  if (capi_labels_table_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting hidden `labels_table' of ext.similarity_table_labels to C/Fortran array" );
+  } else {
+    labels_table = (int *)(PyArray_DATA(capi_labels_table_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+        (*f2py_func)(n,labels,labels_table);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("N",capi_labels_table_tmp);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  }  /*if (capi_labels_table_tmp == NULL) ... else of labels_table*/
+  /* End of cleaning variable labels_table */
+  /* End of cleaning variable n */
+  if((PyObject *)capi_labels_tmp!=labels_capi) {
+    Py_XDECREF(capi_labels_tmp); }
+  }  /*if (capi_labels_tmp == NULL) ... else of labels*/
+  /* End of cleaning variable labels */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/*********************** end of similarity_table_labels ***********************/
+
+/************************* similarity_table_distances *************************/
+static char doc_f2py_rout_ext_similarity_table_distances[] = "\
+distances_table = similarity_table_distances(distance_matrix)\n\nWrapper for ``similarity_table_distances``.\
+\n\nParameters\n----------\n"
+"distance_matrix : input rank-2 array('d') with bounds (n,n)\n"
+"\nReturns\n-------\n"
+"distances_table : rank-1 array('d') with bounds ((n*(n-1))/2)";
+/* extern void similarity_table_distances(int,double*,double*); */
+static PyObject *f2py_rout_ext_similarity_table_distances(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           void (*f2py_func)(int,double*,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int n = 0;
+  double *distance_matrix = NULL;
+  npy_intp distance_matrix_Dims[2] = {-1, -1};
+  const int distance_matrix_Rank = 2;
+  PyArrayObject *capi_distance_matrix_tmp = NULL;
+  int capi_distance_matrix_intent = 0;
+  PyObject *distance_matrix_capi = Py_None;
+  double *distances_table = NULL;
+  npy_intp distances_table_Dims[1] = {-1};
+  const int distances_table_Rank = 1;
+  PyArrayObject *capi_distances_table_tmp = NULL;
+  int capi_distances_table_intent = 0;
+  static char *capi_kwlist[] = {"distance_matrix",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "O:ext.similarity_table_distances",\
+    capi_kwlist,&distance_matrix_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable distance_matrix */
+  ;
+  capi_distance_matrix_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_distance_matrix_tmp = array_from_pyobj(NPY_DOUBLE,distance_matrix_Dims,distance_matrix_Rank,capi_distance_matrix_intent,distance_matrix_capi);
+  if (capi_distance_matrix_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `distance_matrix' of ext.similarity_table_distances to C/Fortran array" );
+  } else {
+    distance_matrix = (double *)(PyArray_DATA(capi_distance_matrix_tmp));
+
+  /* Processing variable n */
+  n = len(distance_matrix);
+  /* Processing variable distances_table */
+  distances_table_Dims[0]=(n*(n-1))/2;
+  capi_distances_table_intent |= F2PY_INTENT_HIDE|F2PY_INTENT_OUT|F2PY_INTENT_C;
+  capi_distances_table_tmp = array_from_pyobj(NPY_DOUBLE,distances_table_Dims,distances_table_Rank,capi_distances_table_intent,Py_None);
+  if (capi_distances_table_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting hidden `distances_table' of ext.similarity_table_distances to C/Fortran array" );
+  } else {
+    distances_table = (double *)(PyArray_DATA(capi_distances_table_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+        (*f2py_func)(n,distance_matrix,distances_table);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("N",capi_distances_table_tmp);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  }  /*if (capi_distances_table_tmp == NULL) ... else of distances_table*/
+  /* End of cleaning variable distances_table */
+  /* End of cleaning variable n */
+  if((PyObject *)capi_distance_matrix_tmp!=distance_matrix_capi) {
+    Py_XDECREF(capi_distance_matrix_tmp); }
+  }  /*if (capi_distance_matrix_tmp == NULL) ... else of distance_matrix*/
+  /* End of cleaning variable distance_matrix */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/********************* end of similarity_table_distances *********************/
+
+/***************************** similarity_measure *****************************/
+static char doc_f2py_rout_ext_similarity_measure[] = "\
+similarity_measure = similarity_measure(labels1,distances1,labels2,distances2,margin,cutoff)\n\nWrapper for ``similarity_measure``.\
+\n\nParameters\n----------\n"
+"labels1 : input rank-2 array('i') with bounds (n1,2)\n"
+"distances1 : input rank-1 array('d') with bounds (n1)\n"
+"labels2 : input rank-2 array('i') with bounds (n2,2)\n"
+"distances2 : input rank-1 array('d') with bounds (n2)\n"
+"margin : input float\n"
+"cutoff : input float\n"
+"\nReturns\n-------\n"
+"similarity_measure : float";
+/* extern double similarity_measure(int,int*,double*,int,int*,double*,double,double); */
+static PyObject *f2py_rout_ext_similarity_measure(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           double (*f2py_func)(int,int*,double*,int,int*,double*,double,double)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  double similarity_measure_return_value=0;
+  int n1 = 0;
+  int *labels1 = NULL;
+  npy_intp labels1_Dims[2] = {-1, -1};
+  const int labels1_Rank = 2;
+  PyArrayObject *capi_labels1_tmp = NULL;
+  int capi_labels1_intent = 0;
+  PyObject *labels1_capi = Py_None;
+  double *distances1 = NULL;
+  npy_intp distances1_Dims[1] = {-1};
+  const int distances1_Rank = 1;
+  PyArrayObject *capi_distances1_tmp = NULL;
+  int capi_distances1_intent = 0;
+  PyObject *distances1_capi = Py_None;
+  int n2 = 0;
+  int *labels2 = NULL;
+  npy_intp labels2_Dims[2] = {-1, -1};
+  const int labels2_Rank = 2;
+  PyArrayObject *capi_labels2_tmp = NULL;
+  int capi_labels2_intent = 0;
+  PyObject *labels2_capi = Py_None;
+  double *distances2 = NULL;
+  npy_intp distances2_Dims[1] = {-1};
+  const int distances2_Rank = 1;
+  PyArrayObject *capi_distances2_tmp = NULL;
+  int capi_distances2_intent = 0;
+  PyObject *distances2_capi = Py_None;
+  double margin = 0;
+  PyObject *margin_capi = Py_None;
+  double cutoff = 0;
+  PyObject *cutoff_capi = Py_None;
+  static char *capi_kwlist[] = {"labels1","distances1","labels2","distances2","margin","cutoff",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOOO:ext.similarity_measure",\
+    capi_kwlist,&labels1_capi,&distances1_capi,&labels2_capi,&distances2_capi,&margin_capi,&cutoff_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable cutoff */
+    f2py_success = double_from_pyobj(&cutoff,cutoff_capi,"ext.similarity_measure() 6th argument (cutoff) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable labels1 */
+  labels1_Dims[1]=2;
+  capi_labels1_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_labels1_tmp = array_from_pyobj(NPY_INT,labels1_Dims,labels1_Rank,capi_labels1_intent,labels1_capi);
+  if (capi_labels1_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `labels1' of ext.similarity_measure to C/Fortran array" );
+  } else {
+    labels1 = (int *)(PyArray_DATA(capi_labels1_tmp));
+
+  /* Processing variable labels2 */
+  labels2_Dims[1]=2;
+  capi_labels2_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_labels2_tmp = array_from_pyobj(NPY_INT,labels2_Dims,labels2_Rank,capi_labels2_intent,labels2_capi);
+  if (capi_labels2_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `labels2' of ext.similarity_measure to C/Fortran array" );
+  } else {
+    labels2 = (int *)(PyArray_DATA(capi_labels2_tmp));
+
+  /* Processing variable margin */
+    f2py_success = double_from_pyobj(&margin,margin_capi,"ext.similarity_measure() 5th argument (margin) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable n1 */
+  n1 = len(labels1);
+  /* Processing variable n2 */
+  n2 = len(labels2);
+  /* Processing variable distances2 */
+  distances2_Dims[0]=n2;
+  capi_distances2_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_distances2_tmp = array_from_pyobj(NPY_DOUBLE,distances2_Dims,distances2_Rank,capi_distances2_intent,distances2_capi);
+  if (capi_distances2_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 4th argument `distances2' of ext.similarity_measure to C/Fortran array" );
+  } else {
+    distances2 = (double *)(PyArray_DATA(capi_distances2_tmp));
+
+  /* Processing variable distances1 */
+  distances1_Dims[0]=n1;
+  capi_distances1_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_distances1_tmp = array_from_pyobj(NPY_DOUBLE,distances1_Dims,distances1_Rank,capi_distances1_intent,distances1_capi);
+  if (capi_distances1_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `distances1' of ext.similarity_measure to C/Fortran array" );
+  } else {
+    distances1 = (double *)(PyArray_DATA(capi_distances1_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  similarity_measure_return_value = (*f2py_func)(n1,labels1,distances1,n2,labels2,distances2,margin,cutoff);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("d",similarity_measure_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_distances1_tmp!=distances1_capi) {
+    Py_XDECREF(capi_distances1_tmp); }
+  }  /*if (capi_distances1_tmp == NULL) ... else of distances1*/
+  /* End of cleaning variable distances1 */
+  if((PyObject *)capi_distances2_tmp!=distances2_capi) {
+    Py_XDECREF(capi_distances2_tmp); }
+  }  /*if (capi_distances2_tmp == NULL) ... else of distances2*/
+  /* End of cleaning variable distances2 */
+  /* End of cleaning variable n2 */
+  /* End of cleaning variable n1 */
+  } /*if (f2py_success) of margin*/
+  /* End of cleaning variable margin */
+  if((PyObject *)capi_labels2_tmp!=labels2_capi) {
+    Py_XDECREF(capi_labels2_tmp); }
+  }  /*if (capi_labels2_tmp == NULL) ... else of labels2*/
+  /* End of cleaning variable labels2 */
+  if((PyObject *)capi_labels1_tmp!=labels1_capi) {
+    Py_XDECREF(capi_labels1_tmp); }
+  }  /*if (capi_labels1_tmp == NULL) ... else of labels1*/
+  /* End of cleaning variable labels1 */
+  } /*if (f2py_success) of cutoff*/
+  /* End of cleaning variable cutoff */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/************************* end of similarity_measure *************************/
+
+/********************************* in_spheres *********************************/
+static char doc_f2py_rout_ext_in_spheres[] = "\
+in_spheres = in_spheres(probe,probe_radius,spheres,sphere_radii)\n\nWrapper for ``in_spheres``.\
+\n\nParameters\n----------\n"
+"probe : input rank-1 array('d') with bounds (3)\n"
+"probe_radius : input float\n"
+"spheres : input rank-2 array('d') with bounds (n,3)\n"
+"sphere_radii : input rank-1 array('d') with bounds (n)\n"
+"\nReturns\n-------\n"
+"in_spheres : int";
+/* extern int in_spheres(int,double*,double,double*,double*); */
+static PyObject *f2py_rout_ext_in_spheres(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           int (*f2py_func)(int,double*,double,double*,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int in_spheres_return_value=0;
+  int n = 0;
+  double *probe = NULL;
+  npy_intp probe_Dims[1] = {-1};
+  const int probe_Rank = 1;
+  PyArrayObject *capi_probe_tmp = NULL;
+  int capi_probe_intent = 0;
+  PyObject *probe_capi = Py_None;
+  double probe_radius = 0;
+  PyObject *probe_radius_capi = Py_None;
+  double *spheres = NULL;
+  npy_intp spheres_Dims[2] = {-1, -1};
+  const int spheres_Rank = 2;
+  PyArrayObject *capi_spheres_tmp = NULL;
+  int capi_spheres_intent = 0;
+  PyObject *spheres_capi = Py_None;
+  double *sphere_radii = NULL;
+  npy_intp sphere_radii_Dims[1] = {-1};
+  const int sphere_radii_Rank = 1;
+  PyArrayObject *capi_sphere_radii_tmp = NULL;
+  int capi_sphere_radii_intent = 0;
+  PyObject *sphere_radii_capi = Py_None;
+  static char *capi_kwlist[] = {"probe","probe_radius","spheres","sphere_radii",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOO:ext.in_spheres",\
+    capi_kwlist,&probe_capi,&probe_radius_capi,&spheres_capi,&sphere_radii_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable spheres */
+  spheres_Dims[1]=3;
+  capi_spheres_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_spheres_tmp = array_from_pyobj(NPY_DOUBLE,spheres_Dims,spheres_Rank,capi_spheres_intent,spheres_capi);
+  if (capi_spheres_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `spheres' of ext.in_spheres to C/Fortran array" );
+  } else {
+    spheres = (double *)(PyArray_DATA(capi_spheres_tmp));
+
+  /* Processing variable probe_radius */
+    f2py_success = double_from_pyobj(&probe_radius,probe_radius_capi,"ext.in_spheres() 2nd argument (probe_radius) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable probe */
+  probe_Dims[0]=3;
+  capi_probe_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_probe_tmp = array_from_pyobj(NPY_DOUBLE,probe_Dims,probe_Rank,capi_probe_intent,probe_capi);
+  if (capi_probe_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `probe' of ext.in_spheres to C/Fortran array" );
+  } else {
+    probe = (double *)(PyArray_DATA(capi_probe_tmp));
+
+  /* Processing variable n */
+  n = len(spheres);
+  /* Processing variable sphere_radii */
+  sphere_radii_Dims[0]=n;
+  capi_sphere_radii_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_sphere_radii_tmp = array_from_pyobj(NPY_DOUBLE,sphere_radii_Dims,sphere_radii_Rank,capi_sphere_radii_intent,sphere_radii_capi);
+  if (capi_sphere_radii_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 4th argument `sphere_radii' of ext.in_spheres to C/Fortran array" );
+  } else {
+    sphere_radii = (double *)(PyArray_DATA(capi_sphere_radii_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  in_spheres_return_value = (*f2py_func)(n,probe,probe_radius,spheres,sphere_radii);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("i",in_spheres_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_sphere_radii_tmp!=sphere_radii_capi) {
+    Py_XDECREF(capi_sphere_radii_tmp); }
+  }  /*if (capi_sphere_radii_tmp == NULL) ... else of sphere_radii*/
+  /* End of cleaning variable sphere_radii */
+  /* End of cleaning variable n */
+  if((PyObject *)capi_probe_tmp!=probe_capi) {
+    Py_XDECREF(capi_probe_tmp); }
+  }  /*if (capi_probe_tmp == NULL) ... else of probe*/
+  /* End of cleaning variable probe */
+  } /*if (f2py_success) of probe_radius*/
+  /* End of cleaning variable probe_radius */
+  if((PyObject *)capi_spheres_tmp!=spheres_capi) {
+    Py_XDECREF(capi_spheres_tmp); }
+  }  /*if (capi_spheres_tmp == NULL) ... else of spheres*/
+  /* End of cleaning variable spheres */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/***************************** end of in_spheres *****************************/
+
+/******************************* in_spheres_all *******************************/
+static char doc_f2py_rout_ext_in_spheres_all[] = "\
+in_spheres_all = in_spheres_all(probe,probe_radius,spheres,sphere_radii,hits)\n\nWrapper for ``in_spheres_all``.\
+\n\nParameters\n----------\n"
+"probe : input rank-1 array('d') with bounds (3)\n"
+"probe_radius : input float\n"
+"spheres : input rank-2 array('d') with bounds (n,3)\n"
+"sphere_radii : input rank-1 array('d') with bounds (n)\n"
+"hits : in/output rank-1 array('i') with bounds (n)\n"
+"\nReturns\n-------\n"
+"in_spheres_all : int";
+/* extern int in_spheres_all(int,double*,double,double*,double*,int*); */
+static PyObject *f2py_rout_ext_in_spheres_all(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           int (*f2py_func)(int,double*,double,double*,double*,int*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int in_spheres_all_return_value=0;
+  int n = 0;
+  double *probe = NULL;
+  npy_intp probe_Dims[1] = {-1};
+  const int probe_Rank = 1;
+  PyArrayObject *capi_probe_tmp = NULL;
+  int capi_probe_intent = 0;
+  PyObject *probe_capi = Py_None;
+  double probe_radius = 0;
+  PyObject *probe_radius_capi = Py_None;
+  double *spheres = NULL;
+  npy_intp spheres_Dims[2] = {-1, -1};
+  const int spheres_Rank = 2;
+  PyArrayObject *capi_spheres_tmp = NULL;
+  int capi_spheres_intent = 0;
+  PyObject *spheres_capi = Py_None;
+  double *sphere_radii = NULL;
+  npy_intp sphere_radii_Dims[1] = {-1};
+  const int sphere_radii_Rank = 1;
+  PyArrayObject *capi_sphere_radii_tmp = NULL;
+  int capi_sphere_radii_intent = 0;
+  PyObject *sphere_radii_capi = Py_None;
+  int *hits = NULL;
+  npy_intp hits_Dims[1] = {-1};
+  const int hits_Rank = 1;
+  PyArrayObject *capi_hits_tmp = NULL;
+  int capi_hits_intent = 0;
+  PyObject *hits_capi = Py_None;
+  static char *capi_kwlist[] = {"probe","probe_radius","spheres","sphere_radii","hits",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOO:ext.in_spheres_all",\
+    capi_kwlist,&probe_capi,&probe_radius_capi,&spheres_capi,&sphere_radii_capi,&hits_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable spheres */
+  spheres_Dims[1]=3;
+  capi_spheres_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_spheres_tmp = array_from_pyobj(NPY_DOUBLE,spheres_Dims,spheres_Rank,capi_spheres_intent,spheres_capi);
+  if (capi_spheres_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `spheres' of ext.in_spheres_all to C/Fortran array" );
+  } else {
+    spheres = (double *)(PyArray_DATA(capi_spheres_tmp));
+
+  /* Processing variable probe_radius */
+    f2py_success = double_from_pyobj(&probe_radius,probe_radius_capi,"ext.in_spheres_all() 2nd argument (probe_radius) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable probe */
+  probe_Dims[0]=3;
+  capi_probe_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_probe_tmp = array_from_pyobj(NPY_DOUBLE,probe_Dims,probe_Rank,capi_probe_intent,probe_capi);
+  if (capi_probe_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `probe' of ext.in_spheres_all to C/Fortran array" );
+  } else {
+    probe = (double *)(PyArray_DATA(capi_probe_tmp));
+
+  /* Processing variable n */
+  n = len(spheres);
+  /* Processing variable hits */
+  hits_Dims[0]=n;
+  capi_hits_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_hits_tmp = array_from_pyobj(NPY_INT,hits_Dims,hits_Rank,capi_hits_intent,hits_capi);
+  if (capi_hits_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 5th argument `hits' of ext.in_spheres_all to C/Fortran array" );
+  } else {
+    hits = (int *)(PyArray_DATA(capi_hits_tmp));
+
+  /* Processing variable sphere_radii */
+  sphere_radii_Dims[0]=n;
+  capi_sphere_radii_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_sphere_radii_tmp = array_from_pyobj(NPY_DOUBLE,sphere_radii_Dims,sphere_radii_Rank,capi_sphere_radii_intent,sphere_radii_capi);
+  if (capi_sphere_radii_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 4th argument `sphere_radii' of ext.in_spheres_all to C/Fortran array" );
+  } else {
+    sphere_radii = (double *)(PyArray_DATA(capi_sphere_radii_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  in_spheres_all_return_value = (*f2py_func)(n,probe,probe_radius,spheres,sphere_radii,hits);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("i",in_spheres_all_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_sphere_radii_tmp!=sphere_radii_capi) {
+    Py_XDECREF(capi_sphere_radii_tmp); }
+  }  /*if (capi_sphere_radii_tmp == NULL) ... else of sphere_radii*/
+  /* End of cleaning variable sphere_radii */
+  if((PyObject *)capi_hits_tmp!=hits_capi) {
+    Py_XDECREF(capi_hits_tmp); }
+  }  /*if (capi_hits_tmp == NULL) ... else of hits*/
+  /* End of cleaning variable hits */
+  /* End of cleaning variable n */
+  if((PyObject *)capi_probe_tmp!=probe_capi) {
+    Py_XDECREF(capi_probe_tmp); }
+  }  /*if (capi_probe_tmp == NULL) ... else of probe*/
+  /* End of cleaning variable probe */
+  } /*if (f2py_success) of probe_radius*/
+  /* End of cleaning variable probe_radius */
+  if((PyObject *)capi_spheres_tmp!=spheres_capi) {
+    Py_XDECREF(capi_spheres_tmp); }
+  }  /*if (capi_spheres_tmp == NULL) ... else of spheres*/
+  /* End of cleaning variable spheres */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/*************************** end of in_spheres_all ***************************/
+
+/******************************** center_ses1 ********************************/
+static char doc_f2py_rout_ext_center_ses1[] = "\
+center_ses1(probe,close1,close1_radius,center)\n\nWrapper for ``center_ses1``.\
+\n\nParameters\n----------\n"
+"probe : input rank-1 array('d') with bounds (3)\n"
+"close1 : input rank-1 array('d') with bounds (3)\n"
+"close1_radius : input float\n"
+"center : in/output rank-1 array('d') with bounds (3)";
+/* extern void center_ses1(double*,double*,double,double*); */
+static PyObject *f2py_rout_ext_center_ses1(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           void (*f2py_func)(double*,double*,double,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  double *probe = NULL;
+  npy_intp probe_Dims[1] = {-1};
+  const int probe_Rank = 1;
+  PyArrayObject *capi_probe_tmp = NULL;
+  int capi_probe_intent = 0;
+  PyObject *probe_capi = Py_None;
+  double *close1 = NULL;
+  npy_intp close1_Dims[1] = {-1};
+  const int close1_Rank = 1;
+  PyArrayObject *capi_close1_tmp = NULL;
+  int capi_close1_intent = 0;
+  PyObject *close1_capi = Py_None;
+  double close1_radius = 0;
+  PyObject *close1_radius_capi = Py_None;
+  double *center = NULL;
+  npy_intp center_Dims[1] = {-1};
+  const int center_Rank = 1;
+  PyArrayObject *capi_center_tmp = NULL;
+  int capi_center_intent = 0;
+  PyObject *center_capi = Py_None;
+  static char *capi_kwlist[] = {"probe","close1","close1_radius","center",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOO:ext.center_ses1",\
+    capi_kwlist,&probe_capi,&close1_capi,&close1_radius_capi,&center_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable close1 */
+  close1_Dims[0]=3;
+  capi_close1_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_close1_tmp = array_from_pyobj(NPY_DOUBLE,close1_Dims,close1_Rank,capi_close1_intent,close1_capi);
+  if (capi_close1_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `close1' of ext.center_ses1 to C/Fortran array" );
+  } else {
+    close1 = (double *)(PyArray_DATA(capi_close1_tmp));
+
+  /* Processing variable probe */
+  probe_Dims[0]=3;
+  capi_probe_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_probe_tmp = array_from_pyobj(NPY_DOUBLE,probe_Dims,probe_Rank,capi_probe_intent,probe_capi);
+  if (capi_probe_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `probe' of ext.center_ses1 to C/Fortran array" );
+  } else {
+    probe = (double *)(PyArray_DATA(capi_probe_tmp));
+
+  /* Processing variable center */
+  center_Dims[0]=3;
+  capi_center_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_center_tmp = array_from_pyobj(NPY_DOUBLE,center_Dims,center_Rank,capi_center_intent,center_capi);
+  if (capi_center_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 4th argument `center' of ext.center_ses1 to C/Fortran array" );
+  } else {
+    center = (double *)(PyArray_DATA(capi_center_tmp));
+
+  /* Processing variable close1_radius */
+    f2py_success = double_from_pyobj(&close1_radius,close1_radius_capi,"ext.center_ses1() 3rd argument (close1_radius) can't be converted to double");
+  if (f2py_success) {
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+        (*f2py_func)(probe,close1,close1_radius,center);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("");
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  } /*if (f2py_success) of close1_radius*/
+  /* End of cleaning variable close1_radius */
+  if((PyObject *)capi_center_tmp!=center_capi) {
+    Py_XDECREF(capi_center_tmp); }
+  }  /*if (capi_center_tmp == NULL) ... else of center*/
+  /* End of cleaning variable center */
+  if((PyObject *)capi_probe_tmp!=probe_capi) {
+    Py_XDECREF(capi_probe_tmp); }
+  }  /*if (capi_probe_tmp == NULL) ... else of probe*/
+  /* End of cleaning variable probe */
+  if((PyObject *)capi_close1_tmp!=close1_capi) {
+    Py_XDECREF(capi_close1_tmp); }
+  }  /*if (capi_close1_tmp == NULL) ... else of close1*/
+  /* End of cleaning variable close1 */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/***************************** end of center_ses1 *****************************/
+
+/******************************** center_ses2 ********************************/
+static char doc_f2py_rout_ext_center_ses2[] = "\
+center_ses2 = center_ses2(probe,close1,close1_radius,close2,close2_radius,center)\n\nWrapper for ``center_ses2``.\
+\n\nParameters\n----------\n"
+"probe : input rank-1 array('d') with bounds (3)\n"
+"close1 : input rank-1 array('d') with bounds (3)\n"
+"close1_radius : input float\n"
+"close2 : input rank-1 array('d') with bounds (3)\n"
+"close2_radius : input float\n"
+"center : in/output rank-1 array('d') with bounds (3)\n"
+"\nReturns\n-------\n"
+"center_ses2 : int";
+/* extern int center_ses2(double*,double*,double,double*,double,double*); */
+static PyObject *f2py_rout_ext_center_ses2(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           int (*f2py_func)(double*,double*,double,double*,double,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int center_ses2_return_value=0;
+  double *probe = NULL;
+  npy_intp probe_Dims[1] = {-1};
+  const int probe_Rank = 1;
+  PyArrayObject *capi_probe_tmp = NULL;
+  int capi_probe_intent = 0;
+  PyObject *probe_capi = Py_None;
+  double *close1 = NULL;
+  npy_intp close1_Dims[1] = {-1};
+  const int close1_Rank = 1;
+  PyArrayObject *capi_close1_tmp = NULL;
+  int capi_close1_intent = 0;
+  PyObject *close1_capi = Py_None;
+  double close1_radius = 0;
+  PyObject *close1_radius_capi = Py_None;
+  double *close2 = NULL;
+  npy_intp close2_Dims[1] = {-1};
+  const int close2_Rank = 1;
+  PyArrayObject *capi_close2_tmp = NULL;
+  int capi_close2_intent = 0;
+  PyObject *close2_capi = Py_None;
+  double close2_radius = 0;
+  PyObject *close2_radius_capi = Py_None;
+  double *center = NULL;
+  npy_intp center_Dims[1] = {-1};
+  const int center_Rank = 1;
+  PyArrayObject *capi_center_tmp = NULL;
+  int capi_center_intent = 0;
+  PyObject *center_capi = Py_None;
+  static char *capi_kwlist[] = {"probe","close1","close1_radius","close2","close2_radius","center",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOOO:ext.center_ses2",\
+    capi_kwlist,&probe_capi,&close1_capi,&close1_radius_capi,&close2_capi,&close2_radius_capi,&center_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable close2 */
+  close2_Dims[0]=3;
+  capi_close2_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_close2_tmp = array_from_pyobj(NPY_DOUBLE,close2_Dims,close2_Rank,capi_close2_intent,close2_capi);
+  if (capi_close2_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 4th argument `close2' of ext.center_ses2 to C/Fortran array" );
+  } else {
+    close2 = (double *)(PyArray_DATA(capi_close2_tmp));
+
+  /* Processing variable close1 */
+  close1_Dims[0]=3;
+  capi_close1_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_close1_tmp = array_from_pyobj(NPY_DOUBLE,close1_Dims,close1_Rank,capi_close1_intent,close1_capi);
+  if (capi_close1_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `close1' of ext.center_ses2 to C/Fortran array" );
+  } else {
+    close1 = (double *)(PyArray_DATA(capi_close1_tmp));
+
+  /* Processing variable center */
+  center_Dims[0]=3;
+  capi_center_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_center_tmp = array_from_pyobj(NPY_DOUBLE,center_Dims,center_Rank,capi_center_intent,center_capi);
+  if (capi_center_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 6th argument `center' of ext.center_ses2 to C/Fortran array" );
+  } else {
+    center = (double *)(PyArray_DATA(capi_center_tmp));
+
+  /* Processing variable probe */
+  probe_Dims[0]=3;
+  capi_probe_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_probe_tmp = array_from_pyobj(NPY_DOUBLE,probe_Dims,probe_Rank,capi_probe_intent,probe_capi);
+  if (capi_probe_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `probe' of ext.center_ses2 to C/Fortran array" );
+  } else {
+    probe = (double *)(PyArray_DATA(capi_probe_tmp));
+
+  /* Processing variable close2_radius */
+    f2py_success = double_from_pyobj(&close2_radius,close2_radius_capi,"ext.center_ses2() 5th argument (close2_radius) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable close1_radius */
+    f2py_success = double_from_pyobj(&close1_radius,close1_radius_capi,"ext.center_ses2() 3rd argument (close1_radius) can't be converted to double");
+  if (f2py_success) {
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  center_ses2_return_value = (*f2py_func)(probe,close1,close1_radius,close2,close2_radius,center);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("i",center_ses2_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  } /*if (f2py_success) of close1_radius*/
+  /* End of cleaning variable close1_radius */
+  } /*if (f2py_success) of close2_radius*/
+  /* End of cleaning variable close2_radius */
+  if((PyObject *)capi_probe_tmp!=probe_capi) {
+    Py_XDECREF(capi_probe_tmp); }
+  }  /*if (capi_probe_tmp == NULL) ... else of probe*/
+  /* End of cleaning variable probe */
+  if((PyObject *)capi_center_tmp!=center_capi) {
+    Py_XDECREF(capi_center_tmp); }
+  }  /*if (capi_center_tmp == NULL) ... else of center*/
+  /* End of cleaning variable center */
+  if((PyObject *)capi_close1_tmp!=close1_capi) {
+    Py_XDECREF(capi_close1_tmp); }
+  }  /*if (capi_close1_tmp == NULL) ... else of close1*/
+  /* End of cleaning variable close1 */
+  if((PyObject *)capi_close2_tmp!=close2_capi) {
+    Py_XDECREF(capi_close2_tmp); }
+  }  /*if (capi_close2_tmp == NULL) ... else of close2*/
+  /* End of cleaning variable close2 */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/***************************** end of center_ses2 *****************************/
+
+/******************************** center_ses3 ********************************/
+static char doc_f2py_rout_ext_center_ses3[] = "\
+center_ses3 = center_ses3(probe,close1,close1_radius,close2,close2_radius,close3,close3_radius,center)\n\nWrapper for ``center_ses3``.\
+\n\nParameters\n----------\n"
+"probe : input rank-1 array('d') with bounds (3)\n"
+"close1 : input rank-1 array('d') with bounds (3)\n"
+"close1_radius : input float\n"
+"close2 : input rank-1 array('d') with bounds (3)\n"
+"close2_radius : input float\n"
+"close3 : input rank-1 array('d') with bounds (3)\n"
+"close3_radius : input float\n"
+"center : in/output rank-1 array('d') with bounds (3)\n"
+"\nReturns\n-------\n"
+"center_ses3 : int";
+/* extern int center_ses3(double*,double*,double,double*,double,double*,double,double*); */
+static PyObject *f2py_rout_ext_center_ses3(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           int (*f2py_func)(double*,double*,double,double*,double,double*,double,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int center_ses3_return_value=0;
+  double *probe = NULL;
+  npy_intp probe_Dims[1] = {-1};
+  const int probe_Rank = 1;
+  PyArrayObject *capi_probe_tmp = NULL;
+  int capi_probe_intent = 0;
+  PyObject *probe_capi = Py_None;
+  double *close1 = NULL;
+  npy_intp close1_Dims[1] = {-1};
+  const int close1_Rank = 1;
+  PyArrayObject *capi_close1_tmp = NULL;
+  int capi_close1_intent = 0;
+  PyObject *close1_capi = Py_None;
+  double close1_radius = 0;
+  PyObject *close1_radius_capi = Py_None;
+  double *close2 = NULL;
+  npy_intp close2_Dims[1] = {-1};
+  const int close2_Rank = 1;
+  PyArrayObject *capi_close2_tmp = NULL;
+  int capi_close2_intent = 0;
+  PyObject *close2_capi = Py_None;
+  double close2_radius = 0;
+  PyObject *close2_radius_capi = Py_None;
+  double *close3 = NULL;
+  npy_intp close3_Dims[1] = {-1};
+  const int close3_Rank = 1;
+  PyArrayObject *capi_close3_tmp = NULL;
+  int capi_close3_intent = 0;
+  PyObject *close3_capi = Py_None;
+  double close3_radius = 0;
+  PyObject *close3_radius_capi = Py_None;
+  double *center = NULL;
+  npy_intp center_Dims[1] = {-1};
+  const int center_Rank = 1;
+  PyArrayObject *capi_center_tmp = NULL;
+  int capi_center_intent = 0;
+  PyObject *center_capi = Py_None;
+  static char *capi_kwlist[] = {"probe","close1","close1_radius","close2","close2_radius","close3","close3_radius","center",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOOOOO:ext.center_ses3",\
+    capi_kwlist,&probe_capi,&close1_capi,&close1_radius_capi,&close2_capi,&close2_radius_capi,&close3_capi,&close3_radius_capi,&center_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable close2 */
+  close2_Dims[0]=3;
+  capi_close2_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_close2_tmp = array_from_pyobj(NPY_DOUBLE,close2_Dims,close2_Rank,capi_close2_intent,close2_capi);
+  if (capi_close2_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 4th argument `close2' of ext.center_ses3 to C/Fortran array" );
+  } else {
+    close2 = (double *)(PyArray_DATA(capi_close2_tmp));
+
+  /* Processing variable close3 */
+  close3_Dims[0]=3;
+  capi_close3_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_close3_tmp = array_from_pyobj(NPY_DOUBLE,close3_Dims,close3_Rank,capi_close3_intent,close3_capi);
+  if (capi_close3_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 6th argument `close3' of ext.center_ses3 to C/Fortran array" );
+  } else {
+    close3 = (double *)(PyArray_DATA(capi_close3_tmp));
+
+  /* Processing variable probe */
+  probe_Dims[0]=3;
+  capi_probe_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_probe_tmp = array_from_pyobj(NPY_DOUBLE,probe_Dims,probe_Rank,capi_probe_intent,probe_capi);
+  if (capi_probe_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `probe' of ext.center_ses3 to C/Fortran array" );
+  } else {
+    probe = (double *)(PyArray_DATA(capi_probe_tmp));
+
+  /* Processing variable center */
+  center_Dims[0]=3;
+  capi_center_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_center_tmp = array_from_pyobj(NPY_DOUBLE,center_Dims,center_Rank,capi_center_intent,center_capi);
+  if (capi_center_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 8th argument `center' of ext.center_ses3 to C/Fortran array" );
+  } else {
+    center = (double *)(PyArray_DATA(capi_center_tmp));
+
+  /* Processing variable close1_radius */
+    f2py_success = double_from_pyobj(&close1_radius,close1_radius_capi,"ext.center_ses3() 3rd argument (close1_radius) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable close1 */
+  close1_Dims[0]=3;
+  capi_close1_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_close1_tmp = array_from_pyobj(NPY_DOUBLE,close1_Dims,close1_Rank,capi_close1_intent,close1_capi);
+  if (capi_close1_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `close1' of ext.center_ses3 to C/Fortran array" );
+  } else {
+    close1 = (double *)(PyArray_DATA(capi_close1_tmp));
+
+  /* Processing variable close3_radius */
+    f2py_success = double_from_pyobj(&close3_radius,close3_radius_capi,"ext.center_ses3() 7th argument (close3_radius) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable close2_radius */
+    f2py_success = double_from_pyobj(&close2_radius,close2_radius_capi,"ext.center_ses3() 5th argument (close2_radius) can't be converted to double");
+  if (f2py_success) {
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  center_ses3_return_value = (*f2py_func)(probe,close1,close1_radius,close2,close2_radius,close3,close3_radius,center);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("i",center_ses3_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  } /*if (f2py_success) of close2_radius*/
+  /* End of cleaning variable close2_radius */
+  } /*if (f2py_success) of close3_radius*/
+  /* End of cleaning variable close3_radius */
+  if((PyObject *)capi_close1_tmp!=close1_capi) {
+    Py_XDECREF(capi_close1_tmp); }
+  }  /*if (capi_close1_tmp == NULL) ... else of close1*/
+  /* End of cleaning variable close1 */
+  } /*if (f2py_success) of close1_radius*/
+  /* End of cleaning variable close1_radius */
+  if((PyObject *)capi_center_tmp!=center_capi) {
+    Py_XDECREF(capi_center_tmp); }
+  }  /*if (capi_center_tmp == NULL) ... else of center*/
+  /* End of cleaning variable center */
+  if((PyObject *)capi_probe_tmp!=probe_capi) {
+    Py_XDECREF(capi_probe_tmp); }
+  }  /*if (capi_probe_tmp == NULL) ... else of probe*/
+  /* End of cleaning variable probe */
+  if((PyObject *)capi_close3_tmp!=close3_capi) {
+    Py_XDECREF(capi_close3_tmp); }
+  }  /*if (capi_close3_tmp == NULL) ... else of close3*/
+  /* End of cleaning variable close3 */
+  if((PyObject *)capi_close2_tmp!=close2_capi) {
+    Py_XDECREF(capi_close2_tmp); }
+  }  /*if (capi_close2_tmp == NULL) ... else of close2*/
+  /* End of cleaning variable close2 */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/***************************** end of center_ses3 *****************************/
+
+/**************************** monte_carlo_volumes ****************************/
+static char doc_f2py_rout_ext_monte_carlo_volumes[] = "\
+monte_carlo_volumes = monte_carlo_volumes(probe_radius,spheres,sphere_radii,num_iter,ses_iter,bigbox,counts)\n\nWrapper for ``monte_carlo_volumes``.\
+\n\nParameters\n----------\n"
+"probe_radius : input float\n"
+"spheres : input rank-2 array('d') with bounds (n,3)\n"
+"sphere_radii : input rank-1 array('d') with bounds (n)\n"
+"num_iter : input int\n"
+"ses_iter : input int\n"
+"bigbox : input int\n"
+"counts : in/output rank-1 array('q') with bounds (5)\n"
+"\nReturns\n-------\n"
+"monte_carlo_volumes : float";
+/* extern double monte_carlo_volumes(int,double,double*,double*,int,int,int,long_long*); */
+static PyObject *f2py_rout_ext_monte_carlo_volumes(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           double (*f2py_func)(int,double,double*,double*,int,int,int,long_long*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  double monte_carlo_volumes_return_value=0;
+  int n = 0;
+  double probe_radius = 0;
+  PyObject *probe_radius_capi = Py_None;
+  double *spheres = NULL;
+  npy_intp spheres_Dims[2] = {-1, -1};
+  const int spheres_Rank = 2;
+  PyArrayObject *capi_spheres_tmp = NULL;
+  int capi_spheres_intent = 0;
+  PyObject *spheres_capi = Py_None;
+  double *sphere_radii = NULL;
+  npy_intp sphere_radii_Dims[1] = {-1};
+  const int sphere_radii_Rank = 1;
+  PyArrayObject *capi_sphere_radii_tmp = NULL;
+  int capi_sphere_radii_intent = 0;
+  PyObject *sphere_radii_capi = Py_None;
+  int num_iter = 0;
+  PyObject *num_iter_capi = Py_None;
+  int ses_iter = 0;
+  PyObject *ses_iter_capi = Py_None;
+  int bigbox = 0;
+  PyObject *bigbox_capi = Py_None;
+  long_long *counts = NULL;
+  npy_intp counts_Dims[1] = {-1};
+  const int counts_Rank = 1;
+  PyArrayObject *capi_counts_tmp = NULL;
+  int capi_counts_intent = 0;
+  PyObject *counts_capi = Py_None;
+  static char *capi_kwlist[] = {"probe_radius","spheres","sphere_radii","num_iter","ses_iter","bigbox","counts",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOOOOO:ext.monte_carlo_volumes",\
+    capi_kwlist,&probe_radius_capi,&spheres_capi,&sphere_radii_capi,&num_iter_capi,&ses_iter_capi,&bigbox_capi,&counts_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable probe_radius */
+    f2py_success = double_from_pyobj(&probe_radius,probe_radius_capi,"ext.monte_carlo_volumes() 1st argument (probe_radius) can't be converted to double");
+  if (f2py_success) {
+  /* Processing variable spheres */
+  spheres_Dims[1]=3;
+  capi_spheres_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_spheres_tmp = array_from_pyobj(NPY_DOUBLE,spheres_Dims,spheres_Rank,capi_spheres_intent,spheres_capi);
+  if (capi_spheres_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `spheres' of ext.monte_carlo_volumes to C/Fortran array" );
+  } else {
+    spheres = (double *)(PyArray_DATA(capi_spheres_tmp));
+
+  /* Processing variable ses_iter */
+    f2py_success = int_from_pyobj(&ses_iter,ses_iter_capi,"ext.monte_carlo_volumes() 5th argument (ses_iter) can't be converted to int");
+  if (f2py_success) {
+  /* Processing variable counts */
+  counts_Dims[0]=5;
+  capi_counts_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_counts_tmp = array_from_pyobj(NPY_LONGLONG,counts_Dims,counts_Rank,capi_counts_intent,counts_capi);
+  if (capi_counts_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 7th argument `counts' of ext.monte_carlo_volumes to C/Fortran array" );
+  } else {
+    counts = (long_long *)(PyArray_DATA(capi_counts_tmp));
+
+  /* Processing variable bigbox */
+    f2py_success = int_from_pyobj(&bigbox,bigbox_capi,"ext.monte_carlo_volumes() 6th argument (bigbox) can't be converted to int");
+  if (f2py_success) {
+  /* Processing variable num_iter */
+    f2py_success = int_from_pyobj(&num_iter,num_iter_capi,"ext.monte_carlo_volumes() 4th argument (num_iter) can't be converted to int");
+  if (f2py_success) {
+  /* Processing variable n */
+  n = len(spheres);
+  /* Processing variable sphere_radii */
+  sphere_radii_Dims[0]=n;
+  capi_sphere_radii_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_sphere_radii_tmp = array_from_pyobj(NPY_DOUBLE,sphere_radii_Dims,sphere_radii_Rank,capi_sphere_radii_intent,sphere_radii_capi);
+  if (capi_sphere_radii_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `sphere_radii' of ext.monte_carlo_volumes to C/Fortran array" );
+  } else {
+    sphere_radii = (double *)(PyArray_DATA(capi_sphere_radii_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  monte_carlo_volumes_return_value = (*f2py_func)(n,probe_radius,spheres,sphere_radii,num_iter,ses_iter,bigbox,counts);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("d",monte_carlo_volumes_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_sphere_radii_tmp!=sphere_radii_capi) {
+    Py_XDECREF(capi_sphere_radii_tmp); }
+  }  /*if (capi_sphere_radii_tmp == NULL) ... else of sphere_radii*/
+  /* End of cleaning variable sphere_radii */
+  /* End of cleaning variable n */
+  } /*if (f2py_success) of num_iter*/
+  /* End of cleaning variable num_iter */
+  } /*if (f2py_success) of bigbox*/
+  /* End of cleaning variable bigbox */
+  if((PyObject *)capi_counts_tmp!=counts_capi) {
+    Py_XDECREF(capi_counts_tmp); }
+  }  /*if (capi_counts_tmp == NULL) ... else of counts*/
+  /* End of cleaning variable counts */
+  } /*if (f2py_success) of ses_iter*/
+  /* End of cleaning variable ses_iter */
+  if((PyObject *)capi_spheres_tmp!=spheres_capi) {
+    Py_XDECREF(capi_spheres_tmp); }
+  }  /*if (capi_spheres_tmp == NULL) ... else of spheres*/
+  /* End of cleaning variable spheres */
+  } /*if (f2py_success) of probe_radius*/
+  /* End of cleaning variable probe_radius */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/************************* end of monte_carlo_volumes *************************/
+
+/****************************** io_read_columns ******************************/
+static char doc_f2py_rout_ext_io_read_columns[] = "\
+io_read_columns = io_read_columns(text,columns,out)\n\nWrapper for ``io_read_columns``.\
+\n\nParameters\n----------\n"
+"text : input rank-1 array('b') with bounds (m)\n"
+"columns : input rank-1 array('i') with bounds (num_cols)\n"
+"out : in/output rank-2 array('d') with bounds (num_rows,num_cols)\n"
+"\nReturns\n-------\n"
+"io_read_columns : int";
+/* extern int io_read_columns(int,signed_char*,int,int,int*,double*); */
+static PyObject *f2py_rout_ext_io_read_columns(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           int (*f2py_func)(int,signed_char*,int,int,int*,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int io_read_columns_return_value=0;
+  int m = 0;
+  signed_char *text = NULL;
+  npy_intp text_Dims[1] = {-1};
+  const int text_Rank = 1;
+  PyArrayObject *capi_text_tmp = NULL;
+  int capi_text_intent = 0;
+  PyObject *text_capi = Py_None;
+  int num_rows = 0;
+  int num_cols = 0;
+  int *columns = NULL;
+  npy_intp columns_Dims[1] = {-1};
+  const int columns_Rank = 1;
+  PyArrayObject *capi_columns_tmp = NULL;
+  int capi_columns_intent = 0;
+  PyObject *columns_capi = Py_None;
+  double *out = NULL;
+  npy_intp out_Dims[2] = {-1, -1};
+  const int out_Rank = 2;
+  PyArrayObject *capi_out_tmp = NULL;
+  int capi_out_intent = 0;
+  PyObject *out_capi = Py_None;
+  static char *capi_kwlist[] = {"text","columns","out",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOO:ext.io_read_columns",\
+    capi_kwlist,&text_capi,&columns_capi,&out_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable text */
+  ;
+  capi_text_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_text_tmp = array_from_pyobj(NPY_BYTE,text_Dims,text_Rank,capi_text_intent,text_capi);
+  if (capi_text_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `text' of ext.io_read_columns to C/Fortran array" );
+  } else {
+    text = (signed_char *)(PyArray_DATA(capi_text_tmp));
+
+  /* Processing variable out */
+  ;
+  capi_out_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_out_tmp = array_from_pyobj(NPY_DOUBLE,out_Dims,out_Rank,capi_out_intent,out_capi);
+  if (capi_out_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `out' of ext.io_read_columns to C/Fortran array" );
+  } else {
+    out = (double *)(PyArray_DATA(capi_out_tmp));
+
+  /* Processing variable num_cols */
+  num_cols = shape(out,1);
+  /* Processing variable num_rows */
+  num_rows = shape(out,0);
+  /* Processing variable m */
+  m = len(text);
+  /* Processing variable columns */
+  columns_Dims[0]=num_cols;
+  capi_columns_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_columns_tmp = array_from_pyobj(NPY_INT,columns_Dims,columns_Rank,capi_columns_intent,columns_capi);
+  if (capi_columns_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 2nd argument `columns' of ext.io_read_columns to C/Fortran array" );
+  } else {
+    columns = (int *)(PyArray_DATA(capi_columns_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  io_read_columns_return_value = (*f2py_func)(m,text,num_rows,num_cols,columns,out);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("i",io_read_columns_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_columns_tmp!=columns_capi) {
+    Py_XDECREF(capi_columns_tmp); }
+  }  /*if (capi_columns_tmp == NULL) ... else of columns*/
+  /* End of cleaning variable columns */
+  /* End of cleaning variable m */
+  /* End of cleaning variable num_rows */
+  /* End of cleaning variable num_cols */
+  if((PyObject *)capi_out_tmp!=out_capi) {
+    Py_XDECREF(capi_out_tmp); }
+  }  /*if (capi_out_tmp == NULL) ... else of out*/
+  /* End of cleaning variable out */
+  if((PyObject *)capi_text_tmp!=text_capi) {
+    Py_XDECREF(capi_text_tmp); }
+  }  /*if (capi_text_tmp == NULL) ... else of text*/
+  /* End of cleaning variable text */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/*************************** end of io_read_columns ***************************/
+
+/******************************* io_read_fixed *******************************/
+static char doc_f2py_rout_ext_io_read_fixed[] = "\
+io_read_fixed = io_read_fixed(text,offset,width,out)\n\nWrapper for ``io_read_fixed``.\
+\n\nParameters\n----------\n"
+"text : input rank-1 array('b') with bounds (m)\n"
+"offset : input int\n"
+"width : input int\n"
+"out : in/output rank-2 array('d') with bounds (num_rows,num_cols)\n"
+"\nReturns\n-------\n"
+"io_read_fixed : int";
+/* extern int io_read_fixed(int,signed_char*,int,int,int,int,double*); */
+static PyObject *f2py_rout_ext_io_read_fixed(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           int (*f2py_func)(int,signed_char*,int,int,int,int,double*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int io_read_fixed_return_value=0;
+  int m = 0;
+  signed_char *text = NULL;
+  npy_intp text_Dims[1] = {-1};
+  const int text_Rank = 1;
+  PyArrayObject *capi_text_tmp = NULL;
+  int capi_text_intent = 0;
+  PyObject *text_capi = Py_None;
+  int num_rows = 0;
+  int num_cols = 0;
+  int offset = 0;
+  PyObject *offset_capi = Py_None;
+  int width = 0;
+  PyObject *width_capi = Py_None;
+  double *out = NULL;
+  npy_intp out_Dims[2] = {-1, -1};
+  const int out_Rank = 2;
+  PyArrayObject *capi_out_tmp = NULL;
+  int capi_out_intent = 0;
+  PyObject *out_capi = Py_None;
+  static char *capi_kwlist[] = {"text","offset","width","out",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOO:ext.io_read_fixed",\
+    capi_kwlist,&text_capi,&offset_capi,&width_capi,&out_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable text */
+  ;
+  capi_text_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_text_tmp = array_from_pyobj(NPY_BYTE,text_Dims,text_Rank,capi_text_intent,text_capi);
+  if (capi_text_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `text' of ext.io_read_fixed to C/Fortran array" );
+  } else {
+    text = (signed_char *)(PyArray_DATA(capi_text_tmp));
+
+  /* Processing variable width */
+    f2py_success = int_from_pyobj(&width,width_capi,"ext.io_read_fixed() 3rd argument (width) can't be converted to int");
+  if (f2py_success) {
+  /* Processing variable offset */
+    f2py_success = int_from_pyobj(&offset,offset_capi,"ext.io_read_fixed() 2nd argument (offset) can't be converted to int");
+  if (f2py_success) {
+  /* Processing variable out */
+  ;
+  capi_out_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_out_tmp = array_from_pyobj(NPY_DOUBLE,out_Dims,out_Rank,capi_out_intent,out_capi);
+  if (capi_out_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 4th argument `out' of ext.io_read_fixed to C/Fortran array" );
+  } else {
+    out = (double *)(PyArray_DATA(capi_out_tmp));
+
+  /* Processing variable m */
+  m = len(text);
+  /* Processing variable num_cols */
+  num_cols = shape(out,1);
+  /* Processing variable num_rows */
+  num_rows = shape(out,0);
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  io_read_fixed_return_value = (*f2py_func)(m,text,num_rows,num_cols,offset,width,out);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("i",io_read_fixed_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  /* End of cleaning variable num_rows */
+  /* End of cleaning variable num_cols */
+  /* End of cleaning variable m */
+  if((PyObject *)capi_out_tmp!=out_capi) {
+    Py_XDECREF(capi_out_tmp); }
+  }  /*if (capi_out_tmp == NULL) ... else of out*/
+  /* End of cleaning variable out */
+  } /*if (f2py_success) of offset*/
+  /* End of cleaning variable offset */
+  } /*if (f2py_success) of width*/
+  /* End of cleaning variable width */
+  if((PyObject *)capi_text_tmp!=text_capi) {
+    Py_XDECREF(capi_text_tmp); }
+  }  /*if (capi_text_tmp == NULL) ... else of text*/
+  /* End of cleaning variable text */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/**************************** end of io_read_fixed ****************************/
+
+/******************************* io_find_lines *******************************/
+static char doc_f2py_rout_ext_io_find_lines[] = "\
+io_find_lines = io_find_lines(text,num_lines)\n\nWrapper for ``io_find_lines``.\
+\n\nParameters\n----------\n"
+"text : input rank-1 array('b') with bounds (m)\n"
+"num_lines : input int\n"
+"\nReturns\n-------\n"
+"io_find_lines : int";
+/* extern int io_find_lines(int,signed_char*,int); */
+static PyObject *f2py_rout_ext_io_find_lines(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           int (*f2py_func)(int,signed_char*,int)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int io_find_lines_return_value=0;
+  int m = 0;
+  signed_char *text = NULL;
+  npy_intp text_Dims[1] = {-1};
+  const int text_Rank = 1;
+  PyArrayObject *capi_text_tmp = NULL;
+  int capi_text_intent = 0;
+  PyObject *text_capi = Py_None;
+  int num_lines = 0;
+  PyObject *num_lines_capi = Py_None;
+  static char *capi_kwlist[] = {"text","num_lines",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OO:ext.io_find_lines",\
+    capi_kwlist,&text_capi,&num_lines_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable text */
+  ;
+  capi_text_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_text_tmp = array_from_pyobj(NPY_BYTE,text_Dims,text_Rank,capi_text_intent,text_capi);
+  if (capi_text_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `text' of ext.io_find_lines to C/Fortran array" );
+  } else {
+    text = (signed_char *)(PyArray_DATA(capi_text_tmp));
+
+  /* Processing variable num_lines */
+    f2py_success = int_from_pyobj(&num_lines,num_lines_capi,"ext.io_find_lines() 2nd argument (num_lines) can't be converted to int");
+  if (f2py_success) {
+  /* Processing variable m */
+  m = len(text);
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  io_find_lines_return_value = (*f2py_func)(m,text,num_lines);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("i",io_find_lines_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  /* End of cleaning variable m */
+  } /*if (f2py_success) of num_lines*/
+  /* End of cleaning variable num_lines */
+  if((PyObject *)capi_text_tmp!=text_capi) {
+    Py_XDECREF(capi_text_tmp); }
+  }  /*if (capi_text_tmp == NULL) ... else of text*/
+  /* End of cleaning variable text */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/**************************** end of io_find_lines ****************************/
+
+/******************************* io_find_field *******************************/
+static char doc_f2py_rout_ext_io_find_field[] = "\
+io_find_field = io_find_field(text,field,begins,ends)\n\nWrapper for ``io_find_field``.\
+\n\nParameters\n----------\n"
+"text : input rank-1 array('b') with bounds (m)\n"
+"field : input int\n"
+"begins : in/output rank-1 array('i') with bounds (num_rows)\n"
+"ends : in/output rank-1 array('i') with bounds (num_rows)\n"
+"\nReturns\n-------\n"
+"io_find_field : int";
+/* extern int io_find_field(int,signed_char*,int,int,int*,int*); */
+static PyObject *f2py_rout_ext_io_find_field(const PyObject *capi_self,
+                           PyObject *capi_args,
+                           PyObject *capi_keywds,
+                           int (*f2py_func)(int,signed_char*,int,int,int*,int*)) {
+  PyObject * volatile capi_buildvalue = NULL;
+  volatile int f2py_success = 1;
+/*decl*/
+
+  int io_find_field_return_value=0;
+  int m = 0;
+  signed_char *text = NULL;
+  npy_intp text_Dims[1] = {-1};
+  const int text_Rank = 1;
+  PyArrayObject *capi_text_tmp = NULL;
+  int capi_text_intent = 0;
+  PyObject *text_capi = Py_None;
+  int num_rows = 0;
+  int field = 0;
+  PyObject *field_capi = Py_None;
+  int *begins = NULL;
+  npy_intp begins_Dims[1] = {-1};
+  const int begins_Rank = 1;
+  PyArrayObject *capi_begins_tmp = NULL;
+  int capi_begins_intent = 0;
+  PyObject *begins_capi = Py_None;
+  int *ends = NULL;
+  npy_intp ends_Dims[1] = {-1};
+  const int ends_Rank = 1;
+  PyArrayObject *capi_ends_tmp = NULL;
+  int capi_ends_intent = 0;
+  PyObject *ends_capi = Py_None;
+  static char *capi_kwlist[] = {"text","field","begins","ends",NULL};
+
+/*routdebugenter*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_clock();
+#endif
+  if (!PyArg_ParseTupleAndKeywords(capi_args,capi_keywds,\
+    "OOOO:ext.io_find_field",\
+    capi_kwlist,&text_capi,&field_capi,&begins_capi,&ends_capi))
+    return NULL;
+/*frompyobj*/
+  /* Processing variable begins */
+  ;
+  capi_begins_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_begins_tmp = array_from_pyobj(NPY_INT,begins_Dims,begins_Rank,capi_begins_intent,begins_capi);
+  if (capi_begins_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 3rd argument `begins' of ext.io_find_field to C/Fortran array" );
+  } else {
+    begins = (int *)(PyArray_DATA(capi_begins_tmp));
+
+  /* Processing variable field */
+    f2py_success = int_from_pyobj(&field,field_capi,"ext.io_find_field() 2nd argument (field) can't be converted to int");
+  if (f2py_success) {
+  /* Processing variable text */
+  ;
+  capi_text_intent |= F2PY_INTENT_IN|F2PY_INTENT_C;
+  capi_text_tmp = array_from_pyobj(NPY_BYTE,text_Dims,text_Rank,capi_text_intent,text_capi);
+  if (capi_text_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 1st argument `text' of ext.io_find_field to C/Fortran array" );
+  } else {
+    text = (signed_char *)(PyArray_DATA(capi_text_tmp));
+
+  /* Processing variable num_rows */
+  num_rows = len(begins);
+  /* Processing variable m */
+  m = len(text);
+  /* Processing variable ends */
+  ends_Dims[0]=num_rows;
+  capi_ends_intent |= F2PY_INTENT_INOUT|F2PY_INTENT_C;
+  capi_ends_tmp = array_from_pyobj(NPY_INT,ends_Dims,ends_Rank,capi_ends_intent,ends_capi);
+  if (capi_ends_tmp == NULL) {
+    if (!PyErr_Occurred())
+      PyErr_SetString(ext_error,"failed in converting 4th argument `ends' of ext.io_find_field to C/Fortran array" );
+  } else {
+    ends = (int *)(PyArray_DATA(capi_ends_tmp));
+
+/*end of frompyobj*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_start_call_clock();
+#endif
+/*callfortranroutine*/
+  io_find_field_return_value = (*f2py_func)(m,text,num_rows,field,begins,ends);
+if (PyErr_Occurred())
+  f2py_success = 0;
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_call_clock();
+#endif
+/*end of callfortranroutine*/
+    if (f2py_success) {
+/*pyobjfrom*/
+/*end of pyobjfrom*/
+    CFUNCSMESS("Building return value.\n");
+    capi_buildvalue = Py_BuildValue("i",io_find_field_return_value);
+/*closepyobjfrom*/
+/*end of closepyobjfrom*/
+    } /*if (f2py_success) after callfortranroutine*/
+/*cleanupfrompyobj*/
+  if((PyObject *)capi_ends_tmp!=ends_capi) {
+    Py_XDECREF(capi_ends_tmp); }
+  }  /*if (capi_ends_tmp == NULL) ... else of ends*/
+  /* End of cleaning variable ends */
+  /* End of cleaning variable m */
+  /* End of cleaning variable num_rows */
+  if((PyObject *)capi_text_tmp!=text_capi) {
+    Py_XDECREF(capi_text_tmp); }
+  }  /*if (capi_text_tmp == NULL) ... else of text*/
+  /* End of cleaning variable text */
+  } /*if (f2py_success) of field*/
+  /* End of cleaning variable field */
+  if((PyObject *)capi_begins_tmp!=begins_capi) {
+    Py_XDECREF(capi_begins_tmp); }
+  }  /*if (capi_begins_tmp == NULL) ... else of begins*/
+  /* End of cleaning variable begins */
+/*end of cleanupfrompyobj*/
+  if (capi_buildvalue == NULL) {
+/*routdebugfailure*/
+  } else {
+/*routdebugleave*/
+  }
+  CFUNCSMESS("Freeing memory.\n");
+/*freemem*/
+#ifdef F2PY_REPORT_ATEXIT
+f2py_stop_clock();
+#endif
+  return capi_buildvalue;
+}
+/**************************** end of io_find_field ****************************/
+/*eof body*/
+
+/******************* See f2py2e/f90mod_rules.py: buildhooks *******************/
+/*need_f90modhooks*/
+
+/************** See f2py2e/rules.py: module_rules['modulebody'] **************/
+
+/******************* See f2py2e/common_rules.py: buildhooks *******************/
+
+/*need_commonhooks*/
+
+/**************************** See f2py2e/rules.py ****************************/
+
+static FortranDataDef f2py_routine_defs[] = {
+  {"ff_dm_quad",-1,{{-1}},0,(char *)ff_dm_quad,(f2py_init_func)f2py_rout_ext_ff_dm_quad,doc_f2py_rout_ext_ff_dm_quad},
+  {"ff_dm_reci",-1,{{-1}},0,(char *)ff_dm_reci,(f2py_init_func)f2py_rout_ext_ff_dm_reci,doc_f2py_rout_ext_ff_dm_reci},
+  {"ff_bond_quad",-1,{{-1}},0,(char *)ff_bond_quad,(f2py_init_func)f2py_rout_ext_ff_bond_quad,doc_f2py_rout_ext_ff_bond_quad},
+  {"ff_bond_hyper",-1,{{-1}},0,(char *)ff_bond_hyper,(f2py_init_func)f2py_rout_ext_ff_bond_hyper,doc_f2py_rout_ext_ff_bond_hyper},
+  {"graphs_floyd_warshall",-1,{{-1}},0,(char *)graphs_floyd_warshall,(f2py_init_func)f2py_rout_ext_graphs_floyd_warshall,doc_f2py_rout_ext_graphs_floyd_warshall},
+  {"molecules_distance_matrix",-1,{{-1}},0,(char *)molecules_distance_matrix,(f2py_init_func)f2py_rout_ext_molecules_distance_matrix,doc_f2py_rout_ext_molecules_distance_matrix},
+  {"similarity_table_labels",-1,{{-1}},0,(char *)similarity_table_labels,(f2py_init_func)f2py_rout_ext_similarity_table_labels,doc_f2py_rout_ext_similarity_table_labels},
+  {"similarity_table_distances",-1,{{-1}},0,(char *)similarity_table_distances,(f2py_init_func)f2py_rout_ext_similarity_table_distances,doc_f2py_rout_ext_similarity_table_distances},
+  {"similarity_measure",-1,{{-1}},0,(char *)similarity_measure,(f2py_init_func)f2py_rout_ext_similarity_measure,doc_f2py_rout_ext_similarity_measure},
+  {"in_spheres",-1,{{-1}},0,(char *)in_spheres,(f2py_init_func)f2py_rout_ext_in_spheres,doc_f2py_rout_ext_in_spheres},
+  {"in_spheres_all",-1,{{-1}},0,(char *)in_spheres_all,(f2py_init_func)f2py_rout_ext_in_spheres_all,doc_f2py_rout_ext_in_spheres_all},
+  {"center_ses1",-1,{{-1}},0,(char *)center_ses1,(f2py_init_func)f2py_rout_ext_center_ses1,doc_f2py_rout_ext_center_ses1},
+  {"center_ses2",-1,{{-1}},0,(char *)center_ses2,(f2py_init_func)f2py_rout_ext_center_ses2,doc_f2py_rout_ext_center_ses2},
+  {"center_ses3",-1,{{-1}},0,(char *)center_ses3,(f2py_init_func)f2py_rout_ext_center_ses3,doc_f2py_rout_ext_center_ses3},
+  {"monte_carlo_volumes",-1,{{-1}},0,(char *)monte_carlo_volumes,(f2py_init_func)f2py_rout_ext_monte_carlo_volumes,doc_f2py_rout_ext_monte_carlo_volumes},
+  {"io_read_columns",-1,{{-1}},0,(char *)io_read_columns,(f2py_init_func)f2py_rout_ext_io_read_columns,doc_f2py_rout_ext_io_read_columns},
+  {"io_read_fixed",-1,{{-1}},0,(char *)io_read_fixed,(f2py_init_func)f2py_rout_ext_io_read_fixed,doc_f2py_rout_ext_io_read_fixed},
+  {"io_find_lines",-1,{{-1}},0,(char *)io_find_lines,(f2py_init_func)f2py_rout_ext_io_find_lines,doc_f2py_rout_ext_io_find_lines},
+  {"io_find_field",-1,{{-1}},0,(char *)io_find_field,(f2py_init_func)f2py_rout_ext_io_find_field,doc_f2py_rout_ext_io_find_field},
+
+/*eof routine_defs*/
+  {NULL}
+};
+
+static PyMethodDef f2py_module_methods[] = {
+
+  {NULL,NULL}
+};
+
+#if PY_VERSION_HEX >= 0x03000000
+static struct PyModuleDef moduledef = {
+  PyModuleDef_HEAD_INIT,
+  "ext",
+  NULL,
+  -1,
+  f2py_module_methods,
+  NULL,
+  NULL,
+  NULL,
+  NULL
+};
+#endif
+
+#if PY_VERSION_HEX >= 0x03000000
+#define RETVAL m
+PyMODINIT_FUNC PyInit_ext(void) {
+#else
+#define RETVAL
+PyMODINIT_FUNC initext(void) {
+#endif
+  int i;
+  PyObject *m,*d, *s;
+#if PY_VERSION_HEX >= 0x03000000
+  m = ext_module = PyModule_Create(&moduledef);
+#else
+  m = ext_module = Py_InitModule("ext", f2py_module_methods);
+#endif
+  Py_TYPE(&PyFortran_Type) = &PyType_Type;
+  import_array();
+  if (PyErr_Occurred())
+    {PyErr_SetString(PyExc_ImportError, "can't initialize module ext (failed to import numpy)"); return RETVAL;}
+  d = PyModule_GetDict(m);
+  s = PyString_FromString("$Revision: $");
+  PyDict_SetItemString(d, "__version__", s);
+#if PY_VERSION_HEX >= 0x03000000
+  s = PyUnicode_FromString(
+#else
+  s = PyString_FromString(
+#endif
+    "This module 'ext' is auto-generated with f2py (version:2).\nFunctions:\n"
+"  ff_dm_quad = ff_dm_quad(cor,dm0,dmk,amp,unitcell,unitcell_reciproke,unitcell_active,gradient)\n"
+"  ff_dm_reci = ff_dm_reci(radii,cor,dm0,amp,unitcell,unitcell_reciproke,unitcell_active,gradient)\n"
+"  ff_bond_quad = ff_bond_quad(cor,pairs,lengths,amp,unitcell,unitcell_reciproke,unitcell_active,gradient)\n"
+"  ff_bond_hyper = ff_bond_hyper(cor,pairs,lengths,scale,amp,unitcell,unitcell_reciproke,unitcell_active,gradient)\n"
+"  graphs_floyd_warshall(dm)\n"
+"  dm = molecules_distance_matrix(cor)\n"
+"  labels_table = similarity_table_labels(labels)\n"
+"  distances_table = similarity_table_distances(distance_matrix)\n"
+"  similarity_measure = similarity_measure(labels1,distances1,labels2,distances2,margin,cutoff)\n"
+"  in_spheres = in_spheres(probe,probe_radius,spheres,sphere_radii)\n"
+"  in_spheres_all = in_spheres_all(probe,probe_radius,spheres,sphere_radii,hits)\n"
+"  center_ses1(probe,close1,close1_radius,center)\n"
+"  center_ses2 = center_ses2(probe,close1,close1_radius,close2,close2_radius,center)\n"
+"  center_ses3 = center_ses3(probe,close1,close1_radius,close2,close2_radius,close3,close3_radius,center)\n"
+"  monte_carlo_volumes = monte_carlo_volumes(probe_radius,spheres,sphere_radii,num_iter,ses_iter,bigbox,counts)\n"
+"  io_read_columns = io_read_columns(text,columns,out)\n"
+"  io_read_fixed = io_read_fixed(text,offset,width,out)\n"
+"  io_find_lines = io_find_lines(text,num_lines)\n"
+"  io_find_field = io_find_field(text,field,begins,ends)\n"
+".");
+  PyDict_SetItemString(d, "__doc__", s);
+  ext_error = PyErr_NewException ("ext.error", NULL, NULL);
+  Py_DECREF(s);
+  for(i=0;f2py_routine_defs[i].name!=NULL;i++)
+    PyDict_SetItemString(d, f2py_routine_defs[i].name,PyFortranObject_NewAsAttr(&f2py_routine_defs[i]));
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+/*eof initf2pywraphooks*/
+/*eof initf90modhooks*/
+
+/*eof initcommonhooks*/
+
+
+#ifdef F2PY_REPORT_ATEXIT
+  if (! PyErr_Occurred())
+    on_exit(f2py_report_on_exit,(void*)"ext");
+#endif
+
+  return RETVAL;
+}
+#ifdef __cplusplus
+}
+#endif
@@ -155,7 +155,7 @@ double ff_dm_reci(int n, double *radii, double *cor, int *dm0, double amp, doubl
             d /= r0;
             result += amp*(d-1)*(d-1)/d/d0;
             if (gradient!=NULL) {
-              tmp = amp*(1-1/d/d)/r0/d/d0;
+              tmp = amp*(1-1/d/d)/r0/r0/d/d0;
               add_grad(i, j, tmp, delta, gradient);
             }
         }
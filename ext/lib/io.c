@@ -0,0 +1,249 @@
+// MolModExt implements a few number crunching routines for the molmod package in C.
+// Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+//
+// This file is part of MolModExt.
+//
+// MolModExt is free software; you can redistribute it and/or
+// modify it under the terms of the GNU General Public License
+// as published by the Free Software Foundation; either version 3
+// of the License, or (at your option) any later version.
+//
+// MolModExt is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program; if not, see <http://www.gnu.org/licenses/>
+//
+// --
+
+
+
+#include <stdlib.h>
+#include <string.h>
+
+
+static inline int is_blank(char c) {
+  return (c == ' ') || (c == '\t') || (c == '\r');
+}
+
+
+static const double powers_of_ten[23] = {
+  1e0, 1e1, 1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10, 1e11, 1e12, 1e13,
+  1e14, 1e15, 1e16, 1e17, 1e18, 1e19, 1e20, 1e21, 1e22
+};
+
+
+static inline int is_separator(char c) {
+  return is_blank(c) || (c == '\n');
+}
+
+
+static inline int parse_eight_digits(char *pos, char *end, unsigned long long *value) {
+  // Convert eight decimal digits at once, when they are available. The
+  // digits are loaded in a 64-bit integer (little endian) and combined
+  // pairwise with three multiplications. Returns zero otherwise.
+  unsigned long long word;
+  if (end - pos < 8) return 0;
+  memcpy(&word, pos, 8);
+  if (((word & 0xF0F0F0F0F0F0F0F0ULL) |
+      (((word + 0x0606060606060606ULL) & 0xF0F0F0F0F0F0F0F0ULL) >> 4)) !=
+      0x3333333333333333ULL) return 0;
+  word -= 0x3030303030303030ULL;
+  word = (word*10) + (word >> 8);
+  word = (((word & 0x000000FF000000FFULL)*(100 + (1000000ULL << 32))) +
+          (((word >> 16) & 0x000000FF000000FFULL)*(1 + (10000ULL << 32)))) >> 32;
+  *value = word;
+  return 1;
+}
+
+
+static int convert_slow(char *begin, char *end, double *result) {
+  // Convert a field with strtod, which needs a zero-terminated copy. Returns
+  // a non-zero value when the field is not a number.
+  char buffer[64];
+  char *stop;
+  int length;
+  length = end - begin;
+  if ((length <= 0) || (length >= 64)) return -1;
+  memcpy(buffer, begin, length);
+  buffer[length] = 0;
+  *result = strtod(buffer, &stop);
+  return (stop != buffer + length);
+}
+
+
+static int parse_number(char **cursor, char *end, double *result) {
+  // Convert the field that starts at *cursor and ends at the first blank,
+  // newline or at end. The cursor is moved to the end of the field. Returns
+  // a non-zero value when the field is not a number.
+  //
+  // Decimal numbers whose mantissa fits in 53 bits and whose decimal
+  // exponent is small are converted in a single pass. The result is then
+  // exactly rounded because both the mantissa and the power of ten are exact
+  // doubles. Other fields are passed to strtod.
+  unsigned long long mantissa, eight;
+  int exponent, negative, exp_negative, exp_value, digits;
+  char *begin, *pos;
+  begin = *cursor;
+  pos = begin;
+  negative = 0;
+  if ((pos < end) && ((*pos == '-') || (*pos == '+'))) {
+    negative = (*pos == '-');
+    pos++;
+  }
+  mantissa = 0;
+  exponent = 0;
+  digits = 0;
+  while ((pos < end) && (*pos >= '0') && (*pos <= '9')) {
+    mantissa = 10*mantissa + (*pos - '0');
+    digits++;
+    pos++;
+  }
+  if ((pos < end) && (*pos == '.')) {
+    pos++;
+    while (parse_eight_digits(pos, end, &eight)) {
+      mantissa = 100000000*mantissa + eight;
+      digits += 8;
+      exponent -= 8;
+      pos += 8;
+    }
+    while ((pos < end) && (*pos >= '0') && (*pos <= '9')) {
+      mantissa = 10*mantissa + (*pos - '0');
+      digits++;
+      exponent--;
+      pos++;
+    }
+  }
+  if ((pos < end) && ((*pos == 'e') || (*pos == 'E'))) {
+    pos++;
+    exp_negative = 0;
+    if ((pos < end) && ((*pos == '-') || (*pos == '+'))) {
+      exp_negative = (*pos == '-');
+      pos++;
+    }
+    if ((pos == end) || (*pos < '0') || (*pos > '9')) digits = 0;
+    exp_value = 0;
+    while ((pos < end) && (*pos >= '0') && (*pos <= '9')) {
+      if (exp_value < 1000) exp_value = 10*exp_value + (*pos - '0');
+      pos++;
+    }
+    exponent += exp_negative ? -exp_value : exp_value;
+  }
+  if ((pos == end) || is_separator(*pos)) {
+    *cursor = pos;
+    if ((digits > 0) && (digits <= 18) && (mantissa <= (1ULL << 53)) &&
+        (exponent >= -22) && (exponent <= 22)) {
+      if (exponent < 0) {
+        *result = (double)mantissa/powers_of_ten[-exponent];
+      } else {
+        *result = (double)mantissa*powers_of_ten[exponent];
+      }
+      if (negative) *result = -*result;
+      return 0;
+    }
+  } else {
+    while ((pos < end) && !is_separator(*pos)) pos++;
+    *cursor = pos;
+  }
+  return convert_slow(begin, pos, result);
+}
+
+
+int io_read_columns(int m, char *text, int num_rows, int num_cols, int *columns, double *out) {
+  // Convert the whitespace separated fields with the given (increasing)
+  // indexes in the first num_rows lines of text. Returns the number of
+  // characters consumed, or -1-row when a line can not be parsed.
+  int row, field, k;
+  char *pos, *end, *stop;
+  pos = text;
+  end = text + m;
+  for (row=0; row<num_rows; row++) {
+    field = 0;
+    k = 0;
+    while (k < num_cols) {
+      while ((pos < end) && is_blank(*pos)) pos++;
+      if ((pos == end) || (*pos == '\n')) return -1-row;
+      if (columns[k] == field) {
+        if (parse_number(&pos, end, out)) return -1-row;
+        out++;
+        k++;
+      } else {
+        while ((pos < end) && !is_separator(*pos)) pos++;
+      }
+      field++;
+    }
+    // skip the remaining fields
+    stop = memchr(pos, '\n', end - pos);
+    pos = (stop == NULL) ? end : stop + 1;
+  }
+  return pos - text;
+}
+
+
+int io_read_fixed(int m, char *text, int num_rows, int num_cols, int offset, int width, double *out) {
+  // Convert num_cols fields of a fixed width, starting at the given offset in
+  // each of the first num_rows lines of text. Returns the number of
+  // characters consumed, or -1-row when a line can not be parsed.
+  int row, k;
+  char *pos, *end, *stop, *field, *field_end;
+  pos = text;
+  end = text + m;
+  for (row=0; row<num_rows; row++) {
+    stop = memchr(pos, '\n', end - pos);
+    if (stop == NULL) stop = end;
+    if (pos + offset + num_cols*width > stop) return -1-row;
+    field = pos + offset;
+    for (k=0; k<num_cols; k++) {
+      field_end = field + width;
+      while ((field < field_end) && is_blank(*field)) field++;
+      if (parse_number(&field, field_end, out)) return -1-row;
+      while ((field < field_end) && is_blank(*field)) field++;
+      if (field != field_end) return -1-row;
+      out++;
+    }
+    pos = (stop == end) ? end : stop + 1;
+  }
+  return pos - text;
+}
+
+
+int io_find_lines(int m, char *text, int num_lines) {
+  // Returns the number of characters in the first num_lines lines of text,
+  // including the last newline, or -1-count when the text only contains
+  // count newlines.
+  int count;
+  char *pos, *end, *stop;
+  pos = text;
+  end = text + m;
+  for (count=0; count<num_lines; count++) {
+    stop = memchr(pos, '\n', end - pos);
+    if (stop == NULL) return -1-count;
+    pos = stop + 1;
+  }
+  return pos - text;
+}
+
+
+int io_find_field(int m, char *text, int num_rows, int field, int *begins, int *ends) {
+  // Locate the whitespace separated field with the given index in the first
+  // num_rows lines of text. Returns the number of characters consumed, or
+  // -1-row when a line has not enough fields.
+  int row, k;
+  char *pos, *end, *stop;
+  pos = text;
+  end = text + m;
+  for (row=0; row<num_rows; row++) {
+    for (k=0; k<=field; k++) {
+      while ((pos < end) && is_blank(*pos)) pos++;
+      if ((pos == end) || (*pos == '\n')) return -1-row;
+      begins[row] = pos - text;
+      while ((pos < end) && !is_separator(*pos)) pos++;
+      ends[row] = pos - text;
+    }
+    stop = memchr(pos, '\n', end - pos);
+    pos = (stop == NULL) ? end : stop + 1;
+  }
+  return pos - text;
+}
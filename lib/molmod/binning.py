@@ -24,14 +24,237 @@ cutoff. The algorithm consists of two major steps:
 1) Divide the given set of coordinates into bins on a regular grid in space.
 2) Calculate the distances (or other usefull things) between coordinates in
    neighboring bins.
+
+The CellList class implements both steps with array operations. The other
+classes in this module are built on top of it.
 """
 
 
-import math, numpy, copy
+import numpy
 
-__all__ = ["PositionedObject", "SparseBinnedObjects",
+__all__ = ["CellList", "PositionedObject", "SparseBinnedObjects",
            "AnalyseNeighboringObjects", "IntraAnalyseNeighboringObjects",
-           "InterAnalyseNeighboringObjects"]
+           "InterAnalyseNeighboringObjects", "NeighborList"]
+
+
+class CellList(object):
+    """
+    An array-backed cell list.
+
+    The points are sorted by the bin (cell) they belong to. The sorted point
+    indices are stored in the attribute order. Only the bins that contain
+    points are stored: cell_keys contains their (sorted) integer keys and
+    offsets is a table such that the points in bin k are
+    order[offsets[k]:offsets[k+1]].
+    """
+
+    # The bin indices (i,j,k) are packed into one integer key. Each bin index
+    # must lie in the range [-key_base/2, key_base/2[.
+    key_base = 2**20
+    # The relative indices of the neighboring bins, including the bin itself.
+    neighbors = numpy.indices((3, 3, 3)).reshape(3, -1).transpose() - 1
+
+    def __init__(self, coordinates, gridsize):
+        """
+        Initialize a CellList instance.
+
+        Arguments:
+        coordinates -- A numpy array with shape (N,3)
+        gridsize -- Defines the size of the bins.
+        """
+        self.coordinates = numpy.asarray(coordinates, float).reshape(-1, 3)
+        self.gridsize = gridsize
+        self.bin_indices = numpy.floor(self.coordinates/gridsize).astype(int)
+        keys = self.get_keys(self.bin_indices)
+        self.order = keys.argsort(kind="mergesort")
+        sorted_keys = keys[self.order]
+        if len(sorted_keys) > 0:
+            starts = numpy.concatenate([[0], (sorted_keys[1:] != sorted_keys[:-1]).nonzero()[0] + 1])
+        else:
+            starts = numpy.zeros(0, int)
+        self.cell_keys = sorted_keys[starts]
+        self.cell_indices = self.bin_indices[self.order[starts]]
+        self.offsets = numpy.concatenate([starts, [len(sorted_keys)]]).astype(int)
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def get_keys(self, bin_indices):
+        """
+        Returns the integer keys of an array of bin indices with shape (N,3).
+        """
+        tmp = bin_indices.astype(numpy.int64) + self.key_base/2
+        return (tmp[:,0]*self.key_base + tmp[:,1])*self.key_base + tmp[:,2]
+
+    def get_bin_ranges(self, bin_indices):
+        """
+        Returns the start and end in self.order of the given bins.
+
+        Bins that do not contain any points get an empty range.
+        """
+        keys = self.get_keys(bin_indices)
+        positions = self.cell_keys.searchsorted(keys)
+        positions = numpy.minimum(positions, len(self.cell_keys) - 1)
+        found = (self.cell_keys[positions] == keys) if len(self.cell_keys) > 0 else numpy.zeros(len(keys), bool)
+        starts = numpy.where(found, self.offsets[positions], 0)
+        ends = numpy.where(found, self.offsets[positions+1], 0)
+        return starts, ends
+
+    def get_bin_members(self, bin_index):
+        """
+        Returns the indices of the points in the bin with the given index.
+        """
+        starts, ends = self.get_bin_ranges(numpy.array([bin_index], int))
+        return self.order[starts[0]:ends[0]]
+
+    def get_images(self, unit_cell, radius=None):
+        """
+        Returns the relative vectors to the neighboring periodic images.
+
+        Only the images directly adjacent in the active directions are
+        considered, including the origin itself. When a radius is given,
+        all images are included that may contain points within that radius
+        of a point in the unit cell, which allows radii larger than half the
+        unit cell spacing. In both cases the points are assumed to lie in the
+        unit cell.
+        """
+        if unit_cell is None:
+            return numpy.zeros((1, 3), float)
+        if radius is None:
+            reach_a, reach_b, reach_c = unit_cell.cell_active.astype(int)
+        else:
+            # The fractional coordinates of two points in the unit cell
+            # differ less than one in each direction.
+            spacings = numpy.sqrt((unit_cell.cell_reciproke**2).sum(axis=1))
+            reach_a, reach_b, reach_c = numpy.floor(radius*spacings).astype(int) + unit_cell.cell_active
+        indices = numpy.array([
+            [index_a, index_b, index_c]
+            for index_a in xrange(-reach_a, reach_a+1)
+            for index_b in xrange(-reach_b, reach_b+1)
+            for index_c in xrange(-reach_c, reach_c+1)
+        ], int)
+        return unit_cell.to_cartesian(indices)
+
+    def _expand(self, other, starts1, counts1, starts2, counts2):
+        """
+        Returns all pairs between the given ranges in self.order and other.order.
+        """
+        sizes = counts1*counts2
+        total = sizes.sum()
+        if total == 0:
+            return numpy.zeros(0, int), numpy.zeros(0, int)
+        blocks = numpy.repeat(numpy.arange(len(sizes)), sizes)
+        positions = numpy.arange(total) - (sizes.cumsum() - sizes)[blocks]
+        width = counts2[blocks]
+        indices1 = self.order[starts1[blocks] + positions//width]
+        indices2 = other.order[starts2[blocks] + positions%width]
+        return indices1, indices2
+
+    def get_pairs(self, other=None, unit_cell=None, radius=None, images=None):
+        """
+        Returns all candidate pairs of points in neighboring bins.
+
+        Optional arguments:
+        other -- Another CellList instance with the same gridsize. When not
+                 given, the pairs within this cell list are computed.
+        unit_cell -- When given, the bins around the neighboring periodic
+                     images are also scanned.
+        radius -- When given, only pairs whose relative vector is shorter
+                  than radius are returned.
+        images -- The relative vectors of the periodic images to scan. The
+                  default is self.get_images(unit_cell, radius). This is
+                  useful to reuse the images when the unit cell is fixed.
+
+        The return value is a tuple of arrays (indices1, indices2, deltas),
+        where indices1 refer to this cell list and indices2 to the other.
+        deltas are the relative vectors other.coordinates[indices2] -
+        self.coordinates[indices1] - image, where image is the relative
+        vector to the periodic image in which the pair is found. A pair may
+        therefore occur more than once, with different images. When other is
+        not given, each pair is only returned once for each image, with
+        indices1 < indices2.
+        """
+        intra = other is None
+        if intra:
+            other = self
+        elif other.gridsize != self.gridsize:
+            raise ValueError("Both cell lists must have the same grid size.")
+        result_indices1 = []
+        result_indices2 = []
+        result_deltas = []
+
+        def add_pairs(indices1, indices2, image):
+            if intra:
+                # only keep each pair once, with indices1 < indices2
+                if image is None:
+                    swap = indices1 > indices2
+                    indices1, indices2 = numpy.where(swap, indices2, indices1), numpy.where(swap, indices1, indices2)
+                else:
+                    mask = indices1 < indices2
+                    indices1 = indices1[mask]
+                    indices2 = indices2[mask]
+            deltas = other.coordinates.take(indices2, axis=0)
+            deltas -= self.coordinates.take(indices1, axis=0)
+            if image is not None:
+                deltas -= image
+            if radius is not None:
+                mask = numpy.einsum("ij,ij->i", deltas, deltas) < radius*radius
+                indices1 = indices1[mask]
+                indices2 = indices2[mask]
+                deltas = deltas[mask]
+            result_indices1.append(indices1)
+            result_indices2.append(indices2)
+            result_deltas.append(deltas)
+
+        # The central image is treated bin by bin. Within one cell list, only
+        # half of the neighboring bins are needed.
+        counts1 = self.offsets[1:] - self.offsets[:-1]
+        for neighbor in self.neighbors:
+            if intra and tuple(neighbor) < (0, 0, 0):
+                continue
+            starts2, ends2 = other.get_bin_ranges(self.cell_indices + neighbor)
+            counts2 = ends2 - starts2
+            indices1, indices2 = self._expand(other, self.offsets[:-1], counts1, starts2, counts2)
+            if intra and (neighbor == 0).all():
+                mask = indices1 < indices2
+                indices1 = indices1[mask]
+                indices2 = indices2[mask]
+            add_pairs(indices1, indices2, None)
+
+        # The other periodic images are treated point by point, because the
+        # shifted points do not fall on the same grid. Only the points that
+        # end up near the other cell list are considered.
+        if len(other) > 0:
+            lower = other.coordinates.min(axis=0) - self.gridsize
+            upper = other.coordinates.max(axis=0) + self.gridsize
+        if images is None:
+            images = self.get_images(unit_cell, radius)
+        for image in images:
+            if (image == 0).all() or len(other) == 0:
+                continue
+            shifted = self.coordinates + image
+            selection = ((shifted > lower) & (shifted < upper)).all(axis=1).nonzero()[0]
+            if len(selection) == 0:
+                continue
+            centers = numpy.floor(shifted[selection]/self.gridsize).astype(int)
+            for neighbor in self.neighbors:
+                starts2, ends2 = other.get_bin_ranges(centers + neighbor)
+                counts2 = ends2 - starts2
+                total = counts2.sum()
+                if total == 0:
+                    continue
+                indices1 = numpy.repeat(selection, counts2)
+                positions = numpy.arange(total) - numpy.repeat(counts2.cumsum() - counts2, counts2)
+                indices2 = other.order[numpy.repeat(starts2, counts2) + positions]
+                add_pairs(indices1, indices2, image)
+
+        if len(result_indices1) == 0:
+            return numpy.zeros(0, int), numpy.zeros(0, int), numpy.zeros((0, 3), float)
+        return (
+            numpy.concatenate(result_indices1),
+            numpy.concatenate(result_indices2),
+            numpy.concatenate(result_deltas),
+        )
 
 
 class PositionedObject(object):
@@ -60,9 +283,9 @@ class SparseBinnedObjects(object):
     A SparseBinnedObjects instance divides 3D space into a sparse grid.
 
     Each cell in the grid is called a bin. Each bin can contain a set of
-    Positioned objects. This implementation works with sparse bins: A bin is
-    only created in memory when an object is encountered that belongs in that
-    bin.
+    Positioned objects. This implementation works with sparse bins: only bins
+    that contain objects are stored. The binning itself is done by a CellList
+    instance, that is stored in the attribute cell_list.
 
     All bins are uniquely defined by their indices i,j,k as defined in __init__.
     """
@@ -78,21 +301,39 @@ class SparseBinnedObjects(object):
         """
         self.gridsize = gridsize
         self.reciproke = 1/gridsize
+        self.positioned_objects = list(positioned_objects)
+        self.cell_list = CellList(
+            [positioned_object.coordinate for positioned_object in self.positioned_objects],
+            gridsize
+        )
+        self._bins = None
+
+    def _get_bins(self):
+        """
+        Returns a dictionary with the set of positioned objects in each bin.
 
-        self.bins = {}
-
-        for positioned_object in positioned_objects:
-            indices = tuple(numpy.floor(positioned_object.coordinate*self.reciproke).astype(int))
-            bin = self.bins.get(indices)
-            if bin is None:
-                bin = set()
-                self.bins[indices] = bin
-            bin.add(positioned_object)
+        The keys are the tuples with the bin indices. The dictionary is only
+        built on first use.
+        """
+        if self._bins is None:
+            cell_list = self.cell_list
+            self._bins = {}
+            for counter in xrange(len(cell_list.cell_keys)):
+                members = cell_list.order[cell_list.offsets[counter]:cell_list.offsets[counter+1]]
+                self._bins[tuple(cell_list.cell_indices[counter])] = set(
+                    self.positioned_objects[index] for index in members
+                )
+        return self._bins
+
+    bins = property(_get_bins)
 
     def yield_surrounding(self, r, deltas):
         """
         Iterate over all objects in the bins that surround the bin that
         contains coordinate r.
+
+        Each iteration yields a tuple (bin, positioned_object), where bin is
+        the set of positioned objects in the bin of positioned_object.
         """
         center = numpy.floor(r*self.reciproke).astype(int)
         for delta in deltas:
@@ -117,35 +358,28 @@ class AnalyseNeighboringObjects(object):
         """
         self.compare_function = compare_function
         # All these parameters have to be defined by the base class
-        self.compare_indices = None
         self.binned_objects1 = None
         self.binned_objects2 = None
 
-    def __call__(self, unit_cell=None):
-        if unit_cell is None:
-            for result in self.call_delta(numpy.zeros(3, float)):
-                yield result
-        else:
-            active_a, active_b, active_c = unit_cell.cell_active.astype(int)
-            for index_a in xrange(-active_a, active_a+1):
-                for index_b in xrange(-active_b, active_b+1):
-                    for index_c in xrange(-active_c, active_c+1):
-                        delta = numpy.dot(unit_cell.cell, numpy.array([index_a, index_b, index_c]))
-                        for result in self.call_delta(delta):
-                            yield result
-
-    def call_delta(self, delta):
-        for center_bin in self.binned_objects1.bins.itervalues():
-            for positioned1 in center_bin:
-                for neighbor_bin, positioned2 in self.binned_objects2.yield_surrounding(positioned1.coordinate + delta, self.compare_indices):
-                    if self.allow(center_bin, neighbor_bin, positioned1, positioned2):
-                        result = self.compare_function(positioned1, positioned2)
-                        if result is not None:
-                            yield (positioned1, positioned2), result
+    def get_pairs(self, unit_cell=None):
+        """
+        Returns the arrays (indices1, indices2, deltas) of all candidate pairs.
 
+        When a unit cell is given, a pair may occur once for each periodic
+        image in which it is found. See CellList.get_pairs for more details.
+        """
+        raise NotImplementedError
 
-    def allow(self, bin1, bin2, positioned1, positioned2):
-        return True
+    def __call__(self, unit_cell=None):
+        indices1, indices2, deltas = self.get_pairs(unit_cell)
+        objects1 = self.binned_objects1.positioned_objects
+        objects2 = self.binned_objects2.positioned_objects
+        for index1, index2 in zip(indices1, indices2):
+            positioned1 = objects1[index1]
+            positioned2 = objects2[index2]
+            result = self.compare_function(positioned1, positioned2)
+            if result is not None:
+                yield (positioned1, positioned2), result
 
 
 class IntraAnalyseNeighboringObjects(AnalyseNeighboringObjects):
@@ -155,18 +389,11 @@ class IntraAnalyseNeighboringObjects(AnalyseNeighboringObjects):
     """
     def __init__(self, binned_objects, compare_function):
         AnalyseNeighboringObjects.__init__(self, compare_function)
-        self.compare_indices = numpy.array([
-            (0, 0, 0), (1, 1, 1),
-            (1, 0, 0), (0, 1, 0), (0, 0, 1),
-            (0, 1, 1), (1, 0, 1), (1, 1, 0),
-            (0, 1, -1), (-1, 0, 1), (1, -1, 0),
-            (1, 1, -1), (1, -1, -1), (1, -1, 1)
-        ], int)
         self.binned_objects1 = binned_objects
         self.binned_objects2 = binned_objects
 
-    def allow(self, bin1, bin2, positioned1, positioned2):
-        return not (bin1 == bin2 and positioned1 >= positioned2)
+    def get_pairs(self, unit_cell=None):
+        return self.binned_objects1.cell_list.get_pairs(unit_cell=unit_cell)
 
 
 class InterAnalyseNeighboringObjects(AnalyseNeighboringObjects):
@@ -177,22 +404,112 @@ class InterAnalyseNeighboringObjects(AnalyseNeighboringObjects):
     def __init__(self, binned_objects1, binned_objects2, compare_function):
         AnalyseNeighboringObjects.__init__(self, compare_function)
         assert binned_objects1.gridsize==binned_objects2.gridsize
-        self.compare_indices = numpy.array([
-            (-1, -1, -1), (-1, -1,  0), (-1, -1,  1),
-            (-1,  0, -1), (-1,  0,  0), (-1,  0,  1),
-            (-1,  1, -1), (-1,  1,  0), (-1,  1,  1),
-
-            ( 0, -1, -1), ( 0, -1,  0), ( 0, -1,  1),
-            ( 0,  0, -1), ( 0,  0,  0), ( 0,  0,  1),
-            ( 0,  1, -1), ( 0,  1,  0), ( 0,  1,  1),
-
-            ( 1, -1, -1), ( 1, -1,  0), ( 1, -1,  1),
-            ( 1,  0, -1), ( 1,  0,  0), ( 1,  0,  1),
-            ( 1,  1, -1), ( 1,  1,  0), ( 1,  1,  1),
-        ], int)
         self.binned_objects1 = binned_objects1
         self.binned_objects2 = binned_objects2
 
+    def get_pairs(self, unit_cell=None):
+        return self.binned_objects1.cell_list.get_pairs(
+            self.binned_objects2.cell_list, unit_cell
+        )
 
 
+class NeighborList(object):
+    """
+    A Verlet neighbor list that is reused as long as the points move little.
+
+    When the list is built, all pairs of points within a distance cutoff+skin
+    are stored, together with the periodic image that connects them. As long
+    as no point has moved more than half the skin since the last build, this
+    list contains all pairs within the cutoff and there is no need to rebuild
+    it. The attributes num_builds and num_updates can be used to tune the
+    skin.
+
+    When a unit cell is given, the minimum image convention is used. The
+    cutoff plus the skin must be smaller than half the distance between
+    opposite faces of the (active) unit cell.
+    """
+
+    def __init__(self, cutoff, skin=0.0, unit_cell=None):
+        """
+        Initialize a NeighborList instance.
+
+        Arguments:
+        cutoff -- Only pairs closer than this cutoff are returned by update.
+        skin -- The extra margin on the cutoff to reduce the number of builds.
+        unit_cell -- An optional UnitCell instance for periodic systems.
+        """
+        self.cutoff = cutoff
+        self.skin = skin
+        self.unit_cell = unit_cell
+        self.num_builds = 0
+        self.num_updates = 0
+        self.reference = None
+
+    def _check_unit_cell(self):
+        if self.unit_cell is None:
+            return
+        # the distances between opposite faces of the active cell directions
+        norms = numpy.sqrt((self.unit_cell.cell_reciproke**2).sum(axis=1))
+        norms = norms[self.unit_cell.cell_active]
+        if len(norms) > 0 and 2*(self.cutoff + self.skin)*norms.max() >= 1:
+            raise ValueError("The cutoff plus the skin must be smaller than half the unit cell spacing.")
+
+    def build(self, coordinates):
+        """
+        Find all pairs within the distance cutoff+skin.
+
+        A CellList is used to find the pairs. Each pair (i,j) is stored with
+        i > j.
+        """
+        self._check_unit_cell()
+        radius = self.cutoff + self.skin
+        if self.unit_cell is not None:
+            # put all points in the unit cell, such that the neighboring
+            # periodic images that are scanned by the binning algorithm
+            # contain all relevant pairs.
+            fractional = numpy.dot(coordinates, self.unit_cell.cell_reciproke.transpose())
+            wrapped = coordinates - numpy.dot(numpy.floor(fractional), self.unit_cell.cell.transpose())
+        else:
+            wrapped = coordinates
+
+        indices1, indices2, foo = CellList(wrapped, radius).get_pairs(
+            unit_cell=self.unit_cell, radius=radius
+        )
+        size = len(coordinates)
+        keys = numpy.unique(indices2*size + indices1)
+        self.indices1 = keys//size
+        self.indices2 = keys%size
+
+        # The periodic image of each pair is fixed at build time, such that
+        # the relative vectors change continuously until the next build.
+        deltas = coordinates[self.indices1] - coordinates[self.indices2]
+        if self.unit_cell is None:
+            self.shifts = numpy.zeros(deltas.shape, float)
+        else:
+            fractional = numpy.dot(deltas, self.unit_cell.cell_reciproke.transpose())
+            self.shifts = -numpy.dot(fractional.round(), self.unit_cell.cell.transpose())
+
+        self.reference = coordinates.copy()
+        self.num_builds += 1
 
+    def update(self, coordinates):
+        """
+        Returns all pairs within the cutoff for the given coordinates.
+
+        The list is only rebuilt when some point moved more than half the skin
+        since the last build. The return value is a tuple (indices1, indices2,
+        deltas, distances), where deltas are the relative vectors
+        coordinates[indices1] - coordinates[indices2] (subject to the minimum
+        image convention) and distances are their norms.
+        """
+        self.num_updates += 1
+        if self.reference is None or self.reference.shape != coordinates.shape:
+            self.build(coordinates)
+        else:
+            displacements = ((coordinates - self.reference)**2).sum(axis=1)
+            if len(displacements) > 0 and displacements.max() > 0.25*self.skin*self.skin:
+                self.build(coordinates)
+        deltas = coordinates[self.indices1] - coordinates[self.indices2] + self.shifts
+        distances = numpy.sqrt((deltas**2).sum(axis=1))
+        mask = distances < self.cutoff
+        return self.indices1[mask], self.indices2[mask], deltas[mask], distances[mask]
@@ -62,6 +62,7 @@ class BondData(object):
         self.periodic_data = periodic_data
         self._load_bond_data(filename)
         self._approximate_unkown_bond_lengths()
+        self._build_length_table()
         self.max_length = max(
             max(lengths.itervalues())
             for lengths
@@ -121,6 +122,22 @@ class BondData(object):
                         dataset[pair] = (atom1.covalent_radius + atom2.covalent_radius)
                     #print "%3i  %3i  %s %30s %30s" % (n1, n2, dataset.get(pair), atom1, atom2)
 
+    def _build_length_table(self):
+        """Store the bond lengths in an array for the vectorized bonded_array
+
+        The element length_table[i, n1, n2] is the bond length for
+        bond_types[i] between atom numbers n1 and n2. Missing bond lengths are
+        set to zero.
+        """
+        size = max(self.periodic_data.yield_numbers()) + 1
+        self.length_table = numpy.zeros((len(bond_types), size, size), float)
+        for index, bond_type in enumerate(bond_types):
+            for pair, bond_length in self.lengths[bond_type].iteritems():
+                numbers = list(pair)
+                n1, n2 = numbers[0], numbers[-1]
+                self.length_table[index, n1, n2] = bond_length
+                self.length_table[index, n2, n1] = bond_length
+
     def bonded(self, n1, n2, distance):
         """
         Return the estimated bond type.
@@ -151,6 +168,28 @@ class BondData(object):
                         deviation = new_deviation
         return result
 
+    def bonded_array(self, numbers1, numbers2, distances):
+        """
+        Return the estimated bond types for arrays of atom pairs.
+
+        This is the vectorized version of the method bonded. The arguments are
+        arrays with the atom numbers of the first and the second atom in each
+        pair and the distances between them. The result is an integer array
+        with the bond types. Where no bond is found, the result is zero.
+        """
+        numbers1 = numpy.asarray(numbers1, int)
+        numbers2 = numpy.asarray(numbers2, int)
+        distances = numpy.asarray(distances, float)
+        size = self.length_table.shape[1]
+        known = (numbers1 >= 0) & (numbers1 < size) & (numbers2 >= 0) & (numbers2 < size)
+        bond_lengths = self.length_table[:, numbers1*known, numbers2*known]
+        deviations = abs(bond_lengths - distances)
+        deviations[(bond_lengths == 0.0) | (distances >= bond_lengths*self.bond_tolerance)] = numpy.inf
+        # argmin picks the first bond type in case of ties, just like bonded
+        result = numpy.array(bond_types)[deviations.argmin(axis=0)]
+        result[~known | numpy.isinf(deviations.min(axis=0))] = 0
+        return result
+
     def get_length(self, n1, n2, bond_type=BOND_SINGLE):
         """
         Return the length of a bond between n1 and n2 of type bond_type.
@@ -87,19 +87,30 @@ class VelocityScaler(Fix):
 
 
 class VerletIntegrator(TrajectoryMaker):
-    def __init__(self, calculate_energy, calculate_gradient, log, masses, time_step, fixes=[]):
+    def __init__(self, calculate_energy, calculate_gradient, log, masses, time_step, fixes=[], neighbor_lists=[]):
+        """Initialize a VerletIntegrator
+
+        The optional argument neighbor_lists is a list of NeighborList
+        instances (see molmod.binning) that are used by calculate_energy and
+        calculate_gradient. Their total number of builds is stored for each
+        step in the trajectory variable num_builds, which is useful to tune
+        the skin of the neighbor lists. The integrator does not update these
+        lists: calculate_energy and calculate_gradient must call their update
+        method with the new coordinates. This argument only serves logging.
+        """
         TrajectoryMaker.__init__(self, calculate_energy, calculate_gradient, len(masses), log)
 
         self.masses = masses
         self.time_step = time_step
         self.fixes = fixes
+        self.neighbor_lists = neighbor_lists
 
         self.current_velocities = numpy.zeros(self.dof, float)
         self.accelerations = numpy.zeros(self.dof, float)
         self.tmp = numpy.zeros(self.dof, float)
         self.gradient = numpy.zeros(self.dof, float)
 
-        self.init_trajectory_vars(["velocities", "energies", "kinetic_energies", "times", "temperatures"])
+        self.init_trajectory_vars(["velocities", "energies", "kinetic_energies", "times", "temperatures", "num_builds"])
 
     def initialize_state(self, initial_state, initial_velocities=0):
         self.clear_trajectory_vars()
@@ -126,6 +137,7 @@ class VerletIntegrator(TrajectoryMaker):
         self.times.append(step*self.time_step)
         self.temperatures.append(kinetic_energy/boltzmann/self.dof)
         self.gradients.append(self.gradient)
+        self.num_builds.append(sum(neighbor_list.num_builds for neighbor_list in self.neighbor_lists))
 
         self.verbose()
 
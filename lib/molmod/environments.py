@@ -42,48 +42,48 @@ def calculate_environments(sparse_binned_objects, radius, unit_cell=None):
     if radius >= sparse_binned_objects.gridsize:
         raise Error("The grid size of the bins is too small.")
 
-    # this is a function that will extract the environment of each object
-    def delta_distance(positioned1, positioned2):
-        delta = positioned2.coordinate - positioned1.coordinate
-        if unit_cell is not None:
-            delta = unit_cell.shortest_vector(delta)
-        distance = numpy.linalg.norm(delta)
-
-        if distance <= radius:
-            return delta, distance
-
-    environments = {}
-    def add_to_environments(positioned_a, positioned_b, delta, distance):
-        environment_a = environments.get(positioned_a.id)
-        if environment_a is None:
-            environment_a = Environment(positioned_a)
-            environment_a.deltas = []
-            environment_a.distances = []
-            environment_a.neighbors = []
-            environment_a.reverse_neighbors = {}
-            environments[positioned_a.id] = environment_a
-        environment_a.deltas.append(delta)
-        environment_a.distances.append(distance)
-        environment_a.neighbors.append(positioned_b.id)
-        environment_a.reverse_neighbors[positioned_b.id] = len(environment_a.reverse_neighbors)
-
-    # now compare 'all' distances
-    for (positioned1, positioned2), (delta, distance) in IntraAnalyseNeighboringObjects(sparse_binned_objects, delta_distance)(unit_cell):
-        add_to_environments(positioned1, positioned2,  delta, distance)
-        add_to_environments(positioned2, positioned1, -delta, distance)
+    # compute all relative vectors between neighboring objects at once
+    indices1, indices2, deltas = IntraAnalyseNeighboringObjects(sparse_binned_objects, None).get_pairs(unit_cell)
+    if unit_cell is not None:
+        deltas = unit_cell.shortest_vector(deltas)
+    distances = numpy.sqrt((deltas**2).sum(axis=1))
+    # a pair can be found in more than one periodic image
+    foo, first = numpy.unique(indices1*len(sparse_binned_objects.positioned_objects) + indices2, return_index=True)
+    mask = numpy.zeros(len(distances), bool)
+    mask[first] = True
+    mask &= distances <= radius
+    indices1 = indices1[mask]
+    indices2 = indices2[mask]
+    deltas = deltas[mask]
+    distances = distances[mask]
+
+    # each pair contributes to the environments of both objects
+    centers = numpy.concatenate([indices1, indices2])
+    others = numpy.concatenate([indices2, indices1])
+    deltas = numpy.concatenate([deltas, -deltas])
+    distances = numpy.concatenate([distances, distances])
+    order = centers.argsort(kind="mergesort")
+    centers = centers[order]
+    others = others[order]
+    deltas = deltas[order]
+    distances = distances[order]
+    bounds = numpy.concatenate([[0], (centers[1:] != centers[:-1]).nonzero()[0] + 1, [len(centers)]])
 
     # At this time we have for each object a set of vectors that
     # point to other objects within the range of radius. Now we will
     # calculate some aditional information
-    for environment in environments.itervalues():
-        environment.n = len(environment.deltas)
-        environment.deltas = numpy.array(environment.deltas)
-        environment.distances = numpy.array(environment.distances)
-        environment.neighbors = numpy.array(environment.neighbors)
+    positioned_objects = sparse_binned_objects.positioned_objects
+    environments = {}
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        if begin == end:
+            continue
+        environment = Environment(positioned_objects[centers[begin]])
+        environment.n = end - begin
+        environment.deltas = deltas[begin:end]
+        environment.distances = distances[begin:end]
+        environment.neighbors = numpy.array([positioned_objects[other].id for other in others[begin:end]])
+        environment.reverse_neighbors = dict((id, index) for index, id in enumerate(environment.neighbors))
         environment.directions = (environment.deltas.transpose() / (environment.distances + (environment.distances == 0.0))).transpose()
+        environments[environment.id] = environment
 
     return environments
-
-
-
-
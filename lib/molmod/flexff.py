@@ -19,10 +19,11 @@
 # --
 
 
-import numpy
+import numpy, scipy.special
 
 from molmod.molecular_graphs import BondPattern, BendingAnglePattern, DihedralAnglePattern
 from molmod.graphs import GraphSearch, CriteriaSet
+from molmod.binning import CellList, NeighborList
 
 
 __all__ = [
@@ -36,10 +37,29 @@ __all__ = [
     "DihedralCosineTerm",
     "OneFourTerm",
     "NonbondTerm",
+    "get_ewald_alpha",
+    "get_ewald_kmax",
+    "EwaldTerm",
+    "PMETerm",
     "ForceField",
 ]
 
+def _dot(a, b):
+    """Dot products of (arrays of) vectors along the last axis."""
+    return (a*b).sum(axis=-1)
+
+
+def _expand(a):
+    """Add an axis to (an array of) scalars to multiply with (an array of) vectors."""
+    return a[...,numpy.newaxis]
+
+
 class EnergyTerm(object):
+    # When True, __call__ also accepts a batch of structures, i.e.
+    # coordinates and gradient_sum with shape (K, N, 3), and then returns an
+    # array with K energies. Otherwise the ForceField loops over the batch.
+    batched = False
+
     def __init__(self, label, calculate_eg):
         self.label = label
         self.calculate_eg = calculate_eg
@@ -52,8 +72,15 @@ class EnergyTerm(object):
 
 
 class ValenceTerm(EnergyTerm):
-    def __init__(self, label, calculate_eg, match_definition):
+    # The name of the attribute of a molecular graph that directly enumerates
+    # the internal coordinates of this term, e.g. "bonds". When the graph does
+    # not have this attribute, the match definition is used instead.
+    topology = None
+    batched = True
+
+    def __init__(self, label, calculate_eg, match_definition, atom_criteria=None):
         self.match_definition = match_definition
+        self.atom_criteria = atom_criteria
         EnergyTerm.__init__(self, label, calculate_eg)
 
     def calculate_ic(self, coordinates):
@@ -64,238 +91,664 @@ class ValenceTerm(EnergyTerm):
 
     def init_graph(self, graph):
         # the internal coordinates are enumerated
+        if self.atom_criteria is not None and hasattr(graph, "filter_rows"):
+            self.indices = graph.filter_rows(getattr(graph, self.topology), self.atom_criteria)
+            return
         indices = []
         for match in GraphSearch(self.match_definition)(graph):
             indices.append([val for key,val in sorted(match.forward.iteritems())])
         self.indices = numpy.array(indices, int)
 
     def __call__(self, coordinates, gradient_sum, unit_cell):
-        energy_sum = 0.0
-        for row in self.indices:
-            sub_coordinates = numpy.array([
-                unit_cell.shortest_vector(coordinates[index] - coordinates[row[0]])
-                for index in row
-            ])
-            ic, jacobian = self.calculate_ic(sub_coordinates)
-            energy, gscalar = self.calculate_eg(ic)
-            energy_sum += energy
-            for index, gradient_atom in zip(row, gscalar*jacobian):
-                gradient_sum[index] += gradient_atom
-        return energy_sum
+        # All internal coordinates, of all structures in a batch, are computed
+        # at once. The relative vectors follow the minimum image convention
+        # with respect to the first atom of each row.
+        if len(self.indices) == 0:
+            if len(coordinates.shape) == 3:
+                return numpy.zeros(len(coordinates), float)
+            return 0.0
+        deltas = coordinates[...,self.indices,:] - coordinates[...,self.indices[:,:1],:]
+        sub_coordinates = unit_cell.shortest_vector(deltas.reshape(-1, 3)).reshape(deltas.shape)
+        ics, jacobians = self.calculate_ic(sub_coordinates)
+        energies, gscalars = self.calculate_eg(ics)
+        # calculate_eg may return scalars, e.g. for a linear energy term
+        energies = numpy.zeros(ics.shape, float) + energies
+        gscalars = numpy.zeros(ics.shape, float) + gscalars
+        gradients = (_expand(_expand(gscalars))*jacobians).reshape(-1, 3)
+        # the atom indices in the flattened batch
+        size = coordinates.shape[-2]
+        num = gradient_sum.size/(3*size)
+        indices = (numpy.arange(num).reshape(-1, 1, 1)*size + self.indices).ravel()
+        flat_sum = numpy.zeros((num*size, 3), float)
+        for i in xrange(3):
+            flat_sum[:,i] = numpy.bincount(indices, gradients[:,i], minlength=num*size)
+        gradient_sum += flat_sum.reshape(gradient_sum.shape)
+        return energies.sum(axis=-1)
 
 
 class BondStretchTerm(ValenceTerm):
+    topology = "bonds"
+
     def __init__(self, label, calculate_eg, atom_criteria):
         ValenceTerm.__init__(self, label, calculate_eg, BondPattern(
             [CriteriaSet(dict((index, criterion) for index, criterion in enumerate(atom_criteria)))]
-        ))
+        ), atom_criteria)
 
     def calculate_ic(self, coordinates):
-        delta = coordinates[0] - coordinates[1]
-        distance = numpy.linalg.norm(delta)
+        delta = coordinates[...,0,:] - coordinates[...,1,:]
+        distance = numpy.sqrt(_dot(delta, delta))
         jacobian = numpy.zeros(coordinates.shape, float)
-        jacobian[0] = delta/distance
-        jacobian[1] = -jacobian[0]
+        jacobian[...,0,:] = delta/_expand(distance)
+        jacobian[...,1,:] = -jacobian[...,0,:]
         return distance, jacobian
 
 
 
 class ThreeBodyTerm(ValenceTerm):
+    topology = "bends"
+
     def __init__(self, label, calculate_eg, atom_criteria):
         ValenceTerm.__init__(self, label, calculate_eg, BendingAnglePattern(
             [CriteriaSet(dict((index, criterion) for index, criterion in enumerate(atom_criteria)))]
-        ))
+        ), atom_criteria)
 
 
 class BendingCosineTerm(ThreeBodyTerm):
     def calculate_ic(self, coordinates):
         jacobian = numpy.zeros(coordinates.shape, float)
-        a = coordinates[0] - coordinates[1]
-        b = coordinates[2] - coordinates[1]
-        dot_ab = numpy.dot(a, b)
-        dot_aa = numpy.dot(a, a)
-        dot_bb = numpy.dot(b, b)
+        a = coordinates[...,0,:] - coordinates[...,1,:]
+        b = coordinates[...,2,:] - coordinates[...,1,:]
+        dot_ab = _expand(_dot(a, b))
+        dot_aa = _expand(_dot(a, a))
+        dot_bb = _expand(_dot(b, b))
         root = numpy.sqrt(dot_aa*dot_bb)
-        jacobian[0] = (root*b - dot_ab*dot_bb*a/root)/root**2
-        jacobian[2] = (root*a - dot_ab*dot_aa*b/root)/root**2
-        jacobian[1] = -jacobian[0]-jacobian[2]
-        return dot_ab/root, jacobian
+        jacobian[...,0,:] = (root*b - dot_ab*dot_bb*a/root)/root**2
+        jacobian[...,2,:] = (root*a - dot_ab*dot_aa*b/root)/root**2
+        jacobian[...,1,:] = -jacobian[...,0,:]-jacobian[...,2,:]
+        return (dot_ab/root)[...,0], jacobian
 
 
 class UreyBradleyTerm(ThreeBodyTerm):
     def calculate_ic(self, coordinates):
-        delta = coordinates[0] - coordinates[2]
-        distance = numpy.linalg.norm(delta)
+        delta = coordinates[...,0,:] - coordinates[...,2,:]
+        distance = numpy.sqrt(_dot(delta, delta))
         jacobian = numpy.zeros(coordinates.shape, float)
-        jacobian[0] = delta/distance
-        jacobian[2] = -jacobian[0]
+        jacobian[...,0,:] = delta/_expand(distance)
+        jacobian[...,2,:] = -jacobian[...,0,:]
         return distance, jacobian
 
 
 class FourBodyTerm(ValenceTerm):
+    topology = "dihedrals"
+
     def __init__(self, label, calculate_eg, atom_criteria):
         ValenceTerm.__init__(self, label, calculate_eg, DihedralAnglePattern(
             [CriteriaSet(dict((index, criterion) for index, criterion in enumerate(atom_criteria)))]
-        ))
+        ), atom_criteria)
 
 
 class DihedralCosineTerm(FourBodyTerm):
     def calculate_ic(self, coordinates):
         jacobian = numpy.zeros(coordinates.shape, float)
-        a = coordinates[0] - coordinates[1]
-        b = coordinates[2] - coordinates[1]
-        c = coordinates[3] - coordinates[2]
-        dot_ab = numpy.dot(a, b)
-        dot_cb = numpy.dot(c, b)
-        dot_bb = numpy.dot(b, b)
+        a = coordinates[...,0,:] - coordinates[...,1,:]
+        b = coordinates[...,2,:] - coordinates[...,1,:]
+        c = coordinates[...,3,:] - coordinates[...,2,:]
+        dot_ab = _expand(_dot(a, b))
+        dot_cb = _expand(_dot(c, b))
+        dot_bb = _expand(_dot(b, b))
         d = a - b*dot_ab/dot_bb
         e = c - b*dot_cb/dot_bb
-        dot_de = numpy.dot(d, e)
-        dot_dd = numpy.dot(d, d)
-        dot_ee = numpy.dot(e, e)
+        dot_de = _expand(_dot(d, e))
+        dot_dd = _expand(_dot(d, d))
+        dot_ee = _expand(_dot(e, e))
         root = numpy.sqrt(dot_dd*dot_ee)
         gd = (root*e - dot_de*dot_ee*d/root)/root**2
         ge = (root*d - dot_de*dot_dd*e/root)/root**2
-        jda = numpy.identity(3) - numpy.outer(b,b)/numpy.sqrt(dot_bb)
-        jdb = -(
-            (numpy.outer(b, a)*dot_bb - 2*numpy.outer(b, b)*dot_ab)/dot_bb/dot_bb +
-            numpy.identity(3)*dot_ab/dot_bb
+        # The products of the Jacobians of d and e with gd and ge are written
+        # out, such that no 3x3 matrices are needed.
+        dot_bgd = _expand(_dot(b, gd))
+        dot_bge = _expand(_dot(b, ge))
+        jacobian[...,0,:] = gd - b*dot_bgd/numpy.sqrt(dot_bb)
+        jacobian[...,3,:] = ge - b*dot_bge/numpy.sqrt(dot_bb)
+        jacobian[...,2,:] = -(
+            (b*_expand(_dot(a, gd))*dot_bb - 2*b*dot_bgd*dot_ab)/dot_bb/dot_bb +
+            gd*dot_ab/dot_bb
+        ) - (
+            (b*_expand(_dot(c, ge))*dot_bb - 2*b*dot_bge*dot_cb)/dot_bb/dot_bb +
+            ge*dot_cb/dot_bb
         )
-        jec = numpy.identity(3) - numpy.outer(b,b)/numpy.sqrt(dot_bb)
-        jeb = -(
-            (numpy.outer(b, c)*dot_bb - 2*numpy.outer(b, b)*dot_cb)/dot_bb/dot_bb +
-            numpy.identity(3)*dot_cb/dot_bb
-        )
-        jacobian[0] = numpy.dot(jda, gd)
-        jacobian[3] = numpy.dot(jec, ge)
-        jacobian[2] = numpy.dot(jdb, gd) + numpy.dot(jeb, ge)
-        jacobian[1] = -jacobian[2]
-        jacobian[1] -= jacobian[0]
-        jacobian[2] -= jacobian[3]
-        return dot_de/root, jacobian
+        jacobian[...,1,:] = -jacobian[...,2,:]
+        jacobian[...,1,:] -= jacobian[...,0,:]
+        jacobian[...,2,:] -= jacobian[...,3,:]
+        return (dot_de/root)[...,0], jacobian
 
 
 
 class OneFourTerm(FourBodyTerm):
     def calculate_ic(self, coordinates):
-        delta = coordinates[0] - coordinates[3]
-        distance = numpy.linalg.norm(delta)
+        delta = coordinates[...,0,:] - coordinates[...,3,:]
+        distance = numpy.sqrt(_dot(delta, delta))
         jacobian = numpy.zeros(coordinates.shape, float)
-        jacobian[0] = delta/distance
-        jacobian[3] = -jacobian[0]
+        jacobian[...,0,:] = delta/_expand(distance)
+        jacobian[...,3,:] = -jacobian[...,0,:]
         return distance, jacobian
 
 
 class NonbondTerm(EnergyTerm):
-    def __init__(self, label, calculate_eg, atom_criteria, nonbond_filter, cutoff):
+    def __init__(self, label, calculate_eg, atom_criteria, nonbond_filter, cutoff, skin=None, max_graph_distance=None):
+        """Initialize a NonbondTerm
+
+        The pairs within the cutoff are found with a cell list (see
+        molmod.binning), scanning all periodic images that are within reach of
+        the cutoff. The unit cell may be periodic in zero, one, two or three
+        directions and the cutoff may exceed the size of the unit cell. The
+        set of periodic images is reused as long as the unit cell does not
+        change.
+
+        When the skin argument is given, a NeighborList (see molmod.binning)
+        with that skin is used to find the pairs within the cutoff. The list is
+        only rebuilt when the atoms have moved significantly. This is only
+        possible when the cutoff plus the skin is smaller than half the unit
+        cell spacing, i.e. when the minimum image convention applies.
+
+        Only the graph distances up to max_graph_distance bonds are computed
+        with Graph.get_sparse_distances. Larger graph distances are passed to
+        the nonbond_filter as zero, just like the distance between atoms in
+        different molecules, e.g. max_graph_distance=3 suffices for a filter
+        that excludes the 1-2, 1-3 and 1-4 pairs. By default, the largest
+        graph distance for which the nonbond_filter differs from its value at
+        zero is used. This gives the same pairs as the full distance matrix,
+        without computing it.
+        """
         self.atom0_criterion, self.atom1_criterion = atom_criteria
         self.nonbond_filter = nonbond_filter
         self.cutoff = cutoff
+        self.skin = skin
+        self.max_graph_distance = max_graph_distance
+        self.neighbor_list = None
+        self.images = None
+        self.images_cell = None
+        self.images_active = None
+        self._indices = None
         EnergyTerm.__init__(self, label, calculate_eg)
 
+    def get_allowed_distances(self, graph):
+        """Return a mask that selects the graph distances that interact.
+
+        The mask covers the distances from zero to the maximum graph distance
+        that has to be computed, see max_graph_distance.
+        """
+        if self.max_graph_distance is None:
+            # a graph distance can not exceed the number of atoms minus one.
+            max_distance = max(len(graph.numbers) - 1, 0)
+        else:
+            max_distance = self.max_graph_distance
+        allowed_distances = numpy.array([
+            bool(self.nonbond_filter(distance)) for distance in xrange(max_distance+1)
+        ], bool)
+        if self.max_graph_distance is None:
+            different = (allowed_distances != allowed_distances[0]).nonzero()[0]
+            max_distance = different.max() if len(different) > 0 else 0
+            allowed_distances = allowed_distances[:max_distance+1]
+        return allowed_distances
+
+    def _iter_partners(self, graph):
+        # For each atom, the interacting atoms are selected at once with the
+        # atom masks and the allowed graph distances, just like in
+        # get_allowed.
+        size = len(graph.numbers)
+        mask0 = self._get_atom_mask(self.atom0_criterion, graph)
+        mask1 = self._get_atom_mask(self.atom1_criterion, graph)
+        allowed_distances = self.get_allowed_distances(graph)
+        sparse = graph.get_sparse_distances(len(allowed_distances) - 1)
+        distances = numpy.zeros(size, int)
+        for atom0 in xrange(size):
+            neighbors = sparse.indices[sparse.indptr[atom0]:sparse.indptr[atom0+1]]
+            distances[neighbors] = sparse.data[sparse.indptr[atom0]:sparse.indptr[atom0+1]]
+            allowed = (mask0[atom0] & mask1) | (mask1[atom0] & mask0)
+            allowed &= allowed_distances[distances]
+            yield atom0, allowed.nonzero()[0]
+            distances[neighbors] = 0
+
     def yield_pairs(self, graph):
-        n = len(graph.numbers)
-        for atom0 in xrange(n):
-            for atom1 in xrange(n):
-                if ((self.atom0_criterion(atom0, graph) and self.atom1_criterion(atom1, graph)) or
-                    (self.atom0_criterion(atom1, graph) and self.atom1_criterion(atom0, graph))):
-                    distance = graph.distances[atom0, atom1]
-                    if self.nonbond_filter(distance):
-                        #print atom0, atom1
-                        yield atom0, atom1
+        for atom0, partners in self._iter_partners(graph):
+            for atom1 in partners:
+                yield atom0, atom1
+
+    def _get_atom_mask(self, criterion, graph):
+        if hasattr(graph, "get_atom_mask"):
+            return graph.get_atom_mask(criterion)
+        elif criterion is None:
+            return numpy.ones(len(graph.numbers), bool)
+        else:
+            return numpy.array([bool(criterion(atom, graph)) for atom in xrange(len(graph.numbers))], bool)
 
     def init_graph(self, graph):
-        # The nonbonding pairs are enumerated here
-        self.indices = numpy.array(list(self.yield_pairs(graph)), int)
-        #for row in self.indices:
-        #    print [graph.numbers[index] for index in row]
-
-    def _get_neighbor_cells(self, unit_cell):
-        # enumerate all periodic images that might be relevant for the nonbonding
-        # interactions in the cutoff radius
-        signs = numpy.array([
-            [ 1,  1,  1],
-            [ 1,  1, -1],
-            [ 1, -1,  1],
-            [ 1, -1, -1],
-            [-1,  1,  1],
-            [-1,  1, -1],
-            [-1, -1,  1],
-            [-1, -1, -1],
-        ], int)
-        #neighbor_cells = [[0, 0, 0]]
-        neighbor_cells = []
-
-        def yield_shell(p):
-            for a in xrange(0, p+1):
-                for b in xrange(0, p-a+1):
-                    c = p-a-b
-                    tmp = numpy.array([a,b,c], float)
-                    for sign in signs:
-                        if ((sign < 0) * (tmp == 0)).any():
-                            continue
-                        yield tmp*sign
-
-
-        def pair(la, lb):
-            for a in la:
-                for b in lb:
-                    yield a, b
-
-
-
-        found_new = True
-        p = 1
-        while found_new:
-            #print "p", p, len(neighbor_cells)
-            found_new = False
-            for indices in yield_shell(p):
-                #print "indices", indices
-                corners_center = numpy.dot(0.5*signs, unit_cell.cell.transpose())
-                corners_other = numpy.dot(0.5*signs + indices, unit_cell.cell.transpose())
-                for corner_center, corner_other in pair(corners_center, corners_other):
-                    distance = numpy.linalg.norm(corner_other - corner_center)
-                    if distance < self.cutoff:
-                        neighbor_cells.append(indices)
-                        found_new = True
-                        break
-            p += 1
-        return numpy.array(neighbor_cells, int)
+        # The nonbonding pairs are not enumerated here, because there are
+        # O(N**2) of them. Instead, the criteria are evaluated for each atom
+        # and the filter for each graph distance. See get_allowed.
+        self.graph = graph
+        self.size = len(graph.numbers)
+        self._indices = None
+        self.mask0 = self._get_atom_mask(self.atom0_criterion, graph)
+        self.mask1 = self._get_atom_mask(self.atom1_criterion, graph)
+        self.allowed_distances = self.get_allowed_distances(graph)
+        sparse = graph.get_sparse_distances(len(self.allowed_distances) - 1).tocoo()
+        keys = sparse.row.astype(int)*self.size + sparse.col
+        order = keys.argsort()
+        self.graph_distance_keys = keys[order]
+        self.graph_distance_values = sparse.data[order]
+
+    def _get_indices(self):
+        if self._indices is None:
+            rows = []
+            for atom0, partners in self._iter_partners(self.graph):
+                row = numpy.zeros((len(partners), 2), int)
+                row[:,0] = atom0
+                row[:,1] = partners
+                rows.append(row)
+            if len(rows) > 0:
+                self._indices = numpy.concatenate(rows)
+            else:
+                self._indices = numpy.zeros((0, 2), int)
+        return self._indices
+
+    indices = property(
+        _get_indices,
+        doc="All ordered pairs of interacting atoms. This is slow for large systems."
+    )
+
+    def get_graph_distances(self, indices1, indices2):
+        """Return the graph distances between the given atoms, see max_graph_distance."""
+        keys = indices1*self.size + indices2
+        result = numpy.zeros(len(keys), int)
+        if len(self.graph_distance_keys) > 0:
+            positions = self.graph_distance_keys.searchsorted(keys)
+            positions = numpy.minimum(positions, len(self.graph_distance_keys) - 1)
+            found = self.graph_distance_keys[positions] == keys
+            result[found] = self.graph_distance_values[positions[found]]
+        return result
+
+    def get_allowed(self, indices1, indices2):
+        """Return a mask that selects the pairs of atoms that interact."""
+        result = (self.mask0[indices1] & self.mask1[indices2]) | (self.mask0[indices2] & self.mask1[indices1])
+        result &= self.allowed_distances[self.get_graph_distances(indices1, indices2)]
+        return result
+
+    def _add_pairs(self, indices1, indices2, deltas, gradient_sum):
+        # deltas are the relative vectors from the atoms in indices1 to the
+        # atoms in indices2. Returns the energy of these pairs.
+        if len(deltas) == 0:
+            return 0.0
+        distances = numpy.sqrt((deltas**2).sum(axis=1))
+        energy_cutoff, foo = self.calculate_eg(self.cutoff)
+        del foo
+        energies, gscalars = self.calculate_eg(distances)
+        energies = numpy.zeros(len(distances), float) + energies
+        gradients = (numpy.zeros(len(distances), float) + gscalars/distances).reshape(-1, 1)*deltas
+        for i in xrange(3):
+            gradient_sum[:,i] += numpy.bincount(indices2, gradients[:,i], minlength=len(gradient_sum))
+            gradient_sum[:,i] -= numpy.bincount(indices1, gradients[:,i], minlength=len(gradient_sum))
+        return (energies - energy_cutoff).sum()
+
+    def _call_neighbor_list(self, coordinates, gradient_sum, unit_cell):
+        if self.neighbor_list is None or self.neighbor_list.unit_cell is not unit_cell:
+            self.neighbor_list = NeighborList(self.cutoff, self.skin, unit_cell)
+        indices1, indices2, deltas, distances = self.neighbor_list.update(coordinates)
+        mask = self.get_allowed(indices1, indices2)
+        return self._add_pairs(indices2[mask], indices1[mask], deltas[mask], gradient_sum)
 
     def __call__(self, coordinates, gradient_sum, unit_cell):
-        energy_sum = 0.0
+        if self.skin is not None:
+            return self._call_neighbor_list(coordinates, gradient_sum, unit_cell)
+        # put all atoms in the unit cell, such that the periodic images from
+        # get_images contain all pairs within the cutoff.
+        wrapped = coordinates - unit_cell.to_cartesian(unit_cell.to_index(coordinates))
+        cell_list = CellList(wrapped, self.cutoff)
+        if (self.images is None or (self.images_cell != unit_cell.cell).any() or
+            (self.images_active != unit_cell.cell_active).any()):
+            self.images = cell_list.get_images(unit_cell, self.cutoff)
+            self.images_cell = unit_cell.cell.copy()
+            self.images_active = unit_cell.cell_active.copy()
+        # each pair of atoms is found once for each periodic image within the
+        # cutoff.
+        indices1, indices2, deltas = cell_list.get_pairs(
+            unit_cell=unit_cell, radius=self.cutoff, images=self.images
+        )
+        mask = self.get_allowed(indices1, indices2)
+        energy_sum = self._add_pairs(indices1[mask], indices2[mask], deltas[mask], gradient_sum)
+        # the interactions of atoms with their own periodic images only
+        # contribute to the energy. Each image is found twice, at opposite
+        # sides.
+        lengths = numpy.sqrt((self.images**2).sum(axis=1))
+        lengths = lengths[(lengths > 0) & (lengths < self.cutoff)]
+        if len(lengths) > 0:
+            energy_sum += self._get_self_image_energy(lengths)
+        return energy_sum
+
+    def _get_self_image_energy(self, lengths):
+        # lengths are the distances between an atom and its periodic images
+        # within the cutoff, at both sides.
+        atoms = numpy.arange(self.size)
+        num_self = self.get_allowed(atoms, atoms).sum()
+        if num_self == 0:
+            return 0.0
         energy_cutoff, foo = self.calculate_eg(self.cutoff)
+        energies, foo = self.calculate_eg(lengths)
+        del foo
+        energies = numpy.zeros(len(lengths), float) + energies
+        return 0.5*num_self*(energies - energy_cutoff).sum()
+
+
+def get_ewald_alpha(cutoff, tolerance):
+    """Select the Ewald splitting parameter for a given real-space cutoff.
+
+    The real-space interactions erfc(alpha*r)/r are truncated at the cutoff,
+    where erfc(alpha*cutoff) equals the tolerance. A larger cutoff gives a
+    smaller alpha, which reduces the number of wave vectors in the reciprocal
+    sum at the same accuracy, i.e. the cutoff balances the real-space work
+    against the reciprocal-space work.
+    """
+    return scipy.special.erfcinv(tolerance)/cutoff
+
+
+def get_ewald_kmax(unit_cell, alpha, tolerance):
+    """Select the reciprocal-space cutoff of the Ewald sum.
+
+    The reciprocal sum is truncated at the wave vector length where
+    exp(-k**2/(4*alpha**2)) equals the tolerance. Returns an array with the
+    largest integer wave vector component along each cell vector.
+    """
+    k_cutoff = 2*alpha*numpy.sqrt(-numpy.log(tolerance))
+    lengths = numpy.sqrt((unit_cell.cell**2).sum(axis=0))
+    return numpy.ceil(k_cutoff*lengths/(2*numpy.pi)).astype(int)
+
+
+class EwaldTerm(NonbondTerm):
+    def __init__(self, label, charges, cutoff, tolerance=1e-6, alpha=None, kmax=None, nonbond_filter=None, skin=None, max_graph_distance=None):
+        """Initialize an EwaldTerm
+
+        The electrostatic energy of point charges in a unit cell that is
+        periodic in three directions. When the total charge is not zero, a
+        uniform neutralizing background is included. The sum is split in a
+        real-space part, that is evaluated like a NonbondTerm with the given
+        cutoff and skin, a sum over the wave vectors in reciprocal space and a
+        self-correction.
+
+        Arguments:
+          label  --  a name for the energy term
+          charges  --  an array with the charge of each atom
+          cutoff  --  the real-space cutoff
+
+        Optional arguments:
+          tolerance  --  the relative error of the truncated real-space and
+                         reciprocal-space sums, see get_ewald_alpha and
+                         get_ewald_kmax
+          alpha  --  the Ewald splitting parameter, overrides the tolerance
+          kmax  --  the largest integer wave vector component along each cell
+                    vector, overrides the tolerance
+          nonbond_filter  --  when given, the pairs whose graph distance is
+                              rejected by the filter (e.g. the 1-2 and 1-3
+                              pairs) do not interact. Their contribution is
+                              subtracted from the reciprocal-space sum. The
+                              longest excluded pair plus the cutoff must be
+                              smaller than the unit cell spacing.
+          skin, max_graph_distance  --  see NonbondTerm
+        """
+        self.charges = numpy.asarray(charges, float)
+        self.tolerance = tolerance
+        if alpha is None:
+            alpha = get_ewald_alpha(cutoff, tolerance)
+        self.alpha = alpha
+        self.kmax = kmax
+        self.reciprocal_cell = None
+        if nonbond_filter is None:
+            # all pairs interact, no need to compute graph distances
+            nonbond_filter = (lambda distance: True)
+            max_graph_distance = 0
+        NonbondTerm.__init__(
+            self, label, self.calculate_real_eg, (None, None), nonbond_filter,
+            cutoff, skin, max_graph_distance
+        )
+
+    def calculate_real_eg(self, distances):
+        """The screened interaction erfc(alpha*r)/r and its derivative."""
+        energies = scipy.special.erfc(self.alpha*distances)/distances
+        gaussians = 2*self.alpha/numpy.sqrt(numpy.pi)*numpy.exp(-(self.alpha*distances)**2)
+        return energies, -(energies + gaussians)/distances
+
+    def init_graph(self, graph):
+        NonbondTerm.init_graph(self, graph)
+        if len(self.charges) != self.size:
+            raise ValueError("The number of charges (%i) does not match the number of atoms (%i)." % (len(self.charges), self.size))
+        # The excluded pairs are close in the graph. They are taken into
+        # account by the reciprocal-space sum and must be subtracted.
+        indices1 = self.graph_distance_keys/self.size
+        indices2 = self.graph_distance_keys%self.size
+        mask = indices1 < indices2
+        indices1 = indices1[mask]
+        indices2 = indices2[mask]
+        mask = ~self.get_allowed(indices1, indices2)
+        self.excluded1 = indices1[mask]
+        self.excluded2 = indices2[mask]
+
+    def _add_pairs(self, indices1, indices2, deltas, gradient_sum):
+        if len(deltas) == 0:
+            return 0.0
+        distances = numpy.sqrt((deltas**2).sum(axis=1))
+        energies, gscalars = self.calculate_real_eg(distances)
+        products = self.charges[indices1]*self.charges[indices2]
+        gradients = _expand(products*gscalars/distances)*deltas
+        for i in xrange(3):
+            gradient_sum[:,i] += numpy.bincount(indices2, gradients[:,i], minlength=len(gradient_sum))
+            gradient_sum[:,i] -= numpy.bincount(indices1, gradients[:,i], minlength=len(gradient_sum))
+        return (products*energies).sum()
+
+    def _get_self_image_energy(self, lengths):
+        atoms = numpy.arange(self.size)
+        allowed = self.get_allowed(atoms, atoms)
+        energies, foo = self.calculate_real_eg(lengths)
         del foo
+        return 0.5*(self.charges[allowed]**2).sum()*energies.sum()
+
+    def _add_exclusions(self, coordinates, gradient_sum, unit_cell):
+        if len(self.excluded1) == 0:
+            return 0.0
+        deltas = unit_cell.shortest_vector(coordinates[self.excluded2] - coordinates[self.excluded1])
+        distances = numpy.sqrt((deltas**2).sum(axis=1))
+        # Only the minimum image of an excluded pair is subtracted, while the
+        # real-space sum skips all its images. This is only correct when the
+        # minimum image is unique and the other images are beyond the cutoff.
+        spacing = 1/numpy.sqrt((unit_cell.cell_reciproke**2).sum(axis=1)).max()
+        if distances.max() + max(distances.max(), self.cutoff) >= spacing:
+            raise ValueError("The unit cell is too small for the excluded pairs. The longest excluded pair plus the cutoff must be smaller than the unit cell spacing.")
+        # the interaction erf(alpha*r)/r is subtracted.
+        energies = scipy.special.erf(self.alpha*distances)/distances
+        gaussians = 2*self.alpha/numpy.sqrt(numpy.pi)*numpy.exp(-(self.alpha*distances)**2)
+        products = self.charges[self.excluded1]*self.charges[self.excluded2]
+        gradients = _expand(products*(energies - gaussians)/distances**2)*deltas
+        for i in xrange(3):
+            gradient_sum[:,i] += numpy.bincount(self.excluded2, gradients[:,i], minlength=len(gradient_sum))
+            gradient_sum[:,i] -= numpy.bincount(self.excluded1, gradients[:,i], minlength=len(gradient_sum))
+        return -(products*energies).sum()
+
+    def init_reciprocal(self, unit_cell):
+        """Prepare the reciprocal-space sum for the given unit cell."""
+        kmax = self.kmax
+        if kmax is None:
+            kmax = get_ewald_kmax(unit_cell, self.alpha, self.tolerance)
+        # only one wave vector of each pair k, -k is included.
+        n = numpy.indices(2*numpy.asarray(kmax) + 1).reshape(3, -1).transpose() - kmax
+        n = n[(n[:,0] > 0) | ((n[:,0] == 0) & ((n[:,1] > 0) | ((n[:,1] == 0) & (n[:,2] > 0))))]
+        wave_vectors = 2*numpy.pi*numpy.dot(n, unit_cell.cell_reciproke)
+        k2 = (wave_vectors**2).sum(axis=1)
+        gaussians = numpy.exp(-0.25*k2/self.alpha**2)
+        if self.kmax is None:
+            # drop the corners of the box that are outside the spherical cutoff
+            mask = gaussians > self.tolerance
+            wave_vectors = wave_vectors[mask]
+            gaussians = gaussians[mask]
+            k2 = k2[mask]
+        self.wave_vectors = wave_vectors
+        self.wave_factors = 4*numpy.pi/unit_cell.generalized_volume()*gaussians/k2
+
+    def _add_reciprocal(self, coordinates, gradient_sum, unit_cell):
+        energy = 0.0
+        # the wave vectors are processed in chunks to limit the memory usage
+        chunk_size = max(1, 1000000/max(1, self.size))
+        for start in xrange(0, len(self.wave_vectors), chunk_size):
+            wave_vectors = self.wave_vectors[start:start+chunk_size]
+            factors = self.wave_factors[start:start+chunk_size]
+            phases = numpy.dot(coordinates, wave_vectors.transpose())
+            cosines = _expand(self.charges)*numpy.cos(phases)
+            sines = _expand(self.charges)*numpy.sin(phases)
+            # real and imaginary part of the structure factors
+            real = cosines.sum(axis=0)
+            imag = sines.sum(axis=0)
+            energy += (factors*(real**2 + imag**2)).sum()
+            gradient_sum += 2*numpy.dot(cosines*(factors*imag) - sines*(factors*real), wave_vectors)
+        return energy
+
+    def _get_self_energy(self, unit_cell):
+        # the interaction of each charge with its own screening charge and the
+        # interaction with the neutralizing background.
+        volume = unit_cell.generalized_volume()
+        return (
+            -self.alpha/numpy.sqrt(numpy.pi)*(self.charges**2).sum()
+            -0.5*numpy.pi*self.charges.sum()**2/(volume*self.alpha**2)
+        )
+
+    def __call__(self, coordinates, gradient_sum, unit_cell):
         if not unit_cell.cell_active.all():
-            raise NotImplementedError("Only 3D periodic cells are supported.")
-        neighbor_cells = self._get_neighbor_cells(unit_cell)
-        #print neighbor_cells
-        for atom0, atom1 in self.indices:
-            for neighbor_cell in neighbor_cells:
-                delta = coordinates[atom0] - coordinates[atom1] + numpy.dot(unit_cell.cell, neighbor_cell)
-                distance = numpy.linalg.norm(delta)
-                #print distance, self.cutoff
-                if distance < self.cutoff:
-                    #print "Neighbor cell", neighbor_cell, atom0, atom1
-                    energy, gscalar = self.calculate_eg(distance)
-                    direction = delta/distance
-                    energy_sum += 0.5*(energy - energy_cutoff)
-                    gradient_sum[atom0] += 0.5*gscalar*direction
-                    gradient_sum[atom1] -= 0.5*gscalar*direction
-        for atom0, atom1 in self.indices:
-            if atom0 > atom1:
-                delta = coordinates[atom0] - coordinates[atom1]
-                distance = numpy.linalg.norm(delta)
-                if distance < self.cutoff:
-                    #print "Same cell", atom0, atom1
-                    energy, gscalar = self.calculate_eg(distance)
-                    energy_sum += energy - energy_cutoff
-                    direction = delta/distance
-                    gradient_sum[atom0] += gscalar*direction
-                    gradient_sum[atom1] -= gscalar*direction
+            raise ValueError("The Ewald summation requires a unit cell that is periodic in three directions.")
+        if self.reciprocal_cell is None or (self.reciprocal_cell != unit_cell.cell).any():
+            self.init_reciprocal(unit_cell)
+            self.reciprocal_cell = unit_cell.cell.copy()
+        energy_sum = self._add_exclusions(coordinates, gradient_sum, unit_cell)
+        energy_sum += NonbondTerm.__call__(self, coordinates, gradient_sum, unit_cell)
+        energy_sum += self._add_reciprocal(coordinates, gradient_sum, unit_cell)
+        energy_sum += self._get_self_energy(unit_cell)
         return energy_sum
 
 
+def _bspline(x, order):
+    """The cardinal B-spline of the given order, nonzero for 0 < x < order."""
+    if order == 1:
+        return ((x >= 0) & (x < 1)).astype(float)
+    return (x*_bspline(x, order-1) + (order - x)*_bspline(x - 1, order-1))/(order - 1)
+
+
+def _get_fft_size(n):
+    """The smallest integer not below n without prime factors larger than 5."""
+    while True:
+        m = n
+        for factor in 2, 3, 5:
+            while m % factor == 0:
+                m /= factor
+        if m == 1:
+            return n
+        n += 1
+
+
+class PMETerm(EwaldTerm):
+    def __init__(self, label, charges, cutoff, tolerance=1e-6, alpha=None, grid=None, order=4, nonbond_filter=None, skin=None, max_graph_distance=None):
+        """Initialize a PMETerm
+
+        The smooth particle-mesh Ewald method evaluates the same energy as the
+        EwaldTerm, but the reciprocal-space sum is computed on a grid. The
+        charges are spread on the grid with cardinal B-splines of the given
+        order and the convolution with the reciprocal-space kernel is carried
+        out with FFTs. The cost scales as O(N log N) instead of O(N**1.5).
+
+        Arguments: see EwaldTerm, except for
+
+          grid  --  the number of grid points along each cell vector. When not
+                    given, the grid is derived from the tolerance.
+          order  --  the order of the B-splines
+        """
+        self.grid = grid
+        self.order = order
+        EwaldTerm.__init__(
+            self, label, charges, cutoff, tolerance, alpha, None,
+            nonbond_filter, skin, max_graph_distance
+        )
+
+    def init_reciprocal(self, unit_cell):
+        grid = self.grid
+        if grid is None:
+            kmax = get_ewald_kmax(unit_cell, self.alpha, self.tolerance)
+            # The interpolation error decreases quickly with the grid
+            # spacing, faster for higher orders. Three grid points per unit
+            # of kmax suffice for a tolerance of 1e-4.
+            factor = 3*max(1.0, 1e-4/self.tolerance)**(1.0/(self.order + 2))
+            grid = [_get_fft_size(max(self.order, int(numpy.ceil(factor*n)))) for n in kmax]
+        self.grid_shape = numpy.array(grid, int)
+        # the integer wave vectors in the layout of numpy.fft.rfftn
+        m0 = numpy.fft.fftfreq(grid[0])*grid[0]
+        m1 = numpy.fft.fftfreq(grid[1])*grid[1]
+        m2 = numpy.arange(grid[2]/2 + 1)
+        m = (
+            m0.reshape(-1,1,1,1)*unit_cell.cell_reciproke[0] +
+            m1.reshape(1,-1,1,1)*unit_cell.cell_reciproke[1] +
+            m2.reshape(1,1,-1,1)*unit_cell.cell_reciproke[2]
+        )
+        msq = (m**2).sum(axis=3)
+        msq[0,0,0] = 1.0
+        kernel = numpy.exp(-(numpy.pi/self.alpha)**2*msq)/(numpy.pi*unit_cell.generalized_volume()*msq)
+        kernel[0,0,0] = 0.0
+        # the correction for the B-spline interpolation of the structure factor
+        weights = _bspline(numpy.arange(1, self.order), self.order)
+        for axis, (size, ms) in enumerate(zip(grid, [m0, m1, m2])):
+            denominators = abs(numpy.dot(
+                numpy.exp(2j*numpy.pi*numpy.outer(ms, numpy.arange(self.order - 1))/size),
+                weights
+            ))**2
+            # For an odd order, the denominator vanishes at the Nyquist
+            # frequency. That component is dropped.
+            moduli = numpy.zeros(len(ms), float)
+            mask = denominators > 1e-10
+            moduli[mask] = 1/denominators[mask]
+            shape = [1, 1, 1]
+            shape[axis] = -1
+            kernel *= moduli.reshape(shape)
+        self.kernel = kernel
+
+    def _add_reciprocal(self, coordinates, gradient_sum, unit_cell):
+        grid = self.grid_shape
+        fractional = unit_cell.to_fractional(coordinates)
+        scaled = (fractional - numpy.floor(fractional))*grid
+        base = numpy.floor(scaled).astype(int)
+        # the B-spline weights and their derivatives of the grid points
+        # base-j, j=0..order-1, along each axis.
+        x = _expand(scaled - base) + numpy.arange(self.order)
+        weights = _bspline(x, self.order)
+        derivatives = _bspline(x, self.order-1) - _bspline(x - 1, self.order-1)
+        points = (_expand(base) - numpy.arange(self.order)) % _expand(grid)
+        indices = (
+            points[:,0,:,numpy.newaxis,numpy.newaxis]*(grid[1]*grid[2]) +
+            points[:,1,numpy.newaxis,:,numpy.newaxis]*grid[2] +
+            points[:,2,numpy.newaxis,numpy.newaxis,:]
+        )
+        w0 = weights[:,0,:,numpy.newaxis,numpy.newaxis]
+        w1 = weights[:,1,numpy.newaxis,:,numpy.newaxis]
+        w2 = weights[:,2,numpy.newaxis,numpy.newaxis,:]
+        spread = self.charges.reshape(-1,1,1,1)*w0*w1*w2
+        charge_grid = numpy.bincount(indices.ravel(), spread.ravel(), minlength=grid.prod()).reshape(grid)
+        # the potential on the grid points is the convolution with the kernel
+        potential = numpy.fft.irfftn(
+            numpy.fft.rfftn(charge_grid)*self.kernel, charge_grid.shape
+        )*grid.prod()
+        energy = 0.5*(charge_grid*potential).sum()
+        local = potential.ravel()[indices]
+        scaled_gradient = numpy.array([
+            (local*derivatives[:,0,:,numpy.newaxis,numpy.newaxis]*w1*w2).sum(axis=3).sum(axis=2).sum(axis=1),
+            (local*w0*derivatives[:,1,numpy.newaxis,:,numpy.newaxis]*w2).sum(axis=3).sum(axis=2).sum(axis=1),
+            (local*w0*w1*derivatives[:,2,numpy.newaxis,numpy.newaxis,:]).sum(axis=3).sum(axis=2).sum(axis=1),
+        ]).transpose()
+        gradient_sum += numpy.dot(_expand(self.charges)*scaled_gradient*grid, unit_cell.cell_reciproke)
+        return energy
+
+
 class ForceField(object):
     def __init__(self, graph, unit_cell, terms):
         self.graph = graph
@@ -304,12 +757,40 @@ class ForceField(object):
         for term in terms:
             term.init_graph(graph)
 
-    def __call__(self, coordinates):
-        energy_sum = 0.0
+    def __call__(self, coordinates, do_gradient=True):
+        """Compute the energy and optionally the gradient.
+
+        The coordinates of a batch of K structures can be given as an array
+        with shape (K, N, 3). Then an array with K energies and the gradients
+        of all structures are returned. The terms that support batches (see
+        EnergyTerm.batched) process all structures at once. A flat array with
+        3N coordinates is also accepted, in which case the gradient is flat
+        too. When do_gradient is False, only the energy is returned.
+
+        The minimizers in molmod.minimizer call fun(x) for the energy alone,
+        so they need a function like this one:
+          lambda x, do_gradient=False: force_field(x, do_gradient)
+        """
+        shape = coordinates.shape
+        if len(shape) == 1:
+            coordinates = coordinates.reshape((-1, 3))
         gradient_sum = numpy.zeros(coordinates.shape, float)
-        for term in self.terms:
-            energy_sum += term(coordinates, gradient_sum, self.unit_cell)
-        return energy_sum, gradient_sum
+        if len(coordinates.shape) == 3:
+            energy_sum = numpy.zeros(len(coordinates), float)
+            for term in self.terms:
+                if term.batched:
+                    energy_sum += term(coordinates, gradient_sum, self.unit_cell)
+                else:
+                    for i in xrange(len(coordinates)):
+                        energy_sum[i] += term(coordinates[i], gradient_sum[i], self.unit_cell)
+        else:
+            energy_sum = 0.0
+            for term in self.terms:
+                energy_sum += term(coordinates, gradient_sum, self.unit_cell)
+        if do_gradient:
+            return energy_sum, gradient_sum.reshape(shape)
+        else:
+            return energy_sum
 
 
 
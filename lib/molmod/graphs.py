@@ -29,8 +29,9 @@ Some distinctive features include:
     http://en.wikipedia.org/wiki/Dijkstra's_algorithm
 * Iterating over nodes or pairs using the Breadth First convention
     http://en.wikipedia.org/wiki/Breadth-first_search
-* The all pairs shortest path matrix (Floyd-Warshall)
-    http://en.wikipedia.org/wiki/Floyd-Warshall_algorithm
+* The all pairs shortest path matrix (Breadth First), also in a sparse form
+  that only contains the distances up to a given number of pairs.
+    http://en.wikipedia.org/wiki/Breadth-first_search
 * Symmetry analysis of graphs (automorphisms)
     The Graph class can generate a list of permutations between nodes that
     map the graph onto itself. This can be used to generate (and test) all
@@ -54,7 +55,7 @@ import copy, numpy
 
 
 __all__ = [
-    "OneToOneError", "OneToOne", "GraphError", "cached", "Graph",
+    "OneToOneError", "OneToOne", "GraphError", "cached", "Graph", "GraphIndex",
     "Match", "PatternError", "Pattern",
     "CriteriaSet", "Anything", "CritOr", "CritAnd", "CritXor", "CritNot",
     "CritNodeString", "CritPairString",
@@ -306,19 +307,84 @@ class Graph(object):
             neighbors[b].add(a)
         return neighbors
 
+    @cached
+    def adjacency_matrix(self):
+        """The sparse (CSR) adjacency matrix, with ones for each pair."""
+        import scipy.sparse
+        pairs = numpy.array([tuple(pair) for pair in self.pairs], int).reshape(-1, 2)
+        rows = numpy.concatenate([pairs[:,0], pairs[:,1]])
+        cols = numpy.concatenate([pairs[:,1], pairs[:,0]])
+        return scipy.sparse.csr_matrix(
+            (numpy.ones(len(rows), numpy.int32), (rows, cols)),
+            shape=(self.num_nodes, self.num_nodes)
+        )
+
     @cached
     def distances(self):
-        """Construct the matrix with the all-pairs shortest path."""
-        from molmod.ext import graphs_floyd_warshall
+        """Construct the matrix with the all-pairs shortest path.
+
+        A breadth first search is started from each node. All searches advance
+        one level at a time with a sparse matrix product, which takes O(N*E)
+        operations. The distance between disconnected nodes is zero. This
+        int32 matrix takes O(N**2) memory. Use get_sparse_distances when only
+        the short distances are needed.
+        """
+        import scipy.sparse
         distances = numpy.zeros((self.num_nodes, self.num_nodes), numpy.int32)
-        #distances[:] = -1 # set all -1, which is just a very big integer
-        #distances.ravel()[::len(distances)+1] = 0 # set diagonal to zero
-        for i,j in self.pairs: # set pairs to one
-            distances[i,j] = 1
-            distances[j,i] = 1
-        graphs_floyd_warshall(distances)
+        adjacency = self.adjacency_matrix
+        # row i of the frontier contains the nodes at the current distance
+        # from node i.
+        frontier = scipy.sparse.identity(self.num_nodes, numpy.int32, format="csr")
+        flat = distances.ravel()
+        distance = 0
+        while frontier.nnz > 0:
+            distance += 1
+            new = frontier*adjacency
+            rows = numpy.repeat(numpy.arange(self.num_nodes), numpy.diff(new.indptr))
+            keys = rows*self.num_nodes + new.indices
+            # only keep the nodes that are not reached yet
+            mask = (flat[keys] == 0) & (rows != new.indices)
+            flat[keys[mask]] = distance
+            indptr = numpy.zeros(self.num_nodes+1, int)
+            indptr[1:] = numpy.bincount(rows[mask], minlength=self.num_nodes).cumsum()
+            frontier = scipy.sparse.csr_matrix(
+                (numpy.ones(mask.sum(), numpy.int32), new.indices[mask], indptr),
+                shape=(self.num_nodes, self.num_nodes)
+            )
         return distances
 
+    def get_sparse_distances(self, max_distance):
+        """Compute the shortest path lengths up to max_distance pairs.
+
+        Argument:
+          max_distance -- the maximum distance
+
+        A breadth first search is carried out from all nodes at once, up to
+        the given depth. The result is a symmetric scipy.sparse CSR matrix
+        with int32 values. Disconnected nodes, nodes further apart than
+        max_distance and the diagonal are not stored, i.e. they have a zero
+        distance, just like in the distances matrix.
+        """
+        import scipy.sparse
+        adjacency = self.adjacency_matrix
+        reached = scipy.sparse.identity(self.num_nodes, numpy.int32, format="csr")
+        frontier = reached
+        result = scipy.sparse.csr_matrix((self.num_nodes, self.num_nodes), dtype=numpy.int32)
+        for distance in xrange(1, max_distance+1):
+            # nodes that are one step further than the current frontier and
+            # that are not reached yet.
+            new = frontier*adjacency
+            new = new - new.multiply(reached)
+            new.eliminate_zeros()
+            if new.nnz == 0:
+                break
+            new.data[:] = 1
+            result = result + new*distance
+            reached = reached + new
+            frontier = new
+        result.sort_indices()
+        return result
+
     @cached
     def max_distance(self):
         """The maximum value in the distances matrix."""
@@ -428,80 +494,176 @@ class Graph(object):
     def canonical_order(self):
         """The nodes in a canonical or normalized order.
 
-        This routine will return a list of nodes in an order that does not
+        This routine will return a list of all nodes in an order that does not
         depend on the initial order, but only depends on the connectivity and
-        the return values of the function self.get_node_string.
-
-        Only the nodes that are involved in pairs will be included. The result
-        can be given as first argument to self.get_subgraph, with reduce=True
-        as second argument. This will return a complete canonical graph.
-
-        The routine is designed not to use symmetry relations that are obtained
-        with the GraphSearch routine. We also tried to create an ordering that
-        feels like natural, i.e. starting in the center and pushing nodes with
-        few equivalents to the front. If necessary, the nature of the nodes and
-        their bonds to atoms closer to the center will also play a role, but
-        only as a last resort.
+        the return values of the functions self.get_node_string and
+        self.get_pair_string. The result can be given as first argument to
+        self.get_subgraph, with normalize=True as second argument. This will
+        return a complete canonical graph.
+
+        The canonical labeling is constructed with partition refinement and
+        individualization (the approach of McKay's nauty): the nodes are
+        colored by their node strings and the colors are refined until nodes
+        with the same color have the same number of neighbors of each color.
+        When some colors are still shared by several nodes, each of the nodes
+        of one such color is given a color of its own in turn and the
+        refinement continues. Each discrete coloring is a candidate ordering
+        and the one with the smallest certificate is retained. Branches that
+        are equivalent under the automorphisms found so far are skipped.
+
+        Disconnected graphs are treated one part at a time. The parts are
+        ordered by their canonical forms.
+        """
+        if len(self.independent_nodes) > 1:
+            parts = []
+            for group in self.independent_nodes:
+                subgraph = self.get_subgraph(group, normalize=True)
+                parts.append((
+                    subgraph.canonical_form,
+                    [group[node] for node in subgraph.canonical_order]
+                ))
+            parts.sort()
+            result = []
+            for form, order in parts:
+                result.extend(order)
+            return result
+
+        node_strings = [self.get_node_string(node) for node in xrange(self.num_nodes)]
+        pair_strings = [self.get_pair_string(index) for index in xrange(self.num_pairs)]
+        # integer colors for the nodes and the pairs, ordered like the strings
+        node_colors = self._get_ranks(node_strings)
+        pair_colors = self._get_ranks(pair_strings)
+        colored_neighbors = [[] for node in xrange(self.num_nodes)]
+        for (a, b), pair_color in zip(self.pairs, pair_colors):
+            colored_neighbors[a].append((pair_color, b))
+            colored_neighbors[b].append((pair_color, a))
+
+        def refine(colors):
+            num_colors = len(set(colors))
+            while True:
+                signatures = [
+                    (colors[node], tuple(sorted(
+                        (pair_color, colors[neighbor]) for pair_color, neighbor
+                        in colored_neighbors[node]
+                    ))) for node in xrange(self.num_nodes)
+                ]
+                colors = self._get_ranks(signatures)
+                if len(set(colors)) == num_colors:
+                    return colors
+                num_colors = len(set(colors))
+
+        def get_certificate(colors):
+            return (
+                tuple(node_strings[node] for node in get_order(colors)),
+                tuple(sorted(
+                    (min(colors[a], colors[b]), max(colors[a], colors[b]), pair_color)
+                    for (a, b), pair_color in zip(self.pairs, pair_colors)
+                )),
+            )
+
+        def get_order(colors):
+            order = [None]*self.num_nodes
+            for node, color in enumerate(colors):
+                order[color] = node
+            return order
+
+        def get_orbit(node, fixed):
+            # the orbit of node under the automorphisms that fix all nodes in
+            # the list fixed.
+            generators = [
+                automorphism for automorphism in automorphisms
+                if all(automorphism[other] == other for other in fixed)
+            ]
+            orbit = set([node])
+            todo = [node]
+            while len(todo) > 0:
+                current = todo.pop()
+                for automorphism in generators:
+                    image = automorphism[current]
+                    if image not in orbit:
+                        orbit.add(image)
+                        todo.append(image)
+            return orbit
+
+        best = []
+        automorphisms = []
+
+        def search(colors, fixed):
+            # Returns the depth of the search tree where the search continues.
+            # This is smaller than len(fixed) when an automorphism was found.
+            # Then all branches below the common ancestor with the best leaf
+            # are images of branches that were already explored.
+            counts = {}
+            for color in colors:
+                counts[color] = counts.get(color, 0) + 1
+            cells = [color for color, count in counts.iteritems() if count > 1]
+            if len(cells) == 0:
+                # a discrete coloring, i.e. a candidate for the canonical order
+                certificate = get_certificate(colors)
+                order = get_order(colors)
+                if len(best) == 0 or certificate < best[0]:
+                    best[:] = [certificate, order, fixed]
+                elif certificate == best[0]:
+                    automorphism = [None]*self.num_nodes
+                    for node, best_node in zip(order, best[1]):
+                        automorphism[node] = best_node
+                    automorphisms.append(automorphism)
+                    depth = 0
+                    while fixed[depth] == best[2][depth]:
+                        depth += 1
+                    return depth
+                return len(fixed)
+            # individualize each node of the first cell that is not a singleton
+            cell = min(cells)
+            done = []
+            for node in xrange(self.num_nodes):
+                if colors[node] != cell:
+                    continue
+                if len(done) > 0 and not get_orbit(node, fixed).isdisjoint(done):
+                    continue
+                new_colors = [2*color+1 for color in colors]
+                new_colors[node] -= 1
+                depth = search(refine(self._get_ranks(new_colors)), fixed + [node])
+                if depth < len(fixed):
+                    return depth
+                done.append(node)
+            return len(fixed)
+
+        search(refine(node_colors), [])
+        return best[1]
+
+    @cached
+    def canonical_form(self):
+        """A string that is the same for all isomorphic graphs.
+
+        Two graphs have the same canonical form if and only if they are
+        isomorphic, taking into account the return values of the methods
+        get_node_string and get_pair_string.
+        """
+        order = self.canonical_order
+        labels = numpy.zeros(self.num_nodes, int)
+        labels[order] = numpy.arange(self.num_nodes)
+        node_strs = ",".join(repr(self.get_node_string(node)) for node in order)
+        pair_strs = ",".join(sorted(
+            "%i_%i_%r" % (min(labels[a], labels[b]), max(labels[a], labels[b]), self.get_pair_string(index))
+            for index, (a, b) in enumerate(self.pairs)
+        ))
+        return "%i %s %s" % (self.num_nodes, node_strs, pair_strs)
+
+    @cached
+    def canonical_hash(self):
+        """A compact hash (20 bytes) of the canonical form.
+
+        This hash can be used as a dictionary key to collect graphs up to
+        isomorphism, e.g. see GraphIndex.
         """
-        # A) find an appropriate starting node.
-        # Here we take a central node that has a minimal number of symmetrical
-        # equivalents, 'the highest atom number', and the highest fingerprint.
-        # Note that the symmetrical equivalents are computed from the node
-        # fingerprints, i.e. without the GraphSearch.
-        starting_node = max(
-            (
-                -len(self.equivalent_nodes[node]),
-                self.get_node_string(node),
-                str(buffer(self.node_fingerprints[node])),
-                node
-            ) for node in self.central_nodes
-        )[-1]
-
-        # B) sort all nodes based on
-        #      1) distance from central node
-        #      2) number of equivalent nodes
-        #      3) node string, (higher atom numbers come first)
-        #      4) fingerprint
-        #      5) node index
-        # The last field is only included to collect the result of the sort.
-        # The fingerprint on itself would be sufficient, but the three first are
-        # there to have a naturally appealing result.
-        l = [
-            [
-                -distance,
-                -len(self.equivalent_nodes[node]),
-                self.get_node_string(node),
-                str(buffer(self.node_fingerprints[node])),
-                node
-            ] for node, distance in self.iter_breadth_first(starting_node)
-            if len(self.neighbors[node]) > 0
-        ]
-        l.sort(reverse=True)
-
-        # C) The order of some nodes is still not completely set. e.g. consider
-        # the case of allene. The four hydrogen atoms are equivalent, but one
-        # can have two different orders: make geminiles consecutive or don't. It
-        # is more trikcy than one would think at first sight. In the case of
-        # allene, geminility could easily solve the problem. Consider a big flat
-        # rotationally symmetric molecule (order 2). The first five shells are
-        # order 4 and one would just give a random order to four segemnts in the
-        # first shell. Only when one reaches the outer part that has order two,
-        # it turns out that the arbitrary choices in the inner shell play a
-        # role. So it does not help to look at relations with nodes at inner or
-        # current shells only. One has to consider the whole picture.
-        # (unit testing reveals troubles like these)
-
-        # I need some sleep now. The code below checks for potential fuzz and
-        # will raise an error if the ordering is not fully determined yet. One
-        # day, I'll need this code more than I do now, and I'll fix things up.
-        # I know how to do this, but I don't care enough right now.
-        # -- Toon
-        for i in xrange(1, len(l)):
-            if l[i][:-1] == l[i-1][:-1]:
-                raise NotImplementedError("Volunteers, please finish this routine!")
-
-        # D) Return only the node indexes.
-        return [record[-1] for record in l]
+        import hashlib
+        return hashlib.sha1(self.canonical_form).digest()
+
+    def _get_ranks(self, keys):
+        """Return the rank of each key among the sorted unique keys."""
+        ranks = dict((key, rank) for rank, key in enumerate(sorted(set(keys))))
+        return [ranks[key] for key in keys]
 
     # other usefull graph functions
 
@@ -687,10 +849,11 @@ class Graph(object):
         # iterations
         if num_iter is None:
             num_iter = self.max_distance
+        pairs = numpy.array([tuple(pair) for pair in self.pairs], int).reshape(-1, 2)
         for i in xrange(num_iter):
-            for a,b in self.pairs:
-                work[a] += result[b]
-                work[b] += result[a]
+            # the sums wrap around, just like the in-place additions per pair
+            numpy.add.at(work, pairs[:,0], result[pairs[:,1]])
+            numpy.add.at(work, pairs[:,1], result[pairs[:,0]])
             #for a in xrange(self.num_nodes):
             #    for b in xrange(self.num_nodes):
             #        work[a] += hashrow(result[b]*self.distances[a,b])
@@ -870,6 +1033,68 @@ class Graph(object):
 # Pattern matching
 
 
+class GraphIndex(object):
+    """An in-memory collection of graphs, up to isomorphism.
+
+    The graphs are stored by their canonical hash, which makes it cheap to
+    test whether an isomorphic graph was added before, e.g. when duplicate
+    fragments are removed from a large library. A value can be associated
+    with each graph, e.g. a counter or a label. Only the canonical form of the
+    first graph of each isomorphism class is kept.
+    """
+
+    def __init__(self):
+        self._records = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, graph):
+        return self.get_key(graph) in self._records
+
+    def __getitem__(self, graph):
+        """Return the value associated with the graph."""
+        return self._records[self.get_key(graph)][1]
+
+    def __setitem__(self, graph, value):
+        graph = self._get_graph(graph)
+        self._records[graph.canonical_hash] = (graph.canonical_form, value)
+
+    def _get_graph(self, graph):
+        """Convert the argument of the public methods into a graph.
+
+        Derived classes can override this method to accept other
+        representations, e.g. see MolecularGraphIndex.
+        """
+        return graph
+
+    def get_key(self, graph):
+        """Return the key of the graph in the index, i.e. its canonical hash."""
+        return self._get_graph(graph).canonical_hash
+
+    def add(self, graph, value=None):
+        """Add a graph to the index.
+
+        Returns True when the graph is new. When an isomorphic graph is already
+        present, the index is not modified and False is returned.
+        """
+        graph = self._get_graph(graph)
+        key = graph.canonical_hash
+        if key in self._records:
+            return False
+        self._records[key] = (graph.canonical_form, value)
+        return True
+
+    def iter_forms(self):
+        """Iterate over the canonical forms of the graphs in the index."""
+        for form, value in self._records.itervalues():
+            yield form
+
+    def iteritems(self):
+        """Iterate over (canonical form, value) for all graphs in the index."""
+        return self._records.itervalues()
+
+
 class Match(OneToOne):
     def __init__(self, node0, node1):
         OneToOne.__init__(self, [(node0,node1)])
@@ -897,6 +1122,9 @@ class PatternError(Exception):
 
 class Pattern(object):
     sub = True # This means that matching nodes must not have equal number of neighbors
+    vf2 = False # This means that GraphSearch may use the state space search of
+                # _iter_matches_vf2 instead of the incremental growth defined by
+                # get_new_pairs, check_next_match and complete.
 
     """Base class for a pattern in a graph.
 
@@ -1065,6 +1293,29 @@ class SubgraphPatternError(PatternError):
 
 
 class SubgraphPattern(Pattern):
+    def _get_vf2(self):
+        """Use the state space search unless it would bypass the pattern.
+
+        The state space search does not call get_new_pairs, check_next_match
+        and complete. When a subclass overrides one of these hooks, or when
+        the matching nodes must have an equal number of neighbors (sub is
+        False), the incremental growth is used, unless vf2 is explicitly set.
+        """
+        vf2 = self.__dict__.get("_vf2")
+        if vf2 is not None:
+            return vf2
+        if not self.sub:
+            return False
+        for name in "get_new_pairs", "check_next_match", "complete":
+            if getattr(self.__class__, name).im_func is not getattr(SubgraphPattern, name).im_func:
+                return False
+        return True
+
+    def _set_vf2(self, vf2):
+        self._vf2 = vf2
+
+    vf2 = property(_get_vf2, _set_vf2)
+
     def __init__(self, subgraph, criteria_sets=None, node_tags={}):
         """Initialise a subgraph pattern.
 
@@ -1114,6 +1365,28 @@ class SubgraphPattern(Pattern):
             for cycles in subgraph.symmetry_cycles:
                 if len(cycles) > 0:
                     self.duplicate_checks.add((cycles[0][0], cycles[0][1]))
+        # C) The order in which the nodes are matched by the state space
+        # search: the breadth first order starting from the central node. Each
+        # node (except the first) has a parent, i.e. its first neighbor in
+        # this order. The pairs with the other preceding neighbors are
+        # constraints.
+        self.vf2_order = []
+        self.vf2_parents = []
+        self.vf2_constraints = []
+        if subgraph is not None:
+            positions = {}
+            for node, distance in subgraph.iter_breadth_first(subgraph.central_node):
+                previous = sorted(
+                    positions[neighbor] for neighbor in subgraph.neighbors[node]
+                    if neighbor in positions
+                )
+                positions[node] = len(self.vf2_order)
+                self.vf2_order.append(node)
+                if len(previous) == 0:
+                    self.vf2_parents.append(None)
+                else:
+                    self.vf2_parents.append(previous[0])
+                self.vf2_constraints.append(previous[1:])
 
 
     def iter_initial_relations(self):
@@ -1125,6 +1398,43 @@ class SubgraphPattern(Pattern):
     def get_new_pairs(self, level):
         return self.level_pairs.get(level, []), self.level_constraints.get(level, [])
 
+    def get_allowed_nodes(self):
+        """Return for each node in the subgraph the allowed subject nodes.
+
+        The result is a dictionary with a set of subject nodes for each node
+        in the subgraph. Nodes that are absent in the dictionary can be
+        associated with any node of the subject graph. A canonical match can
+        only lead to a final match if each node is associated with a subject
+        node that satisfies the node criteria of at least one node in its orbit
+        under the symmetries of the subgraph.
+        """
+        result = {}
+        if self.criteria_sets is None or self.one_match:
+            return result
+        cache = {}
+        for node0 in xrange(self.subgraph.num_nodes):
+            orbit = set(symmetry.forward[node0] for symmetry in self.subgraph.symmetries)
+            allowed = set([])
+            for criteria_set in self.criteria_sets:
+                for other0 in orbit:
+                    criterion = criteria_set.thing_criteria.get(other0)
+                    if criterion is None:
+                        allowed = None
+                        break
+                    nodes1 = cache.get(id(criterion))
+                    if nodes1 is None:
+                        nodes1 = set(
+                            node1 for node1 in xrange(self.graph.num_nodes)
+                            if criterion(node1, self.graph)
+                        )
+                        cache[id(criterion)] = nodes1
+                    allowed.update(nodes1)
+                if allowed is None:
+                    break
+            if allowed is not None:
+                result[node0] = allowed
+        return result
+
     def check_next_match(self, match, new_relations):
         # only returns true for ecaxtly one set of new_relations from all the
         # ones that are symmetrically equivalent
@@ -1396,6 +1706,22 @@ class GraphSearch(object):
                           allows certain optimizations.
         """
         self.pattern.init_graph(graph, one_match)
+        if self.pattern.vf2:
+            canonical_matches = self._iter_matches_vf2(graph)
+        else:
+            canonical_matches = self._iter_canonical_matches(graph)
+        for canonical_match in canonical_matches:
+            # Some patterns my exclude symmetrically equivalent matches as
+            # to aviod dupplicates. with such a 'canonical' solution,
+            # the pattern is allowed to generate just those symmatrical
+            # duplicates of interest.
+            for final_match in self.pattern.iter_final_matches(canonical_match):
+                if self.debug:
+                    self.print_debug("final_match: %s" % final_match)
+                yield final_match
+                if one_match: return
+
+    def _iter_canonical_matches(self, graph):
         # Matches are grown iteratively.
         for node0, node1 in self.pattern.iter_initial_relations():
             init_match = self.pattern.MatchClass(node0, node1)
@@ -1403,14 +1729,87 @@ class GraphSearch(object):
             # this initial match, the function iter_matches extends the match
             # in all possible ways and yields the completed matches
             for canonical_match in self._iter_matches(init_match, graph):
-                # Some patterns my exclude symmetrically equivalent matches as
-                # to aviod dupplicates. with such a 'canonical' solution,
-                # the pattern is allowed to generate just those symmatrical
-                # duplicates of interest.
-                for final_match in self.pattern.iter_final_matches(canonical_match):
-                    self.print_debug("final_match: %s" % final_match)
-                    yield final_match
-                    if one_match: return
+                yield canonical_match
+
+    def _iter_matches_vf2(self, graph):
+        """Yields the canonical matches of a SubgraphPattern.
+
+        This is a depth first state space search in the spirit of the VF2
+        algorithm. The nodes of the subgraph are matched one by one in a fixed
+        order (pattern.vf2_order). The candidates for the next node are the
+        unmatched neighbors of the subject node associated with its parent.
+        They are pruned with the following rules:
+          * the subject node must have at least as many neighbors as the
+            pattern node,
+          * it must satisfy the node criteria (see get_allowed_nodes),
+          * the pairs with the other preceding nodes must be present in the
+            subject graph,
+          * the duplicate checks of the pattern must be satisfied, as soon as
+            both nodes of a check are matched.
+        """
+        pattern = self.pattern
+        order = pattern.vf2_order
+        parents = pattern.vf2_parents
+        constraints = pattern.vf2_constraints
+        size = len(order)
+        degrees0 = [len(pattern.subgraph.neighbors[node0]) for node0 in order]
+        allowed = pattern.get_allowed_nodes()
+        allowed = [allowed.get(node0) for node0 in order]
+        # integer adjacency arrays of the subject graph
+        adjacency = graph.adjacency_matrix
+        degrees1 = (adjacency.indptr[1:] - adjacency.indptr[:-1]).tolist()
+        indices1 = adjacency.indices.tolist()
+        indptr1 = adjacency.indptr.tolist()
+        neighbors1 = graph.neighbors
+        # the duplicate checks that can be made at each position
+        checks = [[] for position in xrange(size)]
+        if not (pattern.criteria_sets is None or pattern.one_match):
+            positions = dict((node0, position) for position, node0 in enumerate(order))
+            for node0_a, node0_b in pattern.duplicate_checks:
+                position_a = positions[node0_a]
+                position_b = positions[node0_b]
+                checks[max(position_a, position_b)].append((position_a, position_b))
+
+        matched = [None]*size
+        used = set([])
+
+        def acceptable(position, node1):
+            if node1 in used or degrees1[node1] < degrees0[position]:
+                return False
+            if allowed[position] is not None and node1 not in allowed[position]:
+                return False
+            for other in constraints[position]:
+                if node1 not in neighbors1[matched[other]]:
+                    return False
+            if not pattern.compare(order[position], node1):
+                return False
+            matched[position] = node1
+            for position_a, position_b in checks[position]:
+                if matched[position_a] > matched[position_b]:
+                    return False
+            return True
+
+        def extend(position):
+            if position == size:
+                match = pattern.MatchClass(order[0], matched[0])
+                match.add_relations(zip(order[1:], matched[1:]))
+                yield match
+                return
+            parent1 = matched[parents[position]]
+            for node1 in indices1[indptr1[parent1]:indptr1[parent1+1]]:
+                if acceptable(position, node1):
+                    used.add(node1)
+                    for match in extend(position+1):
+                        yield match
+                    used.discard(node1)
+            matched[position] = None
+
+        for node0, node1 in pattern.iter_initial_relations():
+            if acceptable(0, node1):
+                used.add(node1)
+                for match in extend(1):
+                    yield match
+                used.discard(node1)
 
     def print_debug(self, text, indent=0):
         if self.debug:
@@ -23,7 +23,7 @@
 import numpy
 
 from molmod.units import ps, angstrom, kcalmol
-from molmod.io.common import slice_match
+from molmod.io.common import slice_match, read_lines, parse_columns
 
 
 __all__ = ["ATRJReader", "ATRJFrame"]
@@ -61,6 +61,14 @@ class SectionFile(object):
             self._skip_section()
         return self._read_section()
 
+    def get_next_block(self, label, num_lines):
+        """Return a section with a known number of lines as a single string."""
+        while self._get_current_label() != label:
+            self._skip_section()
+        block = self._last[self._last.find(":")+1:] + read_lines(self._f, num_lines-1)
+        self._last = self._f.readline()
+        return block
+
 
 class ATRJFrame(object):
     pass
@@ -94,13 +102,8 @@ class ATRJReader(object):
                 frame.step = int(energy_words[1])
                 frame.total_energy = float(energy_words[2])*kcalmol
                 # Read the coordinates
-                coord_lines = self._secfile.get_next("Coordinates")
-                frame.coordinates = numpy.zeros((self.num_atoms, 3), float)
-                for index, line in enumerate(coord_lines):
-                    words = line.split()
-                    frame.coordinates[index,0] = float(words[1])
-                    frame.coordinates[index,1] = float(words[2])
-                    frame.coordinates[index,2] = float(words[3])
+                coord_block = self._secfile.get_next_block("Coordinates", self.num_atoms)
+                frame.coordinates = parse_columns(coord_block, self.num_atoms, [1, 2, 3])[0]
                 frame.coordinates *= angstrom
                 # Done
                 return frame
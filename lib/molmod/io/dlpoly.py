@@ -20,7 +20,7 @@
 
 
 from molmod.units import ps, amu, A, atm, deg
-from molmod.io.common import slice_match
+from molmod.io.common import slice_match, scan_frame_offsets, get_frame_offsets
 
 import numpy
 
@@ -34,6 +34,7 @@ class Error(Exception):
 
 class HistoryReader(object):
     def __init__(self, filename, sub=slice(None), pos_unit=A, vel_unit=A/ps, frc_unit=amu*A/ps**2, time_unit=ps, mass_unit=amu):
+        self.filename = filename
         self._f = file(filename)
         self._sub = sub
         self.pos_unit = pos_unit
@@ -54,6 +55,36 @@ class HistoryReader(object):
         self._counter = 1
         self._frame_size = 4 + self.num_atoms*(self.keytrj+2)
 
+    def get_offsets(self):
+        """Return the byte offsets of all frames, followed by the end of the last frame."""
+        def get_num_lines(lines):
+            words = lines[0].split()
+            if len(words) != 6 or words[0] != "timestep":
+                raise ValueError("Expecting a line that starts with 'timestep'.")
+            return 4 + int(words[2])*(int(words[3])+2)
+        return get_frame_offsets(self.filename, lambda f: scan_frame_offsets(f, 1, get_num_lines, skip=2))
+
+    def get_frame_indices(self, sub, num_frames):
+        """Return the indices of the frames that are selected by sub
+
+        The frames are counted from one in this reader, e.g. slice(None, 3)
+        selects the first two frames. The result contains the corresponding
+        positions in the list of offsets, see get_offsets.
+        """
+        counters = numpy.arange(num_frames+1)[sub]
+        return counters[counters > 0] - 1
+
+    def seek_frame(self, offset, counter):
+        """Continue the iteration at a given frame
+
+        Arguments:
+          offset  --  the byte offset of the frame, see get_offsets
+          counter  --  the index of the frame in the file
+        """
+        self._f.seek(offset)
+        # the frames are counted from one in this reader
+        self._counter = counter + 1
+
     def __del__(self):
         self._f.close()
 
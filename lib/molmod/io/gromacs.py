@@ -20,7 +20,8 @@
 
 
 from molmod.units import ps, nm
-from molmod.io.common import slice_match
+from molmod.io.common import slice_match, read_lines, parse_fixed_columns, \
+    scan_frame_offsets, get_frame_offsets
 
 import numpy
 
@@ -34,9 +35,11 @@ class Error(Exception):
 
 class GroReader(object):
     def __init__(self, filename, sub=slice(None)):
+        self.filename = filename
         self._f = file(filename)
         self._sub = sub
         self.num_atoms = None
+        self._width = None
         (time, pos, vel, cell) = self.read_frame()
         self.num_atoms = len(pos)
         self._counter = 0
@@ -48,6 +51,18 @@ class GroReader(object):
             raise StopIteration
         return line
 
+    def _init_columns(self, line):
+        # The atom lines have a fixed format. The width of the numerical
+        # fields follows from the distance between the decimal points.
+        first = line.find(".", 20)
+        second = line.find(".", first+1)
+        if first < 0 or second < 0:
+            raise ValueError("Could not determine the width of the fields in the atom lines.")
+        self._width = second - first
+        self._num_cols = min((len(line.rstrip()) - 20)/self._width, 6)
+        if self._num_cols < 3:
+            raise ValueError("The atom lines must contain at least the positions.")
+
     def read_frame(self):
         # Read the first line, ignore the title and try to get the time. The
         # time field is optional.
@@ -62,17 +77,16 @@ class GroReader(object):
         num_atoms = int(self.get_line())
         if self.num_atoms is not None and self.num_atoms != num_atoms:
             raise ValueError("The number of atoms must be the same over the entire file.")
-        # Read the atom lines
-        pos = numpy.zeros((num_atoms,3),numpy.float32)
+        # Read the atom lines at once and convert the fixed columns
+        block = read_lines(self._f, num_atoms)
+        if block.count("\n") < num_atoms:
+            raise StopIteration
+        if self._width is None:
+            self._init_columns(block[:block.find("\n")])
+        fields = parse_fixed_columns(block, num_atoms, self._num_cols, 20, self._width)[0]
+        pos = fields[:,:3].astype(numpy.float32)
         vel = numpy.zeros((num_atoms,3),numpy.float32)
-        for i in xrange(num_atoms):
-            words = self.get_line()[22:].split()
-            pos[i,0] = float(words[0])
-            pos[i,1] = float(words[1])
-            pos[i,2] = float(words[2])
-            vel[i,0] = float(words[3])
-            vel[i,1] = float(words[4])
-            vel[i,2] = float(words[5])
+        vel[:,:self._num_cols-3] = fields[:,3:]
         pos *= nm
         vel *= nm/ps
         # Read the cell line
@@ -97,8 +111,24 @@ class GroReader(object):
         num_atoms = int(self.get_line())
         if self.num_atoms is not None and self.num_atoms != num_atoms:
             raise ValueError("The number of atoms must be the same over the entire file.")
-        for i in xrange(num_atoms+1):
-            self.get_line()
+        if read_lines(self._f, num_atoms+1).count("\n") < num_atoms+1:
+            raise StopIteration
+
+    def get_offsets(self):
+        """Return the byte offsets of all frames, followed by the end of the last frame."""
+        def get_num_lines(lines):
+            return int(lines[1]) + 3
+        return get_frame_offsets(self.filename, lambda f: scan_frame_offsets(f, 2, get_num_lines))
+
+    def seek_frame(self, offset, counter):
+        """Continue the iteration at a given frame
+
+        Arguments:
+          offset  --  the byte offset of the frame, see get_offsets
+          counter  --  the index of the frame in the file
+        """
+        self._f.seek(offset)
+        self._counter = counter
 
     def __del__(self):
         self._f.close()
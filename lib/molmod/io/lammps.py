@@ -19,91 +19,248 @@
 # --
 
 
-from molmod.io.common import slice_match
+from molmod.io.common import slice_match, read_lines, parse_columns, \
+    scan_frame_offsets, get_frame_offsets
+from molmod.unit_cell import UnitCell
+from molmod.units import angstrom
 
 import numpy
 
 
-__all__ = ["Error", "DumpReader"]
+__all__ = ["Error", "DumpFrame", "DumpReader"]
 
 
 class Error(Exception):
     pass
 
 
+class DumpFrame(list):
+    """A frame from a LAMMPS dump file
+
+    The frame is a list with the step number, followed by an array for each
+    column that is read. The attributes step, unit_cell and origin contain
+    the step number, the periodic box and the lower corner of the box.
+    """
+    def __init__(self, step, columns, unit_cell, origin):
+        list.__init__(self, [step] + columns)
+        self.step = step
+        self.unit_cell = unit_cell
+        self.origin = origin
+
+
 class DumpReader(object):
-    def __init__(self, filename, units, sub=slice(None)):
-        # first read the number of atoms
+    def __init__(self, filename, units, sub=slice(None), columns=None, cell_unit=angstrom):
+        """Initialize a DumpReader
+
+        Arguments:
+          filename  --  the LAMMPS dump file
+          units  --  the units of the columns that are read
+
+        Optional arguments:
+          sub  --  a slice object to select a subset of the frames
+          columns  --  the names of the columns that are read, as they appear
+              on the line 'ITEM: ATOMS id type x y z ...', e.g. ["x", "y",
+              "z", "vx", "vy", "vz"]. When not given, the columns after the
+              first one are read, one for each unit.
+          cell_unit  --  the unit of the box bounds
+
+        The reader can be used as an iterator over the selected frames. Each
+        frame is a DumpFrame: a list with the step number, followed by one
+        array for each column. The atoms are sorted by the column id, or by
+        the first column when the columns are not named. Orthogonal and
+        triclinic boxes are converted into a UnitCell. When sub has a start
+        or a step, an index with the byte offsets of all the frames is used
+        to jump to the selected frames.
+        """
+        self.filename = filename
+        self.units = units
+        self.cell_unit = cell_unit
+        self.sub = sub
+        self.counter = 0
         self._f = file(filename)
+        # the first frame header defines the number of atoms and the columns
+        self.num_atoms = None
         try:
-            while True:
-                line = self._f.next()
-                if line == "ITEM: NUMBER OF ATOMS\n":
-                    break
-            try:
-                line = self._f.next()
-                self.num_atoms = int(line)
-            except ValueError:
-                raise Error("Could not read the number of atoms. Expected an integer. Got '%s'" % line)
+            step, self.num_atoms, unit_cell, origin, self.column_names = self._read_header()
         except StopIteration:
-            raise Error("Could not find line 'ITEM: NUMBER OF ATOMS'.")
+            raise Error("Could not read the header of the first frame.")
         self._f.seek(0) # go back to the beginning of the file
-        self._f = file(filename)
-        self.units = units
-        self.sub = sub
-        self.counter = 0
+        self._init_columns(columns)
+        self._offsets = None
+        if sub.start is not None or sub.step is not None:
+            self.get_offsets()
+
+    def _init_columns(self, columns):
+        if columns is None:
+            # columns without names: the first one is the atom index
+            indices = range(1, len(self.units)+1)
+            id_index = 0
+        else:
+            if len(self.column_names) == 0:
+                raise Error("The columns in the dump file have no names.")
+            indices = []
+            for column in columns:
+                if column not in self.column_names:
+                    raise Error("The dump file has no column '%s'. Found: %s" % (column, " ".join(self.column_names)))
+                indices.append(self.column_names.index(column))
+            if "id" in self.column_names:
+                id_index = self.column_names.index("id")
+            else:
+                id_index = None
+        if len(indices) != len(self.units):
+            raise Error("Expecting one unit for each column.")
+        # parse_columns reads the fields in increasing order
+        fields = sorted(set(indices + [id_index]) - set([None]))
+        self._fields = fields
+        self._positions = [fields.index(index) for index in indices]
+        if id_index is None:
+            self._id_position = None
+        else:
+            self._id_position = fields.index(id_index)
+        self._buffer = numpy.zeros((self.num_atoms, len(fields)), float)
+
+    def get_offsets(self):
+        """Return the byte offsets of all frames, followed by the end of the last frame."""
+        if self._offsets is None:
+            def get_num_lines(lines):
+                if lines[0] != "ITEM: TIMESTEP":
+                    raise ValueError("Expecting line 'ITEM: TIMESTEP' at the beginning of a time frame.")
+                return int(lines[3]) + 9
+            self._offsets = get_frame_offsets(self.filename, lambda f: scan_frame_offsets(f, 4, get_num_lines))
+        return self._offsets
+
+    def seek_frame(self, offset, counter):
+        """Continue the iteration at a given frame
+
+        Arguments:
+          offset  --  the byte offset of the frame, see get_offsets
+          counter  --  the index of the frame in the file
+        """
+        self._f.seek(offset)
+        self.counter = counter
 
     def __del__(self):
-        self._f.close()
+        if hasattr(self, "_f"):
+            self._f.close()
 
     def __iter__(self):
         return self
 
-    def next(self):
-        # Read one frame, we assume that the current file position is at the
-        # line 'ITEM: TIMESTEP' and that this line marks the beginning of a
-        # time frame.
-        line = self._f.next()
+    def _next_line(self):
+        line = self._f.readline()
+        if len(line) == 0:
+            raise StopIteration
+        return line
+
+    def _read_box(self, line):
+        # The line is 'ITEM: BOX BOUNDS', optionally followed by the boundary
+        # flags and, for a triclinic box, by 'xy xz yz'.
+        words = line.split()[3:]
+        triclinic = "xy" in words
+        flags = [word for word in words if word not in ["xy", "xz", "yz"]]
+        if len(flags) == 3:
+            cell_active = numpy.array([flag[0] == "p" for flag in flags])
+        else:
+            cell_active = numpy.array([True, True, True])
+        bounds = numpy.zeros((3, 3), float)
+        num_words = 2 + triclinic
+        for i in xrange(3):
+            line = self._next_line()
+            try:
+                bounds[i,:num_words] = [float(word) for word in line.split()[:num_words]]
+            except ValueError:
+                raise Error("Could not read the box bounds. Got '%s'" % line[:-1])
+        lo = bounds[:,0].copy()
+        hi = bounds[:,1].copy()
+        xy, xz, yz = bounds[:,2]
+        if triclinic:
+            # convert the bounding box into the bounds of the parallelepiped
+            lo[0] -= min(0.0, xy, xz, xy+xz)
+            hi[0] -= max(0.0, xy, xz, xy+xz)
+            lo[1] -= min(0.0, yz)
+            hi[1] -= max(0.0, yz)
+        # the cell vectors are the columns of the cell matrix
+        cell = numpy.array([
+            [hi[0] - lo[0], xy, xz],
+            [0.0, hi[1] - lo[1], yz],
+            [0.0, 0.0, hi[2] - lo[2]],
+        ])*self.cell_unit
+        return UnitCell(cell, cell_active), lo*self.cell_unit
+
+    def _read_header(self):
+        # Read the header of a frame, we assume that the current file
+        # position is at the line 'ITEM: TIMESTEP' and that this line marks
+        # the beginning of a time frame.
+        line = self._next_line()
         if line != 'ITEM: TIMESTEP\n':
             raise Error("Expecting line 'ITEM: TIMESTEP' at the beginning of a time frame.")
         try:
-            line = self._f.next()
+            line = self._next_line()
             step = int(line)
         except ValueError:
             raise Error("Could not read the step number. Expected an integer. Got '%s'" % line[:-1])
 
         # Now we assume that the next section contains (again) the number of
         # atoms.
-        line = self._f.next()
+        line = self._next_line()
         if line != 'ITEM: NUMBER OF ATOMS\n':
             raise Error("Expecting line 'ITEM: NUMBER OF ATOMS'.")
         try:
-            line = self._f.next()
+            line = self._next_line()
             num_atoms = int(line)
         except ValueError:
             raise Error("Could not read the number of atoms. Expected an integer. Got '%s'" % line[:-1])
-        if num_atoms != self.num_atoms:
+        if self.num_atoms is not None and num_atoms != self.num_atoms:
             raise Error("A variable number of atoms is not supported.")
 
-        # The next section contains the box boundaries. We will skip it
-        for i in xrange(4):
-            self._f.next()
+        # The next section contains the box boundaries.
+        line = self._next_line()
+        if not line.startswith('ITEM: BOX BOUNDS'):
+            raise Error("Expecting line 'ITEM: BOX BOUNDS'.")
+        unit_cell, origin = self._read_box(line)
 
         # The next and last section contains the atom related properties
-        line = self._f.next()
-        if line != 'ITEM: ATOMS\n':
+        line = self._next_line()
+        if not line.startswith('ITEM: ATOMS'):
             raise Error("Expecting line 'ITEM: ATOMS'.")
-        fields = [list() for i in xrange(len(self.units))]
-        for i in xrange(self.num_atoms):
-            line = self._f.next()
-            words = line.split()[1:]
-            for j in xrange(len(fields)):
-                fields[j].append(float(words[j]))
-        fields = [step] + [numpy.array(field)*unit for field, unit in zip(fields, self.units)]
-
-        return fields
-
-
+        column_names = line.split()[2:]
+        return step, num_atoms, unit_cell, origin, column_names
 
+    def _skip_frame(self):
+        # jump over the header and the atom lines at once
+        if read_lines(self._f, self.num_atoms+9).count("\n") < self.num_atoms+9:
+            raise StopIteration
 
+    def next(self):
+        # skip frames as requested
+        if self._offsets is not None:
+            while not slice_match(self.sub, self.counter):
+                self.counter += 1
+            if self.counter >= len(self._offsets) - 1:
+                raise StopIteration
+            self._f.seek(self._offsets[self.counter])
+        else:
+            while not slice_match(self.sub, self.counter):
+                self._skip_frame()
+                self.counter += 1
 
+        step, num_atoms, unit_cell, origin, column_names = self._read_header()
+        if column_names != self.column_names:
+            raise Error("The columns must be the same in all frames.")
+        block = read_lines(self._f, self.num_atoms)
+        if block.count("\n") < self.num_atoms:
+            raise StopIteration
+        try:
+            values = parse_columns(block, self.num_atoms, self._fields, self._buffer)[0]
+        except ValueError, e:
+            raise Error("Could not read the atom lines: %s" % e)
+        if self._id_position is not None:
+            ids = values[:,self._id_position]
+            if (ids[1:] < ids[:-1]).any():
+                values = values[ids.argsort()]
+        columns = [
+            values[:,position]*unit for position, unit
+            in zip(self._positions, self.units)
+        ]
+        self.counter += 1
+        return DumpFrame(step, columns, unit_cell, origin)
@@ -0,0 +1,142 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+import numpy, multiprocessing
+
+
+__all__ = ["map_trajectory"]
+
+
+_trajectory_worker_state = None
+
+
+def _get_frame_indices(reader, sub, num_frames):
+    # Readers that do not count the frames from zero translate sub
+    # themselves, such that the same frames are selected as in a serial run.
+    if hasattr(reader, "get_frame_indices"):
+        return reader.get_frame_indices(sub, num_frames)
+    return numpy.arange(num_frames)[sub]
+
+
+def _init_trajectory_worker(function, reader_class, filename, args, kwargs):
+    global _trajectory_worker_state
+    reader = reader_class(filename, *args, **kwargs)
+    _trajectory_worker_state = (function, reader)
+
+
+def _trajectory_task(chunk):
+    """Apply the function to the frames in a chunk.
+
+    A chunk is a list of (counter, offset) pairs, one for each frame.
+    """
+    function, reader = _trajectory_worker_state
+    result = []
+    for counter, offset in chunk:
+        reader.seek_frame(offset, counter)
+        result.append(function(reader.next()))
+    return result
+
+
+_no_initial = object()
+
+
+def map_trajectory(
+    function, reader_class, filename, args=(), kwargs=None, combine=None,
+    initial=_no_initial, sub=slice(None), num_processes=None, num_chunks=None
+):
+    """Apply a function to all frames of a trajectory file in parallel
+
+    Arguments:
+      function  --  a function that takes a frame, as returned by the reader,
+          and returns a result. It must be defined at the module level.
+      reader_class  --  XYZReader, GroReader, DumpReader or HistoryReader, or
+          any reader with the methods get_offsets and seek_frame. A reader
+          that does not count the frames from zero must also have a method
+          get_frame_indices, see HistoryReader.
+      filename  --  the trajectory file
+
+    Optional arguments:
+      args, kwargs  --  extra arguments for the constructor of the reader,
+          e.g. the units of a DumpReader
+      combine  --  a function that combines two results. When not given,
+          the list of results is returned.
+      initial  --  the initial value for the reduction. When not given,
+          the result of the first frame is used.
+      sub  --  a slice object to select a subset of the frames, with the
+          same meaning as the argument sub of the reader
+      num_processes  --  the size of the multiprocessing pool. The default is
+          the number of cpus. When num_processes is 1, no pool is created.
+      num_chunks  --  the number of chunks in which the frames are divided.
+          The default is four times the number of processes.
+
+    The frames are located with the frame index of the reader, i.e. the byte
+    offsets of all frames, and the selected frames are divided in chunks of
+    consecutive frames. Each worker process has its own reader and parses
+    the frames of a chunk. The results are reduced in the parent process in
+    the order of the frames, so the outcome is identical to that of
+    reduce(combine, [function(frame) for frame in reader], initial) with
+    reader = reader_class(filename, *args, sub=sub, **kwargs).
+    """
+    if kwargs is None:
+        kwargs = {}
+    reader = reader_class(filename, *args, **kwargs)
+    offsets = reader.get_offsets()
+    counters = _get_frame_indices(reader, sub, len(offsets) - 1)
+    del reader
+    frames = zip(counters, offsets[counters])
+
+    if num_processes is None:
+        num_processes = multiprocessing.cpu_count()
+    if num_chunks is None:
+        num_chunks = 4*num_processes
+    num_chunks = max(1, min(num_chunks, len(frames)))
+    bounds = numpy.linspace(0, len(frames), num_chunks+1).round().astype(int)
+    chunks = [frames[begin:end] for begin, end in zip(bounds[:-1], bounds[1:])]
+
+    initargs = (function, reader_class, filename, args, kwargs)
+    if num_processes == 1:
+        pool = None
+        _init_trajectory_worker(*initargs)
+        results = (_trajectory_task(chunk) for chunk in chunks)
+    else:
+        pool = multiprocessing.Pool(num_processes, _init_trajectory_worker, initargs)
+        results = pool.imap(_trajectory_task, chunks)
+
+    try:
+        if combine is None:
+            result = []
+            for chunk_results in results:
+                result.extend(chunk_results)
+        else:
+            result = initial
+            for chunk_results in results:
+                for frame_result in chunk_results:
+                    if result is _no_initial:
+                        result = frame_result
+                    else:
+                        result = combine(result, frame_result)
+            if result is _no_initial:
+                raise TypeError("map_trajectory of an empty selection with no initial value")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return result
@@ -22,9 +22,7 @@
 import numpy
 from molmod.data.periodic import periodic
 from molmod.units import unified
-from molmod.graphs import CriteriaSet, GraphSearch
-from molmod.molecular_graphs import MolecularGraph, BondPattern, \
-    BendingAnglePattern, DihedralAnglePattern, HasAtomNumber
+from molmod.molecular_graphs import MolecularGraph
 from molmod.graphs import Graph
 
 
@@ -248,50 +246,10 @@ class PSFFile(object):
             self.names.extend([name]*new)
 
 
-        # add bonds
-        match_generator = GraphSearch(BondPattern([CriteriaSet()]))
-        tmp = [(
-            match.get_destination(0),
-            match.get_destination(1),
-        ) for match in match_generator(molecular_graph)]
-        tmp.sort()
-        new = len(tmp)
-        if new > 0:
-            prev = len(self.bonds)
-            self.bonds.resize((prev + len(tmp), 2))
-            self.bonds[-len(tmp):] = tmp
-            self.bonds[-len(tmp):] += offset
-
-        # add bends
-        match_generator = GraphSearch(BendingAnglePattern([CriteriaSet()]))
-        tmp = [(
-            match.get_destination(0),
-            match.get_destination(1),
-            match.get_destination(2),
-        ) for match in match_generator(molecular_graph)]
-        tmp.sort()
-        new = len(tmp)
-        if new > 0:
-            prev = len(self.bends)
-            self.bends.resize((prev + len(tmp), 3))
-            self.bends[-len(tmp):] = tmp
-            self.bends[-len(tmp):] += offset
-
-        # add dihedrals
-        match_generator = GraphSearch(DihedralAnglePattern([CriteriaSet()]))
-        tmp = [(
-            match.get_destination(0),
-            match.get_destination(1),
-            match.get_destination(2),
-            match.get_destination(3),
-        ) for match in match_generator(molecular_graph)]
-        tmp.sort()
-        new = len(tmp)
-        if new > 0:
-            prev = len(self.dihedrals)
-            self.dihedrals.resize((prev + len(tmp), 4))
-            self.dihedrals[-len(tmp):] = tmp
-            self.dihedrals[-len(tmp):] += offset
+        # add bonds, bends and dihedrals
+        self.bonds = numpy.concatenate([self.bonds, molecular_graph.bonds + offset])
+        self.bends = numpy.concatenate([self.bends, molecular_graph.bends + offset])
+        self.dihedrals = numpy.concatenate([self.dihedrals, molecular_graph.dihedrals + offset])
 
     def get_graph(self):
         return Graph(self.bonds)
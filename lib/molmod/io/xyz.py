@@ -19,7 +19,8 @@
 # --
 
 
-from molmod.io.common import slice_match
+from molmod.io.common import slice_match, scan_frame_offsets, \
+    get_frame_offsets, read_lines, parse_columns, parse_words
 from molmod.data.periodic import periodic
 from molmod.molecules import Molecule
 from molmod.units import angstrom
@@ -35,28 +36,57 @@ class Error(Exception):
 
 
 class XYZReader(object):
-    def __init__(self, f, sub=slice(None), file_unit=angstrom):
+    def __init__(self, f, sub=slice(None), file_unit=angstrom, sidecar=False):
+        """Initialize an XYZReader
+
+        Arguments:
+          f  --  a filename or a file object
+
+        Optional arguments:
+          sub  --  a slice object to select a subset of the frames
+          file_unit  --  the unit of the coordinates in the file
+          sidecar  --  when True, the frame index is stored in the file
+              f + ".frames" and reused as long as the trajectory does not
+              change (see molmod.io.common.get_frame_offsets)
+
+        The reader can be used as an iterator over the selected frames. Each
+        frame is a tuple (title, coordinates). The frames can also be
+        accessed at random with reader[k] or reader[start:stop:step] and
+        len(reader) returns the number of selected frames. These operations
+        use an index with the byte offsets of all the frames, which is
+        built in one fast scan of the file when it is needed for the first
+        time. When sub skips frames, the index is used to jump to the
+        selected frames.
+        """
         if isinstance(f, file):
             self._auto_close = False
             self._file = f
         else:
             self._auto_close = True
             self._file = file(f)
+        self._filename = f
+        # the trajectory starts at the current position of a file object
+        self._start = self._file.tell()
         self._sub = sub
         self._counter = 0
         self.file_unit = file_unit
+        self._sidecar = sidecar
+        self._offsets = None
+        if sidecar or sub.start is not None or sub.step is not None:
+            self.get_offsets()
 
         try:
-            tmp = self._read()
+            tmp = self._read(True)
             self.symbols = tmp[0]
             self._first = tmp[1:]
-            self.numbers = numpy.zeros(len(self.symbols), int)
-            for index, symbol in enumerate(self.symbols):
+            lookup = {}
+            for symbol in set(self.symbols):
                 atom_info = periodic[symbol]
                 if atom_info is None:
-                    self.numbers[index] = 0
+                    lookup[symbol] = 0
                 else:
-                    self.numbers[index] = atom_info.number
+                    lookup[symbol] = atom_info.number
+            self.numbers = numpy.array([lookup[symbol] for symbol in self.symbols], int)
         except StopIteration:
             raise Error("Could not read first frame from XYZ file. Incorrect file format.")
 
@@ -64,42 +94,112 @@ class XYZReader(object):
         if self._auto_close:
             self._file.close()
 
-    def _read(self):
-        def read_size():
-            try:
-                return int(self._file.readline().strip())
-            except ValueError:
-                raise StopIteration
+    def _scan(self, f):
+        def get_num_lines(lines):
+            return int(lines[0]) + 2
+        return scan_frame_offsets(f, 1, get_num_lines, start=self._start)
 
-        while not slice_match(self._sub, self._counter):
-            size = read_size()
-            for i in xrange(size+1):
-                line = self._file.readline()
-                if len(line) == 0:
-                    raise StopIteration
-            self._counter += 1
+    def get_offsets(self):
+        """Return the byte offsets of all frames, followed by the end of the last frame."""
+        if self._offsets is None:
+            self._offsets = get_frame_offsets(self._filename, self._scan, self._sidecar)
+        return self._offsets
 
-        size = read_size()
+    def seek_frame(self, offset, counter):
+        """Continue the iteration at a given frame
+
+        Arguments:
+          offset  --  the byte offset of the frame, see get_offsets
+          counter  --  the index of the frame in the file
+        """
+        self._first = None
+        self._file.seek(offset)
+        self._counter = counter
+
+    def _get_indices(self):
+        return xrange(*self._sub.indices(len(self.get_offsets()) - 1))
+
+    def _read_frame(self, with_symbols=False):
+        try:
+            size = int(self._file.readline().strip())
+        except ValueError:
+            raise StopIteration
         title = self._file.readline()[:-1]
-        symbols = []
-        coordinates = numpy.zeros((size, 3), float)
-        for counter in xrange(size):
-            line = self._file.readline()
-            if len(line) == 0:
-                raise StopIteration
-            words = line.split()
-            if len(words) < 4:
-                raise StopIteration
-            symbols.append(words[0])
-            try:
-                coordinates[counter,0] = float(words[1])
-                coordinates[counter,1] = float(words[2])
-                coordinates[counter,2] = float(words[3])
-            except ValueError:
-                raise StopIteration
+        block = read_lines(self._file, size)
+        try:
+            coordinates = parse_columns(block, size, [1, 2, 3])[0]
+        except ValueError:
+            raise StopIteration
         coordinates *= self.file_unit
+        if with_symbols:
+            symbols = parse_words(block, size, 0)
+            return symbols, title, coordinates
+        else:
+            return title, coordinates
+
+    def _read(self, with_symbols=False):
+        if self._offsets is not None:
+            while not slice_match(self._sub, self._counter):
+                self._counter += 1
+            if self._counter >= len(self._offsets) - 1:
+                raise StopIteration
+            self._file.seek(self._offsets[self._counter])
+        else:
+            while not slice_match(self._sub, self._counter):
+                try:
+                    size = int(self._file.readline().strip())
+                except ValueError:
+                    raise StopIteration
+                if read_lines(self._file, size+1).count("\n") < size+1:
+                    raise StopIteration
+                self._counter += 1
+        result = self._read_frame(with_symbols)
         self._counter += 1
-        return symbols, title, coordinates
+        return result
+
+    def _read_at(self, frame):
+        # random access must not disturb the iteration
+        position = self._file.tell()
+        try:
+            self._file.seek(self.get_offsets()[frame])
+            try:
+                return self._read_frame()
+            except StopIteration:
+                raise Error("Could not read frame %i from the XYZ file." % frame)
+        finally:
+            self._file.seek(position)
+
+    def __len__(self):
+        return len(self._get_indices())
+
+    def __getitem__(self, index):
+        """Return frame(s) from the selection, i.e. (title, coordinates) tuples
+
+        A single frame is returned for an integer index and a list of frames
+        for a slice.
+        """
+        indices = self._get_indices()
+        if isinstance(index, slice):
+            return [
+                self._read_at(indices[i])
+                for i in xrange(*index.indices(len(indices)))
+            ]
+        else:
+            return self._read_at(indices[index])
+
+    def get_titles(self):
+        """Return the titles of the selected frames without reading the coordinates."""
+        position = self._file.tell()
+        offsets = self.get_offsets()
+        result = []
+        try:
+            for frame in self._get_indices():
+                self._file.seek(offsets[frame])
+                self._file.readline()
+                result.append(self._file.readline()[:-1])
+        finally:
+            self._file.seek(position)
+        return result
 
     def __iter__(self):
         return self
@@ -110,7 +210,7 @@ class XYZReader(object):
             self._first = None
             result = tmp
         else:
-            result = self._read()[1:]
+            result = self._read()
         if result is None:
             raise StopIteration
         return result
@@ -148,33 +248,70 @@ class XYZWriter(object):
 
 
 class XYZFile(object):
-    def __init__(self, f, sub=slice(None), file_unit=angstrom):
-        xyz_reader = XYZReader(f, file_unit=file_unit)
+    def __init__(self, f, sub=slice(None), file_unit=angstrom, sidecar=False):
+        """Initialize an XYZFile
+
+        Arguments:
+          f  --  a filename or a file object
+
+        Optional arguments:
+          sub  --  a slice object to select a subset of the frames
+          file_unit  --  the unit of the coordinates in the file
+          sidecar  --  see XYZReader
+
+        When a filename is given, the frames are read on demand through the
+        frame index of an XYZReader. The attributes titles and geometries
+        are only loaded when they are accessed for the first time and
+        get_molecule reads a single frame from the file unless the
+        geometries are already loaded. When a file object is given, all
+        frames are loaded at once, such that the file can be closed
+        afterwards.
+        """
+        self._reader = XYZReader(f, sub, file_unit=file_unit, sidecar=sidecar)
         self.file_unit = file_unit
+        self.numbers = self._reader.numbers
+        self.symbols = self._reader.symbols
+        self._titles = None
+        self._geometries = None
+        if isinstance(f, file):
+            self._get_titles()
+            self._get_geometries()
 
-        self.numbers = xyz_reader.numbers
-        self.symbols = xyz_reader.symbols
-        self.titles = []
-        if sub.stop is not None:
-            start = sub.start
-            if start is None: start = 0
-            stride = sub.stride
-            if stride is None: stride = 1
-            count = (sub.stop - start)/stride
-            self.geometries = numpy.zeros((count, len(self.numbers), 3), float)
-
-            for counter, (title, coordinates) in xyz_reader:
-                self.titles.append(title)
-                self.geometries[counter] = coordinates
-        else:
-            geometries = []
-            for title, coordinates in xyz_reader:
-                self.titles.append(title)
-                geometries.append(coordinates)
-            self.geometries = numpy.array(geometries, float)
+    def __len__(self):
+        if self._geometries is not None:
+            return len(self._geometries)
+        return len(self._reader)
+
+    def _get_titles(self):
+        if self._titles is None:
+            self._titles = self._reader.get_titles()
+        return self._titles
+
+    def _set_titles(self, titles):
+        self._titles = titles
+
+    titles = property(_get_titles, _set_titles)
+
+    def _get_geometries(self):
+        if self._geometries is None:
+            geometries = numpy.zeros((len(self._reader), len(self.numbers), 3), float)
+            for index in xrange(len(geometries)):
+                geometries[index] = self._reader[index][1]
+            self._geometries = geometries
+        return self._geometries
+
+    def _set_geometries(self, geometries):
+        self._geometries = geometries
+
+    geometries = property(_get_geometries, _set_geometries)
 
     def get_molecule(self, index=0):
-        return Molecule(self.numbers, self.geometries[index], self.titles[index])
+        if self._geometries is None:
+            title, coordinates = self._reader[index]
+        else:
+            title = self.titles[index]
+            coordinates = self._geometries[index]
+        return Molecule(self.numbers, coordinates, title)
 
     def write_to_file(self, f, file_unit=angstrom):
         symbols = []
@@ -28,6 +28,13 @@ def jacobian_analysis(configuration, internal_coordinates):
     jacobian = []
     values = []
     for internal_coordinate in internal_coordinates:
+        if hasattr(internal_coordinate, "values_tangents"):
+            # a set of internal coordinates that is evaluated in bulk, e.g.
+            # molmod.ic.ICArray
+            some_values, tangents = internal_coordinate.values_tangents(configuration.cartesian_values)
+            values.extend(some_values)
+            jacobian.extend(tangents)
+            continue
         value, tangent = internal_coordinate.value_tangent(configuration.cartesian_values)
         values.append(value)
         jacobian.append(numpy.ravel(tangent))
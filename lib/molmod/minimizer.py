@@ -23,13 +23,25 @@ import numpy
 
 
 __all__ = [
-    "GoldenLineSearch", "NewtonLineSearch", "NewtonGLineSearch", "Minimizer"
+    "GoldenLineSearch", "NewtonLineSearch", "NewtonGLineSearch",
+    "WolfeLineSearch", "Minimizer", "LBFGSMinimizer", "FIREMinimizer",
+    "BatchMinimizer", "InternalMinimizer",
 ]
 
 
 phi = 0.5*(1+numpy.sqrt(5))
 
 
+def _dot(a, b):
+    """Dot products of (arrays of) vectors along the last axis."""
+    return (a*b).sum(axis=-1)
+
+
+def _expand(a):
+    """Add an axis to (an array of) scalars to multiply with (an array of) vectors."""
+    return a[...,numpy.newaxis]
+
+
 class LineSearch(object):
     def __init__(self, qtol, max_step, max_iter):
         self.qtol = qtol
@@ -210,12 +222,109 @@ class NewtonGLineSearch(LineSearch):
         return True, qopt, fopt
 
 
+class WolfeLineSearch(LineSearch):
+    """A line search that satisfies the strong Wolfe conditions.
+
+    The function must return the function value and the derivative along the
+    line, i.e. do_gradient must be supported. The trial step is enlarged until
+    the minimum is bracketed and the bracket is then reduced with safeguarded
+    cubic interpolation. (See Nocedal and Wright, Numerical Optimization,
+    algorithms 3.5 and 3.6.)
+    """
+    def __init__(self, qtol, max_step, max_iter, c1=1e-4, c2=0.9):
+        LineSearch.__init__(self, qtol, max_step, max_iter)
+        self.c1 = c1
+        self.c2 = c2
+        self.num_eval = 0
+
+    def get_extra_log_dtypes(self):
+        return [("num_eval", int)]
+
+    def get_extra_log(self):
+        result = (self.num_eval,)
+        self.num_eval = 0
+        return result
+
+    def __call__(self, fun, f0, last_step_size, epsilon, d0=None):
+        if d0 is None:
+            f0, d0 = fun(0.0, do_gradient=True)
+            self.num_eval += 1
+        if d0 >= 0:
+            return False, 0.0, f0
+        q_old, f_old, d_old = 0.0, f0, d0
+        q = self.limit_step(last_step_size)
+        for counter in xrange(self.max_iter):
+            f, d = fun(q, do_gradient=True)
+            self.num_eval += 1
+            if f > f0 + self.c1*q*d0 or (counter > 0 and f >= f_old):
+                return self.zoom(fun, f0, d0, (q_old, f_old, d_old), (q, f, d))
+            if abs(d) <= -self.c2*d0:
+                return True, q, f
+            if d >= 0:
+                return self.zoom(fun, f0, d0, (q, f, d), (q_old, f_old, d_old))
+            if q >= self.max_step:
+                # the sufficient decrease condition holds
+                return True, q, f
+            q_old, f_old, d_old = q, f, d
+            q = self.limit_step(2*q)
+        return True, q_old, f_old
+
+    def zoom(self, fun, f0, d0, low, high):
+        # low is the best point so far that satisfies the sufficient decrease
+        # condition. The derivative in low points towards high.
+        for counter in xrange(self.max_iter):
+            (q_low, f_low, d_low), (q_high, f_high, d_high) = low, high
+            if abs(q_high - q_low) < self.qtol:
+                break
+            q = self.interpolate(low, high)
+            f, d = fun(q, do_gradient=True)
+            self.num_eval += 1
+            if f > f0 + self.c1*q*d0 or f >= f_low:
+                high = (q, f, d)
+            else:
+                if abs(d) <= -self.c2*d0:
+                    return True, q, f
+                if d*(q_high - q_low) >= 0:
+                    high = low
+                low = (q, f, d)
+        q_low, f_low, d_low = low
+        if q_low > 0:
+            return True, q_low, f_low
+        return False, 0.0, f0
+
+    def interpolate(self, low, high):
+        # the minimizer of the cubic through both end points, kept away from
+        # the end points.
+        (q1, f1, d1), (q2, f2, d2) = low, high
+        q_min = min(q1, q2)
+        q_max = max(q1, q2)
+        margin = 0.1*(q_max - q_min)
+        d3 = d1 + d2 - 3*(f1 - f2)/(q1 - q2)
+        discriminant = d3**2 - d1*d2
+        if discriminant >= 0:
+            d4 = numpy.sign(q2 - q1)*numpy.sqrt(discriminant)
+            denominator = d2 - d1 + 2*d4
+            if denominator != 0:
+                q = q2 - (q2 - q1)*(d2 + d4 - d3)/denominator
+                if q_min + margin <= q <= q_max - margin:
+                    return q
+        return 0.5*(q1 + q2)
+
+
 class Minimizer(object):
     def __init__(
         self, x_init, fun, LineSearchCls, ftol, xtol, max_step_rms, max_iter, max_line_iter,
         do_gradient=False, epsilon_init=1e-6, absftol=False, verbose=True, callback=None,
-        min_iter=0, extra_log_dtypes=None
+        min_iter=0, extra_log_dtypes=None, neighbor_lists=None
     ):
+        """Initialize a Minimizer and run the optimization
+
+        When a list of NeighborList instances (see molmod.binning) that are
+        used by fun is given, the total number of builds of these neighbor
+        lists is added to the log in the field num_builds. The minimizer does
+        not update these lists: fun must call their update method with the
+        new coordinates. This argument only serves logging.
+        """
         if len(x_init.shape)!=1:
             raise ValueError("The unknowns must be stored in a plain row vector.")
         max_step = max_step_rms*numpy.sqrt(len(x_init))
@@ -232,8 +341,11 @@ class Minimizer(object):
         self.absftol = absftol
         self.verbose = verbose
         self.min_iter = min_iter
+        self.neighbor_lists = neighbor_lists
 
         self.extra_log_dtypes = self.line_search.get_extra_log_dtypes()
+        if neighbor_lists is not None:
+            self.extra_log_dtypes.append(("num_builds", int))
         if extra_log_dtypes is not None:
             self.extra_log_dtypes.extend(extra_log_dtypes)
 
@@ -374,6 +486,8 @@ class Minimizer(object):
 
     def append_log(self):
         extra_fields = self.line_search.get_extra_log()
+        if self.neighbor_lists is not None:
+            extra_fields = extra_fields + (sum(neighbor_list.num_builds for neighbor_list in self.neighbor_lists),)
         if self.callback is not None:
             extra_fields = extra_fields + tuple(self.callback(self.x))
         self.log.append((
@@ -438,3 +552,563 @@ class Minimizer(object):
         ] + self.extra_log_dtypes)
 
 
+class LBFGSMinimizer(Minimizer):
+    def __init__(
+        self, x_init, fun, ftol, xtol, max_step_rms, max_iter, max_line_iter=20,
+        memory=10, epsilon_init=1e-6, absftol=False, verbose=True, callback=None,
+        min_iter=0, extra_log_dtypes=None, neighbor_lists=None
+    ):
+        """Initialize a limited-memory BFGS Minimizer and run the optimization
+
+        The search directions are computed from the last memory steps and
+        gradient changes with the two-loop recursion of the L-BFGS method. The
+        step along each direction is found with a WolfeLineSearch, which
+        accepts a step after a single function call in most iterations. The
+        function must support do_gradient=True. The convergence criteria, the
+        log and the other arguments are the same as for the Minimizer. The log
+        contains the number of function calls of each iteration in the field
+        num_eval.
+        """
+        self.memory = memory
+        Minimizer.__init__(
+            self, x_init, fun, WolfeLineSearch, ftol, xtol, max_step_rms,
+            max_iter, max_line_iter, do_gradient=True,
+            epsilon_init=epsilon_init, absftol=absftol, verbose=verbose,
+            callback=callback, min_iter=min_iter,
+            extra_log_dtypes=extra_log_dtypes, neighbor_lists=neighbor_lists
+        )
+
+    def get_direction(self, gradient, steps, changes):
+        # The two-loop recursion. The initial inverse hessian is a multiple of
+        # the identity, derived from the last step and gradient change.
+        direction = -gradient
+        alphas = []
+        for s, y in reversed(zip(steps, changes)):
+            alpha = numpy.dot(s, direction)/numpy.dot(s, y)
+            direction -= alpha*y
+            alphas.append(alpha)
+        if self.scale is not None:
+            direction *= self.scale
+        for (s, y), alpha in zip(zip(steps, changes), reversed(alphas)):
+            beta = numpy.dot(y, direction)/numpy.dot(s, y)
+            direction += (alpha - beta)*s
+        return direction
+
+    def line_opt(self, direction, label):
+        norm = numpy.linalg.norm(direction)
+        if norm == 0:
+            self.screen("  'Opt% 3s'              Direction zero" % label)
+            return False, None
+        unit = direction/norm
+        # the gradients of all trial points are kept, such that the gradient
+        # in the new solution does not have to be recomputed.
+        trials = {}
+        def fun_aux(q, do_gradient=False):
+            fq, gq = self.fun(self.x + q*unit, do_gradient=True)
+            trials[q] = gq
+            if do_gradient:
+                return fq, numpy.dot(unit, gq)
+            else:
+                return fq
+
+        if self.scale is None:
+            # there is no estimate of the curvature yet
+            step_size = min(norm, self.step_size)
+        else:
+            step_size = norm
+        success, qopt, fopt = self.line_search(
+            fun_aux, self.f, step_size, self.epsilon, numpy.dot(unit, self.gradient)
+        )
+        if success:
+            self.screen("  'Opt% 3s'             " % label, False)
+            xnew = self.x + qopt*unit
+            gnew = trials[qopt]
+            return self.handle_new_solution(xnew, fopt), gnew
+        else:
+            self.screen("  'Opt% 3s'              Line search failed" % label)
+            self.reset_state()
+            return None, None
+
+    def iterate(self, max_iter):
+        self.f, self.gradient = self.fun(self.x, do_gradient=True)
+        self.line_search.num_eval += 1
+        self.beta = 0
+        self.scale = None
+        steps = []
+        changes = []
+        self.lower = False
+        for self.counter in xrange(max_iter):
+            self.screen("Iter % 5i of % 5i" % (self.counter, max_iter), False)
+            self.direction_sd[:] = -self.gradient
+            self.direction_cg[:] = self.get_direction(self.gradient, steps, changes)
+            if len(steps) > 0 and numpy.dot(self.direction_cg, self.gradient) < 0:
+                label = "BFGS"
+            else:
+                # start over with the (scaled) steepest descent
+                del steps[:]
+                del changes[:]
+                self.direction_cg[:] = self.get_direction(self.gradient, steps, changes)
+                label = "SD"
+            x_old = self.x
+            lower, gnew = self.line_opt(self.direction_cg, label)
+            self.append_log()
+            if gnew is not None and self.decrease > 0:
+                self.lower = True
+                step = self.x - x_old
+                change = gnew - self.gradient
+                self.gradient = gnew
+                if numpy.dot(step, change) > 0:
+                    steps.append(step)
+                    changes.append(change)
+                    self.scale = numpy.dot(step, change)/numpy.dot(change, change)
+                    if len(steps) > self.memory:
+                        del steps[0]
+                        del changes[0]
+            if lower is not True:
+                if label == "SD" and (self.counter > self.min_iter or lower is None):
+                    break
+                del steps[:]
+                del changes[:]
+        self.screen("Done")
+
+
+class FIREMinimizer(Minimizer):
+    def __init__(
+        self, x_init, fun, ftol, xtol, max_step_rms, max_iter, time_step=0.1,
+        max_time_step=1.0, min_downhill_steps=5, absftol=False, verbose=True,
+        callback=None, min_iter=0, extra_log_dtypes=None, neighbor_lists=None
+    ):
+        """Initialize a FIRE Minimizer and run the optimization
+
+        The fast inertial relaxation engine (Bitzek et al., Phys. Rev. Lett.
+        97, 170201, 2006) follows damped molecular dynamics with unit masses.
+        The velocities are mixed with the direction of the force and the time
+        step is increased as long as the motion goes downhill. When the motion
+        goes uphill, the velocities are set to zero and the time step is
+        reduced. Each iteration takes exactly one function call with
+        do_gradient=True and no line search is needed.
+
+        The displacement in one iteration is limited by max_step_rms. The
+        optimization stops when a downhill iteration has a displacement below
+        xtol and a decrease of the function below ftol.
+        """
+        self.time_step = time_step
+        self.max_time_step = max_time_step
+        self.min_downhill_steps = min_downhill_steps
+        Minimizer.__init__(
+            self, x_init, fun, LineSearch, ftol, xtol, max_step_rms, max_iter,
+            0, do_gradient=True, absftol=absftol, verbose=verbose,
+            callback=callback, min_iter=min_iter,
+            extra_log_dtypes=extra_log_dtypes, neighbor_lists=neighbor_lists
+        )
+
+    def iterate(self, max_iter):
+        alpha_start = 0.1
+        self.beta = alpha_start
+        self.f, gradient = self.fun(self.x, do_gradient=True)
+        velocity = numpy.zeros(self.x.shape, float)
+        num_downhill = 0
+        self.lower = False
+        for self.counter in xrange(max_iter):
+            self.screen("Iter % 5i of % 5i" % (self.counter, max_iter), False)
+            force = -gradient
+            self.direction_sd[:] = force
+            power = numpy.dot(force, velocity)
+            if power > 0:
+                # mix the velocity with the direction of the force
+                force_norm = numpy.linalg.norm(force)
+                if force_norm > 0:
+                    velocity *= 1 - self.beta
+                    velocity += self.beta*numpy.linalg.norm(velocity)/force_norm*force
+                num_downhill += 1
+                if num_downhill > self.min_downhill_steps:
+                    self.time_step = min(1.1*self.time_step, self.max_time_step)
+                    self.beta *= 0.99
+            elif power < 0:
+                # uphill, start over
+                velocity[:] = 0
+                num_downhill = 0
+                self.time_step *= 0.5
+                self.beta = alpha_start
+            # semi-implicit Euler step
+            velocity += self.time_step*force
+            step = self.time_step*velocity
+            step_size = numpy.linalg.norm(step)
+            if step_size > self.max_step:
+                step *= self.max_step/step_size
+                velocity *= self.max_step/step_size
+            self.direction_cg[:] = velocity
+            fnew, gradient = self.fun(self.x + step, do_gradient=True)
+            self.step_size = numpy.linalg.norm(step)
+            self.step_rms = self.step_size/numpy.sqrt(len(self.x))
+            if self.absftol:
+                self.decrease = self.f - fnew
+                self.screen("step_rms=% 9.7e   absdecr=% 9.7e   fnew=% 9.7e" % (self.step_rms, self.decrease, fnew))
+            else:
+                self.decrease = (self.f - fnew)/abs(self.f)
+                self.screen("step_rms=% 9.7e   reldecr=% 9.7e   fnew=% 9.7e" % (self.step_rms, self.decrease, fnew))
+            if self.decrease > 0:
+                self.lower = True
+            # unlike the other minimizers, FIRE also accepts uphill steps.
+            self.x = self.x + step
+            self.f = fnew
+            self.append_log()
+            if (power > 0 and self.counter >= self.min_iter and
+                self.step_rms < self.xtol and abs(self.decrease) < self.ftol):
+                break
+        self.screen("Done")
+
+
+class BatchMinimizer(object):
+    def __init__(
+        self, x_init, fun, ftol, xtol, max_step_rms, max_iter, memory=10,
+        absftol=False, verbose=True
+    ):
+        """Initialize a BatchMinimizer and run the optimization
+
+        A batch of K independent problems is minimized in lockstep with the
+        L-BFGS method and a backtracking line search. The first axis of x_init
+        runs over the problems, e.g. an array with shape (K, N, 3) for K
+        structures of N atoms. The function is called as fun(x,
+        do_gradient=True) with a subset of the batch, i.e. x has shape (k,
+        ...), and must return an array with k function values and an array
+        with the gradients, with the same shape as x.
+
+        Each call of fun advances all active problems by one step of their
+        own line search. A problem becomes inactive, and is no longer passed
+        to fun, when an accepted step lowers its function by less than ftol
+        (relative, or absolute when absftol is set), when its line search
+        gets stuck below xtol along the steepest descent or after max_iter
+        calls of fun. The step rms is limited by max_step_rms.
+
+        The attributes x, f and converged contain the results. get_log
+        returns the function values of all problems after each call of fun.
+        """
+        self.shape = x_init.shape
+        num = len(x_init)
+        self.size = x_init[0].size
+        self.fun = fun
+        self.ftol = ftol
+        self.xtol = xtol
+        self.max_step = max_step_rms*numpy.sqrt(self.size)
+        self.memory = memory
+        self.absftol = absftol
+        self.verbose = verbose
+
+        self.x = x_init.reshape(num, self.size).astype(float)
+        self.f = numpy.zeros(num, float)
+        self.gradient = numpy.zeros((num, self.size), float)
+        self.converged = numpy.zeros(num, bool)
+        # the history of the L-BFGS method in ring buffers
+        self.steps = numpy.zeros((num, memory, self.size), float)
+        self.changes = numpy.zeros((num, memory, self.size), float)
+        self.rhos = numpy.zeros((num, memory), float)
+        self.num_pairs = numpy.zeros(num, int)
+        self.last_pair = numpy.zeros(num, int)
+        self.scale = numpy.zeros(num, float)
+        # the state of the line searches
+        self.direction = numpy.zeros((num, self.size), float)
+        self.slope = numpy.zeros(num, float)
+        self.alpha = numpy.zeros(num, float)
+        self.log = []
+
+        self.iterate(max_iter)
+        self.x = self.x.reshape(self.shape)
+        self.gradient = self.gradient.reshape(self.shape)
+
+    def screen(self, s):
+        if self.verbose:
+            print s
+
+    def call(self, x):
+        f, gradient = self.fun(x.reshape((len(x),) + self.shape[1:]), do_gradient=True)
+        return numpy.asarray(f, float), numpy.asarray(gradient, float).reshape(len(x), self.size)
+
+    def update_directions(self, selection):
+        """Compute new search directions with the two-loop recursion."""
+        direction = -self.gradient[selection]
+        num_pairs = self.num_pairs[selection]
+        alphas = []
+        for j in xrange(self.memory):
+            # from the most recent to the oldest pair, masked when missing.
+            index = (self.last_pair[selection] - j) % self.memory
+            valid = j < num_pairs
+            s = self.steps[selection, index]
+            y = self.changes[selection, index]
+            alpha = valid*self.rhos[selection, index]*_dot(s, direction)
+            direction -= _expand(alpha)*y
+            alphas.append((index, valid, alpha))
+        scale = self.scale[selection]
+        # without any curvature information, the trial step is at most one
+        norms = numpy.sqrt(_dot(direction, direction))
+        scale[scale == 0] = numpy.minimum(1.0, 1.0/numpy.maximum(norms[scale == 0], 1e-300))
+        direction *= _expand(scale)
+        for index, valid, alpha in reversed(alphas):
+            s = self.steps[selection, index]
+            y = self.changes[selection, index]
+            beta = valid*self.rhos[selection, index]*_dot(y, direction)
+            direction += _expand(alpha - beta)*s
+        slope = _dot(direction, self.gradient[selection])
+        # fall back to the steepest descent when the direction goes uphill
+        uphill = slope >= 0
+        if uphill.any():
+            direction[uphill] = -self.gradient[selection][uphill]*_expand(scale[uphill])
+            slope[uphill] = _dot(direction[uphill], self.gradient[selection][uphill])
+            self.num_pairs[selection[uphill]] = 0
+        self.direction[selection] = direction
+        self.slope[selection] = slope
+        # the first trial step is limited by max_step
+        norms = numpy.sqrt(_dot(direction, direction))
+        self.alpha[selection] = numpy.minimum(1.0, self.max_step/numpy.maximum(norms, 1e-300))
+
+    def iterate(self, max_iter):
+        num = len(self.x)
+        self.f[:], self.gradient[:] = self.call(self.x)
+        self.update_directions(numpy.arange(num))
+        for counter in xrange(max_iter):
+            active = (~self.converged).nonzero()[0]
+            self.screen("Iter % 5i of % 5i   active=% 5i   fmin=% 9.7e" % (counter, max_iter, len(active), self.f.min()))
+            if len(active) == 0:
+                break
+            steps = _expand(self.alpha[active])*self.direction[active]
+            f_new, gradient_new = self.call(self.x[active] + steps)
+            # the Armijo condition
+            accepted = f_new <= self.f[active] + 1e-4*self.alpha[active]*self.slope[active]
+            # reduce the trial step of the rejected problems by quadratic
+            # interpolation, safeguarded between 0.1 and 0.5.
+            rejected = active[~accepted]
+            if len(rejected) > 0:
+                alpha = self.alpha[rejected]
+                curvature = f_new[~accepted] - self.f[rejected] - self.slope[rejected]*alpha
+                factor = -0.5*self.slope[rejected]*alpha/numpy.maximum(curvature, 1e-300)
+                self.alpha[rejected] *= numpy.clip(factor, 0.1, 0.5)
+                step_rms = self.alpha[rejected]*numpy.sqrt(_dot(self.direction[rejected], self.direction[rejected])/self.size)
+                stuck = step_rms < self.xtol
+                if stuck.any():
+                    # try again along the steepest descent, unless the
+                    # direction already is the steepest descent.
+                    restart = rejected[stuck & (self.num_pairs[rejected] > 0)]
+                    self.converged[rejected[stuck & (self.num_pairs[rejected] == 0)]] = True
+                    if len(restart) > 0:
+                        self.num_pairs[restart] = 0
+                        self.update_directions(restart)
+            selection = active[accepted]
+            if len(selection) > 0:
+                s = steps[accepted]
+                y = gradient_new[accepted] - self.gradient[selection]
+                if self.absftol:
+                    decrease = self.f[selection] - f_new[accepted]
+                else:
+                    decrease = (self.f[selection] - f_new[accepted])/abs(self.f[selection])
+                self.x[selection] += s
+                self.f[selection] = f_new[accepted]
+                self.gradient[selection] = gradient_new[accepted]
+                self.converged[selection[decrease < self.ftol]] = True
+                # store the new pairs with a positive curvature
+                sy = _dot(s, y)
+                good = sy > 0
+                update = selection[good]
+                if len(update) > 0:
+                    index = (self.last_pair[update] + 1) % self.memory
+                    self.last_pair[update] = index
+                    self.steps[update, index] = s[good]
+                    self.changes[update, index] = y[good]
+                    self.rhos[update, index] = 1/sy[good]
+                    self.num_pairs[update] = numpy.minimum(self.num_pairs[update] + 1, self.memory)
+                    self.scale[update] = sy[good]/_dot(y[good], y[good])
+                self.update_directions(selection)
+            self.log.append((self.f.copy(), ~self.converged))
+        self.screen("Done")
+
+    def get_log(self):
+        num = len(self.f)
+        return numpy.array(self.log, [("f", float, (num,)), ("active", bool, (num,))])
+
+
+class InternalMinimizer(object):
+    def __init__(
+        self, x_init, fun, internals, ftol, xtol, max_step_rms, max_iter,
+        hessian=None, trust_radius=0.3, max_back_iter=50, absftol=False,
+        verbose=True, callback=None, extra_log_dtypes=None
+    ):
+        """Initialize a Minimizer in redundant internal coordinates and run it
+
+        Arguments:
+          x_init  --  the initial Cartesian coordinates, a plain row vector
+          fun  --  the function to minimize, fun(x, do_gradient=True) must
+              return the function value and the Cartesian gradient
+          internals  --  a molmod.redundant.RedundantInternals instance
+          ftol, xtol, max_step_rms, max_iter  --  see Minimizer
+
+        Optional arguments:
+          hessian  --  the initial Hessian in internal coordinates, an (M,M)
+              matrix or the M diagonal elements. The default is the model
+              Hessian of internals.get_model_hessian.
+          trust_radius  --  the initial trust radius for the steps in
+              internal coordinates
+          max_back_iter  --  the maximum number of iterations in the
+              back-transformation of a step to Cartesian coordinates
+
+        Each iteration transforms the gradient to internal coordinates with
+        the Wilson B matrix and takes a rational function optimization (RFO)
+        step with the projected Hessian, within the trust radius. The step
+        is transformed back to Cartesian coordinates iteratively. Rejected
+        steps shrink the trust radius. After each accepted step the Hessian
+        is updated with the BFGS formula. The optimization stops when the
+        decrease of the function is below ftol or when the Cartesian step is
+        below xtol (rms). The log has the same fields as the log of
+        Minimizer, with the trust radius in the field beta and the norm of
+        the last step in internal coordinates in the field norm_cg.
+        """
+        from molmod.redundant import WilsonB
+
+        if len(x_init.shape)!=1:
+            raise ValueError("The unknowns must be stored in a plain row vector.")
+        self.x = x_init.copy()
+        self.fun = fun
+        self.internals = internals
+        self.ftol = ftol
+        self.xtol = xtol
+        self.max_step = max_step_rms*numpy.sqrt(len(x_init))
+        self.trust_radius = trust_radius
+        self.max_back_iter = max_back_iter
+        self.absftol = absftol
+        self.verbose = verbose
+        self.callback = callback
+        self.WilsonB = WilsonB
+        if hessian is None:
+            hessian = internals.get_model_hessian(self.x.reshape((-1,3)))
+        hessian = numpy.asarray(hessian, float)
+        if len(hessian.shape) == 1:
+            hessian = numpy.diag(hessian)
+        self.hessian = hessian
+
+        self.extra_log_dtypes = [("num_eval", int)]
+        if extra_log_dtypes is not None:
+            self.extra_log_dtypes.extend(extra_log_dtypes)
+        self.log = []
+        self.num_eval = 0
+        self.step_rms = 0.0
+
+        self.iterate(max_iter)
+
+    def screen(self, s, newline=True):
+        if self.verbose:
+            if newline:
+                print s
+            else:
+                print s,
+
+    def get_step(self, gradient, wilson):
+        """Compute an RFO step in internal coordinates within the trust radius."""
+        # Only the part of the Hessian in the space of the non-redundant
+        # internal coordinates is used. The redundant directions get a very
+        # large curvature.
+        projector = wilson.b_matrix*wilson.b_inv
+        projector = 0.5*(projector + projector.T)
+        gradient = numpy.dot(projector, gradient)
+        hessian = numpy.dot(projector, numpy.dot(self.hessian, projector))
+        hessian += 1000*(numpy.identity(len(gradient)) - projector)
+        size = len(gradient)
+        augmented = numpy.zeros((size+1, size+1), float)
+        augmented[:size,:size] = hessian
+        augmented[:size,size] = gradient
+        augmented[size,:size] = gradient
+        evals, evecs = numpy.linalg.eigh(augmented)
+        lowest = evecs[:,0]
+        if abs(lowest[size]) > 1e-10:
+            step = lowest[:size]/lowest[size]
+        else:
+            step = -gradient
+        norm = numpy.linalg.norm(step)
+        if norm > self.trust_radius:
+            step *= self.trust_radius/norm
+        predicted = numpy.dot(gradient, step) + 0.5*numpy.dot(step, numpy.dot(hessian, step))
+        return step, predicted
+
+    def back_transform(self, step, wilson):
+        """Find the Cartesian coordinates that correspond to an internal step."""
+        internals = self.internals
+        targets = wilson.values + step
+        x = self.x.copy()
+        first = None
+        for i in xrange(self.max_back_iter):
+            deltas = internals.get_deltas(targets, internals.get_values(x.reshape((-1,3))))
+            dx = wilson.step_to_cartesian(deltas)
+            x += dx
+            if first is None:
+                first = x.copy()
+            if numpy.sqrt((dx**2).mean()) < 1e-8:
+                return x
+        # fall back to the first-order step
+        return first
+
+    def iterate(self, max_iter):
+        internals = self.internals
+        self.f, gradient = self.fun(self.x, do_gradient=True)
+        self.num_eval += 1
+        wilson = self.WilsonB(internals, self.x.reshape((-1,3)))
+        gradient_internal = wilson.gradient_to_internal(gradient)
+        self.lower = False
+        for self.counter in xrange(max_iter):
+            self.screen("Iter % 5i of % 5i" % (self.counter, max_iter), False)
+            step, predicted = self.get_step(gradient_internal, wilson)
+            xnew = self.back_transform(step, wilson)
+            cartesian_step = xnew - self.x
+            step_size = numpy.linalg.norm(cartesian_step)
+            if step_size > self.max_step:
+                xnew = self.x + cartesian_step*(self.max_step/step_size)
+            fnew, gnew = self.fun(xnew, do_gradient=True)
+            self.num_eval += 1
+            self.step_rms = numpy.sqrt(((xnew - self.x)**2).mean())
+            if self.absftol:
+                decrease = self.f - fnew
+                self.screen("step_rms=% 9.7e   absdecr=% 9.7e   fnew=% 9.7e" % (self.step_rms, decrease, fnew))
+            else:
+                decrease = (self.f - fnew)/abs(self.f)
+                self.screen("step_rms=% 9.7e   reldecr=% 9.7e   fnew=% 9.7e" % (self.step_rms, decrease, fnew))
+            # adapt the trust radius to the quality of the quadratic model
+            if predicted < 0:
+                ratio = (fnew - self.f)/predicted
+            else:
+                ratio = -1
+            if ratio < 0.25:
+                self.trust_radius *= 0.5
+            elif ratio > 0.75 and numpy.linalg.norm(step) > 0.9*self.trust_radius:
+                self.trust_radius *= 2
+            converged = decrease < self.ftol or self.step_rms < self.xtol
+            if decrease > 0:
+                self.lower = True
+                wilson_new = self.WilsonB(internals, xnew.reshape((-1,3)))
+                gradient_internal_new = wilson_new.gradient_to_internal(gnew)
+                # BFGS update of the Hessian with the actual step
+                s = internals.get_deltas(wilson_new.values, wilson.values)
+                y = gradient_internal_new - gradient_internal
+                sy = numpy.dot(s, y)
+                if sy > 0:
+                    hs = numpy.dot(self.hessian, s)
+                    self.hessian += numpy.outer(y, y)/sy - numpy.outer(hs, hs)/numpy.dot(s, hs)
+                self.x = xnew
+                self.f = fnew
+                gradient = gnew
+                wilson = wilson_new
+                gradient_internal = gradient_internal_new
+            self.append_log(gradient, numpy.linalg.norm(step))
+            if converged and (decrease > 0 or self.step_rms < self.xtol):
+                break
+        self.screen("Done")
+
+    def append_log(self, gradient, step_norm):
+        extra_fields = (self.num_eval,)
+        if self.callback is not None:
+            extra_fields = extra_fields + tuple(self.callback(self.x))
+        self.log.append((
+            self.f, self.step_rms, self.trust_radius,
+            numpy.linalg.norm(gradient), step_norm, self.x.copy(),
+        ) + extra_fields)
+
+    def get_log(self):
+        return numpy.array(self.log, [
+            ("f", float), ("step_rms", float), ("beta", float),
+            ("norm_sd", float), ("norm_cg", float), ("x", float, self.x.shape),
+        ] + self.extra_log_dtypes)
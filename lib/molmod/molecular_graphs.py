@@ -19,17 +19,16 @@
 # --
 
 
-from molmod.graphs import cached, Graph, SubgraphPattern, EqualPattern, Match, \
-    OneToOne, GraphSearch, CriteriaSet
-from molmod.binning import IntraAnalyseNeighboringObjects, PositionedObject, \
-    SparseBinnedObjects
+from molmod.graphs import cached, Graph, GraphIndex, SubgraphPattern, \
+    EqualPattern, Match, OneToOne, GraphSearch, CriteriaSet
+from molmod.binning import CellList
 from molmod.units import angstrom
 
-import numpy, copy
+import numpy, copy, itertools
 
 
 __all__ = [
-    "MolecularGraph",
+    "MolecularGraph", "MolecularGraphIndex", "GraphTracker",
     "HasAtomNumber", "HasNumNeighbors", "HasNeighborNumbers", "HasNeighbors", "BondLongerThan",
     "atom_criteria", "BondPattern", "BendingAnglePattern", "DihedralAnglePattern",
     "OutOfPlanePattern", "TetraPattern", "NRingPattern",
@@ -46,53 +45,60 @@ class MolecularGraph(Graph):
     various graph analysis and properties can be cached.
     """
     @classmethod
-    def from_geometry(cls, molecule, unit_cell=None, do_orders=False):
-        from molmod.data.bonds import bonds
+    def from_geometry(cls, molecule, unit_cell=None, do_orders=False, neighbor_list=None):
+        """Construct a molecular graph based on the interatomic distances.
 
-        def yield_positioned_atoms():
-            for index in xrange(molecule.size):
-                yield PositionedObject(index, molecule.coordinates[index])
-
-        binned_atoms = SparseBinnedObjects(yield_positioned_atoms(), bonds.max_length*bonds.bond_tolerance)
-
-        def compare_function(positioned1, positioned2):
-            delta = positioned2.coordinate - positioned1.coordinate
-            if unit_cell is not None:
-                delta = unit_cell.shortest_vector(delta)
-            distance = numpy.linalg.norm(delta)
-            if distance < binned_atoms.gridsize:
-                bond_order = bonds.bonded(molecule.numbers[positioned1.id], molecule.numbers[positioned2.id], distance)
-                if bond_order != None:
-                    return bond_order, distance
-
-        bond_data = list(dict(
-            (frozenset([positioned.id for positioned in key]), data)
-            for key, data
-            in IntraAnalyseNeighboringObjects(binned_atoms, compare_function)(unit_cell)
-        ).iteritems())
-        pairs = tuple(pair for pair, data in bond_data)
-        orders = numpy.array([data[0] for pair, data in bond_data], dtype=int)
-        lengths = numpy.array([data[1] for pair, data in bond_data], dtype=float)
+        Arguments:
+          molecule -- the Molecule instance whose bonds are perceived
+          unit_cell -- an optional UnitCell instance for periodic systems
+          do_orders -- when True, the bond orders are also stored
+          neighbor_list -- an optional NeighborList instance (see
+                           molmod.binning) that is reused for consecutive
+                           geometries. Its cutoff must not be smaller than
+                           the longest bond length times the bond tolerance.
+                           The unit_cell argument is ignored in this case.
+        """
+        from molmod.data.bonds import bonds
 
+        cutoff = bonds.max_length*bonds.bond_tolerance
+        if neighbor_list is not None:
+            if neighbor_list.cutoff < cutoff:
+                raise ValueError("The cutoff of the neighbor list is too small for bond perception.")
+            indices1, indices2, deltas, distances = neighbor_list.update(molecule.coordinates)
+        else:
+            indices1, indices2, deltas, distances = _find_close_pairs(molecule.coordinates, unit_cell, cutoff)
+
+        orders = bonds.bonded_array(molecule.numbers[indices1], molecule.numbers[indices2], distances)
+        mask = orders != 0
+        pairs = tuple(
+            frozenset([int(index1), int(index2)]) for index1, index2
+            in zip(indices1[mask], indices2[mask])
+        )
         if do_orders:
-            result = cls(pairs, molecule.numbers, orders)
+            result = cls(pairs, molecule.numbers, orders[mask])
         else:
             result = cls(pairs, molecule.numbers)
-        result.bond_lengths = lengths
+        result.bond_lengths = distances[mask]
         return result
 
     @classmethod
     def from_blob(cls, s):
         """Construct a molecular graph from the blob representation created with get_blob"""
-        atom_str, pair_str = s.split()
+        words = s.split()
+        atom_str = words[0]
+        if len(words) > 1:
+            pair_str = words[1]
+        else:
+            pair_str = ""
         numbers = numpy.array([int(s) for s in atom_str.split(",")])
         pairs = []
         orders = []
-        for s in pair_str.split(","):
-            i,j,o = (int(w) for w in s.split("_"))
-            pairs.append((i,j))
-            orders.append(o)
-        return cls(pairs,numbers,numpy.array(orders))
+        if len(pair_str) > 0:
+            for s in pair_str.split(","):
+                i,j,o = (int(w) for w in s.split("_"))
+                pairs.append((i,j))
+                orders.append(o)
+        return cls(pairs,numbers,numpy.array(orders, int))
 
     def __init__(self, pairs, numbers, orders=None):
         """Initialize a molecular graph
@@ -148,6 +154,139 @@ class MolecularGraph(Graph):
         pair_str = ",".join("%i_%i_%i" % (i,j,o) for (i,j),o in zip(self.pairs,self.orders))
         return "%s %s" % (atom_str, pair_str)
 
+    @cached
+    def canonical_form(self):
+        """The blob of the graph with its atoms in the canonical order.
+
+        Isomorphic molecular graphs have the same canonical form. The pairs in
+        the blob are sorted. MolecularGraph.from_blob reconstructs the graph in
+        the canonical order.
+        """
+        order = self.canonical_order
+        labels = numpy.zeros(self.num_nodes, int)
+        labels[order] = numpy.arange(self.num_nodes)
+        atom_str = ",".join(str(number) for number in self.numbers[order])
+        pair_str = ",".join("%i_%i_%i" % record for record in sorted(
+            (min(labels[i], labels[j]), max(labels[i], labels[j]), o)
+            for (i,j),o in zip(self.pairs,self.orders)
+        ))
+        return "%s %s" % (atom_str, pair_str)
+
+    # Direct enumeration of the internal coordinates. The rows have the same
+    # orientation as the canonical matches of the corresponding patterns and
+    # they are sorted.
+
+    def _get_neighbor_combinations(self, size):
+        """Return all (center, neighbor1, ..., neighborN) with sorted neighbors.
+
+        The atoms are grouped by their number of neighbors, such that all
+        combinations in one group are constructed with array operations.
+        """
+        adjacency = self.adjacency_matrix
+        degrees = adjacency.indptr[1:] - adjacency.indptr[:-1]
+        result = [numpy.zeros((0, size+1), int)]
+        for degree in numpy.unique(degrees[degrees >= size]):
+            centers = (degrees == degree).nonzero()[0]
+            neighbors = adjacency.indices[adjacency.indptr[centers].reshape(-1, 1) + numpy.arange(degree)]
+            neighbors.sort(axis=1)
+            combinations = numpy.array(list(itertools.combinations(xrange(degree), size)))
+            rows = numpy.zeros((len(centers), len(combinations), size+1), int)
+            rows[:,:,0] = centers.reshape(-1, 1)
+            rows[:,:,1:] = neighbors[:,combinations]
+            result.append(rows.reshape(-1, size+1))
+        return numpy.concatenate(result)
+
+    def _sort_rows(self, rows):
+        return rows[numpy.lexsort(rows.transpose()[::-1])]
+
+    @cached
+    def bonds(self):
+        """An integer array with all bonds (i, j), where i < j."""
+        rows = numpy.array([sorted(pair) for pair in self.pairs], int).reshape(-1, 2)
+        return self._sort_rows(rows)
+
+    @cached
+    def bends(self):
+        """An integer array with all bending angles (i, j, k), where i < k.
+
+        Atom j is the central atom.
+        """
+        rows = self._get_neighbor_combinations(2)
+        return self._sort_rows(rows[:,[1, 0, 2]])
+
+    @cached
+    def dihedrals(self):
+        """An integer array with all dihedral angles (i, j, k, l), where i < l.
+
+        The bond j-k is the central bond.
+        """
+        # extend the bending angles in both directions with a neighbor of
+        # the last atom
+        bends = numpy.concatenate([self.bends, self.bends[:,::-1]])
+        adjacency = self.adjacency_matrix
+        last = bends[:,2]
+        counts = adjacency.indptr[last+1] - adjacency.indptr[last]
+        blocks = numpy.repeat(numpy.arange(len(bends)), counts)
+        positions = numpy.arange(len(blocks)) - (counts.cumsum() - counts)[blocks]
+        rows = numpy.zeros((len(blocks), 4), int)
+        rows[:,:3] = bends[blocks]
+        rows[:,3] = adjacency.indices[adjacency.indptr[last][blocks] + positions]
+        # each dihedral is found in both directions, only i < l is retained.
+        # This also discards the cases where the first and the last atom
+        # coincide, or where the last atom goes back to the second.
+        rows = rows[(rows[:,0] < rows[:,3]) & (rows[:,1] != rows[:,3])]
+        return self._sort_rows(rows)
+
+    @cached
+    def out_of_planes(self):
+        """An integer array with all out-of-plane quadruples (i, j, k, l).
+
+        Atom i is the central atom, bonded to atoms j < k < l.
+        """
+        return self._sort_rows(self._get_neighbor_combinations(3))
+
+    def get_atom_mask(self, criterion):
+        """Return a boolean array that is True for the atoms that satisfy criterion.
+
+        When the criterion has a method get_mask, it is used to evaluate the
+        criterion for all atoms at once. When the criterion is None, all atoms
+        are selected.
+        """
+        if criterion is None:
+            return numpy.ones(self.num_nodes, bool)
+        elif hasattr(criterion, "get_mask"):
+            return criterion.get_mask(self)
+        else:
+            return numpy.array([bool(criterion(atom, self)) for atom in xrange(self.num_nodes)], bool).reshape(-1)
+
+    def filter_rows(self, rows, atom_criteria):
+        """Select the rows (e.g. bonds, bends or dihedrals) that satisfy atom_criteria.
+
+        Arguments:
+          rows -- an integer array with shape (N, K), e.g. self.dihedrals
+          atom_criteria -- a list of atom criteria, where None means any
+                           atom, or a dictionary with the criteria for some
+                           indices, as returned by the function atom_criteria
+
+        A row is also selected when its reverse satisfies the criteria. Such
+        rows are reversed in the result, just like the final matches of the
+        corresponding patterns with one criteria set.
+        """
+        if isinstance(atom_criteria, dict):
+            atom_criteria = atom_criteria.iteritems()
+        else:
+            atom_criteria = enumerate(atom_criteria)
+        forward = numpy.ones(len(rows), bool)
+        backward = numpy.ones(len(rows), bool)
+        for index, criterion in atom_criteria:
+            mask = self.get_atom_mask(criterion)
+            forward &= mask[rows[:,index]]
+            backward &= mask[rows[:,-1-index]]
+        backward &= ~forward
+        result = rows.copy()
+        result[backward] = rows[backward,::-1]
+        return result[forward | backward]
+
     def get_node_string(self, i):
         number = self.numbers[i]
         if number == 0:
@@ -230,6 +369,174 @@ class MolecularGraph(Graph):
 
 # basic criteria for molecular patterns
 
+class MolecularGraphIndex(GraphIndex):
+    """An in-memory collection of molecular graphs, up to isomorphism.
+
+    Besides MolecularGraph instances, all methods also accept blobs (see
+    MolecularGraph.blob) as arguments.
+    """
+
+    def _get_graph(self, graph):
+        if isinstance(graph, basestring):
+            return MolecularGraph.from_blob(graph)
+        else:
+            return graph
+
+    def iter_graphs(self):
+        """Iterate over the graphs in the index, with atoms in canonical order."""
+        for form in self.iter_forms():
+            yield MolecularGraph.from_blob(form)
+
+
+def _find_close_pairs(coordinates, unit_cell, radius):
+    """Return all pairs of atoms that are closer than radius.
+
+    The result is a tuple (indices1, indices2, deltas, distances) with
+    indices1 < indices2 and deltas the relative vectors from the atoms in
+    indices1 to the atoms in indices2. The pairs are sorted by indices1 and
+    then by indices2. For periodic systems, only the shortest image of each
+    pair is retained.
+    """
+    if unit_cell is not None:
+        # put all atoms in the unit cell, such that the neighboring
+        # periodic images contain all close pairs.
+        coordinates = coordinates - unit_cell.to_cartesian(unit_cell.to_index(coordinates))
+    indices1, indices2, deltas = CellList(coordinates, radius).get_pairs(unit_cell=unit_cell, radius=radius)
+    distances = numpy.sqrt((deltas**2).sum(axis=1))
+    # only keep the shortest periodic image of each pair
+    keys = indices1*len(coordinates) + indices2
+    order = numpy.lexsort([distances, keys])
+    keys = keys[order]
+    first = numpy.ones(len(keys), bool)
+    first[1:] = keys[1:] != keys[:-1]
+    order = order[first]
+    return indices1[order], indices2[order], deltas[order], distances[order]
+
+
+class GraphTracker(object):
+    """Follows the molecular graph along a trajectory.
+
+    The bonds are perceived as in MolecularGraph.from_geometry, but only the
+    pairs of atoms whose distance is close to the bonding threshold are
+    reconsidered in each frame. When the bonds (and their orders) do not
+    change, the previous MolecularGraph instance is reused, together with all
+    its cached properties. Only its attribute bond_lengths is updated.
+
+    All close pairs are searched again when some atom has moved more than half
+    the margin since the last search. The attribute num_searches counts these
+    searches.
+    """
+
+    def __init__(self, numbers, unit_cell=None, margin=0.5*angstrom, do_orders=False):
+        """Initialize a GraphTracker
+
+        Arguments:
+          numbers -- the atom numbers
+          unit_cell -- an optional UnitCell instance for periodic systems
+          margin -- pairs whose distance differs more than the margin from the
+                    bonding threshold are not reconsidered
+          do_orders -- when True, the bond orders are also stored. A change of
+                       a bond order then results in a new graph.
+        """
+        from molmod.data.bonds import bonds
+
+        self.numbers = numpy.array(numbers)
+        self.unit_cell = unit_cell
+        self.margin = margin
+        self.do_orders = do_orders
+        self.num_searches = 0
+        self.graph = None
+        # the distance below which some bond type is found, for all pairs of
+        # atom numbers in the table of bond lengths.
+        self._thresholds = bonds.length_table.max(axis=0)*bonds.bond_tolerance
+        self._cutoff = bonds.max_length*bonds.bond_tolerance
+        self._reference = None
+        self._keys = numpy.zeros(0, int)
+        self._orders = numpy.zeros(0, int)
+
+    def _search(self, coordinates):
+        """Find all pairs that may be bonded before the next search."""
+        indices1, indices2, deltas, distances = _find_close_pairs(
+            coordinates, self.unit_cell, self._cutoff + self.margin
+        )
+        numbers1 = self.numbers[indices1]
+        numbers2 = self.numbers[indices2]
+        known = (numbers1 >= 0) & (numbers1 < len(self._thresholds)) & \
+                (numbers2 >= 0) & (numbers2 < len(self._thresholds))
+        thresholds = self._thresholds[numbers1*known, numbers2*known]*known
+        mask = distances < thresholds + self.margin
+        self._indices1 = indices1[mask]
+        self._indices2 = indices2[mask]
+        # The periodic image of each pair is fixed until the next search.
+        deltas = deltas[mask]
+        if self.unit_cell is None:
+            self._shifts = numpy.zeros(deltas.shape, float)
+        else:
+            raw = coordinates[self._indices2] - coordinates[self._indices1]
+            fractional = self.unit_cell.to_fractional(deltas - raw)
+            self._shifts = self.unit_cell.to_cartesian(fractional.round())
+        # Only the pairs close to the threshold can change their status
+        # before the next search.
+        distances = distances[mask]
+        thresholds = thresholds[mask]
+        self._stable = distances < thresholds - self.margin
+        self._reference = coordinates.copy()
+        self.num_searches += 1
+
+    def update(self, coordinates):
+        """Perceive the bonds in the next frame.
+
+        Argument:
+          coordinates -- the atomic coordinates of the next frame
+
+        Returns: (graph, formed, broken) where graph is the current
+        MolecularGraph and formed and broken are tuples with the pairs that
+        were bonded or that lost their bond since the previous frame. In
+        the first frame, all bonds are reported as formed.
+        """
+        from molmod.data.bonds import bonds
+
+        coordinates = numpy.asarray(coordinates, float)
+        if self._reference is None or self._reference.shape != coordinates.shape or \
+           ((coordinates - self._reference)**2).sum(axis=1).max() > 0.25*self.margin**2:
+            self._search(coordinates)
+
+        # the stable pairs are bonded, the others are reconsidered
+        deltas = coordinates[self._indices2] - coordinates[self._indices1] + self._shifts
+        distances = numpy.sqrt((deltas**2).sum(axis=1))
+        if self.do_orders:
+            todo = numpy.ones(len(distances), bool)
+        else:
+            todo = ~self._stable
+        bonded = self._stable.copy()
+        orders = numpy.zeros(len(distances), int)
+        orders[todo] = bonds.bonded_array(
+            self.numbers[self._indices1[todo]], self.numbers[self._indices2[todo]],
+            distances[todo]
+        )
+        bonded[todo] = orders[todo] != 0
+        size = len(self.numbers)
+        keys = self._indices1[bonded]*size + self._indices2[bonded]
+        orders = orders[bonded]
+        bond_lengths = distances[bonded]
+
+        def to_pairs(keys):
+            return tuple(frozenset([int(key//size), int(key%size)]) for key in keys)
+
+        formed = keys[~numpy.in1d(keys, self._keys)]
+        broken = self._keys[~numpy.in1d(self._keys, keys)]
+        if self.graph is None or len(formed) > 0 or len(broken) > 0 or \
+           (self.do_orders and (orders != self._orders).any()):
+            if self.do_orders:
+                self.graph = MolecularGraph(to_pairs(keys), self.numbers, orders)
+            else:
+                self.graph = MolecularGraph(to_pairs(keys), self.numbers)
+        self.graph.bond_lengths = bond_lengths
+        self._keys = keys
+        self._orders = orders
+        return self.graph, to_pairs(formed), to_pairs(broken)
+
+
 class HasAtomNumber(object):
     def __init__(self, number):
         self.number = number
@@ -237,6 +544,9 @@ class HasAtomNumber(object):
     def __call__(self, atom, graph):
         return graph.numbers[atom] == self.number
 
+    def get_mask(self, graph):
+        return graph.numbers == self.number
+
 
 class HasNumNeighbors(object):
     def __init__(self, count):
@@ -245,6 +555,10 @@ class HasNumNeighbors(object):
     def __call__(self, atom, graph):
         return len(graph.neighbors[atom]) == self.count
 
+    def get_mask(self, graph):
+        adjacency = graph.adjacency_matrix
+        return (adjacency.indptr[1:] - adjacency.indptr[:-1]) == self.count
+
 
 class HasNeighborNumbers(object):
     def __init__(self, *numbers):
@@ -349,6 +663,10 @@ class NRingPattern(SubgraphPattern):
         self.strong = strong
         subgraph = Graph([(i,(i+1)%size) for i in xrange(size)])
         SubgraphPattern.__init__(self, subgraph, criteria_sets, node_tags)
+        # check_next_match and complete only add checks for strong rings,
+        # which rely on the incremental growth of the matches.
+        if not strong:
+            self.vf2 = True
 
     def check_next_match(self, match, new_relations):
         if not SubgraphPattern.check_next_match(self, match, new_relations):
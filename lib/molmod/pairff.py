@@ -19,7 +19,9 @@
 # --
 
 
-import math, numpy
+from molmod.binning import NeighborList
+
+import numpy, scipy.sparse
 
 
 __all__ = [
@@ -40,229 +42,389 @@ class PairFF(object):
     The class is initialized with the coordinates of the points, pairs of
     points whos interactions have to be excluded, and userdefined data that
     specifies the interactions in the derived classes.
+
+    The derived classes implement either the batched generators
+    (yield_batch_energies, yield_batch_gradients and yield_batch_hessians)
+    or the per-pair generators (yield_pair_energies, ...). The batched
+    generators evaluate all the terms for a whole array of pairs at once and
+    are used internally to compute the energy, gradient and hessian. Each
+    family has a default implementation in terms of the other one.
+
+    When a cutoff is given, only the pairs within the cutoff distance are
+    taken into account. They are found with the binning algorithm and stored
+    in compact arrays, such that the memory usage scales linearly with the
+    number of points. In that case, the dense attributes distances, deltas,
+    directions and mask are not available and one should use hessian_sparse
+    instead of hessian. When a unit_cell is given, the minimum image
+    convention is used for all relative vectors.
+
+    The pairs within the cutoff are taken from a NeighborList (see
+    molmod.binning), that is only rebuilt when some point moved more than half
+    the skin since the last build. The neighbor list is available as the
+    attribute neighbor_list.
     """
-    def __init__(self, coordinates, exclude_pairs=None):
-        self.update_coordinates(coordinates)
+    def __init__(self, coordinates, exclude_pairs=None, cutoff=None, unit_cell=None, skin=0.0):
         if exclude_pairs is None:
-            self.exclude_pairs = set([])
+            self._exclude_pairs = set([])
+        else:
+            self._exclude_pairs = exclude_pairs
+        self.cutoff = cutoff
+        self.unit_cell = unit_cell
+        if cutoff is None:
+            self.neighbor_list = None
         else:
-            self.exclude_pairs = exclude_pairs
+            self.neighbor_list = NeighborList(cutoff, skin, unit_cell)
+        self.coordinates = coordinates
+        self.numc = len(coordinates)
+        self.update_mask()
+        self.update_coordinates()
 
     def update_coordinates(self, coordinates=None):
         if coordinates is not None:
             self.coordinates = coordinates
         self.numc = len(self.coordinates)
-        self.distances = numpy.zeros((self.numc, self.numc), float)
-        self.deltas = numpy.zeros((self.numc, self.numc, 3), float)
-        self.directions = numpy.zeros((self.numc, self.numc, 3), float)
-        self.dirouters = numpy.zeros((self.numc, self.numc, 3, 3), float)
-        for index1, coordinate1 in enumerate(self.coordinates):
-            for index2, coordinate2 in enumerate(self.coordinates):
-                delta = coordinate1 - coordinate2
-                self.deltas[index1,index2] = delta
-                distance = math.sqrt(numpy.dot(delta, delta))
-                self.distances[index1, index2] = distance
-                if index1 != index2:
-                    tmp = delta/distance
-                    self.directions[index1, index2] = tmp
-                    self.dirouters[index1, index2] = numpy.outer(tmp, tmp)
+        if self.cutoff is None:
+            self.deltas = self.compute_deltas(self.coordinates.reshape(-1,1,3) - self.coordinates.reshape(1,-1,3))
+            self.distances = numpy.sqrt((self.deltas**2).sum(axis=2))
+            # avoid divisions by zero on the diagonal, the directions remain zero
+            self.directions = self.deltas/(self.distances + numpy.identity(self.numc)).reshape(self.numc,self.numc,1)
+            self.pair_indices1, self.pair_indices2 = numpy.tril(self.mask).nonzero()
+            self.pair_deltas = self.deltas[self.pair_indices1, self.pair_indices2]
+            self.pair_distances = self.distances[self.pair_indices1, self.pair_indices2]
+        else:
+            self.update_neighbor_pairs()
+
+    def _set_exclude_pairs(self, exclude_pairs):
+        self._exclude_pairs = exclude_pairs
+        self.update_mask()
+        self.update_coordinates()
+
+    exclude_pairs = property(lambda self: self._exclude_pairs, _set_exclude_pairs)
+
+    def update_mask(self):
+        """
+        Processes the excluded pairs.
+
+        In the dense case, this computes the boolean matrix that is True for
+        all interacting pairs. Assigning to exclude_pairs takes care of this.
+        When the set exclude_pairs is modified in place, update_mask must be
+        called again, followed by update_coordinates.
+        """
+        excluded = numpy.array([sorted(pair) for pair in self.exclude_pairs], int).reshape(-1, 2)
+        self.exclude_keys = numpy.unique(excluded[:,1]*self.numc + excluded[:,0])
+        if self.cutoff is None:
+            self.mask = numpy.ones((self.numc, self.numc), bool)
+            self.mask.ravel()[::self.numc+1] = False
+            self.mask[excluded[:,0], excluded[:,1]] = False
+            self.mask[excluded[:,1], excluded[:,0]] = False
+
+    def compute_deltas(self, deltas):
+        """
+        Applies the minimum image convention to an array of relative vectors.
+
+        The last axis of deltas must have size three. Without unit cell, the
+        deltas are returned unaltered.
+        """
+        if self.unit_cell is None:
+            return deltas
+        fractional = numpy.dot(deltas, self.unit_cell.cell_reciproke.transpose())
+        return deltas - numpy.dot(fractional.round(), self.unit_cell.cell.transpose())
+
+    def update_neighbor_pairs(self):
+        """
+        Selects all non-excluded pairs within the cutoff distance.
+        """
+        indices1, indices2, deltas, distances = self.neighbor_list.update(self.coordinates)
+        mask = ~numpy.in1d(indices1*self.numc + indices2, self.exclude_keys)
+        self.pair_indices1 = indices1[mask]
+        self.pair_indices2 = indices2[mask]
+        self.pair_deltas = deltas[mask]
+        self.pair_distances = distances[mask]
+
+    def _get_ordered_pairs(self):
+        # returns all interacting pairs in both orders
+        return (
+            numpy.concatenate([self.pair_indices1, self.pair_indices2]),
+            numpy.concatenate([self.pair_indices2, self.pair_indices1]),
+            numpy.concatenate([self.pair_deltas, -self.pair_deltas]),
+            numpy.concatenate([self.pair_distances, self.pair_distances]),
+        )
+
+    def _get_batch_arguments(self, index1, index2):
+        indices1 = numpy.array([index1])
+        indices2 = numpy.array([index2])
+        deltas = self.compute_deltas(self.coordinates[indices1] - self.coordinates[indices2])
+        distances = numpy.sqrt((deltas**2).sum(axis=1))
+        return indices1, indices2, deltas, distances
+
+    def _check_batch_method(self, name):
+        # The default per-pair and batched generators are implemented in
+        # terms of each other. At least one of both must be overridden.
+        if getattr(self.__class__, name).im_func is getattr(PairFF, name).im_func:
+            raise NotImplementedError("%s must implement %s or the corresponding per-pair generator." % (self.__class__.__name__, name))
 
     def yield_pair_energies(self, index1, index2):
         """
         Yields pairs ((s(r_ij), v(bar{r}_ij)). (implemented in derived classes)
         """
-        raise NotImplementedError
+        self._check_batch_method("yield_batch_energies")
+        for se, ve in self.yield_batch_energies(*self._get_batch_arguments(index1, index2)):
+            yield se[0], ve[0]
 
     def yield_pair_gradients(self, index1, index2):
         """
         Yields pairs ((s'(r_ij), grad_i v(bar{r}_ij)). (implemented in derived classes)
         """
-        raise NotImplementedError
+        self._check_batch_method("yield_batch_gradients")
+        for sg, vg in self.yield_batch_gradients(*self._get_batch_arguments(index1, index2)):
+            yield sg[0], vg[0]
 
     def yield_pair_hessians(self, index1, index2):
         """
         Yields pairs ((s''(r_ij), grad_i (x) grad_i v(bar{r}_ij)). (implemented in derived classes)
         """
-        raise NotImplementedError
+        self._check_batch_method("yield_batch_hessians")
+        for sh, vh in self.yield_batch_hessians(*self._get_batch_arguments(index1, index2)):
+            yield sh[0], vh[0]
+
+    def _yield_batch_aux(self, yield_pair, indices1, indices2, v_shape):
+        # Stack the per-pair results into arrays. All pairs must yield the same
+        # number of terms.
+        terms = zip(*[list(yield_pair(index1, index2)) for index1, index2 in zip(indices1, indices2)])
+        for term in terms:
+            s = numpy.array([se for se, ve in term], float)
+            v = numpy.zeros((len(term),) + v_shape, float)
+            v[:] = [ve for se, ve in term]
+            yield s, v
+
+    def yield_batch_energies(self, indices1, indices2, deltas, distances):
+        """
+        Yields pairs of arrays (s(r_ij), v(bar{r}_ij)) for all pairs (i,j) in
+        zip(indices1, indices2). (implemented in derived classes)
+
+        The relative vectors r_i - r_j and their norms are given in the
+        arguments deltas and distances. The yielded arrays have shape (M,)
+        where M is the number of pairs.
+        """
+        return self._yield_batch_aux(self.yield_pair_energies, indices1, indices2, ())
+
+    def yield_batch_gradients(self, indices1, indices2, deltas, distances):
+        """
+        Yields pairs of arrays (s'(r_ij), grad_i v(bar{r}_ij)) for all pairs
+        (i,j) in zip(indices1, indices2). (implemented in derived classes)
+
+        The arrays have shape (M,) and (M,3) where M is the number of pairs.
+        """
+        return self._yield_batch_aux(self.yield_pair_gradients, indices1, indices2, (3,))
+
+    def yield_batch_hessians(self, indices1, indices2, deltas, distances):
+        """
+        Yields pairs of arrays (s''(r_ij), grad_i (x) grad_i v(bar{r}_ij)) for
+        all pairs (i,j) in zip(indices1, indices2). (implemented in derived
+        classes)
+
+        The arrays have shape (M,) and (M,3,3) where M is the number of pairs.
+        """
+        return self._yield_batch_aux(self.yield_pair_hessians, indices1, indices2, (3,3))
+
+    def _gradient_terms(self, indices1, indices2, deltas, distances):
+        # contributions to the gradient of atom indices1 due to the pairs
+        result = numpy.zeros((len(indices1), 3), float)
+        directions = deltas/distances.reshape(-1,1)
+        for (se, ve), (sg, vg) in zip(
+            self.yield_batch_energies(indices1, indices2, deltas, distances),
+            self.yield_batch_gradients(indices1, indices2, deltas, distances)
+        ):
+            result += (sg*ve).reshape(-1,1)*directions + se.reshape(-1,1)*vg
+        return result
+
+    def _hessian_terms(self, indices1, indices2, deltas, distances):
+        # contributions to the diagonal hessian block of atom indices1 due to
+        # the pairs. The off-diagonal blocks are the same with opposite sign.
+        result = numpy.zeros((len(indices1), 3, 3), float)
+        directions = deltas/distances.reshape(-1,1)
+        dirouters = directions.reshape(-1,3,1)*directions.reshape(-1,1,3)
+        d_1 = 1/distances
+        for (se, ve), (sg, vg), (sh, vh) in zip(
+            self.yield_batch_energies(indices1, indices2, deltas, distances),
+            self.yield_batch_gradients(indices1, indices2, deltas, distances),
+            self.yield_batch_hessians(indices1, indices2, deltas, distances)
+        ):
+            result += (
+                +(sh*ve).reshape(-1,1,1)*dirouters
+                +(sg*ve*d_1).reshape(-1,1,1)*(numpy.identity(3, float) - dirouters)
+                +sg.reshape(-1,1,1)*directions.reshape(-1,3,1)*vg.reshape(-1,1,3)
+                +sg.reshape(-1,1,1)*vg.reshape(-1,3,1)*directions.reshape(-1,1,3)
+                +se.reshape(-1,1,1)*vh
+            )
+        return result
 
     def energy(self):
         result = 0.0
-        for index1 in xrange(self.numc):
-            for index2 in xrange(index1):
-                if not frozenset([index1, index2]) in self.exclude_pairs:
-                    for se, ve in self.yield_pair_energies(index1, index2):
-                        result += se*ve
+        for se, ve in self.yield_batch_energies(self.pair_indices1, self.pair_indices2, self.pair_deltas, self.pair_distances):
+            result += (se*ve).sum()
         return result
 
     def gradient_component(self, index1):
-        result = numpy.zeros(3, float)
-        for index2 in xrange(self.numc):
-            if index2 != index1 and not frozenset([index1, index2]) in self.exclude_pairs:
-                for (se, ve), (sg, vg) in zip(self.yield_pair_energies(index1, index2), self.yield_pair_gradients(index1, index2)):
-                    result += sg*self.directions[index1, index2]*ve + se*vg
-        return result
+        indices1, indices2, deltas, distances = self._get_ordered_pairs()
+        selection = (indices1 == index1)
+        return self._gradient_terms(
+            indices1[selection], indices2[selection], deltas[selection], distances[selection]
+        ).sum(axis=0)
 
     def gradient(self):
+        indices1, indices2, deltas, distances = self._get_ordered_pairs()
         result = numpy.zeros((self.numc, 3), float)
-        for index1 in xrange(self.numc):
-            result[index1] = self.gradient_component(index1)
+        terms = self._gradient_terms(indices1, indices2, deltas, distances)
+        for c in xrange(3):
+            result[:,c] = numpy.bincount(indices1, terms[:,c], self.numc)
         return result
 
     def hessian_component(self, index1, index2):
-        result = numpy.zeros((3, 3), float)
+        indices1, indices2, deltas, distances = self._get_ordered_pairs()
         if index1 == index2:
-            for index3 in xrange(self.numc):
-                if index3 != index1 and not frozenset([index1, index3]) in self.exclude_pairs:
-                    d_1 = 1/self.distances[index1,index3]
-                    for (se, ve), (sg, vg), (sh, vh) in zip(
-                        self.yield_pair_energies(index1, index3),
-                        self.yield_pair_gradients(index1, index3),
-                        self.yield_pair_hessians(index1, index3)
-                    ):
-                        result += (
-                            +sh*self.dirouters[index1,index3]*ve
-                            +sg*(numpy.identity(3, float) - self.dirouters[index1, index3])*ve*d_1
-                            +sg*numpy.outer(self.directions[index1, index3],  vg)
-                            +sg*numpy.outer(vg, self.directions[index1, index3])
-                            +se*vh
-                        )
-        elif not frozenset([index1, index2]) in self.exclude_pairs:
-            d_1 = 1/self.distances[index1,index2]
-            for (se, ve), (sg, vg), (sh, vh) in zip(
-                self.yield_pair_energies(index1, index2),
-                self.yield_pair_gradients(index1, index2),
-                self.yield_pair_hessians(index1, index2)
-            ):
-                result -= (
-                    +sh*self.dirouters[index1,index2]*ve
-                    +sg*(numpy.identity(3, float) - self.dirouters[index1, index2])*ve*d_1
-                    +sg*numpy.outer(self.directions[index1, index2],  vg)
-                    +sg*numpy.outer(vg, self.directions[index1, index2])
-                    +se*vh
-                )
-        return result
+            selection = (indices1 == index1)
+            sign = 1
+        else:
+            selection = (indices1 == index1) & (indices2 == index2)
+            sign = -1
+        return sign*self._hessian_terms(
+            indices1[selection], indices2[selection], deltas[selection], distances[selection]
+        ).sum(axis=0)
 
     def hessian(self):
+        indices1, indices2, deltas, distances = self._get_ordered_pairs()
         result = numpy.zeros((self.numc, self.numc, 3, 3), float)
-        for index1 in xrange(self.numc):
-            for index2 in xrange(self.numc):
-                result[index1, index2] = self.hessian_component(index1, index2)
+        terms = self._hessian_terms(indices1, indices2, deltas, distances)
+        result[indices1, indices2] = -terms
+        diagonal = numpy.zeros((self.numc, 9), float)
+        for c in xrange(9):
+            diagonal[:,c] = numpy.bincount(indices1, terms.reshape(-1, 9)[:,c], self.numc)
+        all_indices = numpy.arange(self.numc)
+        result[all_indices, all_indices] = diagonal.reshape(self.numc, 3, 3)
         return result
 
+    def hessian_sparse(self):
+        """
+        Returns the hessian as a sparse (3*numc, 3*numc) matrix in CSR format.
+        """
+        indices1, indices2, deltas, distances = self._get_ordered_pairs()
+        terms = self._hessian_terms(indices1, indices2, deltas, distances)
+        # the row and column indices of all the elements in the 3x3 blocks
+        rows = 3*indices1.reshape(-1,1,1) + numpy.zeros((1,3,3), int) + numpy.arange(3).reshape(1,3,1)
+        cols_off = 3*indices2.reshape(-1,1,1) + numpy.zeros((1,3,3), int) + numpy.arange(3).reshape(1,1,3)
+        cols_diag = 3*indices1.reshape(-1,1,1) + numpy.zeros((1,3,3), int) + numpy.arange(3).reshape(1,1,3)
+        # duplicate elements are summed when converting to the CSR format
+        return scipy.sparse.coo_matrix((
+            numpy.concatenate([-terms.ravel(), terms.ravel()]), (
+                numpy.concatenate([rows.ravel(), rows.ravel()]),
+                numpy.concatenate([cols_off.ravel(), cols_diag.ravel()]),
+            )
+        ), shape=(self.numc*3, self.numc*3)).tocsr()
+
     def gradient_flat(self):
         return self.gradient().ravel()
 
     def hessian_flat(self):
-        tmp = self.hessian()
-        result = numpy.zeros((self.numc*3,self.numc*3), float)
-        for index1 in xrange(self.numc):
-            for index2 in xrange(self.numc):
-                result[index1*3:(index1+1)*3,index2*3:(index2+1)*3] = tmp[index1,index2]
-        return result
+        return self.hessian().transpose(0,2,1,3).reshape(self.numc*3, self.numc*3)
 
 
 class CoulombFF(PairFF):
-    def __init__(self, coordinates, charges=None, dipoles=None, exclude_pairs=None):
-        PairFF.__init__(self, coordinates, exclude_pairs)
+    def __init__(self, coordinates, charges=None, dipoles=None, exclude_pairs=None, cutoff=None, unit_cell=None, skin=0.0):
         self.charges = charges
         self.dipoles = dipoles
+        PairFF.__init__(self, coordinates, exclude_pairs, cutoff, unit_cell, skin)
 
-    def yield_pair_energies(self, index1, index2):
-        d_1 = 1/self.distances[index1, index2]
+    def yield_batch_energies(self, indices1, indices2, deltas, distances):
+        d_1 = 1/distances
+        ones = numpy.ones(len(d_1), float)
         if self.charges is not None:
-            c1 = self.charges[index1]
-            c2 = self.charges[index2]
-            yield c1*c2*d_1, 1
+            c1 = self.charges[indices1]
+            c2 = self.charges[indices2]
+            yield c1*c2*d_1, ones
         if self.dipoles is not None:
             d_3 = d_1**3
             d_5 = d_1**5
-            delta = self.deltas[index1, index2]
-            p1 = self.dipoles[index1]
-            p2 = self.dipoles[index2]
-            yield d_3*numpy.dot(p1, p2), 1
-            yield -3*d_5, numpy.dot(p1, delta)*numpy.dot(delta, p2)
+            p1 = self.dipoles[indices1]
+            p2 = self.dipoles[indices2]
+            yield d_3*(p1*p2).sum(axis=1), ones
+            yield -3*d_5, (p1*deltas).sum(axis=1)*(deltas*p2).sum(axis=1)
             if self.charges is not None:
-                yield c1*d_3, numpy.dot(p2, delta)
-                yield c2*d_3, numpy.dot(p1, -delta)
+                yield c1*d_3, (p2*deltas).sum(axis=1)
+                yield c2*d_3, (p1*-deltas).sum(axis=1)
 
-    def yield_pair_gradients(self, index1, index2):
-        d_2 = 1/self.distances[index1, index2]**2
+    def yield_batch_gradients(self, indices1, indices2, deltas, distances):
+        d_2 = 1/distances**2
+        zeros = numpy.zeros((len(d_2), 3), float)
         if self.charges is not None:
-            c1 = self.charges[index1]
-            c2 = self.charges[index2]
-            yield -c1*c2*d_2, numpy.zeros(3)
+            c1 = self.charges[indices1]
+            c2 = self.charges[indices2]
+            yield -c1*c2*d_2, zeros
         if self.dipoles is not None:
             d_4 = d_2**2
             d_6 = d_2**3
-            delta = self.deltas[index1, index2]
-            p1 = self.dipoles[index1]
-            p2 = self.dipoles[index2]
-            yield -3*d_4*numpy.dot(p1, p2), numpy.zeros(3)
-            yield 15*d_6, p1*numpy.dot(p2, delta) + p2*numpy.dot(p1, delta)
+            p1 = self.dipoles[indices1]
+            p2 = self.dipoles[indices2]
+            yield -3*d_4*(p1*p2).sum(axis=1), zeros
+            yield 15*d_6, p1*(p2*deltas).sum(axis=1).reshape(-1,1) + p2*(p1*deltas).sum(axis=1).reshape(-1,1)
             if self.charges is not None:
                 yield -3*c1*d_4, p2
                 yield -3*c2*d_4, -p1
 
-    def yield_pair_hessians(self, index1, index2):
-        d_1 = 1/self.distances[index1, index2]
+    def yield_batch_hessians(self, indices1, indices2, deltas, distances):
+        d_1 = 1/distances
         d_3 = d_1**3
+        zeros = numpy.zeros((len(d_1), 3, 3), float)
         if self.charges is not None:
-            c1 = self.charges[index1]
-            c2 = self.charges[index2]
-            yield 2*c1*c2*d_3, numpy.zeros((3,3))
+            c1 = self.charges[indices1]
+            c2 = self.charges[indices2]
+            yield 2*c1*c2*d_3, zeros
         if self.dipoles is not None:
             d_5 = d_1**5
             d_7 = d_1**7
-            delta = self.deltas[index1, index2]
-            p1 = self.dipoles[index1]
-            p2 = self.dipoles[index2]
-            yield 12*d_5*numpy.dot(p1, p2), numpy.zeros((3,3))
-            yield -90*d_7, numpy.outer(p1, p2) + numpy.outer(p2, p1)
+            p1 = self.dipoles[indices1]
+            p2 = self.dipoles[indices2]
+            yield 12*d_5*(p1*p2).sum(axis=1), zeros
+            yield -90*d_7, p1.reshape(-1,3,1)*p2.reshape(-1,1,3) + p2.reshape(-1,3,1)*p1.reshape(-1,1,3)
             if self.charges is not None:
-                yield 12*c1*d_5, numpy.zeros((3,3))
-                yield 12*c2*d_5, numpy.zeros((3,3))
+                yield 12*c1*d_5, zeros
+                yield 12*c2*d_5, zeros
 
 
 class DispersionFF(PairFF):
-    def __init__(self, coordinates, strengths, exclude_pairs=None):
-        PairFF.__init__(self, coordinates, exclude_pairs)
+    def __init__(self, coordinates, strengths, exclude_pairs=None, cutoff=None, unit_cell=None, skin=0.0):
         self.strengths = strengths
+        PairFF.__init__(self, coordinates, exclude_pairs, cutoff, unit_cell, skin)
 
-    def yield_pair_energies(self, index1, index2):
-        strength = self.strengths[index1, index2]
-        distance = self.distances[index1, index2]
-        yield strength*distance**(-6), 1
+    def yield_batch_energies(self, indices1, indices2, deltas, distances):
+        strength = self.strengths[indices1, indices2]
+        yield strength*distances**(-6), numpy.ones(len(distances), float)
 
-    def yield_pair_gradients(self, index1, index2):
-        strength = self.strengths[index1, index2]
-        distance = self.distances[index1, index2]
-        yield -6*strength*distance**(-7), numpy.zeros(3)
+    def yield_batch_gradients(self, indices1, indices2, deltas, distances):
+        strength = self.strengths[indices1, indices2]
+        yield -6*strength*distances**(-7), numpy.zeros((len(distances), 3), float)
 
-    def yield_pair_hessians(self, index1, index2):
-        strength = self.strengths[index1, index2]
-        distance = self.distances[index1, index2]
-        yield 42*strength*distance**(-8), numpy.zeros((3,3))
+    def yield_batch_hessians(self, indices1, indices2, deltas, distances):
+        strength = self.strengths[indices1, indices2]
+        yield 42*strength*distances**(-8), numpy.zeros((len(distances), 3, 3), float)
 
 
 class PauliRepulsionFF(PairFF):
-    def __init__(self, coordinates, strengths, exclude_pairs=None):
-        PairFF.__init__(self, coordinates, exclude_pairs)
+    def __init__(self, coordinates, strengths, exclude_pairs=None, cutoff=None, unit_cell=None, skin=0.0):
         self.strengths = strengths
+        PairFF.__init__(self, coordinates, exclude_pairs, cutoff, unit_cell, skin)
 
-    def yield_pair_energies(self, index1, index2):
-        strength = self.strengths[index1, index2]
-        distance = self.distances[index1, index2]
-        yield strength*distance**(-12), 1
+    def yield_batch_energies(self, indices1, indices2, deltas, distances):
+        strength = self.strengths[indices1, indices2]
+        yield strength*distances**(-12), numpy.ones(len(distances), float)
 
-    def yield_pair_gradients(self, index1, index2):
-        strength = self.strengths[index1, index2]
-        distance = self.distances[index1, index2]
-        yield -12*strength*distance**(-13), numpy.zeros(3)
+    def yield_batch_gradients(self, indices1, indices2, deltas, distances):
+        strength = self.strengths[indices1, indices2]
+        yield -12*strength*distances**(-13), numpy.zeros((len(distances), 3), float)
 
-    def yield_pair_hessians(self, index1, index2):
-        strength = self.strengths[index1, index2]
-        distance = self.distances[index1, index2]
-        yield 12*13*strength*distance**(-14), numpy.zeros((3,3))
+    def yield_batch_hessians(self, indices1, indices2, deltas, distances):
+        strength = self.strengths[indices1, indices2]
+        yield 12*13*strength*distances**(-14), numpy.zeros((len(distances), 3, 3), float)
 
 
 
@@ -20,28 +20,41 @@
 
 
 from random import shuffle, sample
+import random
 
 from molmod.molecules import Molecule
+from molmod.binning import CellList
 from molmod.graphs import GraphError
 from molmod.data.bonds import bonds
 from molmod.data.periodic import periodic
 from molmod.transformations import rotation_around_center, Translation, Rotation, Complete
 from molmod.vectors import random_orthonormal, random_unit
 
-import numpy, copy
+import numpy, copy, multiprocessing
 
 
 __all__ = [
     "MolecularTransformation",
     "RandomManipulation", "RandomStretch", "RandomTorsion", "RandomBend", "RandomDoubleStretch",
     "yield_halfs_bond", "yield_halfs_bend", "yield_halfs_double",
-    "generate_manipulations", "check_nonbond",
+    "generate_manipulations", "get_threshold_matrix", "NonbondChecker",
+    "check_nonbond", "randomize_coordinates",
     "randomize_molecule", "randomize_molecule_low",
     "single_random_manipulation", "single_random_manipulation_low",
-    "random_dimer",
+    "random_dimer", "conformer_rmsds", "generate_conformers",
 ]
 
 
+def _transform_rows(transformation, coordinates, indices):
+    """Apply a transformation in place to the given rows of coordinates."""
+    rows = coordinates[indices]
+    if isinstance(transformation, Rotation):
+        rows = numpy.dot(rows, transformation.r.transpose())
+    if isinstance(transformation, Translation):
+        rows += transformation.t
+    coordinates[indices] = rows
+
+
 class MolecularTransformation(object):
     @classmethod
     def read_from_file(cls, filename):
@@ -69,8 +82,8 @@ class MolecularTransformation(object):
             self.transformation.t[:] = transformation.t
 
         if molecule is not None:
-            for i in affected_atoms:
-                molecule.coordinates[i] = transformation.vector_apply(molecule.coordinates[i])
+            indices = numpy.array(list(affected_atoms), int)
+            _transform_rows(transformation, molecule.coordinates, indices)
 
     def write_to_file(self, filename):
         r = self.transformation.r
@@ -98,24 +111,34 @@ class RandomManipulation(object):
                 len(hinge_atoms)
             ))
         self.affected_atoms = affected_atoms
+        self.affected_indices = numpy.array(sorted(affected_atoms), int)
         self.max_amplitude = max_amplitude
         self.hinge_atoms = hinge_atoms
 
     def apply(self, molecule):
         return MolecularTransformation(
-            self.affected_atoms, self.get_transformation(molecule), molecule
+            self.affected_atoms, self.get_transformation(molecule.coordinates), molecule
         )
 
-    def get_transformation(self, molecule):
+    def apply_coordinates(self, coordinates):
+        """Apply a random transformation in place to an (N,3) coordinates array.
+
+        This is the light-weight version of apply, for use in loops over
+        many trials: no molecule is copied and no MolecularTransformation
+        object is created.
+        """
+        _transform_rows(self.get_transformation(coordinates), coordinates, self.affected_indices)
+
+    def get_transformation(self, coordinates):
         raise NotImplementedError
 
 
 class RandomStretch(RandomManipulation):
     num_hinge_atoms = 2
 
-    def get_transformation(self, molecule):
+    def get_transformation(self, coordinates):
         atom1, atom2 = self.hinge_atoms
-        direction = molecule.coordinates[atom1] - molecule.coordinates[atom2]
+        direction = coordinates[atom1] - coordinates[atom2]
         direction /= numpy.linalg.norm(direction)
         direction *= numpy.random.uniform(-self.max_amplitude, self.max_amplitude)
         result = Translation()
@@ -126,10 +149,10 @@ class RandomStretch(RandomManipulation):
 class RandomTorsion(RandomManipulation):
     num_hinge_atoms = 2
 
-    def get_transformation(self, molecule):
+    def get_transformation(self, coordinates):
         atom1, atom2 = self.hinge_atoms
-        center = molecule.coordinates[atom1]
-        axis = molecule.coordinates[atom1] - molecule.coordinates[atom2]
+        center = coordinates[atom1]
+        axis = coordinates[atom1] - coordinates[atom2]
         axis /= numpy.linalg.norm(axis)
         angle = numpy.random.uniform(-self.max_amplitude, self.max_amplitude)
         return rotation_around_center(center, angle, axis)
@@ -138,11 +161,11 @@ class RandomTorsion(RandomManipulation):
 class RandomBend(RandomManipulation):
     num_hinge_atoms = 3
 
-    def get_transformation(self, molecule):
+    def get_transformation(self, coordinates):
         atom1, atom2, atom3 = self.hinge_atoms
-        center = molecule.coordinates[atom2]
-        a = molecule.coordinates[atom1] - molecule.coordinates[atom2]
-        b = molecule.coordinates[atom3] - molecule.coordinates[atom2]
+        center = coordinates[atom2]
+        a = coordinates[atom1] - coordinates[atom2]
+        b = coordinates[atom3] - coordinates[atom2]
         axis = numpy.cross(a, b)
         norm = numpy.linalg.norm(axis)
         if norm < 1e-5:
@@ -157,11 +180,11 @@ class RandomBend(RandomManipulation):
 class RandomDoubleStretch(RandomManipulation):
     num_hinge_atoms = 4
 
-    def get_transformation(self, molecule):
+    def get_transformation(self, coordinates):
         atom1, atom2, atom3, atom4 = self.hinge_atoms
-        a = molecule.coordinates[atom1] - molecule.coordinates[atom2]
+        a = coordinates[atom1] - coordinates[atom2]
         a /= numpy.linalg.norm(a)
-        b = molecule.coordinates[atom3] - molecule.coordinates[atom4]
+        b = coordinates[atom3] - coordinates[atom4]
         b /= numpy.linalg.norm(b)
         direction = 0.5*(a+b)
         direction *= numpy.random.uniform(-self.max_amplitude, self.max_amplitude)
@@ -272,6 +295,110 @@ def generate_manipulations(
     return results
 
 
+def get_threshold_matrix(thresholds):
+    """Convert a dictionary with nonbond thresholds into a matrix.
+
+    The thresholds dictionary has the following format:
+    {frozenset([atom_number1, atom_number2]): distance}
+
+    The result is a symmetric square matrix, indexed by atom numbers. Entries
+    without a threshold are set to nan.
+    """
+    size = max(max(key) for key in thresholds) + 1
+    result = numpy.zeros((size, size), float)
+    result[:] = numpy.nan
+    for key, distance in thresholds.iteritems():
+        key = list(key)
+        number1 = key[0]
+        number2 = key[-1]
+        result[number1, number2] = distance
+        result[number2, number1] = distance
+    return result
+
+
+class NonbondChecker(object):
+    """A fast nonbond clash test for many geometries of one molecular graph.
+
+    All work that only depends on the graph is done once in the constructor:
+    the atom pairs that are separated by one or two bonds are excluded and
+    the thresholds are looked up per pair. For small molecules, the
+    distances of all remaining pairs are compared with their thresholds in
+    one vectorized operation. For molecules with more than max_dense_size
+    atoms, a cell list is used to find the candidate pairs.
+    """
+
+    max_dense_size = 500
+
+    def __init__(self, graph, numbers, thresholds):
+        """Initialize a NonbondChecker.
+
+        Arguments:
+          graph  --  the molecular graph
+          numbers  --  the atom numbers of the molecule
+          thresholds  --  see check_nonbond
+        """
+        self.size = graph.num_nodes
+        self.numbers = numpy.array(numbers, int)
+        # atoms that are separated by one or two bonds are not checked. These
+        # pairs are stored as sorted integer keys index1*size+index2, with
+        # index1 < index2.
+        close = graph.get_sparse_distances(2).tocoo()
+        mask = close.row < close.col
+        self.close_keys = numpy.sort(close.row[mask].astype(int)*self.size + close.col[mask])
+        threshold_matrix = get_threshold_matrix(thresholds)
+        if self.numbers.max() >= len(threshold_matrix):
+            padded = numpy.zeros((self.numbers.max()+1,)*2, float)
+            padded[:] = numpy.nan
+            padded[:len(threshold_matrix),:len(threshold_matrix)] = threshold_matrix
+            threshold_matrix = padded
+        if self.size > self.max_dense_size:
+            self.indices1 = None
+            self.indices2 = None
+            # all combinations of atom numbers in the molecule must be covered
+            unique = numpy.unique(self.numbers)
+            missing = numpy.isnan(threshold_matrix[unique][:,unique])
+            self.max_threshold = threshold_matrix[unique][:,unique].max()
+        else:
+            indices1, indices2 = numpy.triu_indices(self.size, 1)
+            mask = ~self.is_close(indices1, indices2)
+            self.indices1 = indices1[mask]
+            self.indices2 = indices2[mask]
+            pair_thresholds = threshold_matrix[self.numbers[self.indices1], self.numbers[self.indices2]]
+            missing = numpy.isnan(pair_thresholds)
+            self.pair_thresholds_sq = pair_thresholds**2
+        if missing.any():
+            raise KeyError("Some nonbond thresholds are missing.")
+        self.threshold_matrix_sq = threshold_matrix**2
+
+    def is_close(self, indices1, indices2):
+        """Test which pairs are separated by one or two bonds.
+
+        Both index arrays must satisfy indices1 < indices2. A boolean array
+        is returned.
+        """
+        if len(self.close_keys) == 0:
+            return numpy.zeros(len(indices1), bool)
+        keys = indices1*self.size + indices2
+        positions = self.close_keys.searchsorted(keys)
+        positions = numpy.minimum(positions, len(self.close_keys) - 1)
+        return self.close_keys[positions] == keys
+
+    def __call__(self, coordinates):
+        """Return True when all nonbonded atoms are well separated."""
+        if self.indices1 is not None:
+            deltas = coordinates[self.indices1] - coordinates[self.indices2]
+            distances_sq = (deltas*deltas).sum(axis=1)
+            return not (distances_sq < self.pair_thresholds_sq).any()
+        else:
+            cell_list = CellList(coordinates, self.max_threshold)
+            indices1, indices2, deltas = cell_list.get_pairs(radius=self.max_threshold)
+            distances_sq = (deltas*deltas).sum(axis=1)
+            clash = distances_sq < self.threshold_matrix_sq[self.numbers[indices1], self.numbers[indices2]]
+            if not clash.any():
+                return True
+            return self.is_close(indices1[clash], indices2[clash]).all()
+
+
 def check_nonbond(molecule, graph, thresholds):
     """Check whether all nonbonded atoms are well separated.
 
@@ -286,16 +413,41 @@ def check_nonbond(molecule, graph, thresholds):
     projected on the nonbonding distance gradients. The distance for which the
     absolute value of these gradients drops below 100 kJ/mol is a rough guess
     of a proper threshold value.
+
+    When many geometries of the same graph are checked, construct a
+    NonbondChecker once and call it with the coordinates instead.
     """
+    return NonbondChecker(graph, molecule.numbers, thresholds)(molecule.coordinates)
+
+
+def randomize_coordinates(coordinates, manipulations, checker, max_tries=1000, out=None):
+    """Randomize an (N,3) array of coordinates.
+
+    Arguments:
+      coordinates  --  the initial coordinates, which are not altered
+      manipulations  --  a list of RandomManipulation objects
+      checker  --  a NonbondChecker instance, or any function that returns
+          True when the given coordinates are acceptable
+
+    Optional arguments:
+      max_tries  --  the maximum number of trials
+      out  --  a preallocated (N,3) buffer for the result
 
-    # check that no atoms overlap
-    for atom1 in xrange(graph.num_nodes):
-        for atom2 in xrange(atom1):
-            if graph.distances[atom1, atom2] > 2:
-                distance = numpy.linalg.norm(molecule.coordinates[atom1] - molecule.coordinates[atom2])
-                if distance < thresholds[frozenset([molecule.numbers[atom1], molecule.numbers[atom2]])]:
-                    return False
-    return True
+    Each trial copies the coordinates into the buffer and applies all
+    manipulations in random order in place. The buffer is returned as soon
+    as it passes the check. If all trials fail, None is returned.
+    """
+    if out is None:
+        out = numpy.zeros(coordinates.shape, float)
+    for m in xrange(max_tries):
+        out[:] = coordinates
+        order = copy.copy(manipulations)
+        shuffle(order)
+        for manipulation in order:
+            manipulation.apply_coordinates(out)
+        if checker(out):
+            return out
+    return None
 
 
 def randomize_molecule(molecule, graph, manipulations, nonbond_thresholds, max_tries=1000):
@@ -305,11 +457,13 @@ def randomize_molecule(molecule, graph, manipulations, nonbond_thresholds, max_t
     after max_tries repetitions, None is returned. In case of success, the
     randomized molecule is returned. The original molecule is not altered.
     """
-    for m in xrange(max_tries):
-        random_molecule = randomize_molecule_low(molecule, manipulations)
-        if check_nonbond(random_molecule, graph, nonbond_thresholds):
-            return random_molecule
-    return None
+    checker = NonbondChecker(graph, molecule.numbers, nonbond_thresholds)
+    coordinates = randomize_coordinates(molecule.coordinates, manipulations, checker, max_tries)
+    if coordinates is None:
+        return None
+    random_molecule = copy.deepcopy(molecule)
+    random_molecule.coordinates[:] = coordinates
+    return random_molecule
 
 
 def randomize_molecule_low(molecule, manipulations):
@@ -331,9 +485,10 @@ def single_random_manipulation(molecule, graph, manipulations, nonbond_threshold
     randomized molecule and the corresponding transformation is returned.
     The original molecule is not altered.
     """
+    checker = NonbondChecker(graph, molecule.numbers, nonbond_thresholds)
     for m in xrange(max_tries):
         random_molecule, transformation = single_random_manipulation_low(molecule, manipulations)
-        if check_nonbond(random_molecule, graph, nonbond_thresholds):
+        if checker(random_molecule.coordinates):
             return random_molecule, transformation
     return None
 
@@ -416,7 +571,139 @@ def random_dimer(molecule0, molecule1, thresholds, shoot_max, max_tries=1000):
     return dimer
 
 
+def conformer_rmsds(references, coordinates):
+    """Compute the RMSD between one geometry and a stack of reference geometries.
+
+    Arguments:
+      references  --  a numpy array with shape (K,N,3)
+      coordinates  --  a numpy array with shape (N,3)
+
+    Each reference is optimally superposed on the given coordinates with the
+    Kabsch algorithm (see transformations.superpose) before the RMSD is
+    computed. All K superpositions are handled in one batch of 3x3 singular
+    value decompositions. An array with K RMSD values is returned.
+    """
+    references = references - references.mean(axis=1).reshape((-1,1,3))
+    coordinates = coordinates - coordinates.mean(axis=0)
+    covariances = numpy.tensordot(references, coordinates, axes=([1],[0]))
+    u, s, vt = numpy.linalg.svd(covariances)
+    # the sign of the smallest singular value takes care of reflections
+    s[:,2] *= numpy.sign(numpy.linalg.det(u)*numpy.linalg.det(vt))
+    msds = (
+        (references**2).sum(axis=2).sum(axis=1) + (coordinates**2).sum()
+        - 2*s.sum(axis=1)
+    )/len(coordinates)
+    return numpy.sqrt(numpy.clip(msds, 0, numpy.inf))
+
+
+# The read-only state of the worker processes in generate_conformers. It is
+# installed once per worker by _init_conformer_worker.
+_conformer_worker_state = None
 
 
+def _init_conformer_worker(molecule, graph, manipulations, nonbond_thresholds, max_tries, seed):
+    global _conformer_worker_state
+    checker = NonbondChecker(graph, molecule.numbers, nonbond_thresholds)
+    _conformer_worker_state = (molecule.coordinates, manipulations, checker, max_tries, seed)
 
 
+def _random_conformer_task(index):
+    """Generate the random conformer with the given index.
+
+    Both random number generators are seeded with the pair (seed, index),
+    which makes the outcome of a task independent of the process that
+    executes it.
+    """
+    coordinates, manipulations, checker, max_tries, seed = _conformer_worker_state
+    numpy.random.seed([seed, index])
+    random.seed(numpy.random.randint(2**31))
+    return index, randomize_coordinates(coordinates, manipulations, checker, max_tries)
+
+
+def generate_conformers(
+    molecule, graph, manipulations, nonbond_thresholds, num_conformers,
+    max_tasks=None, max_tries=1000, num_processes=None, seed=0, ordered=False,
+    rmsd_threshold=None, similarity_threshold=None, margin=1.0, cutoff=10.0,
+):
+    """Generate random conformers in parallel and yield the distinct ones.
+
+    Arguments:
+      molecule, graph, manipulations, nonbond_thresholds, max_tries  --  see
+          randomize_molecule
+      num_conformers  --  the generator stops after this number of accepted
+          conformers
+
+    Optional arguments:
+      max_tasks  --  the maximum number of calls to randomize_coordinates,
+          defaults to 10*num_conformers
+      num_processes  --  the size of the multiprocessing pool. The default is
+          the number of cpus. When num_processes is 1, no pool is created.
+      seed  --  task i seeds its random number generators with (seed, i)
+      ordered  --  when True, results are screened in the order of the task
+          index and the sequence of conformers is fully reproducible. When
+          False, results are screened as soon as they arrive.
+      rmsd_threshold  --  a conformer is dropped when its RMSD after
+          superposition with a previously accepted conformer is below this
+          threshold
+      similarity_threshold  --  a conformer is dropped when its normalized
+          DistanceDescriptor similarity with a previously accepted conformer
+          exceeds this threshold (a value between 0 and 1)
+      margin, cutoff  --  parameters for DistanceDescriptor.similarity
+
+    The accepted conformers are yielded as Molecule objects as soon as they
+    are screened. Tasks that fail the nonbond check max_tries times are
+    silently skipped. Closing the generator terminates the pool.
+    """
+    from molmod.similarity import DistanceDescriptor
+
+    if max_tasks is None:
+        max_tasks = 10*num_conformers
+    if num_processes is None:
+        num_processes = multiprocessing.cpu_count()
+
+    initargs = (molecule, graph, manipulations, nonbond_thresholds, max_tries, seed)
+    if num_processes == 1:
+        pool = None
+        _init_conformer_worker(*initargs)
+        results = (_random_conformer_task(index) for index in xrange(max_tasks))
+    else:
+        pool = multiprocessing.Pool(num_processes, _init_conformer_worker, initargs)
+        chunksize = max(1, min(16, max_tasks/(4*num_processes)))
+        if ordered:
+            results = pool.imap(_random_conformer_task, xrange(max_tasks), chunksize)
+        else:
+            results = pool.imap_unordered(_random_conformer_task, xrange(max_tasks), chunksize)
+
+    accepted = numpy.zeros((num_conformers, molecule.size, 3), float)
+    descriptors = []
+    norms = []
+    counter = 0
+    try:
+        for index, coordinates in results:
+            if coordinates is None:
+                continue
+            if rmsd_threshold is not None and counter > 0:
+                if conformer_rmsds(accepted[:counter], coordinates).min() < rmsd_threshold:
+                    continue
+            conformer = Molecule(molecule.numbers, coordinates, "conformer %i" % index)
+            if similarity_threshold is not None:
+                descriptor = DistanceDescriptor(conformer)
+                norm = descriptor.norm(margin, cutoff)
+                duplicate = False
+                for other, other_norm in zip(descriptors, norms):
+                    if descriptor.similarity(other, margin, cutoff)/(norm*other_norm) > similarity_threshold:
+                        duplicate = True
+                        break
+                if duplicate:
+                    continue
+                descriptors.append(descriptor)
+                norms.append(norm)
+            accepted[counter] = coordinates
+            counter += 1
+            yield conformer
+            if counter == num_conformers:
+                break
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
@@ -0,0 +1,366 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Redundant internal coordinates and the Wilson B matrix.
+
+RedundantInternals enumerates all bonds, bending angles, dihedral angles and
+out-of-plane angles of a molecular graph and evaluates them in bulk with the
+array functions of molmod.ic. WilsonB transforms gradients and Hessians
+between Cartesian and redundant internal coordinates at a given geometry.
+"""
+
+
+import molmod.ic as ic
+from molmod.units import deg
+
+import numpy, scipy.sparse, scipy.sparse.linalg
+
+
+__all__ = ["RedundantInternals", "WilsonB"]
+
+
+class RedundantInternals(object):
+    """A set of redundant internal coordinates derived from a molecular graph.
+
+    The internal coordinates are ordered by kind: first all bonds, then all
+    bending angles, then all dihedral angles and finally all out-of-plane
+    angles. The attribute kinds contains the kind (an index in kind_names)
+    of each internal coordinate.
+    """
+
+    kind_names = ["bond", "bend", "dihed", "oop"]
+
+    def __init__(self, graph, coordinates=None, linear_angle=175*deg, do_oops=True):
+        """Initialize a RedundantInternals object.
+
+        Arguments:
+          graph  --  a MolecularGraph
+
+        Optional arguments:
+          coordinates  --  a reference geometry. When given, dihedral angles
+              that contain a bending angle above linear_angle are left out,
+              because they are ill-defined.
+          linear_angle  --  see coordinates
+          do_oops  --  when True, the out-of-plane angles of all atoms with
+              exactly three neighbors are included
+        """
+        self.num_atoms = graph.num_nodes
+        self.numbers = graph.numbers
+        neighbors = graph.neighbors
+        self.bonds = numpy.array([sorted(pair) for pair in graph.pairs], int).reshape((-1,2))
+
+        bends = []
+        for center in xrange(self.num_atoms):
+            others = sorted(neighbors.get(center, []))
+            for index, atom1 in enumerate(others):
+                for atom2 in others[index+1:]:
+                    bends.append((atom1, center, atom2))
+        self.bends = numpy.array(bends, int).reshape((-1,3))
+
+        diheds = []
+        for atom1, atom2 in self.bonds:
+            for atom0 in sorted(neighbors[atom1]):
+                if atom0 == atom2:
+                    continue
+                for atom3 in sorted(neighbors[atom2]):
+                    if atom3 == atom1 or atom3 == atom0:
+                        continue
+                    diheds.append((atom0, atom1, atom2, atom3))
+        diheds = numpy.array(diheds, int).reshape((-1,4))
+        if coordinates is not None and len(diheds) > 0:
+            angles1, = ic.bend_angles(coordinates, diheds[:,:3])
+            angles2, = ic.bend_angles(coordinates, diheds[:,1:])
+            diheds = diheds[(angles1 < linear_angle) & (angles2 < linear_angle)]
+        self.diheds = diheds
+
+        oops = []
+        if do_oops:
+            for center in xrange(self.num_atoms):
+                others = sorted(neighbors.get(center, []))
+                if len(others) != 3:
+                    continue
+                atom0, atom1, atom2 = others
+                oops.append((atom0, center, atom1, atom2))
+                oops.append((atom1, center, atom2, atom0))
+                oops.append((atom2, center, atom0, atom1))
+        self.oops = numpy.array(oops, int).reshape((-1,4))
+
+        self.ic_arrays = [
+            ic.ICArray(ic.bond_lengths, self.bonds),
+            ic.ICArray(ic.bend_angles, self.bends),
+            ic.ICArray(ic.dihed_angles, self.diheds),
+            ic.ICArray(ic.oop_angles, self.oops),
+        ]
+        self.kinds = numpy.concatenate([
+            numpy.zeros(len(ic_array), int) + kind
+            for kind, ic_array in enumerate(self.ic_arrays)
+        ])
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def compute(self, coordinates, deriv=0):
+        """Evaluate all internal coordinates at once.
+
+        Arguments:
+          coordinates  --  an (N,3) array with Cartesian coordinates
+
+        Optional argument:
+          deriv  --  0, 1 or 2
+
+        Returns a tuple with the values (M,). When deriv > 0, the sparse
+        (M,3N) Wilson B matrix is appended. When deriv > 1, a list with the
+        Hessian blocks of each kind is appended, see get_k_matrix.
+        """
+        values = []
+        rows = []
+        hessians = []
+        for ic_array in self.ic_arrays:
+            if len(ic_array) == 0:
+                continue
+            result = ic_array(coordinates, deriv)
+            values.append(result[0])
+            if deriv > 0:
+                rows.append(ic.sparse_jacobian(ic_array.indices, result[1], self.num_atoms))
+            if deriv > 1:
+                hessians.append(result[2])
+        values = numpy.concatenate(values)
+        if deriv == 0:
+            return values,
+        b_matrix = scipy.sparse.vstack(rows).tocsr()
+        if deriv == 1:
+            return values, b_matrix
+        return values, b_matrix, hessians
+
+    def get_values(self, coordinates):
+        """Return the values of all internal coordinates."""
+        return self.compute(coordinates)[0]
+
+    def get_b_matrix(self, coordinates):
+        """Return the sparse (M,3N) Wilson B matrix."""
+        return self.compute(coordinates, 1)[1]
+
+    def get_k_matrix(self, coordinates, gradient, hessians=None):
+        """Return the sum of the internal Hessians weighted with a gradient.
+
+        Arguments:
+          coordinates  --  an (N,3) array with Cartesian coordinates
+          gradient  --  an array with M components, e.g. the gradient of the
+              energy towards the internal coordinates
+
+        Optional argument:
+          hessians  --  the Hessian blocks computed with compute(..., 2). They
+              are computed when not given.
+
+        This is the second-order term in the transformation of a Hessian
+        between Cartesian and internal coordinates. A sparse (3N,3N) matrix
+        is returned.
+        """
+        if hessians is None:
+            hessians = self.compute(coordinates, 2)[2]
+        result = scipy.sparse.csr_matrix((3*self.num_atoms, 3*self.num_atoms))
+        begin = 0
+        ic_arrays = [ic_array for ic_array in self.ic_arrays if len(ic_array) > 0]
+        for ic_array, block in zip(ic_arrays, hessians):
+            end = begin + len(ic_array)
+            result = result + ic.sparse_hessian(ic_array.indices, block, self.num_atoms, gradient[begin:end])
+            begin = end
+        return result
+
+    # The parameters of the model Hessian of Lindh et al., Chem. Phys. Lett.
+    # 241, 423 (1995), in atomic units, indexed by the rows in the periodic
+    # table (first row, second row, third row and beyond).
+    lindh_alpha = numpy.array([
+        [1.0000, 0.3949, 0.3949],
+        [0.3949, 0.2800, 0.2800],
+        [0.3949, 0.2800, 0.2800],
+    ])
+    lindh_r_ref = numpy.array([
+        [1.35, 2.10, 2.53],
+        [2.10, 2.87, 3.40],
+        [2.53, 3.40, 3.40],
+    ])
+    lindh_k = numpy.array([0.45, 0.15, 0.005, 0.005])
+
+    def get_model_hessian(self, coordinates):
+        """Return a diagonal model Hessian in the style of Lindh.
+
+        Each force constant is the product of a constant for the kind of
+        internal coordinate and of the factors
+        rho_ij = exp(alpha_ij*(r_ref_ij**2 - r_ij**2)) of all consecutive
+        atom pairs in the internal coordinate. (For out-of-plane angles, the
+        three bonds to the central atom are used.) The M diagonal elements
+        are returned.
+        """
+        rows = numpy.searchsorted([2, 10], self.numbers, side="left")
+        def rho(atoms1, atoms2):
+            deltas = coordinates[atoms1] - coordinates[atoms2]
+            rows1 = rows[atoms1]
+            rows2 = rows[atoms2]
+            return numpy.exp(
+                self.lindh_alpha[rows1, rows2]*
+                (self.lindh_r_ref[rows1, rows2]**2 - (deltas**2).sum(axis=1))
+            )
+        result = []
+        for kind, ic_array in enumerate(self.ic_arrays):
+            indices = ic_array.indices
+            if kind == 3:
+                pairs = [(0,1), (2,1), (3,1)]
+            else:
+                pairs = [(i, i+1) for i in xrange(indices.shape[1]-1)]
+            factors = numpy.zeros(len(indices), float) + self.lindh_k[kind]
+            for i, j in pairs:
+                factors *= rho(indices[:,i], indices[:,j])
+            result.append(factors)
+        return numpy.concatenate(result)
+
+    def get_deltas(self, values1, values0):
+        """Return the differences values1 - values0.
+
+        The differences of dihedral angles are wrapped into [-pi,pi].
+        """
+        deltas = values1 - values0
+        mask = self.kinds == 2
+        deltas[mask] = (deltas[mask] + numpy.pi) % (2*numpy.pi) - numpy.pi
+        return deltas
+
+
+class WilsonB(object):
+    """The Wilson B matrix and its generalized inverse at one geometry.
+
+    With redundant internal coordinates, B has more rows than there are
+    internal degrees of freedom. The gradients and the steps are transformed
+    with the sparse B matrix only: they are the minimum norm least squares
+    solutions of the linear systems with B or B^T, computed iteratively with
+    LSQR. This scales with the number of nonzeros in B, i.e. linearly with
+    the size of the molecule. The external degrees of freedom (translations
+    and rotations) are thereby removed.
+
+    The dense generalized inverses g_inv and b_inv, the rank and the Hessian
+    transformations rely on the eigendecomposition of the (3N,3N) matrix
+    G = B^T B. This takes O(N**3) time and O(N**2) memory, which limits them
+    to a few thousand atoms. They are only computed when needed. Eigenvalues
+    below threshold times the largest eigenvalue are treated as zero.
+    """
+
+    def __init__(self, internals, coordinates, threshold=1e-8):
+        """Initialize a WilsonB object.
+
+        Arguments:
+          internals  --  a RedundantInternals object
+          coordinates  --  an (N,3) array with Cartesian coordinates
+
+        Optional argument:
+          threshold  --  the relative threshold for the eigenvalues of G
+        """
+        self.internals = internals
+        self.coordinates = coordinates
+        self.threshold = threshold
+        self.values, self.b_matrix = internals.compute(coordinates, 1)
+        self._g_inv = None
+        self._rank = None
+        self._b_inv = None
+        self._hessians = None
+
+    def _init_g_inv(self):
+        if self._g_inv is None:
+            g = (self.b_matrix.T*self.b_matrix).toarray()
+            evals, evecs = numpy.linalg.eigh(g)
+            mask = evals > self.threshold*evals.max()
+            self._rank = mask.sum()
+            evecs = evecs[:,mask]
+            self._g_inv = numpy.dot(evecs/evals[mask], evecs.T)
+
+    def get_g_inv(self):
+        """Return the dense (3N,3N) generalized inverse of G = B^T B."""
+        self._init_g_inv()
+        return self._g_inv
+
+    g_inv = property(get_g_inv)
+
+    def get_rank(self):
+        """Return the number of internal degrees of freedom."""
+        self._init_g_inv()
+        return self._rank
+
+    rank = property(get_rank)
+
+    def get_b_inv(self):
+        """Return the dense (3N,M) generalized inverse of B."""
+        if self._b_inv is None:
+            self._b_inv = (self.b_matrix*self.g_inv).T
+        return self._b_inv
+
+    b_inv = property(get_b_inv)
+
+    def _solve(self, matrix, rhs):
+        # the minimum norm least squares solution of matrix*x = rhs
+        return scipy.sparse.linalg.lsqr(
+            matrix, rhs, atol=1e-14, btol=1e-14, conlim=1e14,
+            iter_lim=10*sum(matrix.shape)
+        )[0]
+
+    def get_k_matrix(self, gradient):
+        """See RedundantInternals.get_k_matrix."""
+        if self._hessians is None:
+            self._hessians = self.internals.compute(self.coordinates, 2)[2]
+        return self.internals.get_k_matrix(self.coordinates, gradient, self._hessians)
+
+    def gradient_to_internal(self, gradient):
+        """Transform a Cartesian gradient, (N,3) or (3N,), to internal coordinates."""
+        return self._solve(self.b_matrix.T, numpy.ravel(gradient))
+
+    def step_to_cartesian(self, step):
+        """Transform a small step in internal coordinates to a Cartesian (3N,) step.
+
+        This is the product of b_inv with step, without the dense b_inv.
+        """
+        return self._solve(self.b_matrix, step)
+
+    def gradient_to_cartesian(self, gradient):
+        """Transform a gradient in internal coordinates to an (N,3) Cartesian gradient."""
+        return (self.b_matrix.T*gradient).reshape((-1,3))
+
+    def hessian_to_internal(self, hessian, gradient):
+        """Transform a Cartesian Hessian to internal coordinates.
+
+        Arguments:
+          hessian  --  the (3N,3N) Cartesian Hessian
+          gradient  --  the Cartesian gradient, (N,3) or (3N,)
+
+        Returns the dense (M,M) Hessian in internal coordinates.
+        """
+        gradient_internal = self.gradient_to_internal(gradient)
+        corrected = hessian - self.get_k_matrix(gradient_internal).toarray()
+        tmp = numpy.dot(self.g_inv, numpy.dot(corrected, self.g_inv))
+        return self.b_matrix*(self.b_matrix*tmp).T
+
+    def hessian_to_cartesian(self, hessian, gradient):
+        """Transform a Hessian in internal coordinates to Cartesian coordinates.
+
+        Arguments:
+          hessian  --  the (M,M) Hessian in internal coordinates, dense or sparse
+          gradient  --  the gradient in internal coordinates (M,)
+
+        Returns the dense (3N,3N) Cartesian Hessian.
+        """
+        tmp = self.b_matrix.T*(self.b_matrix.T*hessian).T
+        if scipy.sparse.issparse(tmp):
+            tmp = tmp.toarray()
+        return tmp + self.get_k_matrix(gradient).toarray()
@@ -45,20 +45,20 @@ def guess_geometry(graph, unitcell_active, unitcell, unitcell_reciproke):
     """
 
     N = len(graph.numbers)
-    from molmod.minimizer import Minimizer, NewtonGLineSearch
+    from molmod.minimizer import LBFGSMinimizer
 
     ff = ToyFF(graph, unitcell_active, unitcell, unitcell_reciproke)
     x_init = numpy.random.normal(0,1,N*3)
 
     #  level 1 geometry optimization: graph based
     ff.dm_quad = 1.0
-    minimizer = Minimizer(x_init, ff, NewtonGLineSearch, 1e-10, 1e-8, 2*N, 500, 50, do_gradient=True, verbose=False)
+    minimizer = LBFGSMinimizer(x_init, ff, 1e-10, 1e-8, 2*N, 500, 50, verbose=False)
     x_init = minimizer.x
 
     #  level 2 geometry optimization: graph based + pauli repulsion
     ff.dm_quad = 1.0
     ff.dm_reci = 1.0
-    minimizer = Minimizer(x_init, ff, NewtonGLineSearch, 1e-10, 1e-8, 2*N, 500, 50, do_gradient=True, verbose=False)
+    minimizer = LBFGSMinimizer(x_init, ff, 1e-10, 1e-8, 2*N, 500, 50, verbose=False)
     x_init = minimizer.x
 
     # Add a little noise to avoid saddle points
@@ -68,14 +68,14 @@ def guess_geometry(graph, unitcell_active, unitcell, unitcell_reciproke):
     ff.dm_quad = 0.0
     ff.dm_reci = 0.2
     ff.bond_quad = 1.0
-    minimizer = Minimizer(x_init, ff, NewtonGLineSearch, 1e-3, 1e-3, 2*N, 500, 50, do_gradient=True, verbose=False)
+    minimizer = LBFGSMinimizer(x_init, ff, 1e-3, 1e-3, 2*N, 500, 50, verbose=False)
     x_init = minimizer.x
 
     #  level 4 geometry optimization: bond lengths + bending angles + pauli
     ff.bond_quad = 0.0
     ff.bond_hyper = 1.0
     ff.span_quad = 1.0
-    minimizer = Minimizer(x_init, ff, NewtonGLineSearch, 1e-6, 1e-6, 2*N, 500, 50, do_gradient=True, verbose=False)
+    minimizer = LBFGSMinimizer(x_init, ff, 1e-6, 1e-6, 2*N, 500, 50, verbose=False)
     x_init = minimizer.x
 
     x_opt = x_init
@@ -97,7 +97,7 @@ def tune_geometry(graph, mol):
     """
 
     N = len(graph.numbers)
-    from molmod.minimizer import Minimizer, NewtonGLineSearch
+    from molmod.minimizer import LBFGSMinimizer
 
     ff = ToyFF(graph)
     x_init = mol.coordinates.ravel()
@@ -105,14 +105,14 @@ def tune_geometry(graph, mol):
     #  level 3 geometry optimization: bond lengths + pauli
     ff.dm_reci = 0.2
     ff.bond_quad = 1.0
-    minimizer = Minimizer(x_init, ff, NewtonGLineSearch, 1e-3, 1e-3, 2*N, 500, 50, do_gradient=True, verbose=False)
+    minimizer = LBFGSMinimizer(x_init, ff, 1e-3, 1e-3, 2*N, 500, 50, verbose=False)
     x_init = minimizer.x
 
     #  level 4 geometry optimization: bond lengths + bending angles + pauli
     ff.bond_quad = 0.0
     ff.bond_hyper = 1.0
     ff.span_quad = 1.0
-    minimizer = Minimizer(x_init, ff, NewtonGLineSearch, 1e-6, 1e-6, 2*N, 500, 50, do_gradient=True, verbose=False)
+    minimizer = LBFGSMinimizer(x_init, ff, 1e-6, 1e-6, 2*N, 500, 50, verbose=False)
     x_init = minimizer.x
 
     x_opt = x_init
@@ -153,11 +153,8 @@ class ToyFF(object):
         print "Active directions:"
         print self.unitcell_active
 
-        self.dm = graph.distances.astype(numpy.int32)
-        # print self.dm
-        dm = self.dm.astype(float)
-        self.dm0 = dm**2
-        self.dmk = dm**(-3)
+        self.graph = graph
+        self._dm = None
         self.vdw_radii = numpy.array([periodic[number].vdw_radius for number in graph.numbers], dtype=float)
         self.covalent_radii = numpy.array([periodic[number].covalent_radius for number in graph.numbers], dtype=float)
 
@@ -224,7 +221,55 @@ class ToyFF(object):
         self.span_quad = 0.0
         self.bond_hyper = 0.0
 
+    def _init_dm(self):
+        # The terms dm_quad and dm_reci act on all pairs of atoms, so they
+        # need the full graph distance matrix. It is only computed when one
+        # of these terms is used.
+        if self._dm is None:
+            self._dm = self.graph.distances.astype(numpy.int32)
+            dm = self._dm.astype(float)
+            self._dm0 = dm**2
+            self._dmk = dm**(-3)
+
+    def _get_dm(self):
+        self._init_dm()
+        return self._dm
+
+    def _get_dm0(self):
+        self._init_dm()
+        return self._dm0
+
+    def _get_dmk(self):
+        self._init_dm()
+        return self._dmk
+
+    dm = property(_get_dm)
+    dm0 = property(_get_dm0)
+    dmk = property(_get_dmk)
+
     def __call__(self, x, do_gradient=False):
+        """Compute the energy and optionally the gradient.
+
+        The argument x contains the Cartesian coordinates of one structure,
+        or of a batch of K structures in an array with shape (K, N, 3). In the
+        latter case, an array with K energies and an array with the gradients
+        of all structures are returned, which is the interface of the
+        BatchMinimizer in molmod.minimizer. This is not vectorized: the
+        structures are simply evaluated one by one in a Python loop.
+        """
+        if len(x.shape) == 3:
+            energies = numpy.zeros(len(x), float)
+            gradients = numpy.zeros(x.shape, float)
+            for i in xrange(len(x)):
+                if do_gradient:
+                    energies[i], gradient = self(x[i], True)
+                    gradients[i] = gradient.reshape(x[i].shape)
+                else:
+                    energies[i] = self(x[i])
+            if do_gradient:
+                return energies, gradients
+            else:
+                return energies
         x = x.reshape((-1,3))
         result = 0.0
 
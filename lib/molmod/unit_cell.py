@@ -96,17 +96,20 @@ class UnitCell(object):
             temp = self.cell
         self.cell_reciproke = numpy.transpose(self.cell_active*numpy.transpose(numpy.linalg.inv(temp)))
 
+    # The following methods accept a single vector or an array of vectors
+    # whose last axis has size three.
+
     def to_fractional(self, coordinate):
-        return numpy.dot(self.cell_reciproke, coordinate)
+        return numpy.dot(coordinate, self.cell_reciproke.transpose())
 
     def to_index(self, coordinate):
         return numpy.floor(self.to_fractional(coordinate)).astype(int)
 
     def to_cartesian(self, fractional):
-        return numpy.dot(self.cell, fractional)
+        return numpy.dot(fractional, self.cell.transpose())
 
     def move_to_cell(self, delta, index):
-        return delta + numpy.dot(self.cell, index)
+        return delta + numpy.dot(index, self.cell.transpose())
 
     def shortest_vector(self, delta):
         return self.move_to_cell(delta, -self.to_fractional(delta).round().astype(int))
@@ -60,7 +60,7 @@ class ZMatrixGenerator(object):
         # We will try to take the original order as long as it satisfies the
         # constraint.
         for i in xrange(1, graph.num_nodes):
-            if (graph.distances[i][new_order] == 1).any():
+            if not graph.neighbors[i].isdisjoint(new_order):
                 new_order.append(i)
             else:
                 break
@@ -70,7 +70,7 @@ class ZMatrixGenerator(object):
         remaining = range(len(new_order), graph.num_nodes)
         while len(remaining) > 0:
             pivot = remaining.pop()
-            if (graph.distances[pivot][new_order] == 1).any():
+            if not graph.neighbors[pivot].isdisjoint(new_order):
                 new_order.append(pivot)
             else:
                 remaining.insert(0, pivot)
@@ -79,6 +79,8 @@ class ZMatrixGenerator(object):
         self.new_index = numpy.zeros(self.old_index.shape, int)
         for i,j in enumerate(self.old_index):
             self.new_index[j] = i
+        # the references are computed when they are needed for the first time
+        self.refs = None
 
     def get_new_ref(self, existing_refs):
         ref0 = existing_refs[0]
@@ -93,30 +95,47 @@ class ZMatrixGenerator(object):
                 return result
         raise ZMatrixException("Could not find new reference.")
 
-    def cart_to_zmat(self, coordinates):
+    def get_refs(self):
+        """Return the reference atoms of each row in the zmatrix.
+
+        The result is an (N,4) array. The first column contains the atom
+        index of each row in the zmatrix, the other columns contain the
+        indexes of the atoms that define the distance, the angle and the
+        dihedral angle, or -1 when not applicable.
+        """
         N = len(self.graph.numbers)
-        result = numpy.zeros(N, dtype=self.dtype)
+        refs = numpy.zeros((N,4), int) - 1
         for i in xrange(N):
             ref0 = self.old_index[i]
-            rel1 = -1
-            rel2 = -1
-            rel3 = -1
-            distance = 0
-            angle = 0
-            dihed = 0
+            refs[i,0] = ref0
             if i > 0:
-                ref1 = self.get_new_ref([ref0])
-                distance = numpy.linalg.norm(coordinates[ref0]-coordinates[ref1])
-                rel1 = i - self.new_index[ref1]
+                refs[i,1] = self.get_new_ref([ref0])
             if i > 1:
-                ref2 = self.get_new_ref([ref0, ref1])
-                angle, = ic.bend_angle(coordinates[ref0], coordinates[ref1], coordinates[ref2])
-                rel2 = i - self.new_index[ref2]
+                refs[i,2] = self.get_new_ref([ref0, refs[i,1]])
             if i > 2:
-                ref3 = self.get_new_ref([ref0, ref1, ref2])
-                dihed, = ic.dihed_angle(coordinates[ref0], coordinates[ref1], coordinates[ref2], coordinates[ref3])
-                rel3 = i - self.new_index[ref3]
-            result[i] = (self.graph.numbers[i], distance, rel1, angle, rel2, dihed, rel3)
+                refs[i,3] = self.get_new_ref([ref0, refs[i,1], refs[i,2]])
+        return refs
+
+    def cart_to_zmat(self, coordinates):
+        N = len(self.graph.numbers)
+        if self.refs is None:
+            self.refs = self.get_refs()
+        refs = self.refs
+        result = numpy.zeros(N, dtype=self.dtype)
+        result["number"] = self.graph.numbers
+        result["rel1"] = -1
+        result["rel2"] = -1
+        result["rel3"] = -1
+        # all internal coordinates of one kind are computed at once
+        if N > 1:
+            result["distance"][1:], = ic.bond_lengths(coordinates, refs[1:,:2])
+            result["rel1"][1:] = numpy.arange(1, N) - self.new_index[refs[1:,1]]
+        if N > 2:
+            result["angle"][2:], = ic.bend_angles(coordinates, refs[2:,:3])
+            result["rel2"][2:] = numpy.arange(2, N) - self.new_index[refs[2:,2]]
+        if N > 3:
+            result["dihed"][3:], = ic.dihed_angles(coordinates, refs[3:,:4])
+            result["rel3"][3:] = numpy.arange(3, N) - self.new_index[refs[3:,3]]
         return result
 
 
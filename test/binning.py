@@ -20,7 +20,8 @@
 
 
 from molmod.binning import InterAnalyseNeighboringObjects, \
-    IntraAnalyseNeighboringObjects, PositionedObject, SparseBinnedObjects
+    IntraAnalyseNeighboringObjects, PositionedObject, SparseBinnedObjects, \
+    NeighborList, CellList
 from molmod.unit_cell import UnitCell
 from molmod.units import angstrom, degree
 from molmod.data.periodic import periodic
@@ -152,7 +153,99 @@ class BinningTestCase(unittest.TestCase):
         )
         self.verify_inter(molecule1, molecule2, distances, unit_cell)
 
-
+    def verify_cell_list(self, coordinates1, coordinates2, unit_cell, radius):
+        if coordinates2 is None:
+            indices1, indices2, deltas = CellList(coordinates1, radius).get_pairs(unit_cell=unit_cell, radius=radius)
+            self.assert_((indices1 < indices2).all())
+        else:
+            indices1, indices2, deltas = CellList(coordinates1, radius).get_pairs(CellList(coordinates2, radius), unit_cell, radius)
+        expected = set([])
+        for index1, coordinate1 in enumerate(coordinates1):
+            if coordinates2 is None:
+                others = enumerate(coordinates1[index1+1:], index1+1)
+            else:
+                others = enumerate(coordinates2)
+            for index2, coordinate2 in others:
+                delta = unit_cell.shortest_vector(coordinate2 - coordinate1)
+                if numpy.dot(delta, delta) < radius*radius:
+                    expected.add((index1, index2))
+        self.assertEqual(len(indices1), len(expected))
+        self.assertEqual(set(zip(indices1, indices2)), expected)
+        if coordinates2 is None:
+            coordinates2 = coordinates1
+        for index1, index2, delta in zip(indices1, indices2, deltas):
+            shortest = unit_cell.shortest_vector(coordinates2[index2] - coordinates1[index1])
+            self.assertAlmostEqual(abs(delta - shortest).max(), 0.0, 10)
+
+    def test_cell_list(self):
+        unit_cell = UnitCell(numpy.diag([10.0, 12.0, 14.0]))
+        for cell_active in [False, False, False], [True, False, True], [True, True, True]:
+            unit_cell.set_cell_active(numpy.array(cell_active))
+            coordinates1 = numpy.random.uniform(0, 10, (100, 3))
+            coordinates2 = numpy.random.uniform(0, 10, (50, 3))
+            self.verify_cell_list(coordinates1, None, unit_cell, 2.5)
+            self.verify_cell_list(coordinates1, coordinates2, unit_cell, 2.5)
+
+    def test_yield_surrounding(self):
+        m, sbo = self.load_binned_atoms("precursor.xyz")
+        deltas = numpy.array([[0, 0, 0]])
+        for bin, positioned in sbo.yield_surrounding(m.coordinates[0], deltas):
+            self.assert_(positioned in bin)
+            indices = numpy.floor(positioned.coordinate/self.gridsize).astype(int)
+            self.assertEqual(bin, sbo.bins[tuple(indices)])
+        ids = set(positioned.id for bin, positioned in sbo.yield_surrounding(m.coordinates[0], deltas))
+        self.assert_((m, 0) in ids)
+
+    def verify_neighbor_list(self, coordinates, neighbor_list, unit_cell=None):
+        indices1, indices2, deltas, distances = neighbor_list.update(coordinates)
+        expected = {}
+        for index1 in xrange(len(coordinates)):
+            for index2 in xrange(index1):
+                delta = coordinates[index1] - coordinates[index2]
+                if unit_cell is not None:
+                    delta = unit_cell.shortest_vector(delta)
+                distance = math.sqrt(numpy.dot(delta, delta))
+                if distance < neighbor_list.cutoff:
+                    expected[(index1, index2)] = distance
+        self.assertEqual(len(indices1), len(expected))
+        for index1, index2, delta, distance in zip(indices1, indices2, deltas, distances):
+            self.assertAlmostEqual(expected[(index1, index2)], distance, 10)
+            self.assertAlmostEqual(numpy.linalg.norm(delta), distance, 10)
+
+    def test_neighbor_list(self):
+        molecule = XYZFile("input/precursor.xyz").get_molecule()
+        neighbor_list = NeighborList(4*angstrom, 1*angstrom)
+        coordinates = molecule.coordinates.copy()
+        self.verify_neighbor_list(coordinates, neighbor_list)
+        self.assertEqual(neighbor_list.num_builds, 1)
+        # small displacements do not trigger a rebuild
+        coordinates += numpy.random.uniform(-0.25, 0.25, coordinates.shape)*angstrom
+        self.verify_neighbor_list(coordinates, neighbor_list)
+        self.assertEqual(neighbor_list.num_builds, 1)
+        self.assertEqual(neighbor_list.num_updates, 2)
+        # large displacements do trigger a rebuild
+        coordinates[0] += numpy.array([0.0, 0.0, 1.0])*angstrom
+        self.verify_neighbor_list(coordinates, neighbor_list)
+        self.assertEqual(neighbor_list.num_builds, 2)
+
+    def test_neighbor_list_periodic(self):
+        molecule = XYZFile("input/lau.xyz").get_molecule()
+        unit_cell = UnitCell()
+        unit_cell.set_parameters(
+            numpy.array([14.59, 12.88, 7.61])*angstrom,
+            numpy.array([ 90.0, 111.0, 90.0])*degree,
+        )
+        unit_cell.set_cell_active(numpy.array([True, True, True]))
+        neighbor_list = NeighborList(2.5*angstrom, 0.5*angstrom, unit_cell)
+        coordinates = molecule.coordinates.copy()
+        self.verify_neighbor_list(coordinates, neighbor_list, unit_cell)
+        for counter in xrange(5):
+            coordinates += numpy.random.uniform(-0.1, 0.1, coordinates.shape)*angstrom
+            self.verify_neighbor_list(coordinates, neighbor_list, unit_cell)
+        self.assert_(neighbor_list.num_builds < 6)
+        # a cutoff that is too large for the minimum image convention
+        neighbor_list = NeighborList(3.5*angstrom, 0.5*angstrom, unit_cell)
+        self.assertRaises(ValueError, neighbor_list.update, coordinates)
 
 
 
@@ -19,7 +19,7 @@
 # --
 
 
-import unittest
+import unittest, numpy
 
 from molmod.data.periodic import periodic
 from molmod.data.bonds import bonds, BOND_SINGLE
@@ -58,6 +58,18 @@ class DataTestCase(unittest.TestCase):
     def test_nubtab03(self):
         self.assertAlmostEqual(nubtab03.abundances[1][1], 99.9885)
 
+    def test_bonded_array(self):
+        numbers1 = numpy.random.randint(1, 20, 1000)
+        numbers2 = numpy.random.randint(1, 20, 1000)
+        distances = numpy.random.uniform(0.5, 4.0, 1000)*angstrom
+        result = bonds.bonded_array(numbers1, numbers2, distances)
+        for n1, n2, distance, bond_type in zip(numbers1, numbers2, distances, result):
+            expected = bonds.bonded(n1, n2, distance)
+            if expected is None:
+                self.assertEqual(bond_type, 0)
+            else:
+                self.assertEqual(bond_type, expected)
+
 
 
 
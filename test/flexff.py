@@ -172,6 +172,24 @@ class FlexFFTestCase(unittest.TestCase):
                 oom = abs(ic2 - ic1)
                 self.assert_(error/oom < 1e-4, "error=%s, oom=%s" % (error, oom))
 
+    def test_jacobians_array(self):
+        terms = [
+            (2, BondStretchTerm("test", lambda x: x, [None, None])),
+            (3, BendingCosineTerm("test", lambda x: x, [None, None, None])),
+            (3, UreyBradleyTerm("test", lambda x: x, [None, None, None])),
+            (4, DihedralCosineTerm("test", lambda x: x, [None, None, None, None])),
+            (4, OneFourTerm("test", lambda x: x, [None, None, None, None])),
+        ]
+        for n, term in terms:
+            coordinates = numpy.random.uniform(-3,3,(10,n,3))
+            ics, jacobians = term.calculate_ic(coordinates)
+            self.assertEqual(ics.shape, (10,))
+            self.assertEqual(jacobians.shape, (10,n,3))
+            for row, ic, jacobian in zip(coordinates, ics, jacobians):
+                ic_row, jacobian_row = term.calculate_ic(row)
+                self.assertAlmostEqual(ic, ic_row, 10)
+                self.assert_(abs(jacobian - jacobian_row).max() < 1e-10)
+
     def test_gcm_gradients(self):
         for term in self.get_gcm():
             for counter in xrange(100):
@@ -234,7 +252,179 @@ class FlexFFTestCase(unittest.TestCase):
                     #print error/oom, error, oom
                     self.assert_(error/oom < 1e-2, "error=%s, oom=%s" % (error, oom))
 
+    def test_batch(self):
+        coordinates, molecular_graph, unit_cell = self.get_system("sodalite_ethane")
+        ff = ForceField(molecular_graph, unit_cell, self.get_reduced())
+        batch = coordinates + numpy.random.uniform(-0.1, 0.1, (3,) + coordinates.shape)*angstrom
+        energies, gradients = ff(batch)
+        self.assertEqual(energies.shape, (3,))
+        self.assertEqual(gradients.shape, batch.shape)
+        for i in xrange(3):
+            energy, gradient = ff(batch[i])
+            self.assertAlmostEqual(energies[i], energy, 10)
+            self.assert_(abs(gradients[i] - gradient).max() < 1e-10)
+        self.assert_(abs(ff(batch, False) - energies).max() < 1e-10)
+        # flat coordinates, as used by the minimizers
+        energy, gradient = ff(batch[0].ravel())
+        self.assertAlmostEqual(energy, energies[0], 10)
+        self.assertEqual(gradient.shape, (batch[0].size,))
+        self.assert_(abs(gradient - gradients[0].ravel()).max() < 1e-10)
+        self.assertAlmostEqual(ff(batch[0].ravel(), False), energies[0], 10)
+
+    def test_nonbond_skin(self):
+        coordinates, molecular_graph, unit_cell = self.get_system("sodalite_ethane")
+        calculate_eg = (lambda q: (q**(-6) - q**(-4), -6*q**(-7) + 4*q**(-5)))
+        criterion = (lambda atom, graph: True)
+        filter14 = (lambda n: n==0 or n >= 4)
+        reference = ForceField(molecular_graph, unit_cell, [
+            NonbondTerm("test", calculate_eg, [criterion, criterion], filter14, 3.5*angstrom)
+        ])
+        term = NonbondTerm("test", calculate_eg, [criterion, criterion], filter14, 3.5*angstrom, 0.8*angstrom)
+        ff = ForceField(molecular_graph, unit_cell, [term])
+        for counter in xrange(3):
+            delta = numpy.random.uniform(-0.1, 0.1, coordinates.shape)*angstrom
+            e1, g1 = reference(coordinates + delta)
+            e2, g2 = ff(coordinates + delta)
+            self.assertAlmostEqual(e1, e2, 8)
+            self.assert_(abs(g1 - g2).max() < 1e-8)
+        self.assertEqual(term.neighbor_list.num_builds, 1)
+
+    def test_nonbond_periodicity(self):
+        calculate_eg = (lambda q: (q**(-6) - q**(-4), -6*q**(-7) + 4*q**(-5)))
+        criterion = (lambda atom, graph: True)
+        cutoff = 6.0*angstrom
+        graph = MolecularGraph([], numpy.ones(20, int))
+        coordinates = numpy.random.uniform(0, 5, (20, 3))*angstrom
+        cell = numpy.array([[5.0, 1.0, 0.0], [0.0, 5.0, 0.0], [0.0, 0.0, 5.0]])*angstrom
+        for cell_active in [False, False, False], [True, False, False], [True, True, False], [True, True, True]:
+            unit_cell = UnitCell(cell, numpy.array(cell_active, bool))
+            term = NonbondTerm("test", calculate_eg, [criterion, criterion], (lambda n: True), cutoff)
+            ff = ForceField(graph, unit_cell, [term])
+            energy, gradient = ff(coordinates)
+            # brute force
+            ranges = [xrange(-3, 4) if active else xrange(1) for active in cell_active]
+            expected = 0.0
+            for a in ranges[0]:
+                for b in ranges[1]:
+                    for c in ranges[2]:
+                        image = numpy.dot(cell, [a, b, c])
+                        for i in xrange(20):
+                            for j in xrange(20):
+                                if i == j and a == 0 and b == 0 and c == 0:
+                                    continue
+                                distance = numpy.linalg.norm(coordinates[j] + image - coordinates[i])
+                                if distance < cutoff:
+                                    expected += 0.5*(calculate_eg(distance)[0] - calculate_eg(cutoff)[0])
+            self.assert_(abs(energy - expected) < 1e-10*abs(expected))
+            # finite differences
+            delta = numpy.random.uniform(-1e-5, 1e-5, coordinates.shape)
+            energy2, gradient2 = ff(coordinates + delta)
+            error = abs((energy2 - energy) - 0.5*numpy.dot(delta.ravel(), (gradient + gradient2).ravel()))
+            self.assert_(error < 1e-3*abs(energy2 - energy))
+
+    def test_nonbond_max_graph_distance(self):
+        coordinates, molecular_graph, unit_cell = self.get_system("sodalite_ethane")
+        calculate_eg = (lambda q: (q**(-6) - q**(-4), -6*q**(-7) + 4*q**(-5)))
+        criterion = (lambda atom, graph: True)
+        filter14 = (lambda n: n==0 or n >= 4)
+        reference = NonbondTerm("test", calculate_eg, [criterion, criterion], filter14, 3.5*angstrom)
+        reference.init_graph(molecular_graph)
+        term = NonbondTerm("test", calculate_eg, [criterion, criterion], filter14, 3.5*angstrom, max_graph_distance=3)
+        term.init_graph(molecular_graph)
+        self.assert_((reference.indices == term.indices).all())
+        # the pairs are only enumerated once
+        self.assert_(term.indices is term.indices)
+        # by default, the dense distance matrix is not needed
+        self.assertEqual(len(reference.allowed_distances), 4)
+        self.assert_("_cache_distances" not in molecular_graph.__dict__)
+        distances = molecular_graph.distances
+        expected = numpy.array([
+            (atom0, atom1) for atom0 in xrange(len(distances))
+            for atom1 in xrange(len(distances))
+            if filter14(distances[atom0, atom1])
+        ])
+        self.assert_((reference.indices == expected).all())
+        # asymmetric atom criteria
+        criterion0 = (lambda atom, graph: graph.numbers[atom] == 6)
+        criterion1 = (lambda atom, graph: graph.numbers[atom] != 1)
+        term = NonbondTerm("test", calculate_eg, [criterion0, criterion1], filter14, 3.5*angstrom)
+        term.init_graph(molecular_graph)
+        expected = [
+            (atom0, atom1) for atom0, atom1 in expected
+            if (criterion0(atom0, molecular_graph) and criterion1(atom1, molecular_graph)) or
+               (criterion0(atom1, molecular_graph) and criterion1(atom0, molecular_graph))
+        ]
+        self.assert_(len(expected) > 0)
+        self.assertEqual([tuple(pair) for pair in term.indices], expected)
+        self.assertEqual(list(term.yield_pairs(molecular_graph)), expected)
 
 
+    def test_ewald_madelung(self):
+        # rock salt with a nearest neighbor distance of one bohr
+        fractional = numpy.array([[0, 0, 0], [0, 0.5, 0.5], [0.5, 0, 0.5], [0.5, 0.5, 0]])
+        coordinates = numpy.concatenate([fractional, fractional + [0.5, 0, 0]])*2.0
+        charges = numpy.array([1.0]*4 + [-1.0]*4)
+        graph = MolecularGraph([], numpy.array([11]*4 + [17]*4))
+        unit_cell = UnitCell(numpy.identity(3)*2.0, numpy.array([True, True, True]))
+        for term in EwaldTerm("test", charges, 1.9), PMETerm("test", charges, 1.9):
+            ff = ForceField(graph, unit_cell, [term])
+            energy, gradient = ff(coordinates)
+            self.assertAlmostEqual(energy/4, -1.747565, 5)
+            self.assert_(abs(gradient).max() < 1e-8)
 
+    def test_ewald_pme(self):
+        numpy.random.seed(1)
+        coordinates = numpy.random.uniform(0, 10, (30, 3))*angstrom
+        charges = numpy.random.normal(0, 1, 30)
+        charges -= charges.mean()
+        graph = MolecularGraph([], numpy.ones(30, int))
+        cell = numpy.array([[10.0, 1.0, 0.0], [0.0, 11.0, 0.5], [0.0, 0.0, 12.0]])*angstrom
+        unit_cell = UnitCell(cell, numpy.array([True, True, True]))
+        ff = ForceField(graph, unit_cell, [EwaldTerm("test", charges, 6*angstrom, tolerance=1e-10)])
+        expected_energy, expected_gradient = ff(coordinates)
+        # the errors are proportional to the tolerance and the sum of the
+        # squared charges.
+        tolerance = 1e-6
+        threshold = 10*tolerance*(charges**2).sum()
+        for term in EwaldTerm("test", charges, 6*angstrom, tolerance), PMETerm("test", charges, 6*angstrom, tolerance):
+            ff = ForceField(graph, unit_cell, [term])
+            energy, gradient = ff(coordinates)
+            self.assert_(abs(energy - expected_energy) < threshold)
+            self.assert_(abs(gradient - expected_gradient).max() < threshold)
+            # finite differences
+            delta = numpy.random.uniform(-1e-5, 1e-5, coordinates.shape)
+            energy2, gradient2 = ff(coordinates + delta)
+            error = abs((energy2 - energy) - 0.5*numpy.dot(delta.ravel(), (gradient + gradient2).ravel()))
+            self.assert_(error < 1e-3*abs(energy2 - energy))
+        # the unit cell must be periodic in three directions
+        unit_cell = UnitCell(cell, numpy.array([True, True, False]))
+        ff = ForceField(graph, unit_cell, [EwaldTerm("test", charges, 6*angstrom)])
+        self.assertRaises(ValueError, ff, coordinates)
 
+    def test_ewald_exclusions(self):
+        coordinates, molecular_graph, unit_cell = self.get_system("sodalite_ethane")
+        size = len(coordinates)
+        charges = numpy.random.uniform(-1, 1, size)
+        filter13 = (lambda n: n==0 or n >= 3)
+        reference = ForceField(molecular_graph, unit_cell, [PMETerm("test", charges, 4*angstrom)])
+        expected_energy, expected_gradient = reference(coordinates)
+        # subtract the bare interactions of the 1-2 and 1-3 pairs
+        distances = molecular_graph.distances
+        for i in xrange(size):
+            for j in xrange(i):
+                if distances[i, j] in (1, 2):
+                    delta = unit_cell.shortest_vector(coordinates[j] - coordinates[i])
+                    distance = numpy.linalg.norm(delta)
+                    expected_energy -= charges[i]*charges[j]/distance
+                    expected_gradient[i] -= charges[i]*charges[j]*delta/distance**3
+                    expected_gradient[j] += charges[i]*charges[j]*delta/distance**3
+        for max_graph_distance in None, 2:
+            term = PMETerm("test", charges, 4*angstrom, nonbond_filter=filter13, max_graph_distance=max_graph_distance)
+            ff = ForceField(molecular_graph, unit_cell, [term])
+            energy, gradient = ff(coordinates)
+            self.assertAlmostEqual(energy, expected_energy, 8)
+            self.assert_(abs(gradient - expected_gradient).max() < 1e-8)
+        # other images of the excluded pairs would be within the cutoff
+        term = EwaldTerm("test", charges, 8*angstrom, nonbond_filter=filter13)
+        ff = ForceField(molecular_graph, unit_cell, [term])
+        self.assertRaises(ValueError, ff, coordinates)
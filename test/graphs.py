@@ -286,6 +286,16 @@ class GraphTestCase(unittest.TestCase):
         self.assertEqual(expecting.shape,graph.distances.shape)
         self.assert_((expecting==graph.distances).all())
 
+    def test_sparse_distances(self):
+        for case in self.iter_cases(disconnected=True):
+            g = case.graph
+            for max_distance in 1, 2, 3:
+                sparse = g.get_sparse_distances(max_distance)
+                expecting = g.distances*(g.distances <= max_distance)
+                self.assertEqual(sparse.shape, expecting.shape)
+                self.assert_((sparse.toarray() == expecting).all())
+                self.assertEqual(sparse.nnz, (expecting > 0).sum())
+
     def test_neighbors(self):
         for case in self.iter_cases():
             g = case.graph
@@ -321,6 +331,34 @@ class GraphTestCase(unittest.TestCase):
             for i in xrange(g0.num_nodes):
                 self.assert_((g0.node_fingerprints[i]==g1.node_fingerprints[permutation[i]]).all())
 
+    def test_canonical_form(self):
+        for case in self.iter_cases(disconnected=True):
+            g0 = case.graph
+            for i in xrange(3):
+                permutation = numpy.random.permutation(g0.num_nodes)
+                new_pairs = tuple((permutation[i], permutation[j]) for i,j in g0.pairs)
+                g1 = Graph(new_pairs, g0.num_nodes)
+                self.assertEqual(g0.canonical_form, g1.canonical_form)
+                self.assertEqual(g0.canonical_hash, g1.canonical_hash)
+                g2 = g1.get_subgraph(g1.canonical_order, normalize=True)
+                self.assertEqual(str(g0.get_subgraph(g0.canonical_order, normalize=True)), str(g2))
+        # one hexagon versus two triangles, both are regular graphs.
+        g0 = Graph([(0,1), (1,2), (2,3), (3,4), (4,5), (5,0)])
+        g1 = Graph([(0,1), (1,2), (2,0), (3,4), (4,5), (5,3)])
+        self.assertNotEqual(g0.canonical_form, g1.canonical_form)
+
+    def test_graph_index(self):
+        index = GraphIndex()
+        self.assert_(index.add(Graph([(0,1), (1,2)]), "chain"))
+        self.assert_(not index.add(Graph([(0,2), (2,1)]), "other chain"))
+        self.assert_(index.add(Graph([(0,1), (1,2), (2,0)])))
+        self.assertEqual(len(index), 2)
+        self.assert_(Graph([(1,0), (0,2)]) in index)
+        self.assert_(Graph([(0,1), (2,3)]) not in index)
+        self.assertEqual(index[Graph([(2,1), (1,0)])], "chain")
+        index[Graph([(2,1), (1,0)])] = "updated"
+        self.assertEqual(index[Graph([(0,1), (1,2)])], "updated")
+
     def test_symmetries(self):
         cases = self.iter_cases()
         for case in cases:
@@ -620,3 +658,46 @@ class GraphTestCase(unittest.TestCase):
             match_generator(case.graph).next()
 
 
+
+    def test_subgraph_pattern_vf2(self):
+        # compare the state space search with the incremental growth
+        def get_matches(pattern, graph, vf2):
+            pattern.vf2 = vf2
+            return sorted(
+                tuple(sorted(match.forward.iteritems()))
+                for match in GraphSearch(pattern)(graph)
+            )
+
+        subgraphs = [
+            Graph([(0,1)]),
+            Graph([(0,1), (1,2)]),
+            Graph([(0,1), (1,2), (2,3)]),
+            Graph([(0,1), (1,2), (2,0)]),
+            Graph([(0,1), (0,2), (0,3)]),
+            Graph([(0,1), (1,2), (2,3), (3,0)]),
+        ]
+        for case in self.iter_cases():
+            for subgraph in subgraphs:
+                for criteria_sets in None, [CriteriaSet()]:
+                    pattern = SubgraphPattern(subgraph, criteria_sets)
+                    matches_vf2 = get_matches(pattern, case.graph, True)
+                    self.assertEqual(matches_vf2, get_matches(pattern, case.graph, False))
+                    self.assertEqual(len(matches_vf2), len(set(matches_vf2)))
+
+    def test_subgraph_pattern_vf2_hooks(self):
+        class NoRootPattern(SubgraphPattern):
+            def check_next_match(self, match, new_relations):
+                if 0 in match.reverse:
+                    return False
+                return SubgraphPattern.check_next_match(self, match, new_relations)
+
+        subgraph = Graph([(0,1), (1,2)])
+        self.assert_(SubgraphPattern(subgraph).vf2)
+        self.assert_(not EqualPattern(subgraph).vf2)
+        pattern = NoRootPattern(subgraph)
+        self.assert_(not pattern.vf2)
+        graph = Graph([(0,1), (1,2), (2,3)])
+        for match in GraphSearch(pattern)(graph):
+            self.assert_(0 not in match.reverse)
+        pattern.vf2 = True
+        self.assert_(pattern.vf2)
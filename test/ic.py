@@ -217,6 +217,96 @@ class ICTestCase(BaseTestCase):
                 oom = (delta1**2).mean()
                 self.assert_(error*1e5 < oom)
 
+    def test_array_api(self):
+        N = 10
+        coordinates = numpy.random.normal(0, big, (N,3))
+        cases = [
+            (ic.bond_lengths, ic.bond_length, 2),
+            (ic.bend_cosines, ic.bend_cos, 3),
+            (ic.bend_angles, ic.bend_angle, 3),
+            (ic.dihed_cosines, ic.dihed_cos, 4),
+            (ic.dihed_angles, ic.dihed_angle, 4),
+            (ic.oop_sines, ic.oop_sin, 4),
+            (ic.oop_angles, ic.oop_angle, 4),
+        ]
+        for array_fn, fn, k in cases:
+            indices = numpy.array([numpy.random.permutation(N)[:k] for i in xrange(20)])
+            values, gradients, hessians = array_fn(coordinates, indices, 2)
+            self.assertEqual(values.shape, (20,))
+            self.assertEqual(gradients.shape, (20,k,3))
+            self.assertEqual(hessians.shape, (20,k,3,k,3))
+            for i, row in enumerate(indices):
+                v, d, dd = fn(*(list(coordinates[row]) + [2]))
+                self.assertAlmostEqual(values[i], v)
+                self.assertArraysAlmostEqual(gradients[i], d, 1e-10)
+                self.assertArraysAlmostEqual(hessians[i], dd, 1e-10)
+            values0, = array_fn(coordinates, indices)
+            self.assertArraysAlmostEqual(values0, values, 1e-10)
+
+            # sparse assembly
+            jacobian = ic.sparse_jacobian(indices, gradients, N).toarray()
+            weights = numpy.random.normal(0, 1, len(indices))
+            hessian = ic.sparse_hessian(indices, hessians, N, weights).toarray()
+            for i, row in enumerate(indices):
+                cols = (3*row[:,None] + numpy.arange(3)).ravel()
+                self.assertArraysAlmostEqual(jacobian[i, cols], gradients[i].ravel(), 1e-10)
+            check = numpy.zeros((3*N, 3*N), float)
+            for i, row in enumerate(indices):
+                cols = (3*row[:,None] + numpy.arange(3)).ravel()
+                check[numpy.ix_(cols, cols)] += weights[i]*hessians[i].reshape((3*k,3*k))
+            self.assertArraysAlmostEqual(hessian, check, 1e-10)
+
+    def test_jacobian_analysis(self):
+        from molmod.jacobian import jacobian_analysis
+
+        class Configuration(object):
+            pass
+
+        mol = XYZFile("input/thf_single.xyz").get_molecule()
+        configuration = Configuration()
+        configuration.cartesian_values = mol.coordinates.ravel()
+        bonds = ic.ICArray(ic.bond_lengths, [[0,1], [1,2], [2,3]])
+        bends = ic.ICArray(ic.bend_angles, [[0,1,2], [1,2,3]])
+        jacobian_analysis(configuration, [bonds, bends])
+        self.assertEqual(configuration.internal_values.shape, (5,))
+        self.assertEqual(configuration.jacobian.shape, (3*mol.size, 5))
+        self.assertAlmostEqual(configuration.internal_values[0], ic.bond_length(mol.coordinates[0], mol.coordinates[1])[0])
+        gradient = ic.bend_angle(mol.coordinates[1], mol.coordinates[2], mol.coordinates[3], 1)[1]
+        self.assertArraysAlmostEqual(configuration.jacobian[3:12,4], gradient.ravel(), 1e-10)
+
+    def test_diff_oop(self):
+        for r1, r2, r3, r4 in yield_diheds():
+            d = numpy.random.normal(0,eps,12)
+            s1 = r1+d[:3]
+            s2 = r2+d[3:6]
+            s3 = r3+d[6:9]
+            s4 = r4+d[9:]
+            for fn in [ic.oop_sin, ic.oop_angle]:
+                qr, gr, hr = fn(r1, r2, r3, r4, 2)
+                qs, gs, hs = fn(s1, s2, s3, s4, 2)
+                delta1 = qs - qr
+                delta2 = numpy.dot(0.5*(gr+gs).ravel(), d)
+                error = abs(delta1-delta2)
+                oom = abs(delta1)
+                self.assert_(error*1e5 < oom)
+                delta1 = (gs - gr).ravel()
+                delta2 = numpy.dot(0.5*(hs+hr).reshape((12,12)), d)
+                error = ((delta1-delta2)**2).mean()
+                oom = (delta1**2).mean()
+                self.assert_(error*1e5 < oom)
+
+    def test_oop_planes(self):
+        # the bonds to r2 and r3 lie in the xy-plane, the bond to r0 is
+        # tilted by the given angle.
+        r1 = numpy.zeros(3, float)
+        r2 = numpy.array([numpy.cos(2*numpy.pi/3), numpy.sin(2*numpy.pi/3), 0])
+        r3 = numpy.array([numpy.cos(4*numpy.pi/3), numpy.sin(4*numpy.pi/3), 0])
+        for angle in numpy.arange(-80, 90, 20)*deg:
+            r0 = 1.5*numpy.array([numpy.cos(angle), 0, numpy.sin(angle)])
+            self.assertAlmostEqual(ic.oop_angle(r0, r1, r2, r3)[0], angle)
+            self.assertAlmostEqual(ic.oop_angle(r0, r1, r3, r2)[0], -angle)
+            self.assertAlmostEqual(ic.oop_sin(r0, r1, r2, r3)[0], numpy.sin(angle))
+
 
     def test_dihedral_ethene(self):
         mol = XYZFile("input/ethene.xyz").get_molecule()
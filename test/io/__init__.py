@@ -26,5 +26,10 @@ from number_state import *
 from atrj import *
 from sdf import *
 from cml import *
+from xyz import *
+from gromacs import *
+from lammps import *
+from mtrj import *
+from parallel import *
 
 
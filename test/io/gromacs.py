@@ -0,0 +1,77 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from common import BaseTestCase
+
+from molmod.io.gromacs import GroReader
+from molmod.units import nm, ps
+
+import numpy, unittest
+
+
+__all__ = ["GroTestCase"]
+
+
+class GroTestCase(BaseTestCase):
+    def write_gro(self, filename, num_frames, num_atoms, velocities=True):
+        f = file(filename, "w")
+        frames = []
+        for index in xrange(num_frames):
+            pos = numpy.random.uniform(0, 9, (num_atoms, 3)).round(3)
+            vel = numpy.random.uniform(-1, 1, (num_atoms, 3)).round(4)
+            print >> f, "Generated by a test t= %.5f" % (index*0.5)
+            print >> f, "%5i" % num_atoms
+            for i in xrange(num_atoms):
+                line = "%5i%-5s%5s%5i%8.3f%8.3f%8.3f" % ((i/3+1, "SOL", "OW", i+1) + tuple(pos[i]))
+                if velocities:
+                    line += "%8.4f%8.4f%8.4f" % tuple(vel[i])
+                print >> f, line
+            print >> f, "%10.5f%10.5f%10.5f" % (9.0, 9.5, 10.0)
+            frames.append((pos, vel))
+        f.close()
+        return frames
+
+    def test_load(self):
+        frames = self.write_gro("output/test.gro", 4, 100)
+        gro_reader = GroReader("output/test.gro")
+        self.assertEqual(gro_reader.num_atoms, 100)
+        result = list(gro_reader)
+        self.assertEqual(len(result), 4)
+        for (time, pos, vel, cell), (pos_ref, vel_ref) in zip(result, frames):
+            self.assertEqual(pos.dtype, numpy.float32)
+            self.assertEqual(vel.dtype, numpy.float32)
+            self.assertArraysAlmostEqual(pos/nm, pos_ref, 1e-6)
+            self.assertArraysAlmostEqual(vel/(nm/ps), vel_ref, 1e-6)
+            self.assertAlmostEqual(cell[1,1]/nm, 9.5, 5)
+        self.assertAlmostEqual(result[3][0]/ps, 1.5)
+        # sliced
+        gro_reader = GroReader("output/test.gro", slice(1, None, 2))
+        result = list(gro_reader)
+        self.assertEqual(len(result), 2)
+        self.assertAlmostEqual(result[1][0]/ps, 1.5)
+        self.assertArraysAlmostEqual(result[1][1]/nm, frames[3][0], 1e-6)
+
+    def test_load_positions(self):
+        frames = self.write_gro("output/test_pos.gro", 2, 10, velocities=False)
+        result = list(GroReader("output/test_pos.gro"))
+        self.assertEqual(len(result), 2)
+        self.assertArraysAlmostEqual(result[1][1]/nm, frames[1][0], 1e-6)
+        self.assert_((result[1][2] == 0).all())
@@ -0,0 +1,102 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from common import BaseTestCase
+
+from molmod.io.lammps import DumpReader
+from molmod.units import angstrom
+
+import numpy, unittest
+
+
+__all__ = ["LammpsTestCase"]
+
+
+class LammpsTestCase(BaseTestCase):
+    def write_dump(self, filename, num_frames, num_atoms, header, box):
+        f = file(filename, "w")
+        frames = []
+        for index in xrange(num_frames):
+            pos = numpy.random.uniform(0, 10, (num_atoms, 3)).round(6)
+            vel = numpy.random.uniform(-1, 1, (num_atoms, 3)).round(6)
+            order = numpy.random.permutation(num_atoms)
+            print >> f, "ITEM: TIMESTEP\n%i\nITEM: NUMBER OF ATOMS\n%i" % (index*100, num_atoms)
+            print >> f, box
+            print >> f, header
+            for i in order:
+                print >> f, "%i 1 %.6f %.6f %.6f %.6f %.6f %.6f" % ((i+1,) + tuple(pos[i]) + tuple(vel[i]))
+            frames.append((pos, vel))
+        f.close()
+        return frames
+
+    def test_columns(self):
+        box = "ITEM: BOX BOUNDS pp pp ff\n0.0 10.0\n-1.0 9.0\n0.0 12.0"
+        frames = self.write_dump("output/columns.dump", 3, 20, "ITEM: ATOMS id type x y z vx vy vz", box)
+        dump_reader = DumpReader("output/columns.dump", [1.0, angstrom, angstrom], columns=["vy", "x", "z"])
+        self.assertEqual(dump_reader.num_atoms, 20)
+        self.assertEqual(dump_reader.sub, slice(None))
+        result = list(dump_reader)
+        self.assertEqual(len(result), 3)
+        for frame, (pos, vel) in zip(result, frames):
+            self.assertEqual(len(frame), 4)
+            self.assertEqual(frame[0], frame.step)
+            self.assertArraysAlmostEqual(frame[1], vel[:,1], 1e-10)
+            self.assertArraysAlmostEqual(frame[2]/angstrom, pos[:,0], 1e-10)
+            self.assertArraysAlmostEqual(frame[3]/angstrom, pos[:,2], 1e-10)
+            self.assertArraysAlmostEqual(frame.unit_cell.cell/angstrom, numpy.diag([10.0, 10.0, 12.0]), 1e-10)
+            self.assertArraysEqual(frame.unit_cell.cell_active, numpy.array([True, True, False]))
+            self.assertArraysAlmostEqual(frame.origin/angstrom, numpy.array([0.0, -1.0, 0.0]), 1e-10)
+        self.assertEqual(result[2].step, 200)
+
+    def test_triclinic(self):
+        box = "ITEM: BOX BOUNDS xy xz yz pp pp pp\n-1.0 12.0 1.0\n0.0 11.0 0.0\n0.0 10.0 -2.0"
+        self.write_dump("output/triclinic.dump", 1, 5, "ITEM: ATOMS id type x y z vx vy vz", box)
+        frame = DumpReader("output/triclinic.dump", [angstrom], columns=["x"]).next()
+        # xy = 1, xz = 0 and yz = -2 are the third numbers on the bound lines
+        expected = numpy.array([
+            [12.0, 1.0, 0.0],
+            [0.0, 9.0, -2.0],
+            [0.0, 0.0, 10.0],
+        ])
+        self.assertArraysAlmostEqual(frame.unit_cell.cell/angstrom, expected, 1e-10)
+        self.assertArraysAlmostEqual(frame.origin/angstrom, numpy.array([-1.0, 2.0, 0.0]), 1e-10)
+
+    def test_sub(self):
+        box = "ITEM: BOX BOUNDS pp pp pp\n0.0 10.0\n0.0 10.0\n0.0 10.0"
+        frames = self.write_dump("output/sub.dump", 7, 10, "ITEM: ATOMS id type x y z vx vy vz", box)
+        for sub in slice(None, 3), slice(1, None, 2), slice(None, None, 3), slice(2, 6):
+            result = list(DumpReader("output/sub.dump", [angstrom]*3, sub, ["x", "y", "z"]))
+            indices = range(7)[sub]
+            self.assertEqual([frame.step for frame in result], [100*i for i in indices])
+            for frame, i in zip(result, indices):
+                self.assertArraysAlmostEqual(numpy.array(frame[1:]).transpose()/angstrom, frames[i][0], 1e-10)
+
+    def test_legacy(self):
+        # without column names, the columns after the first one are read
+        box = "ITEM: BOX BOUNDS\n0.0 10.0\n0.0 10.0\n0.0 10.0"
+        frames = self.write_dump("output/legacy.dump", 2, 10, "ITEM: ATOMS", box)
+        result = list(DumpReader("output/legacy.dump", [1.0, angstrom, angstrom]))
+        self.assertEqual(len(result), 2)
+        for frame, (pos, vel) in zip(result, frames):
+            self.assertArraysEqual(frame[1], numpy.ones(10))
+            self.assertArraysAlmostEqual(frame[2]/angstrom, pos[:,0], 1e-10)
+            self.assertArraysAlmostEqual(frame[3]/angstrom, pos[:,1], 1e-10)
+            self.assertArraysEqual(frame.unit_cell.cell_active, numpy.array([True, True, True]))
@@ -0,0 +1,184 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from common import BaseTestCase
+
+from molmod.io.mtrj import *
+from molmod.io.xyz import XYZWriter, XYZFile
+from molmod.io.atrj import ATRJReader
+from molmod.io.dlpoly import HistoryReader
+from molmod.io.gromacs import GroReader
+from molmod.units import angstrom, ps
+
+import numpy, unittest
+
+
+__all__ = ["MTRJTestCase"]
+
+
+class MTRJTestCase(BaseTestCase):
+    def test_write_read(self):
+        numbers = numpy.array([8, 1, 1])
+        writer = MTRJWriter("output/test.mtrj", numbers, ["pos", "time", "cell"])
+        pos = numpy.random.normal(0, 1, (10, 3, 3))
+        cells = numpy.random.normal(0, 1, (10, 3, 3))
+        for index in xrange(5):
+            writer.dump(pos=pos[index], time=index*0.5, cell=cells[index])
+        self.assertRaises(Error, writer.dump, pos=pos[0])
+        traj = MTRJFile("output/test.mtrj")
+        self.assertEqual(len(traj), 5)
+        self.assertArraysEqual(traj.numbers, numbers)
+        self.assertEqual(traj.fields, ["pos", "cell", "time"])
+        self.assert_(isinstance(traj.records, numpy.memmap))
+        self.assertEqual(traj.pos.shape, (5, 3, 3))
+        self.assertArraysEqual(traj.pos[1:4, [0, 2]], pos[1:4, [0, 2]])
+        self.assertArraysEqual(traj.cell, cells[:5])
+        self.assertArraysEqual(traj.time, numpy.arange(5)*0.5)
+        # the file can be read while frames are added
+        for index in xrange(5, 8):
+            writer.dump(pos=pos[index], time=index*0.5, cell=cells[index])
+        self.assertEqual(len(traj), 5)
+        traj.reload()
+        self.assertEqual(len(traj), 8)
+        self.assertArraysEqual(traj.pos[7], pos[7])
+        del writer
+        # append to an existing file
+        writer = MTRJWriter("output/test.mtrj", numbers, ["pos", "time", "cell"], append=True)
+        writer.dump(pos=pos[8], time=4.0, cell=cells[8])
+        del writer
+        traj = MTRJFile("output/test.mtrj")
+        self.assertEqual(len(traj), 9)
+        self.assertArraysEqual(traj.pos, pos[:9])
+        self.assertRaises(Error, MTRJWriter, "output/test.mtrj", numbers, ["pos"], append=True)
+        # single precision
+        writer = MTRJWriter("output/test32.mtrj", numbers, ["pos", "energy"], numpy.float32)
+        writer.dump(pos=pos[0], energy=-1.5)
+        del writer
+        traj = MTRJFile("output/test32.mtrj")
+        self.assertEqual(traj.pos.dtype, numpy.float32)
+        self.assertArraysAlmostEqual(traj.pos[0], pos[0], 1e-6)
+        self.assertEqual(traj.energy[0], -1.5)
+
+    def test_convert_xyz(self):
+        xyz_file = XYZFile("input/tpa.xyz")
+        molecule = xyz_file.get_molecule()
+        writer = XYZWriter("output/convert.xyz", xyz_file.symbols)
+        for index in xrange(4):
+            writer.dump("frame %i" % index, molecule.coordinates + index)
+        del writer
+        convert_xyz("output/convert.xyz", "output/convert_xyz.mtrj", sub=slice(1, None))
+        traj = MTRJFile("output/convert_xyz.mtrj")
+        self.assertEqual(len(traj), 3)
+        self.assertArraysEqual(traj.numbers, molecule.numbers)
+        self.assertArraysAlmostEqual(traj.pos[2], molecule.coordinates + 3, 1e-6)
+
+    def test_convert_atrj(self):
+        convert_atrj("input/bartek.atrj", "output/bartek.mtrj")
+        traj = MTRJFile("output/bartek.mtrj")
+        frames = list(ATRJReader("input/bartek.atrj"))
+        self.assertEqual(len(traj), 3)
+        for index, frame in enumerate(frames):
+            self.assertArraysEqual(traj.pos[index], frame.coordinates)
+            self.assertEqual(traj.time[index], frame.time)
+            self.assertEqual(traj.energy[index], frame.total_energy)
+
+    def test_convert_gro(self):
+        f = file("output/convert.gro", "w")
+        for index in xrange(2):
+            print >> f, "Test t= %.3f" % index
+            print >> f, "    2"
+            print >> f, "    1SOL     OW    1   0.126   1.624   1.679  0.1227 -0.0580  0.0434"
+            print >> f, "    1SOL    HW1    2   0.190   1.661   1.747  0.8085  0.3191 -0.7791"
+            print >> f, "   1.86206   1.86206   1.86206"
+        f.close()
+        convert_gro("output/convert.gro", "output/convert_gro.mtrj", numbers=[8, 1])
+        traj = MTRJFile("output/convert_gro.mtrj")
+        frames = list(GroReader("output/convert.gro"))
+        self.assertEqual(len(traj), 2)
+        self.assertArraysEqual(traj.numbers, numpy.array([8, 1]))
+        self.assertArraysAlmostEqual(traj.pos[1], frames[1][1], 1e-6)
+        self.assertArraysAlmostEqual(traj.vel[1], frames[1][2], 1e-6)
+        self.assertArraysAlmostEqual(traj.cell[1], frames[1][3], 1e-6)
+        self.assertAlmostEqual(traj.time[1]/ps, 1.0)
+
+    def test_convert_lammps(self):
+        f = file("output/convert.dump", "w")
+        frames = []
+        for index in xrange(5):
+            pos = numpy.random.uniform(0, 10, (3, 3)).round(6)
+            vel = numpy.random.uniform(-1, 1, (3, 3)).round(6)
+            print >> f, "ITEM: TIMESTEP\n%i\nITEM: NUMBER OF ATOMS\n3" % (index*10)
+            print >> f, "ITEM: BOX BOUNDS pp pp pp\n0.0 10.0\n0.0 11.0\n0.0 12.0"
+            print >> f, "ITEM: ATOMS id type x y z vx vy vz"
+            for i in 2, 0, 1:
+                print >> f, "%i 1 %.6f %.6f %.6f %.6f %.6f %.6f" % ((i+1,) + tuple(pos[i]) + tuple(vel[i]))
+            frames.append((pos, vel))
+        f.close()
+        units = [angstrom]*3 + [angstrom/ps]*3
+        columns = ["x", "y", "z", "vx", "vy", "vz"]
+        convert_lammps(
+            "output/convert.dump", "output/convert_lammps.mtrj", units,
+            ["pos", "vel", "cell"], numbers=[8, 1, 1], time_step=0.5*ps,
+            sub=slice(1, None, 2), columns=columns,
+        )
+        traj = MTRJFile("output/convert_lammps.mtrj")
+        self.assertEqual(len(traj), 2)
+        self.assertEqual(traj.fields, ["pos", "vel", "cell", "time"])
+        self.assertArraysEqual(traj.numbers, numpy.array([8, 1, 1]))
+        for index, (pos, vel) in enumerate(frames[1::2]):
+            self.assertArraysAlmostEqual(traj.pos[index]/angstrom, pos, 1e-10)
+            self.assertArraysAlmostEqual(traj.vel[index]/(angstrom/ps), vel, 1e-10)
+            self.assertArraysAlmostEqual(traj.cell[index]/angstrom, numpy.diag([10.0, 11.0, 12.0]), 1e-10)
+        self.assertAlmostEqual(traj.time[1]/ps, 15.0)
+        # the columns after the first one, without names
+        convert_lammps(
+            "output/convert.dump", "output/convert_lammps.mtrj",
+            [1.0, angstrom, angstrom], sub=slice(3, None),
+        )
+        traj = MTRJFile("output/convert_lammps.mtrj")
+        self.assertEqual(len(traj), 2)
+        self.assertArraysEqual(traj.pos[0,:,0], numpy.ones(3))
+        self.assertArraysAlmostEqual(traj.pos[1,:,1:]/angstrom, frames[4][0][:,:2], 1e-10)
+
+    def test_convert_dlpoly(self):
+        f = file("output/HISTORY", "w")
+        print >> f, "Test HISTORY"
+        print >> f, "         1         1         2"
+        for step in 10, 20:
+            print >> f, "timestep%10i%10i%10i%10i%12.6f" % (step, 2, 1, 1, 0.001)
+            for i in xrange(3):
+                print >> f, "%12.4f%12.4f%12.4f" % tuple(numpy.identity(3)[i]*20)
+            for i, symbol in enumerate(["Si", "O"]):
+                print >> f, "%-8s%10i%12.6f%12.6f" % (symbol, i+1, 28.0 - 12*i, 0.0)
+                print >> f, "%12.4f%12.4f%12.4f" % (i, step*0.1, 1.0)
+                print >> f, "%12.4f%12.4f%12.4f" % (0.5, -0.5, i)
+        f.close()
+        convert_dlpoly("output/HISTORY", "output/history.mtrj")
+        traj = MTRJFile("output/history.mtrj")
+        frames = list(HistoryReader("output/HISTORY"))
+        self.assertEqual(len(traj), 2)
+        self.assertEqual(traj.fields, ["pos", "vel", "cell", "time"])
+        self.assertArraysEqual(traj.numbers, numpy.array([14, 8]))
+        for index, frame in enumerate(frames):
+            self.assertArraysEqual(traj.pos[index], frame["pos"])
+            self.assertArraysEqual(traj.vel[index], frame["vel"])
+            self.assertArraysEqual(traj.cell[index], frame["cell"])
+            self.assertEqual(traj.time[index], frame["time"])
@@ -0,0 +1,126 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from common import BaseTestCase
+
+from molmod.io.parallel import map_trajectory
+from molmod.io.xyz import XYZReader, XYZWriter
+from molmod.io.gromacs import GroReader
+from molmod.io.lammps import DumpReader
+from molmod.io.dlpoly import HistoryReader
+from molmod.units import angstrom
+
+import numpy, unittest
+
+
+__all__ = ["ParallelTestCase"]
+
+
+def xyz_distance(frame):
+    title, coordinates = frame
+    return numpy.linalg.norm(coordinates[0] - coordinates[-1])
+
+
+def gro_center(frame):
+    time, pos, vel, cell = frame
+    return pos.mean(axis=0)
+
+
+def lammps_sum(frame):
+    return frame[0] + sum(column.sum() for column in frame[1:])
+
+
+def dlpoly_step(frame):
+    return frame["step"], frame["pos"][1,1]
+
+
+def add(a, b):
+    return a + b
+
+
+class ParallelTestCase(BaseTestCase):
+    def check(self, function, reader_class, filename, args=(), combine=None, num_frames=None, sub=slice(None)):
+        reference = [function(frame) for frame in reader_class(filename, *args, sub=sub)]
+        if num_frames is not None:
+            self.assertEqual(len(reference), num_frames)
+        for num_processes in 1, 2:
+            for num_chunks in None, 3:
+                result = map_trajectory(function, reader_class, filename, args, sub=sub, num_processes=num_processes, num_chunks=num_chunks)
+                self.assertEqual(len(result), len(reference))
+                for a, b in zip(result, reference):
+                    self.assert_((numpy.array(a) == numpy.array(b)).all())
+        if combine is not None:
+            result = map_trajectory(function, reader_class, filename, args, combine=combine, sub=sub, num_processes=2)
+            self.assert_((numpy.array(result) == numpy.array(reduce(combine, reference))).all())
+        return reference
+
+    def test_xyz(self):
+        writer = XYZWriter("output/parallel.xyz", ["O", "H", "H"])
+        for index in xrange(11):
+            writer.dump("frame %i" % index, numpy.random.normal(0, 1, (3, 3)))
+        del writer
+        reference = self.check(xyz_distance, XYZReader, "output/parallel.xyz", combine=add, num_frames=11)
+        # selection of frames and an initial value
+        result = map_trajectory(xyz_distance, XYZReader, "output/parallel.xyz", combine=add, initial=1.0, sub=slice(2, None, 3), num_processes=2)
+        self.assertEqual(result, 1.0 + reference[2] + reference[5] + reference[8])
+        result = map_trajectory(xyz_distance, XYZReader, "output/parallel.xyz", sub=slice(2, None, 3), num_processes=1)
+        self.assertEqual(result, reference[2::3])
+
+    def test_gro(self):
+        f = file("output/parallel.gro", "w")
+        for index in xrange(7):
+            print >> f, "Test t= %.3f" % index
+            print >> f, "%5i" % 4
+            for i in xrange(4):
+                print >> f, "%5i%-5s%5s%5i%8.3f%8.3f%8.3f%8.4f%8.4f%8.4f" % ((1, "SOL", "OW", i+1) + tuple(numpy.random.uniform(0, 2, 6)))
+            print >> f, "   1.86206   1.86206   1.86206"
+        f.close()
+        self.check(gro_center, GroReader, "output/parallel.gro", combine=add, num_frames=7)
+
+    def test_lammps(self):
+        f = file("output/parallel.dump", "w")
+        for step in xrange(0, 500, 100):
+            print >> f, "ITEM: TIMESTEP\n%i\nITEM: NUMBER OF ATOMS\n3\nITEM: BOX BOUNDS\n0 10\n0 10\n0 10\nITEM: ATOMS" % step
+            for i in xrange(3):
+                print >> f, "%i %.6f %.6f %.6f" % ((i+1,) + tuple(numpy.random.uniform(0, 10, 3)))
+        f.close()
+        self.check(lammps_sum, DumpReader, "output/parallel.dump", ([angstrom]*3,), combine=add, num_frames=5)
+
+    def test_dlpoly(self):
+        f = file("output/PARALLEL_HISTORY", "w")
+        print >> f, "Test HISTORY"
+        print >> f, "         0         1         2"
+        for step in xrange(10, 70, 10):
+            print >> f, "timestep%10i%10i%10i%10i%12.6f" % (step, 2, 0, 1, 0.001)
+            for i in xrange(3):
+                print >> f, "%12.4f%12.4f%12.4f" % tuple(numpy.identity(3)[i]*20)
+            for i, symbol in enumerate(["Si", "O"]):
+                print >> f, "%-8s%10i%12.6f%12.6f" % (symbol, i+1, 28.0 - 12*i, 0.0)
+                print >> f, "%12.4f%12.4f%12.4f" % tuple(numpy.random.uniform(0, 10, 3))
+        f.close()
+        self.check(dlpoly_step, HistoryReader, "output/PARALLEL_HISTORY", num_frames=6)
+        # the HistoryReader counts the frames from one
+        reference = self.check(dlpoly_step, HistoryReader, "output/PARALLEL_HISTORY", num_frames=3, sub=slice(None, None, 2))
+        self.assertEqual([step for step, y in reference], [20, 40, 60])
+        reference = self.check(dlpoly_step, HistoryReader, "output/PARALLEL_HISTORY", num_frames=2, sub=slice(None, 3))
+        self.assertEqual([step for step, y in reference], [10, 20])
+        reference = self.check(dlpoly_step, HistoryReader, "output/PARALLEL_HISTORY", num_frames=3, sub=slice(1, None, 2))
+        self.assertEqual([step for step, y in reference], [10, 30, 50])
@@ -0,0 +1,197 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from common import BaseTestCase
+
+from molmod.io.xyz import XYZReader, XYZWriter, XYZFile
+from molmod.io.common import scan_frame_offsets, get_frame_offsets, \
+    read_lines, parse_columns, parse_fixed_columns, parse_words
+
+import numpy, unittest, os
+
+
+__all__ = ["XYZTestCase"]
+
+
+class XYZTestCase(BaseTestCase):
+    def write_trajectory(self, filename, num_frames):
+        xyz_file = XYZFile("input/tpa.xyz")
+        molecule = xyz_file.get_molecule()
+        writer = XYZWriter(filename, xyz_file.symbols)
+        geometries = []
+        for index in xrange(num_frames):
+            coordinates = molecule.coordinates + numpy.random.uniform(-0.1, 0.1, molecule.coordinates.shape)
+            writer.dump("frame %i" % index, coordinates)
+            geometries.append(coordinates)
+        del writer
+        return numpy.array(geometries)
+
+    def test_scan(self):
+        geometries = self.write_trajectory("output/scan.xyz", 10)
+        f = file("output/scan.xyz")
+        lines = f.readlines()
+        f.seek(0)
+        offsets = scan_frame_offsets(f, 1, lambda lines: int(lines[0]) + 2)
+        self.assertEqual(len(offsets), 11)
+        self.assertEqual(offsets[0], 0)
+        self.assertEqual(offsets[-1], os.path.getsize("output/scan.xyz"))
+        self.assertEqual(f.tell(), 0)
+        size = len(lines[0]) + len(lines[1]) + sum(len(line) for line in lines[2:2+len(geometries[0])])
+        self.assertEqual(offsets[1], size)
+        # the result does not depend on the chunk size
+        for chunk_size in 1, 7, 100:
+            self.assertArraysEqual(scan_frame_offsets(f, 1, lambda lines: int(lines[0]) + 2, chunk_size=chunk_size), offsets)
+        f.close()
+        # an incomplete frame at the end is ignored, and so is a missing line
+        # ending at the end of the file.
+        f = file("output/scan_broken.xyz", "w")
+        f.write("".join(lines[:-3]))
+        f.close()
+        f = file("output/scan_broken.xyz")
+        self.assertArraysEqual(scan_frame_offsets(f, 1, lambda lines: int(lines[0]) + 2), offsets[:-1])
+        f.close()
+        f = file("output/scan_broken.xyz", "w")
+        f.write("".join(lines)[:-1])
+        f.close()
+        f = file("output/scan_broken.xyz")
+        self.assertArraysEqual(scan_frame_offsets(f, 1, lambda lines: int(lines[0]) + 2, chunk_size=13), numpy.array(offsets[:-1].tolist() + [offsets[-1] - 1]))
+        f.close()
+
+    def test_parse(self):
+        values = numpy.random.normal(0, 10, (50, 4))
+        text = "".join("X %r %.9f  %.17e\t%g\n" % tuple(row) for row in values)
+        result, size = parse_columns(text, 50, [1, 2, 4])
+        self.assertEqual(size, len(text))
+        self.assertArraysEqual(result[:,0], values[:,0])
+        self.assertArraysEqual(result[:,1], numpy.array(["%.9f" % value for value in values[:,1]], float))
+        self.assertArraysEqual(result[:,2], numpy.array(["%g" % value for value in values[:,3]], float))
+        result, size = parse_columns(text + "trailing text", 50, [3])
+        self.assertEqual(size, len(text))
+        self.assertRaises(ValueError, parse_columns, text, 51, [1])
+        self.assertRaises(ValueError, parse_columns, text, 50, [0])
+        self.assertRaises(ValueError, parse_columns, text, 50, [5])
+        text = "  abc  1.500 -2.250\nxyz     4.0000000  6\n"
+        result, size = parse_fixed_columns(text, 2, 2, 5, 7)
+        self.assertArraysEqual(result, numpy.array([[1.5, -2.25], [4.0, 0.0]]))
+        self.assertRaises(ValueError, parse_fixed_columns, text, 2, 2, 5, 6)
+        # special cases of the fast conversion
+        words = [
+            "+1.5", "-.5", "5.", "1e5", "1.5E-3", "-0.0", "12345678.12345678",
+            "0.123456789012345678901", "1e-30", "1.25e300", "inf",
+        ]
+        result, size = parse_columns(" ".join(words) + "\n", 1, range(len(words)))
+        self.assertArraysEqual(result[0], numpy.array(words, float))
+        for word in "1.0d0", "1.5x", "1e", "--1", ".", "-":
+            self.assertRaises(ValueError, parse_columns, "X %s\n" % word, 1, [1])
+            self.assertRaises(ValueError, parse_fixed_columns, "%6s\n" % word, 1, 1, 0, 6)
+        # extract words
+        self.assertEqual(parse_words("  C 1.0\nHe 2.0\n\tO 3.0 x\n", 3, 0), ["C", "He", "O"])
+        self.assertEqual(parse_words("  C 1.0\nHe 2.0\n", 2, 1), ["1.0", "2.0"])
+        self.assertRaises(ValueError, parse_words, "C 1.0\nHe\n", 2, 1)
+        # read blocks of lines
+        f = file("output/lines.txt", "w")
+        f.write("".join("line %i\n" % i for i in xrange(1000)))
+        f.close()
+        f = file("output/lines.txt")
+        block = read_lines(f, 3, chunk_size=5)
+        self.assertEqual(block, "line 0\nline 1\nline 2\n")
+        self.assertEqual(f.readline(), "line 3\n")
+        block = read_lines(f, 990)
+        self.assertEqual(block.count("\n"), 990)
+        self.assertEqual(f.readline(), "line 994\n")
+        self.assertEqual(read_lines(f, 10).count("\n"), 5)
+        f.close()
+
+    def test_random_access(self):
+        geometries = self.write_trajectory("output/random.xyz", 20)
+        reader = XYZReader("output/random.xyz")
+        self.assertEqual(len(reader), 20)
+        title, coordinates = reader[13]
+        self.assertEqual(title, "frame 13")
+        self.assertArraysAlmostEqual(coordinates, geometries[13], 1e-6)
+        title, coordinates = reader[-1]
+        self.assertEqual(title, "frame 19")
+        frames = reader[2:11:4]
+        self.assertEqual([title for title, coordinates in frames], ["frame 2", "frame 6", "frame 10"])
+        self.assertRaises(IndexError, reader.__getitem__, 20)
+        # random access does not interfere with the iteration
+        titles = [title for title, coordinates in reader]
+        self.assertEqual(titles, ["frame %i" % index for index in xrange(20)])
+        self.assertEqual(reader.get_titles(), titles)
+        # with a selection of the frames
+        reader = XYZReader("output/random.xyz", slice(3, None, 5))
+        self.assertEqual(len(reader), 4)
+        self.assertEqual(reader[1][0], "frame 8")
+        self.assertArraysAlmostEqual(reader[-1][1], geometries[18], 1e-6)
+        self.assertEqual([title for title, coordinates in reader], ["frame 3", "frame 8", "frame 13", "frame 18"])
+        reader = XYZReader("output/random.xyz", slice(None, 3))
+        self.assertEqual([title for title, coordinates in reader], ["frame 0", "frame 1", "frame 2"])
+
+    def test_sidecar(self):
+        self.write_trajectory("output/sidecar.xyz", 5)
+        if os.path.isfile("output/sidecar.xyz.frames"):
+            os.remove("output/sidecar.xyz.frames")
+        reader = XYZReader("output/sidecar.xyz", sidecar=True)
+        self.assert_(os.path.isfile("output/sidecar.xyz.frames"))
+        self.assertEqual(len(reader), 5)
+        calls = []
+        def scan(f):
+            calls.append(f)
+            return reader._scan(f)
+        offsets = get_frame_offsets("output/sidecar.xyz", scan, True)
+        self.assertEqual(len(calls), 0)
+        self.assertArraysEqual(offsets, reader.get_offsets())
+        # a modified trajectory is scanned again
+        geometries = self.write_trajectory("output/sidecar.xyz", 7)
+        st = os.stat("output/sidecar.xyz")
+        os.utime("output/sidecar.xyz", (st.st_atime, st.st_mtime + 10))
+        reader = XYZReader("output/sidecar.xyz", sidecar=True)
+        self.assertEqual(len(reader), 7)
+        self.assertArraysAlmostEqual(reader[6][1], geometries[6], 1e-6)
+
+    def test_xyz_file(self):
+        geometries = self.write_trajectory("output/lazy.xyz", 6)
+        xyz_file = XYZFile("output/lazy.xyz", slice(1, None, 2))
+        self.assertEqual(len(xyz_file), 3)
+        molecule = xyz_file.get_molecule(2)
+        self.assertEqual(molecule.title, "frame 5")
+        self.assertArraysAlmostEqual(molecule.coordinates, geometries[5], 1e-6)
+        self.assertEqual(xyz_file.titles, ["frame 1", "frame 3", "frame 5"])
+        self.assertArraysAlmostEqual(xyz_file.geometries, geometries[1::2], 1e-6)
+        self.assertEqual(xyz_file.get_molecule(1).title, "frame 3")
+        # the geometries can be replaced
+        xyz_file.geometries = geometries[:3]
+        self.assertEqual(xyz_file.get_molecule(0).title, "frame 1")
+        self.assertArraysAlmostEqual(xyz_file.get_molecule(0).coordinates, geometries[0], 1e-6)
+
+    def test_xyz_file_object(self):
+        geometries = self.write_trajectory("output/object.xyz", 4)
+        f = file("output/object.xyz")
+        # skip the first frame, the file is read from the current position
+        num_lines = int(f.readline()) + 1
+        for i in xrange(num_lines):
+            f.readline()
+        xyz_file = XYZFile(f)
+        f.close()
+        self.assertEqual(len(xyz_file), 3)
+        self.assertEqual(xyz_file.titles, ["frame 1", "frame 2", "frame 3"])
+        self.assertArraysAlmostEqual(xyz_file.geometries, geometries[1:], 1e-6)
+        self.assertEqual(xyz_file.get_molecule(2).title, "frame 3")
@@ -0,0 +1,165 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from molmod.minimizer import *
+from molmod.redundant import RedundantInternals
+from molmod.molecular_graphs import MolecularGraph
+from molmod.io.xyz import XYZFile
+from molmod.toyff import ToyFF
+
+import unittest, numpy
+
+
+__all__ = ["MinimizerTestCase"]
+
+
+class CountingFunction(object):
+    def __init__(self, fun):
+        self.fun = fun
+        self.num_calls = 0
+
+    def __call__(self, x, do_gradient=False):
+        self.num_calls += 1
+        return self.fun(x, do_gradient)
+
+
+def rosenbrock(x, do_gradient=False):
+    f = (100*(x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2).sum() + 1
+    if do_gradient:
+        gradient = numpy.zeros(len(x), float)
+        gradient[1:] += 200*(x[1:] - x[:-1]**2)
+        gradient[:-1] += -400*x[:-1]*(x[1:] - x[:-1]**2) - 2*(1 - x[:-1])
+        return f, gradient
+    else:
+        return f
+
+
+class MinimizerTestCase(unittest.TestCase):
+    def test_lbfgs(self):
+        x_init = numpy.random.uniform(0.0, 0.5, 20)
+        fun_cg = CountingFunction(rosenbrock)
+        minimizer = Minimizer(x_init, fun_cg, NewtonGLineSearch, 1e-12, 1e-10, 1.0, 5000, 100, do_gradient=True, verbose=False)
+        fun_lbfgs = CountingFunction(rosenbrock)
+        minimizer = LBFGSMinimizer(x_init, fun_lbfgs, 1e-12, 1e-10, 1.0, 5000, verbose=False)
+        self.assert_(abs(minimizer.x - 1).max() < 1e-4)
+        self.assertAlmostEqual(minimizer.f, 1.0, 10)
+        self.assert_(fun_lbfgs.num_calls*3 < fun_cg.num_calls)
+        log = minimizer.get_log()
+        self.assert_(log["num_eval"].sum() <= fun_lbfgs.num_calls)
+        self.assert_((log["f"][1:] <= log["f"][:-1]).all())
+
+    def test_fire(self):
+        scales = numpy.arange(1, 11, dtype=float)
+        # the relative decrease must also work for negative function values
+        for offset in 1.0, -50.0:
+            def fun(x, do_gradient=False):
+                f = 0.5*(scales*x**2).sum() + offset
+                if do_gradient:
+                    return f, scales*x
+                else:
+                    return f
+            x_init = numpy.random.uniform(-1, 1, 10)
+            minimizer = FIREMinimizer(x_init, fun, 1e-12, 1e-8, 0.1, 5000, verbose=False)
+            self.assert_(abs(minimizer.x).max() < 1e-5)
+            self.assertAlmostEqual(minimizer.f, offset, 10)
+            self.assert_(len(minimizer.get_log()) < 5000)
+            # the first step follows the force and lowers the function
+            minimizer = FIREMinimizer(x_init, fun, 1e-12, 1e-8, 0.1, 1, verbose=False)
+            self.assert_(minimizer.decrease > 0)
+            self.assert_(minimizer.lower)
+
+    def test_batch(self):
+        batch_sizes = []
+        def batch_rosenbrock(x, do_gradient=False):
+            batch_sizes.append(len(x))
+            result = [rosenbrock(row, True) for row in x]
+            return numpy.array([f for f, g in result]), numpy.array([g for f, g in result])
+        x_init = numpy.random.uniform(0.0, 0.5, (5, 10))
+        minimizer = BatchMinimizer(x_init, batch_rosenbrock, 1e-12, 1e-10, 1.0, 5000, verbose=False)
+        self.assert_(minimizer.converged.all())
+        self.assert_(abs(minimizer.x - 1).max() < 1e-4)
+        self.assert_(abs(minimizer.f - 1).max() < 1e-9)
+        log = minimizer.get_log()
+        self.assertEqual(log["f"].shape[1], 5)
+        # converged problems are no longer passed to the function
+        self.assertEqual(batch_sizes[2:], list(log["active"].sum(axis=1)[:-1]))
+        self.assert_(min(batch_sizes) < 5)
+        # negative function values must not stop the problems after one step
+        def batch_negative(x, do_gradient=False):
+            f, gradient = batch_rosenbrock(x, do_gradient)
+            return f - 100, gradient
+        minimizer = BatchMinimizer(x_init, batch_negative, 1e-12, 1e-10, 1.0, 5000, verbose=False)
+        self.assert_(minimizer.converged.all())
+        self.assert_(abs(minimizer.x - 1).max() < 1e-4)
+
+    def test_internal(self):
+        molecule = XYZFile("input/tpa.xyz").get_molecule()
+        graph = MolecularGraph.from_geometry(molecule)
+        internals = RedundantInternals(graph, molecule.coordinates)
+        reference = internals.get_values(molecule.coordinates)
+        force_constants = numpy.array([0.3, 0.1, 0.01, 0.02])[internals.kinds]
+        def fun(x, do_gradient=False):
+            values, b_matrix = internals.compute(x.reshape((-1,3)), 1)[:2]
+            deltas = internals.get_deltas(values, reference)
+            f = 0.5*(force_constants*deltas**2).sum()
+            if do_gradient:
+                return f, b_matrix.T*(force_constants*deltas)
+            else:
+                return f
+        x_init = molecule.coordinates.ravel() + numpy.random.uniform(-0.1, 0.1, molecule.size*3)
+        fun_lbfgs = CountingFunction(fun)
+        minimizer = LBFGSMinimizer(x_init, fun_lbfgs, 1e-10, 1e-8, 1.0, 1000, verbose=False)
+        fun_internal = CountingFunction(fun)
+        minimizer = InternalMinimizer(x_init, fun_internal, internals, 1e-10, 1e-8, 1.0, 1000, verbose=False)
+        self.assert_(minimizer.f < 1e-12)
+        self.assert_(fun_internal.num_calls*5 < fun_lbfgs.num_calls)
+        log = minimizer.get_log()
+        self.assertEqual(log["num_eval"][-1], fun_internal.num_calls)
+        self.assert_((log["f"][1:] <= log["f"][:-1]).all())
+        self.assert_((log["norm_cg"] > 0).all())
+        # negative function values must not stop the optimization early
+        def fun_negative(x, do_gradient=False):
+            if do_gradient:
+                f, gradient = fun(x, True)
+                return f - 10, gradient
+            else:
+                return fun(x) - 10
+        minimizer = InternalMinimizer(x_init, fun_negative, internals, 1e-10, 1e-8, 1.0, 1000, verbose=False)
+        self.assert_(minimizer.f + 10 < 1e-8)
+
+    def test_internal_toyff(self):
+        # ToyFF is not harmonic in the internal coordinates and contains
+        # non-bonded pair terms.
+        numpy.random.seed(1)
+        molecule = XYZFile("input/thf_single.xyz").get_molecule()
+        graph = MolecularGraph.from_geometry(molecule)
+        ff = ToyFF(graph)
+        ff.dm_reci = 0.2
+        ff.bond_hyper = 1.0
+        ff.span_quad = 1.0
+        internals = RedundantInternals(graph, molecule.coordinates)
+        x_init = molecule.coordinates.ravel() + numpy.random.uniform(-0.1, 0.1, molecule.size*3)
+        fun_lbfgs = CountingFunction(ff)
+        minimizer_lbfgs = LBFGSMinimizer(x_init, fun_lbfgs, 1e-10, 1e-8, 1.0, 2000, verbose=False)
+        fun_internal = CountingFunction(ff)
+        minimizer = InternalMinimizer(x_init, fun_internal, internals, 1e-10, 1e-8, 1.0, 2000, verbose=False)
+        self.assert_(abs(minimizer.f - minimizer_lbfgs.f) < 1e-7)
+        self.assert_(fun_internal.num_calls*1.5 < fun_lbfgs.num_calls)
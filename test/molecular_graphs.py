@@ -18,7 +18,7 @@
 #
 # --
 
-from molmod.units import angstrom
+from molmod.units import angstrom, degree
 from molmod.molecular_graphs import *
 from molmod.graphs import GraphError, GraphSearch, CriteriaSet, CritOr, RingPattern
 from molmod.toyff import guess_geometry
@@ -295,6 +295,57 @@ class MolecularGraphTestCase(unittest.TestCase):
 
         self.verify_graph_search(molecule.graph, expected_results, test_results, iter_alternatives)
 
+    def test_internal_coordinates_precursor(self):
+        graph = self.load_molecule("precursor.xyz").graph
+        # construct all internal coordinates the slow way
+        bonds = set([])
+        bends = set([])
+        dihedrals = set([])
+        out_of_planes = set([])
+        for b, c in graph.pairs:
+            bonds.add((min(b, c), max(b, c)))
+            for b, c in (b, c), (c, b):
+                for a in graph.neighbors[b]:
+                    if a != c:
+                        for d in graph.neighbors[c]:
+                            if d != b and a < d:
+                                dihedrals.add((a, b, c, d))
+        for b in xrange(graph.num_nodes):
+            neighbors = sorted(graph.neighbors[b])
+            for i, a in enumerate(neighbors):
+                for j, c in enumerate(neighbors[i+1:]):
+                    bends.add((a, b, c))
+                    for d in neighbors[i+j+2:]:
+                        out_of_planes.add((b, a, c, d))
+        for rows, expected in [
+            (graph.bonds, bonds), (graph.bends, bends),
+            (graph.dihedrals, dihedrals), (graph.out_of_planes, out_of_planes),
+        ]:
+            self.assertEqual(len(rows), len(expected))
+            self.assertEqual(set(tuple(row) for row in rows), expected)
+            self.assertEqual(rows.tolist(), sorted(rows.tolist()))
+
+    def test_filter_rows_tpa(self):
+        graph = self.load_molecule("tpa.xyz").graph
+        rows = graph.filter_rows(graph.dihedrals, atom_criteria(1, 6, 6, 7))
+        self.assertEqual(set(tuple(row) for row in rows), set([
+            (16, 2, 1, 0), (15, 2, 1, 0), (23, 5, 4, 0), (22, 5, 4, 0),
+            (29, 8, 7, 0), (30, 8, 7, 0), (37, 11, 10, 0), (36, 11, 10, 0)
+        ]))
+        # compare with the graph search, up to the direction of the dihedrals
+        pattern = DihedralAnglePattern([CriteriaSet(atom_criteria(1, 6, 6, 1))])
+        expected = set([])
+        for match in GraphSearch(pattern)(graph):
+            row = tuple(match.get_destination(index) for index in xrange(4))
+            expected.add(min(row, row[::-1]))
+        rows = graph.filter_rows(graph.dihedrals, atom_criteria(1, 6, 6, 1))
+        self.assertEqual(len(rows), len(expected))
+        self.assertEqual(set(min(tuple(row), tuple(row[::-1])) for row in rows), expected)
+        self.assert_((graph.numbers[rows] == [1, 6, 6, 1]).all())
+        # None means any atom
+        rows = graph.filter_rows(graph.bonds, [HasAtomNumber(7), None])
+        self.assertEqual(set(tuple(row) for row in rows), set([(0, 1), (0, 4), (0, 7), (0, 10)]))
+
     def test_rings_5ringOH(self):
         molecule = self.load_molecule("5ringOH.xyz")
         pattern = NRingPattern(10, [CriteriaSet(tag="all")])
@@ -367,6 +418,74 @@ class MolecularGraphTestCase(unittest.TestCase):
             self.assertEqual(check.orders.shape,check_orders.shape)
             self.assert_((check.orders==check_orders).all())
 
+    def test_from_geometry_neighbor_list(self):
+        from molmod.binning import NeighborList
+        from molmod.data.bonds import bonds
+        molecule = XYZFile("input/precursor.xyz").get_molecule()
+        reference = MolecularGraph.from_geometry(molecule)
+        neighbor_list = NeighborList(bonds.max_length*bonds.bond_tolerance, 0.5*angstrom)
+        for counter in xrange(3):
+            graph = MolecularGraph.from_geometry(molecule, neighbor_list=neighbor_list)
+            self.assertEqual(set(graph.pairs), set(reference.pairs))
+        self.assertEqual(neighbor_list.num_builds, 1)
+        neighbor_list = NeighborList(1.0*angstrom)
+        self.assertRaises(ValueError, MolecularGraph.from_geometry, molecule, neighbor_list=neighbor_list)
+
+    def test_from_geometry_periodic(self):
+        from molmod.unit_cell import UnitCell
+        from molmod.data.bonds import bonds
+        molecule = XYZFile("input/lau.xyz").get_molecule()
+        unit_cell = UnitCell()
+        unit_cell.set_parameters(
+            numpy.array([14.59, 12.88, 7.61])*angstrom,
+            numpy.array([ 85.0, 111.0, 80.0])*degree,
+        )
+        unit_cell.set_cell_active(numpy.array([True, True, True]))
+        graph = MolecularGraph.from_geometry(molecule, unit_cell, do_orders=True)
+        # compare with the shortest distance over all neighboring images
+        images = unit_cell.to_cartesian(numpy.indices((5, 5, 5)).reshape(3, -1).transpose() - 2)
+        expected = {}
+        for index1 in xrange(molecule.size):
+            for index2 in xrange(index1):
+                delta = molecule.coordinates[index2] - molecule.coordinates[index1]
+                distance = numpy.sqrt(((delta + images)**2).sum(axis=1)).min()
+                bond_type = bonds.bonded(molecule.numbers[index1], molecule.numbers[index2], distance)
+                if bond_type is not None:
+                    expected[frozenset([index1, index2])] = (bond_type, distance)
+        self.assertEqual(set(graph.pairs), set(expected))
+        for pair, order, bond_length in zip(graph.pairs, graph.orders, graph.bond_lengths):
+            self.assertEqual(order, expected[pair][0])
+            self.assertAlmostEqual(bond_length, expected[pair][1], 10)
+
+    def test_graph_tracker(self):
+        from molmod.molecules import Molecule
+        molecule = XYZFile("input/precursor.xyz").get_molecule()
+        for do_orders in False, True:
+            tracker = GraphTracker(molecule.numbers, do_orders=do_orders)
+            coordinates = molecule.coordinates.copy()
+            graph, formed, broken = tracker.update(coordinates)
+            self.assertEqual(set(formed), set(graph.pairs))
+            self.assertEqual(len(broken), 0)
+            # small displacements keep the same graph object
+            previous = graph
+            graph, formed, broken = tracker.update(coordinates + 0.001*angstrom)
+            self.assert_(graph is previous)
+            self.assertEqual(len(formed), 0)
+            self.assertEqual(len(broken), 0)
+            # a random walk, compared with from_geometry in each frame
+            old_pairs = set(graph.pairs)
+            for counter in xrange(20):
+                coordinates += numpy.random.uniform(-0.05, 0.05, coordinates.shape)*angstrom
+                graph, formed, broken = tracker.update(coordinates)
+                reference = MolecularGraph.from_geometry(Molecule(molecule.numbers, coordinates), do_orders=do_orders)
+                self.assertEqual(graph.pairs, reference.pairs)
+                self.assert_((graph.orders == reference.orders).all())
+                self.assertAlmostEqual(abs(graph.bond_lengths - reference.bond_lengths).max(), 0.0, 10)
+                self.assertEqual(set(formed), set(graph.pairs) - old_pairs)
+                self.assertEqual(set(broken), old_pairs - set(graph.pairs))
+                old_pairs = set(graph.pairs)
+            self.assert_(tracker.num_searches < 20)
+
     def test_fingerprints(self):
         for mol in self.iter_molecules():
             g0 = mol.graph
@@ -447,23 +566,57 @@ class MolecularGraphTestCase(unittest.TestCase):
             self.assertEqual(len(match), g1.num_nodes)
 
     def test_canonical_order(self):
-        # TODO: analogous tests voor pure graphs + fixen
         for molecule in self.iter_molecules():
-            try:
-                g0 = molecule.graph
-                order0 = g0.canonical_order
-                g0_bis = g0.get_subgraph(order0, normalize=True)
-
-                permutation = numpy.random.permutation(g0.num_nodes)
-                g1 = g0.get_subgraph(permutation, normalize=True)
-                order1 = g1.canonical_order
-                g1_bis = g1.get_subgraph(order1, normalize=True)
-
-                self.assertEqual(str(g0_bis), str(g1_bis))
-                self.assert_((g0_bis.numbers==g1_bis.numbers).all())
-                self.assert_((g0_bis.orders==g1_bis.orders).all())
-            except NotImplementedError:
-                pass
+            g0 = molecule.graph
+            order0 = g0.canonical_order
+            g0_bis = g0.get_subgraph(order0, normalize=True)
+
+            permutation = numpy.random.permutation(g0.num_nodes)
+            g1 = g0.get_subgraph(permutation, normalize=True)
+            order1 = g1.canonical_order
+            g1_bis = g1.get_subgraph(order1, normalize=True)
+
+            self.assertEqual(str(g0_bis), str(g1_bis))
+            self.assert_((g0_bis.numbers==g1_bis.numbers).all())
+            self.assert_((g0_bis.orders==g1_bis.orders).all())
+
+    def test_canonical_form(self):
+        for molecule in self.iter_molecules(allow_multi=True):
+            g0 = molecule.graph
+            permutation = numpy.random.permutation(g0.num_nodes)
+            g1 = g0.get_subgraph(permutation, normalize=True)
+            self.assertEqual(g0.canonical_form, g1.canonical_form)
+            self.assertEqual(g0.canonical_hash, g1.canonical_hash)
+            # the canonical form is a blob of the graph in canonical order
+            g2 = MolecularGraph.from_blob(g0.canonical_form)
+            self.assert_((g2.numbers==g0.numbers[g0.canonical_order]).all())
+            self.assertEqual(g2.canonical_form, g0.canonical_form)
+        # butane and isobutane have the same formula
+        butane = MolecularGraph([(0,1), (1,2), (2,3)], [6, 6, 6, 6])
+        isobutane = MolecularGraph([(0,1), (0,2), (0,3)], [6, 6, 6, 6])
+        self.assertNotEqual(butane.canonical_form, isobutane.canonical_form)
+        # bond orders are part of the canonical form
+        ethene = MolecularGraph([(0,1)], [6, 6], [2])
+        ethane = MolecularGraph([(0,1)], [6, 6], [1])
+        self.assertNotEqual(ethene.canonical_hash, ethane.canonical_hash)
+
+    def test_graph_index(self):
+        index = MolecularGraphIndex()
+        # a box with many tetrahydrofuran molecules
+        graph = self.load_molecule("thf.xyz").graph
+        for group in graph.independent_nodes:
+            index.add(graph.get_subgraph(group, normalize=True))
+        self.assertEqual(len(index), 1)
+        for molecule in self.iter_molecules():
+            index.add(molecule.graph)
+        for graph in index.iter_graphs():
+            self.assert_(graph in index)
+            permutation = numpy.random.permutation(graph.num_nodes)
+            blob = graph.get_subgraph(permutation, normalize=True).blob
+            self.assert_(blob in index)
+            self.assert_(not index.add(blob))
+        self.assert_(index.add("6,1,1,1,1 0_1_1,0_2_1,0_3_1,0_4_1", "methane"))
+        self.assertEqual(index["6,1,1,1,1 0_4_1,0_2_1,0_3_1,0_1_1"], "methane")
 
     def test_guess_geometry(self):
         for input_mol in self.iter_molecules(allow_multi=False):
@@ -19,6 +19,7 @@
 # --
 
 import molmod.pairff
+import molmod.unit_cell
 
 import unittest, numpy, math
 
@@ -228,6 +229,99 @@ class PairFFTestCase(unittest.TestCase):
     def test_debug4ff(self):
         self.ff_test(self.make_debug4ff(do_excludes=False))
 
+    def test_batch_consistency(self):
+        numpy.random.seed(2)
+        coordinates = numpy.random.uniform(0, 5, (20, 3))
+        charges = numpy.random.normal(0, 1, 20)
+        dipoles = numpy.random.normal(0, 1, (20, 3))
+        exclude_pairs = [set([0,2]), set([0,1]), set([5,7])]
+        ff = molmod.pairff.CoulombFF(coordinates, charges, dipoles, exclude_pairs)
+        # compare the batched energy with a plain loop over the pairs
+        energy = 0.0
+        for index1 in xrange(20):
+            for index2 in xrange(index1):
+                if set([index1, index2]) not in exclude_pairs:
+                    for se, ve in ff.yield_pair_energies(index1, index2):
+                        energy += se*ve
+        self.assertAlmostEqual(ff.energy(), energy, 10)
+        # compare the full gradient and hessian with their components
+        gradient = ff.gradient()
+        hessian = ff.hessian()
+        for index1 in xrange(20):
+            self.assert_(abs(gradient[index1] - ff.gradient_component(index1)).max() < 1e-10)
+            for index2 in xrange(20):
+                self.assert_(abs(hessian[index1, index2] - ff.hessian_component(index1, index2)).max() < 1e-10)
+        self.assert_(abs(hessian[0, 2]).max() == 0.0)
+
+    def test_exclude_pairs(self):
+        numpy.random.seed(5)
+        coordinates = numpy.random.uniform(0, 5, (10, 3))
+        charges = numpy.random.normal(0, 1, 10)
+        exclude_pairs = [set([0,2]), set([0,1])]
+        reference = molmod.pairff.CoulombFF(coordinates, charges, exclude_pairs=exclude_pairs)
+        # the mask is updated when exclude_pairs is assigned
+        ff = molmod.pairff.CoulombFF(coordinates, charges)
+        ff.exclude_pairs = exclude_pairs
+        self.assertAlmostEqual(ff.energy(), reference.energy(), 10)
+        self.assertEqual(ff.mask[0,2], False)
+
+    def test_not_implemented(self):
+        class EmptyFF(molmod.pairff.PairFF):
+            pass
+        ff = EmptyFF(numpy.random.uniform(0, 5, (3, 3)))
+        self.assertRaises(NotImplementedError, ff.energy)
+        self.assertRaises(NotImplementedError, ff.gradient)
+        self.assertRaises(NotImplementedError, ff.hessian)
+
+    def test_cutoff(self):
+        numpy.random.seed(3)
+        coordinates = numpy.random.uniform(0, 5, (30, 3))
+        charges = numpy.random.normal(0, 1, 30)
+        exclude_pairs = [set([0,2]), set([0,1]), set([5,7])]
+        dense = molmod.pairff.CoulombFF(coordinates, charges, exclude_pairs=exclude_pairs)
+        sparse = molmod.pairff.CoulombFF(coordinates, charges, exclude_pairs=exclude_pairs, cutoff=2.0)
+        # compare with a dense force field where the long-range pairs are excluded
+        for index1 in xrange(30):
+            for index2 in xrange(index1):
+                if dense.distances[index1, index2] >= 2.0:
+                    exclude_pairs.append(set([index1, index2]))
+        dense.update_mask()
+        dense.update_coordinates()
+        self.assertEqual(len(sparse.pair_indices1), len(dense.pair_indices1))
+        self.assertAlmostEqual(sparse.energy(), dense.energy(), 10)
+        self.assert_(abs(sparse.gradient() - dense.gradient()).max() < 1e-10)
+        self.assert_(abs(sparse.hessian_sparse().toarray() - dense.hessian_flat()).max() < 1e-10)
+
+    def test_cutoff_periodic(self):
+        numpy.random.seed(4)
+        unit_cell = molmod.unit_cell.UnitCell(numpy.array([
+            [5.0, 1.0, 0.0],
+            [0.0, 6.0, 0.5],
+            [0.0, 0.0, 5.5],
+        ]), numpy.array([True, True, True]))
+        coordinates = numpy.random.uniform(-3, 8, (40, 3))
+        atom_strengths = numpy.random.uniform(0.5, 1.0, 40)
+        strengths = numpy.outer(atom_strengths, atom_strengths)
+        ff = molmod.pairff.DispersionFF(coordinates, strengths, cutoff=2.4, unit_cell=unit_cell)
+        # brute force reference with the minimum image convention
+        energy = 0.0
+        gradient = numpy.zeros((40, 3), float)
+        for index1 in xrange(40):
+            for index2 in xrange(index1):
+                delta = unit_cell.shortest_vector(coordinates[index1] - coordinates[index2])
+                distance = numpy.linalg.norm(delta)
+                if distance < 2.4:
+                    strength = strengths[index1, index2]
+                    energy += strength*distance**(-6)
+                    gradient[index1] -= 6*strength*distance**(-8)*delta
+                    gradient[index2] += 6*strength*distance**(-8)*delta
+        self.assertAlmostEqual(ff.energy(), energy, 10)
+        self.assert_(abs(ff.gradient() - gradient).max() < 1e-10)
+        # the sparse hessian must be consistent with the dense one
+        hessian_sparse = ff.hessian_sparse()
+        self.assert_(abs(hessian_sparse.toarray() - ff.hessian_flat()).max() < 1e-10)
+        self.assert_(abs(hessian_sparse - hessian_sparse.transpose()).max() < 1e-10)
+
     def ff_test(self, ff):
         coordinates = ff.coordinates
         numc = len(coordinates)
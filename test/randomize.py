@@ -23,11 +23,11 @@ from common import BaseTestCase
 from molmod.randomize import *
 from molmod.molecular_graphs import MolecularGraph
 from molmod.units import A
-from molmod.transformations import Translation, Rotation
+from molmod.transformations import Translation, Rotation, superpose, random_rotation
 
 from molmod.io.xyz import XYZFile
 
-import unittest, numpy, os
+import unittest, numpy, os, copy
 
 __all__ = ["RandomizeTestCase"]
 
@@ -91,3 +91,86 @@ class RandomizeTestCase(BaseTestCase):
                 self.assertArraysAlmostEqual(mol_transformation.transformation.r, check_transformation.transformation.r, 1e-5, doabs=True)
                 self.assertArraysAlmostEqual(mol_transformation.transformation.t, check_transformation.transformation.t, 1e-5, doabs=True)
 
+
+    def test_nonbond_checker(self):
+        class CellListChecker(NonbondChecker):
+            max_dense_size = 0
+
+        for molecule, graph in self.yield_test_molecules():
+            dense = NonbondChecker(graph, molecule.numbers, nonbond_thresholds)
+            cell = CellListChecker(graph, molecule.numbers, nonbond_thresholds)
+            self.assertEqual(dense.indices1 is None, False)
+            self.assertEqual(cell.indices1 is None, True)
+            close = graph.get_sparse_distances(2).todok()
+            for i in xrange(20):
+                coordinates = molecule.coordinates + numpy.random.normal(0, 0.3*A, molecule.coordinates.shape)
+                expected = True
+                for atom1 in xrange(graph.num_nodes):
+                    for atom2 in xrange(atom1):
+                        if (atom1, atom2) not in close:
+                            distance = numpy.linalg.norm(coordinates[atom1] - coordinates[atom2])
+                            if distance < nonbond_thresholds[frozenset([molecule.numbers[atom1], molecule.numbers[atom2]])]:
+                                expected = False
+                self.assertEqual(dense(coordinates), expected)
+                self.assertEqual(cell(coordinates), expected)
+        self.assertRaises(KeyError, NonbondChecker, graph, molecule.numbers, {frozenset([1,6]): 1.0})
+
+    def test_randomize_coordinates(self):
+        for molecule, graph in self.yield_test_molecules():
+            manipulations = generate_manipulations(graph, molecule)
+            checker = NonbondChecker(graph, molecule.numbers, nonbond_thresholds)
+            out = numpy.zeros(molecule.coordinates.shape, float)
+            result = randomize_coordinates(molecule.coordinates, manipulations, checker, out=out)
+            self.assert_(result is out)
+            self.assert_(checker(out))
+            # the in-place manipulations must match the ones on molecules
+            for manipulation in manipulations:
+                randomized_molecule = copy.deepcopy(molecule)
+                numpy.random.seed(1)
+                manipulation.apply(randomized_molecule)
+                out[:] = molecule.coordinates
+                numpy.random.seed(1)
+                manipulation.apply_coordinates(out)
+                self.assertArraysAlmostEqual(out, randomized_molecule.coordinates, 1e-10)
+
+    def test_conformer_rmsds(self):
+        molecule = XYZFile("input/tpa.xyz").get_molecule()
+        rotation = random_rotation()
+        references = numpy.array([
+            numpy.dot(molecule.coordinates, rotation.r.transpose()) + 1.0,
+            molecule.coordinates + numpy.random.normal(0, 0.1, molecule.coordinates.shape),
+        ])
+        rmsds = conformer_rmsds(references, molecule.coordinates)
+        self.assertAlmostEqual(rmsds[0], 0.0, 5)
+        transformation = superpose(molecule.coordinates, references[1])
+        delta = numpy.dot(references[1], transformation.r.transpose()) + transformation.t - molecule.coordinates
+        self.assertAlmostEqual(rmsds[1], numpy.sqrt((delta**2).sum()/len(delta)), 5)
+
+    def test_generate_conformers(self):
+        molecule = XYZFile("input/tpa.xyz").get_molecule()
+        graph = MolecularGraph.from_geometry(molecule)
+        manipulations = generate_manipulations(graph, molecule)
+        serial = list(generate_conformers(
+            molecule, graph, manipulations, nonbond_thresholds, 5,
+            num_processes=1, seed=1, rmsd_threshold=0.1*A,
+        ))
+        self.assertEqual(len(serial), 5)
+        for index1, conformer1 in enumerate(serial):
+            self.assert_(check_nonbond(conformer1, graph, nonbond_thresholds))
+            for conformer2 in serial[:index1]:
+                rmsd = conformer_rmsds(numpy.array([conformer2.coordinates]), conformer1.coordinates)[0]
+                self.assert_(rmsd >= 0.1*A)
+        # the outcome must not depend on the number of processes
+        parallel = list(generate_conformers(
+            molecule, graph, manipulations, nonbond_thresholds, 5,
+            num_processes=2, seed=1, ordered=True, rmsd_threshold=0.1*A,
+        ))
+        for conformer1, conformer2 in zip(serial, parallel):
+            self.assertEqual(conformer1.title, conformer2.title)
+            self.assertArraysAlmostEqual(conformer1.coordinates, conformer2.coordinates, 1e-10)
+        # very strict similarity screening leaves only one conformer
+        similar = list(generate_conformers(
+            molecule, graph, manipulations, nonbond_thresholds, 5,
+            max_tasks=5, num_processes=2, similarity_threshold=0.0,
+        ))
+        self.assertEqual(len(similar), 1)
@@ -0,0 +1,114 @@
+# MolMod is a collection of molecular modelling tools for python.
+# Copyright (C) 2007 - 2008 Toon Verstraelen <Toon.Verstraelen@UGent.be>
+#
+# This file is part of MolMod.
+#
+# MolMod is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# MolMod is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+
+from common import BaseTestCase
+
+from molmod.redundant import *
+from molmod.molecular_graphs import MolecularGraph
+from molmod.io.xyz import XYZFile
+
+import unittest, numpy
+
+
+__all__ = ["RedundantTestCase"]
+
+
+class RedundantTestCase(BaseTestCase):
+    def load(self, filename):
+        molecule = XYZFile(filename).get_molecule()
+        graph = MolecularGraph.from_geometry(molecule)
+        return molecule, graph
+
+    def test_counts(self):
+        molecule, graph = self.load("input/ethene.xyz")
+        internals = RedundantInternals(graph, molecule.coordinates)
+        self.assertEqual(len(internals.bonds), 5)
+        self.assertEqual(len(internals.bends), 6)
+        self.assertEqual(len(internals.diheds), 4)
+        self.assertEqual(len(internals.oops), 6)
+        self.assertEqual(len(internals), 21)
+        self.assertEqual(list(numpy.bincount(internals.kinds)), [5, 6, 4, 6])
+        values = internals.get_values(molecule.coordinates)
+        # ethene is planar
+        self.assert_(abs(values[internals.kinds == 3]).max() < 1e-3)
+
+    def test_b_matrix(self):
+        molecule, graph = self.load("input/thf_single.xyz")
+        internals = RedundantInternals(graph, molecule.coordinates)
+        coordinates = molecule.coordinates
+        values, b_matrix = internals.compute(coordinates, 1)
+        self.assertEqual(b_matrix.shape, (len(internals), 3*molecule.size))
+        eps = 1e-6
+        for i in xrange(3*molecule.size):
+            delta = numpy.zeros(3*molecule.size, float)
+            delta[i] = eps
+            plus = internals.get_values(coordinates + delta.reshape((-1,3)))
+            minus = internals.get_values(coordinates - delta.reshape((-1,3)))
+            column = internals.get_deltas(plus, minus)/(2*eps)
+            self.assertArraysAlmostEqual(b_matrix[:,i].toarray().ravel(), column, 1e-5, doabs=True)
+
+    def test_transformations(self):
+        molecule, graph = self.load("input/thf_single.xyz")
+        internals = RedundantInternals(graph, molecule.coordinates)
+        coordinates = molecule.coordinates + numpy.random.normal(0, 0.05, molecule.coordinates.shape)
+        reference = internals.get_values(molecule.coordinates)
+        force_constants = numpy.random.uniform(0.1, 1.0, len(internals))
+
+        def gradient_cartesian(coordinates):
+            values, b_matrix = internals.compute(coordinates, 1)
+            gradient_internal = force_constants*internals.get_deltas(values, reference)
+            return b_matrix.T*gradient_internal
+
+        wilson = WilsonB(internals, coordinates)
+        self.assertEqual(wilson.rank, 3*molecule.size - 6)
+        gradient_internal = force_constants*internals.get_deltas(wilson.values, reference)
+        gradient = wilson.gradient_to_cartesian(gradient_internal)
+        self.assertEqual(gradient.shape, (molecule.size, 3))
+        self.assertArraysAlmostEqual(gradient.ravel(), gradient_cartesian(coordinates), 1e-10)
+
+        # Cartesian gradients can be transformed back and forth
+        projected = wilson.gradient_to_internal(gradient)
+        self.assertArraysAlmostEqual(wilson.gradient_to_cartesian(projected), gradient, 1e-8)
+        b_inv = wilson.b_inv
+        self.assertEqual(b_inv.shape, (3*molecule.size, len(internals)))
+        self.assertArraysAlmostEqual(projected, numpy.dot(b_inv.T, gradient.ravel()), 1e-8)
+        step = numpy.random.normal(0, 0.01, len(internals))
+        self.assertArraysAlmostEqual(wilson.step_to_cartesian(step), numpy.dot(b_inv, step), 1e-8)
+
+        # the Cartesian Hessian is compared with finite differences
+        hessian = wilson.hessian_to_cartesian(numpy.diag(force_constants), gradient_internal)
+        eps = 1e-5
+        check = numpy.zeros(hessian.shape, float)
+        for i in xrange(3*molecule.size):
+            delta = numpy.zeros(3*molecule.size, float)
+            delta[i] = eps
+            check[i] = (
+                gradient_cartesian(coordinates + delta.reshape((-1,3))) -
+                gradient_cartesian(coordinates - delta.reshape((-1,3)))
+            )/(2*eps)
+        self.assertArraysAlmostEqual(hessian, check, 1e-4)
+
+        # transforming back gives the projected internal Hessian, provided
+        # that the internal gradient is consistent with the Cartesian one.
+        projector = wilson.b_matrix*b_inv
+        hessian = wilson.hessian_to_cartesian(numpy.diag(force_constants), projected)
+        expected = numpy.dot(projector, numpy.dot(numpy.diag(force_constants), projector.T))
+        self.assertArraysAlmostEqual(wilson.hessian_to_internal(hessian, gradient), expected, 1e-6)
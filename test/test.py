@@ -60,7 +60,9 @@ from io import *
 from randomize import *
 from zmatrix import *
 from ic import *
+from redundant import *
 from volume import *
+from minimizer import *
 
 unittest.main()
 
@@ -83,6 +83,13 @@ class UnitCellTestCase(unittest.TestCase):
                 r1 = uc.shortest_vector(r0)
                 self.assert_(numpy.linalg.norm(r0) <= numpy.linalg.norm(r1))
 
+    def test_shortest_vector_array(self):
+        uc = UnitCell(numpy.random.uniform(-1, 1, (3, 3)), numpy.array([True, False, True]))
+        deltas = numpy.random.normal(0, 10, (10, 3))
+        result = uc.shortest_vector(deltas)
+        for delta, row in zip(deltas, result):
+            self.assert_(abs(uc.shortest_vector(delta) - row).max() < 1e-10)
+
     def test_radius_indexes(self):
         cell = numpy.array([
             [1.5, 0, 0],